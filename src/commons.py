@@ -39,7 +39,7 @@ __version__ = 'master'
 # Miscellaneous
 import ast, collections, contextlib, ctypes, cython, functools, hashlib
 import importlib, inspect, itertools, keyword, logging, operator, os, re
-import shutil, struct, sys, textwrap, traceback, types
+import shutil, struct, sys, textwrap, threading, traceback, types
 import unicodedata, warnings
 from copy import deepcopy
 # Numerics
@@ -197,12 +197,16 @@ Allgatherv = lambda sendbuf, recvbuf: comm.Allgatherv(
     buf_and_dtype(sendbuf), recvbuf)
 Allreduce = lambda sendbuf, recvbuf, op=MPI.SUM: comm.Allreduce(
     buf_and_dtype(sendbuf), recvbuf, op)
+Alltoall = lambda sendbuf, recvbuf: comm.Alltoall(
+    buf_and_dtype(sendbuf), recvbuf)
 Barrier = comm.Barrier
 Bcast = lambda buf, root=master_rank: comm.Bcast(buf_and_dtype(buf), root)
 Gather = lambda sendbuf, recvbuf, root=master_rank: comm.Gather(
     buf_and_dtype(sendbuf), recvbuf, root)
 Gatherv = lambda sendbuf, recvbuf, root=master_rank: comm.Gatherv(
     buf_and_dtype(sendbuf), recvbuf, root)
+Irecv = lambda buf, source=MPI.ANY_SOURCE, tag=MPI.ANY_TAG: comm.Irecv(
+    buf_and_dtype(buf), source, tag)
 Isend = lambda buf, dest, tag=0: comm.Isend(buf_and_dtype(buf), dest, tag)
 Reduce = lambda sendbuf, recvbuf, op=MPI.SUM, root=master_rank: comm.Reduce(
     buf_and_dtype(sendbuf), recvbuf, op, root)
@@ -213,6 +217,7 @@ Sendrecv = (lambda sendbuf, dest, sendtag=0, recvbuf=None, source=MPI.ANY_SOURCE
     recvtag=MPI.ANY_TAG, status=None: comm.Sendrecv(buf_and_dtype(sendbuf), dest, sendtag,
         recvbuf, source, recvtag, status)
 )
+Waitall = lambda requests: MPI.Request.Waitall(requests)
 allgather  = comm.allgather
 allreduce  = comm.allreduce
 bcast      = lambda obj=None, root=master_rank: comm.bcast(obj, root)
@@ -2464,6 +2469,7 @@ cython.declare(
     render2D_select=dict,
     render3D_select=dict,
     snapshot_type=str,
+    concept_snapshot_params=dict,
     gadget_snapshot_params=dict,
     snapshot_wrap='bint',
     life_output_order=tuple,
@@ -2474,6 +2480,8 @@ cython.declare(
     # Numerical parameter
     boxsize='double',
     potential_options=dict,
+    potential_reuse_steps='Py_ssize_t',
+    potential_reuse_tol='double',
     ewald_gridsize='Py_ssize_t',
     shortrange_params=dict,
     powerspec_options=dict,
@@ -2510,9 +2518,11 @@ cython.declare(
     Δa_max_late='double',
     static_timestepping=object,  # str, callable or None
     N_rungs='Py_ssize_t',
+    N_threads='int',
     fftw_wisdom_rigor=str,
     fftw_wisdom_reuse='bint',
     fftw_wisdom_share='bint',
+    fftw_wisdom_preplan='bint',
     random_generator=str,
     random_seeds=dict,
     primordial_amplitude_fixed='bint',
@@ -2522,7 +2532,9 @@ cython.declare(
     fluid_scheme_select=dict,
     fluid_options=dict,
     class_k_max=dict,
+    class_k_chunks='Py_ssize_t',
     class_reuse='bint',
+    class_cache_size='double',
     # Graphics
     terminal_width='int',
     enable_terminal_formatting='bint',
@@ -2533,6 +2545,7 @@ cython.declare(
     print_load_imbalance=object,
     allow_snapshot_multifile_singleload='bint',
     particle_reordering=object,
+    particle_reordering_period='Py_ssize_t',
     enable_Hubble='bint',
     enable_class_background='bint',
     CosmoFile=str,
@@ -2779,6 +2792,94 @@ snapshot_type = (str(user_params.get('snapshot_type', 'concept'))
     .lower()
 )
 user_params['snapshot_type'] = snapshot_type
+concept_snapshot_params_defaults = {
+    'dataformat': {
+        'pos': 64,
+        'mom': 64,
+    },
+    'compression': None,
+    'chunk size': 'automatic',
+    'subfiles': False,
+    'asynchronous': False,
+}
+concept_snapshot_params = dict(user_params.get('concept_snapshot_params', {}))
+for key, val in concept_snapshot_params.copy().items():
+    key_transformed = (
+        str(key).lower().replace(' ', '').replace('_', '').replace('-', '')
+    )
+    for key_default in concept_snapshot_params_defaults.keys():
+        key_default_transformed = (
+            str(key_default).lower().replace(' ', '').replace('_', '').replace('-', '')
+        )
+        if key_transformed == key_default_transformed:
+            concept_snapshot_params[key_default] = concept_snapshot_params.pop(key)
+            break
+    else:
+        abort(f'Unknown sub-parameter "{key}" in concept_snapshot_params')
+for key, val in concept_snapshot_params_defaults.items():
+    concept_snapshot_params.setdefault(key, val)
+concept_snapshot_params_dataformat = {}
+for key, val in concept_snapshot_params['dataformat'].items():
+    for valid_key in concept_snapshot_params_defaults['dataformat'].keys():
+        if key.lower().startswith(valid_key):
+            break
+    else:
+        abort(
+            f'Unknown CO𝘕CEPT snapshot dataset "{key}" '
+            f'listed in concept_snapshot_params["dataformat"]'
+        )
+    concept_snapshot_params_dataformat[valid_key] = val
+replace_ellipsis(concept_snapshot_params_dataformat)
+for key, val in concept_snapshot_params_defaults['dataformat'].items():
+    concept_snapshot_params_dataformat.setdefault(key, val)
+for key, val in concept_snapshot_params_dataformat.items():
+    val_transformed = str(val).lower()
+    if 'fix' in val_transformed and key == 'pos':
+        val = 'fixed'
+    elif any([
+        pattern in val_transformed
+        for pattern in ['64', '8', 'double']
+    ]):
+        val = 64
+    elif any([
+        pattern in val_transformed
+        for pattern in ['32', '4', 'single', 'float']
+    ]):
+        val = 32
+    else:
+        abort(
+            f'Unknown format "{val}" specified as '
+            f'concept_snapshot_params["dataformat"]["{key}"]'
+        )
+    concept_snapshot_params_dataformat[key] = val
+concept_snapshot_params['dataformat'] = concept_snapshot_params_dataformat
+if concept_snapshot_params['compression']:
+    concept_snapshot_params['compression'] = str(
+        concept_snapshot_params['compression']
+    ).lower()
+    if concept_snapshot_params['compression'] not in ('gzip', 'lzf'):
+        abort(
+            f'Unknown compression "{concept_snapshot_params["compression"]}" '
+            f'specified as concept_snapshot_params["compression"] ∉ {{"gzip", "lzf"}}'
+        )
+else:
+    concept_snapshot_params['compression'] = None
+if isinstance(concept_snapshot_params['chunk size'], str):
+    if 'auto' in concept_snapshot_params['chunk size'].lower():
+        concept_snapshot_params['chunk size'] = -1
+    else:
+        abort(
+            f'Could not understand concept_snapshot_params["chunk size"] '
+            f'= {concept_snapshot_params["chunk size"]}'
+        )
+concept_snapshot_params['chunk size'] = int(round(float(
+    concept_snapshot_params['chunk size']
+)))
+concept_snapshot_params['asynchronous'] = bool(concept_snapshot_params['asynchronous'])
+concept_snapshot_params['subfiles'] = bool(
+    concept_snapshot_params['subfiles'] or concept_snapshot_params['asynchronous']
+)
+user_params['concept_snapshot_params'] = concept_snapshot_params
 gadget_snapshot_params_defaults = {
     'snapformat': 2,
     'dataformat': {
@@ -2866,7 +2967,16 @@ if isinstance(gadget_snapshot_params['particles per file'], str):
 gadget_snapshot_params['particles per file'] = int(round(float(
     gadget_snapshot_params['particles per file']
 )))
-gadget_snapshot_params['parallel write'] = bool(gadget_snapshot_params['parallel write'])
+if isinstance(gadget_snapshot_params['parallel write'], str):
+    if 'pos' in gadget_snapshot_params['parallel write'].lower():
+        gadget_snapshot_params['parallel write'] = 'positional'
+    else:
+        abort(
+            f'Could not understand gadget_snapshot_params["parallel write"] '
+            f'= {gadget_snapshot_params["parallel write"]}'
+        )
+else:
+    gadget_snapshot_params['parallel write'] = bool(gadget_snapshot_params['parallel write'])
 for key in gadget_snapshot_params.copy():
     key_transformed = (
         key.lower().replace(' ', '').replace('-', '').replace('[', '').replace(']', '')
@@ -3233,6 +3343,14 @@ for name, d in potential_differentiations_input.items():
         potential_differentiations[name][key] = subd
 potential_options['differentiation'] = potential_differentiations
 user_params['potential_options'] = potential_options
+potential_reuse_steps = to_int(user_params.get('potential_reuse_steps', 0))
+if potential_reuse_steps < 0:
+    abort(f'potential_reuse_steps = {potential_reuse_steps} but must be non-negative')
+user_params['potential_reuse_steps'] = potential_reuse_steps
+potential_reuse_tol = float(user_params.get('potential_reuse_tol', 1e-3))
+if potential_reuse_tol < 0:
+    abort(f'potential_reuse_tol = {potential_reuse_tol} but must be non-negative')
+user_params['potential_reuse_tol'] = potential_reuse_tol
 ewald_gridsize = to_int(user_params.get('ewald_gridsize', 64))
 user_params['ewald_gridsize'] = ewald_gridsize
 shortrange_params = dict(user_params.get('shortrange_params', {}))
@@ -3262,12 +3380,15 @@ shortrange_params_defaults = {
         'range'    : '4.5*scale',
         'tilesize' : 'range',
         'subtiling': 'automatic',
-        'tablesize': 2**12,
+        'tablesize': 2**9,
+        'tableinterpolation': 'linear',
+        'balancing': False,
     },
 }
 for force, d in shortrange_params_defaults.items():
     shortrange_params.setdefault(force, d)
 subtiling_refinement_period_default = 16
+balancing_period_default = 16
 for force, d in shortrange_params.items():
     for key, val in shortrange_params_defaults.get(force, {}).items():
         d.setdefault(key, val)
@@ -3348,6 +3469,34 @@ for force, d in shortrange_params.items():
         d['subtiling'] = subtiling
     tablesize = int(round(d.get('tablesize', -1)))
     d['tablesize'] = tablesize
+    tableinterpolation = d.get('tableinterpolation')
+    if tableinterpolation is not None:
+        tableinterpolation = str(tableinterpolation).lower()
+        if tableinterpolation not in {'ngp', 'linear', 'cubic'}:
+            abort(
+                f'Could not understand tableinterpolation = "{tableinterpolation}" '
+                f'of shortrange_params["{force}"]'
+            )
+        d['tableinterpolation'] = tableinterpolation
+        tablesize_min = {'ngp': 2, 'linear': 2, 'cubic': 4}[tableinterpolation]
+        if tablesize < tablesize_min:
+            abort(
+                f'A tablesize of at least {tablesize_min} is needed for '
+                f'tableinterpolation = "{tableinterpolation}" of shortrange_params["{force}"]'
+            )
+    # The balancing is stored as the rebalancing period
+    # in time steps, with 0 meaning no balancing.
+    balancing = d.get('balancing', False)
+    if balancing is True:
+        balancing = balancing_period_default
+    elif not balancing:
+        balancing = 0
+    balancing = int(balancing)
+    if balancing < 0:
+        abort(
+            f'Could not understand balancing = {balancing} of shortrange_params["{force}"]'
+        )
+    d['balancing'] = balancing
 user_params['shortrange_params'] = shortrange_params
 powerspec_options_defaults = {
     'upstream gridsize': {
@@ -3787,7 +3936,7 @@ for key, val in d.copy().items():
 d = realization_options['lpt']
 for key, val in d.copy().items():
     d[key] = int(round(val))
-    if d[key] not in {1, 2}:
+    if d[key] not in {1, 2, 3}:
         abort(f'{d[key]}LPT not implemented')
 for s in ('nongauss', 'nongaussian', 'nongaussianity'):
     if s not in realization_options:
@@ -3875,12 +4024,16 @@ if static_timestepping == '':
 user_params['static_timestepping'] = static_timestepping
 N_rungs = int(user_params.get('N_rungs', 8))
 user_params['N_rungs'] = N_rungs
+N_threads = int(user_params.get('N_threads', 1))
+user_params['N_threads'] = N_threads
 fftw_wisdom_rigor = user_params.get('fftw_wisdom_rigor', 'measure').lower()
 user_params['fftw_wisdom_rigor'] = fftw_wisdom_rigor
 fftw_wisdom_reuse = bool(user_params.get('fftw_wisdom_reuse', True))
 user_params['fftw_wisdom_reuse'] = fftw_wisdom_reuse
 fftw_wisdom_share = bool(user_params.get('fftw_wisdom_share', False))
 user_params['fftw_wisdom_share'] = fftw_wisdom_share
+fftw_wisdom_preplan = bool(user_params.get('fftw_wisdom_preplan', False))
+user_params['fftw_wisdom_preplan'] = fftw_wisdom_preplan
 random_generator = user_params.get('random_generator', 'PCG64DXSM')
 user_params['random_generator'] = random_generator
 random_seeds_default = {
@@ -4014,8 +4167,14 @@ else:
 for key, val in class_k_max.copy().items():
     class_k_max[key] = any2list(val)[0]
 user_params['class_k_max'] = class_k_max
+class_k_chunks = to_int(user_params.get('class_k_chunks', 4))
+if class_k_chunks < 1:
+    abort(f'class_k_chunks = {class_k_chunks} but must be at least 1')
+user_params['class_k_chunks'] = class_k_chunks
 class_reuse = bool(user_params.get('class_reuse', True))
 user_params['class_reuse'] = class_reuse
+class_cache_size = float(user_params.get('class_cache_size', ထ))
+user_params['class_cache_size'] = class_cache_size
 # Graphics
 terminal_width = to_int(user_params.get('terminal_width', 80))
 user_params['terminal_width'] = terminal_width
@@ -4283,6 +4442,13 @@ particle_reordering = user_params.get('particle_reordering', True)
 if isinstance(particle_reordering, str):
     particle_reordering = particle_reordering.lower()
 user_params['particle_reordering'] = particle_reordering
+particle_reordering_period = to_int(user_params.get('particle_reordering_period', 8))
+if particle_reordering_period < 1:
+    abort(
+        f'particle_reordering_period = {particle_reordering_period} '
+        f'but must be at least 1'
+    )
+user_params['particle_reordering_period'] = particle_reordering_period
 enable_Hubble = bool(user_params.get('enable_Hubble', True))
 user_params['enable_Hubble'] = enable_Hubble
 enable_class_background = bool(user_params.get('enable_class_background', enable_Hubble))
@@ -4653,6 +4819,7 @@ def call_class(extra_params=None, sleep_time=0.1, mode='single node', class_call
     k_output_values_global_str = params_specialized.get('k_output_values', '')
     # Fairly distribute the k modes among the nodes,
     # taking the number of processes in each node into account.
+    n_chunks = 0
     if 'k_output_values' in params_specialized:
         k_output_values = params_specialized['k_output_values'].split(',')
         if k_output_values != sorted(k_output_values, key=float):
@@ -4664,70 +4831,94 @@ def call_class(extra_params=None, sleep_time=0.1, mode='single node', class_call
         if 'k_output_values' not in params_specialized:
             abort('Cannot call CLASS in node mode when no k_output_values are given')
         n_modes = len(k_output_values)
-        # Put the sorted k modes in a deque.
-        # If the number of k modes cannot be evenly distributed
-        # over the processes, skip the lowest few k modes for now.
-        n_surplus = n_modes % nprocs
-        k_output_values_procs_deque = collections.deque(k_output_values[n_surplus:])
-        # Distribute the k values evenly over the number of processes.
-        # To fairly distribute the workload per process, a given process
-        # is first assigned a k mode from the large k end, then a k mode
-        # from the low k end.
-        k_output_values_procs = [[] for _ in range(nprocs)]
-        while k_output_values_procs_deque:
-            for method in ('pop', 'popleft'):
-                for k_output_values_proc in k_output_values_procs:
-                    if k_output_values_procs_deque:
-                        k_output_values_proc.append(getattr(k_output_values_procs_deque, method)())
-        # Include the skipped low k modes
-        for k_output_value, k_output_values_proc in zip(k_output_values[:n_surplus],
-                                                        reversed(k_output_values_procs),
-                                                        ):
-            k_output_values_proc.append(k_output_value)
-        # Collect the process distributed k modes into node distributed
-        # k modes, based on the number of processes in each node.
-        # The processes with the larger assigned k modes will be
-        # designated the nodes with the most processes.
-        k_output_values_nodes_deque = collections.deque(k_output_values_procs)
-        k_output_values_nodes = [[] for _ in range(nnodes)]
-        while k_output_values_nodes_deque:
-            for method in ('pop', 'popleft'):
-                for nprocs_node_i, k_output_values_node in zip(
-                    sorted(nprocs_nodes, reverse=True), k_output_values_nodes):
-                    if len(k_output_values_node) < nprocs_node_i:
-                        k_output_values_node.append(getattr(k_output_values_nodes_deque, method)())
-        k_output_values_nodes = [
-            list(itertools.chain.from_iterable(k_output_values_node))
-            for k_output_values_node in k_output_values_nodes
-        ]
-        # The k_output_values_nodes list now store one list of k modes
-        # for each node, but the order is scrambled. This is due to
-        # the reversed sorting of nprocs_nodes above. This reversed
-        # sorting is undone here.
-        k_output_values_nodes = [
-            list(map(str, k_output_values_node_arr))
-            for k_output_values_node_arr in
-            asarray(list(reversed(k_output_values_nodes)), dtype=object)[
-                np.argsort(np.argsort(nprocs_nodes))
-           ]
-        ]
-        # Sort the k modes within each node
-        for k_output_values_node in k_output_values_nodes:
-            k_output_values_node.sort(key=float)
-        # Select the list of k modes designated this node
-        # and insert it in the CLASS parameters.
-        k_output_values_node = k_output_values_nodes[node]
-        params_specialized['k_output_values'] = ','.join(k_output_values_node)
-        # Indices of elements of k_output_values
-        # which should be computed on this node.
-        k_output_values_node_indices = asarray(
-            [k_output_values.index(k_output_value) for k_output_value in k_output_values_node],
-            dtype=C2np['Py_ssize_t'],
-        )
-        # If no k modes were delegated to this node,
-        # add a fake, cheap one.
-        if len(k_output_values_node_indices) == 0:
-            params_specialized['k_output_values'] = '1e-6'
+        # Number of k chunks to hand out dynamically to the nodes.
+        # With a single node (or class_k_chunks = 1), the k modes are
+        # instead distributed statically among the nodes. The same goes
+        # when every process is a node master, as the dynamic hand-out
+        # requires a process not running CLASS (see call_class_dynamic()).
+        n_chunks = 0
+        if nnodes > 1 and nprocs > nnodes and class_k_chunks > 1:
+            n_chunks = np.min([class_k_chunks*nnodes, n_modes])
+        if n_chunks > nnodes:
+            # Split the k modes into chunks of (close to) equal size,
+            # ordered with the heaviest (largest k) chunk first. As the
+            # chunks are handed out to whichever node becomes idle
+            # first, the light chunks at the end of the queue fill in
+            # any remaining imbalance between the nodes. The k modes
+            # within each chunk are sorted in ascending order.
+            k_output_values_chunks = [
+                sorted(map(str, k_output_values_chunk), key=float)
+                for k_output_values_chunk in np.array_split(
+                    asarray(k_output_values[::-1], dtype=object), n_chunks,
+                )
+            ]
+            # Only used for the progress message below
+            k_output_values_nodes = k_output_values_chunks
+        else:
+            # Put the sorted k modes in a deque.
+            # If the number of k modes cannot be evenly distributed
+            # over the processes, skip the lowest few k modes for now.
+            n_surplus = n_modes % nprocs
+            k_output_values_procs_deque = collections.deque(k_output_values[n_surplus:])
+            # Distribute the k values evenly over the number of processes.
+            # To fairly distribute the workload per process, a given process
+            # is first assigned a k mode from the large k end, then a k mode
+            # from the low k end.
+            k_output_values_procs = [[] for _ in range(nprocs)]
+            while k_output_values_procs_deque:
+                for method in ('pop', 'popleft'):
+                    for k_output_values_proc in k_output_values_procs:
+                        if k_output_values_procs_deque:
+                            k_output_values_proc.append(getattr(k_output_values_procs_deque, method)())
+            # Include the skipped low k modes
+            for k_output_value, k_output_values_proc in zip(k_output_values[:n_surplus],
+                                                            reversed(k_output_values_procs),
+                                                            ):
+                k_output_values_proc.append(k_output_value)
+            # Collect the process distributed k modes into node distributed
+            # k modes, based on the number of processes in each node.
+            # The processes with the larger assigned k modes will be
+            # designated the nodes with the most processes.
+            k_output_values_nodes_deque = collections.deque(k_output_values_procs)
+            k_output_values_nodes = [[] for _ in range(nnodes)]
+            while k_output_values_nodes_deque:
+                for method in ('pop', 'popleft'):
+                    for nprocs_node_i, k_output_values_node in zip(
+                        sorted(nprocs_nodes, reverse=True), k_output_values_nodes):
+                        if len(k_output_values_node) < nprocs_node_i:
+                            k_output_values_node.append(getattr(k_output_values_nodes_deque, method)())
+            k_output_values_nodes = [
+                list(itertools.chain.from_iterable(k_output_values_node))
+                for k_output_values_node in k_output_values_nodes
+            ]
+            # The k_output_values_nodes list now store one list of k modes
+            # for each node, but the order is scrambled. This is due to
+            # the reversed sorting of nprocs_nodes above. This reversed
+            # sorting is undone here.
+            k_output_values_nodes = [
+                list(map(str, k_output_values_node_arr))
+                for k_output_values_node_arr in
+                asarray(list(reversed(k_output_values_nodes)), dtype=object)[
+                    np.argsort(np.argsort(nprocs_nodes))
+               ]
+            ]
+            # Sort the k modes within each node
+            for k_output_values_node in k_output_values_nodes:
+                k_output_values_node.sort(key=float)
+            # Select the list of k modes designated this node
+            # and insert it in the CLASS parameters.
+            k_output_values_node = k_output_values_nodes[node]
+            params_specialized['k_output_values'] = ','.join(k_output_values_node)
+            # Indices of elements of k_output_values
+            # which should be computed on this node.
+            k_output_values_node_indices = asarray(
+                [k_output_values.index(k_output_value) for k_output_value in k_output_values_node],
+                dtype=C2np['Py_ssize_t'],
+            )
+            # If no k modes were delegated to this node,
+            # add a fake, cheap one.
+            if len(k_output_values_node_indices) == 0:
+                params_specialized['k_output_values'] = '1e-6'
     else:
         if 'k_output_values' in params_specialized:
             k_output_values_node_indices = arange(len(k_output_values), dtype=C2np['Py_ssize_t'])
@@ -4793,27 +4984,35 @@ def call_class(extra_params=None, sleep_time=0.1, mode='single node', class_call
             for insert in inserts:
                 message = re.subn((insert%0).replace(r'+', r'\+'), insert, message, 1)[0]
         message = bcast(message)
-    # Depending on the mode, initialize a Class instance
-    # on the master or node masters.
-    # the other precesses will not run CLASS.
-    cosmo = func = None
-    if (mode == 'single node' and master) or (mode == 'mpi' and node_master):
-        from classy import Class
-        cosmo = Class(concept_class_call=True, node=node, num_threads=num_threads, message=message)
-        cosmo.set(params_specialized)
-        func = cosmo.compute
-    # The background should be available to all processes.
-    # Broadcast the background and instantiate fake classy.Class
-    # instances on slave processes, with the get_background() method
-    # in place.
-    fake_cosmo = get_fake_cosmo(cosmo)
-    if cosmo is None:
-        cosmo = fake_cosmo
-    # Call cosmo.compute in such a way as to allow
-    # for OpenMP parallelization.
-    Barrier()
-    call_openmp_lib(func, sleep_time=sleep_time, mode=mode)
-    Barrier()
+    if n_chunks > nnodes:
+        # Let the node masters compute the k chunks,
+        # handed out dynamically.
+        cosmo, k_output_values_node_indices = call_class_dynamic(
+            params_specialized, k_output_values, k_output_values_chunks,
+            num_threads, message, sleep_time,
+        )
+    else:
+        # Depending on the mode, initialize a Class instance
+        # on the master or node masters.
+        # the other precesses will not run CLASS.
+        cosmo = func = None
+        if (mode == 'single node' and master) or (mode == 'mpi' and node_master):
+            from classy import Class
+            cosmo = Class(concept_class_call=True, node=node, num_threads=num_threads, message=message)
+            cosmo.set(params_specialized)
+            func = cosmo.compute
+        # The background should be available to all processes.
+        # Broadcast the background and instantiate fake classy.Class
+        # instances on slave processes, with the get_background() method
+        # in place.
+        fake_cosmo = get_fake_cosmo(cosmo)
+        if cosmo is None:
+            cosmo = fake_cosmo
+        # Call cosmo.compute in such a way as to allow
+        # for OpenMP parallelization.
+        Barrier()
+        call_openmp_lib(func, sleep_time=sleep_time, mode=mode)
+        Barrier()
     masterprint('done')
     # Always return the cosmo object. If perturbations have
     # been computed, also return the indices of the k_output_values
@@ -4822,6 +5021,107 @@ def call_class(extra_params=None, sleep_time=0.1, mode='single node', class_call
         return cosmo, k_output_values_node_indices
     else:
         return cosmo
+# Helper function for the call_class() function, computing the
+# perturbations of the given chunks of k modes. Rather than distributing
+# the chunks statically among the nodes, each node master repeatedly
+# grabs the next chunk in line whenever it finishes its previous one.
+def call_class_dynamic(
+    params_specialized, k_output_values, k_output_values_chunks,
+    num_threads, message, sleep_time,
+):
+    # The index of the next chunk in line is kept in a shared counter,
+    # exposed through an MPI window. Each node master atomically fetches
+    # and increments this counter, so that no process needs to act as a
+    # dispatcher. Without an MPI progress thread, the passive-target
+    # operations on the counter only complete once the process hosting
+    # it enters the MPI library. The node masters are busy running CLASS
+    # and so the counter is placed on a process which is not a node
+    # master, preferably one on the master node. Such a process
+    # repeatedly probes for messages within sleeping_barrier(), which
+    # drives MPI progress. To keep the latency of fetching a chunk
+    # index low, this process probes at the shortest sleep interval,
+    # rather than backing off. That such a process exists is ensured
+    # by call_class().
+    ranks_counter = [
+        other_rank for other_rank in range(nprocs) if other_rank not in node_master_ranks
+    ]
+    ranks_counter.sort(key=(lambda other_rank: nodes[other_rank] != nodes[master_rank]))
+    rank_counter = ranks_counter[0]
+    if rank == rank_counter:
+        sleep_time = any2list(sleep_time)[0]
+    counter = zeros(int(rank == rank_counter), dtype=C2np['Py_ssize_t'])
+    window = MPI.Win.Create(counter, counter.itemsize, comm=comm)
+    increment = ones(1, dtype=C2np['Py_ssize_t'])
+    chunk_index = empty(1, dtype=C2np['Py_ssize_t'])
+    def fetch_chunk_index():
+        window.Lock(rank_counter, MPI.LOCK_SHARED)
+        window.Fetch_and_op(increment, chunk_index, rank_counter, op=MPI.SUM)
+        window.Unlock(rank_counter)
+        return chunk_index[0]
+    # Function for running CLASS on the node master for a single chunk.
+    # The perturbations are copied out of CLASS, allowing its memory to
+    # be freed right away.
+    background = h = None
+    perturbations = []
+    def compute_chunk(k_output_values_chunk):
+        nonlocal background, h
+        from classy import Class
+        cosmo = Class(concept_class_call=True, node=node, num_threads=num_threads, message=message)
+        cosmo.set(params_specialized | {'k_output_values': ','.join(k_output_values_chunk)})
+        cosmo.compute()
+        if master and background is None:
+            background = cosmo.get_background()
+            h = cosmo.h()
+        perturbations.extend([
+            {key: arr.copy() for key, arr in perturbation.items()}
+            for perturbation in cosmo.get_perturbations()['scalar']
+        ])
+        cosmo.struct_cleanup()
+    # Function for computing chunks on the node master until none
+    # are left. If no chunks at all were grabbed by this node, a fake,
+    # cheap k mode is computed instead.
+    k_output_values_indices = {
+        k_output_value: index for index, k_output_value in enumerate(k_output_values)
+    }
+    k_output_values_node_indices = []
+    def compute_chunks():
+        while True:
+            index = fetch_chunk_index()
+            if index >= len(k_output_values_chunks):
+                break
+            compute_chunk(k_output_values_chunks[index])
+            k_output_values_node_indices.extend([
+                k_output_values_indices[k_output_value]
+                for k_output_value in k_output_values_chunks[index]
+            ])
+        if not k_output_values_node_indices:
+            compute_chunk(['1e-6'])
+    # Call compute_chunks() in such a way as to allow
+    # for OpenMP parallelization.
+    Barrier()
+    call_openmp_lib(compute_chunks, sleep_time=sleep_time, mode='mpi')
+    Barrier()
+    window.Free()
+    # Sort the perturbations on this node according to k
+    if k_output_values_node_indices:
+        order = np.argsort(k_output_values_node_indices)
+        perturbations[:] = [perturbations[i] for i in order]
+        k_output_values_node_indices = asarray(k_output_values_node_indices)[order]
+    k_output_values_node_indices = asarray(
+        k_output_values_node_indices, dtype=C2np['Py_ssize_t'],
+    )
+    # The background should be available to all processes, while each
+    # node master keeps its own perturbations. Clean-up of the
+    # resulting fake classy.Class instance frees the perturbations.
+    background = bcast(background)
+    h = bcast(h)
+    cosmo = FakeClass(
+        lambda: background,
+        lambda: {'scalar': perturbations},
+        lambda: h,
+        perturbations.clear,
+    )
+    return cosmo, k_output_values_node_indices
 # Helper function for the call_class() function
 def get_fake_cosmo(cosmo=None):
     background = bcast(cosmo.get_background() if master else None)
@@ -5565,6 +5865,65 @@ def get_reusable_filename(kind, *objects, extension='', sha_length=10):
     filename = f'{path.reusable_dir}/{kind}/{sha}{extension}'
     return filename
 
+# Function for marking a reusable file as recently used,
+# postponing its eviction from the cache.
+def touch_reusable(filename):
+    try:
+        os.utime(filename)
+    except OSError:
+        # The file may have been evicted by another process
+        pass
+
+# Function for evicting the least recently used reusable files
+# of the given kind, until their total size is below size_max.
+def evict_reusable(kind, size_max, protected=()):
+    """Files at (or within) paths listed in protected are never
+    evicted, nor are temporary files currently being written. The time
+    of last use is taken to be the modification time of each file,
+    which is updated through touch_reusable() whenever the file
+    is reused.
+    """
+    if size_max == ထ:
+        return
+    dirname = f'{path.reusable_dir}/{kind}'
+    protected = [
+        os.path.abspath(path_protected)
+        for path_protected in any2list(protected)
+        if path_protected
+    ]
+    files = []
+    for dirpath, dirnames, filenames in os.walk(dirname):
+        for filename in filenames:
+            filename = os.path.abspath(os.path.join(dirpath, filename))
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, filename))
+    size = np.sum([size_file for _, size_file, _ in files])
+    for _, size_file, filename in sorted(files):
+        if size <= size_max:
+            break
+        if '.tmp_' in os.path.basename(filename):
+            continue
+        if any([
+            filename == path_protected or filename.startswith(f'{path_protected}/')
+            for path_protected in protected
+        ]):
+            continue
+        try:
+            os.remove(filename)
+        except OSError:
+            # Already evicted by another process
+            continue
+        size -= size_file
+        # Remove the directory if left empty
+        if os.path.dirname(filename) != os.path.abspath(dirname):
+            try:
+                os.rmdir(os.path.dirname(filename))
+            except OSError:
+                pass
+
 # Function for doing lookup into shortrange_params which depend on the
 # component(s) in question, i.e. if the values involves the number of
 # particles N.
@@ -5693,7 +6052,7 @@ np.save     = tryexcept_wrapper(np.save,     'np.save() failed')
 np.loadtxt  = tryexcept_wrapper(np.loadtxt,  'np.loadtxt() failed')
 np.savetxt  = tryexcept_wrapper(np.savetxt,  'np.savetxt() failed')
 # For h5py.File the monkey patch is more involved
-def open_hdf5(filename, raise_exception=False, **kwargs):
+def open_hdf5(filename, raise_exception=False, individual=False, **kwargs):
     """This function is equivalent to just doing
     h5py.File(filename, **kwargs)
     except that it will not throw an exception if the file is
@@ -5703,7 +6062,8 @@ def open_hdf5(filename, raise_exception=False, **kwargs):
     become available.
     The function supports both collective and non-collective calls.
     It is an error to call non-collectively from any process but the
-    master mode.
+    master mode, unless individual is True, in which case each process
+    is free to open (its own) file independently of the others.
     """
     # A warning about np.float128 might be emitted from _get_machar()
     # within numpy/core/getlimits.py upon importing h5py.
@@ -5714,14 +6074,14 @@ def open_hdf5(filename, raise_exception=False, **kwargs):
     sleep_time_max = 300
     # Determine if this is a collective call or not
     collective = (kwargs.get('driver') == 'mpio')
-    if not collective and not master:
+    if not collective and not master and not individual:
         abort(
             f'A non-collective call to open_hdf5() was performed on process {rank}, '
             f'which is not the master'
         )
-    # Let the master check if the file is available for opening
-    # in the mode given by **kwargs.
-    if master:
+    # Let the master (or each process for individual calls) check if
+    # the file is available for opening in the mode given by **kwargs.
+    if master or individual:
         # As this check is done by the master only,
         # we must not open it using a collective driver.
         kwargs_noncollective = kwargs.copy()
@@ -5758,9 +6118,23 @@ def open_hdf5(filename, raise_exception=False, **kwargs):
         hdf5_file = h5py.File(filename, **kwargs)
     except OSError:
         # We did not make it. Try again.
-        return open_hdf5(filename, **kwargs)
+        return open_hdf5(filename, individual=individual, **kwargs)
     return hdf5_file
 
+# Function returning a memory-mapped NumPy array over the data of the
+# passed HDF5 dataset, so that only the parts of the data actually
+# accessed are read in from disk. The mapping is copy-on-write,
+# meaning that the array may be written to without affecting the file.
+# If the dataset cannot be memory-mapped (e.g. if it is chunked or
+# compressed), the data is read in normally.
+def map_hdf5_dataset(dset):
+    offset = dset.id.get_offset()
+    if offset is None or dset.chunks is not None or dset.size == 0:
+        return dset[...]
+    return np.memmap(
+        dset.file.filename, dtype=dset.dtype, mode='c', offset=offset, shape=dset.shape,
+    )
+
 
 
 ##############################################################
@@ -5770,6 +6144,18 @@ def open_hdf5(filename, raise_exception=False, **kwargs):
 snapshot_types = ['concept', 'gadget', 'tipsy']
 if snapshot_type not in snapshot_types:
     abort(f'Unrecognised snapshot type "{snapshot_type}" ∉ {snapshot_types}')
+# Warn about compression of CO𝘕CEPT snapshots which cannot be applied
+if (
+        concept_snapshot_params['compression']
+    and not concept_snapshot_params['subfiles']
+    and nprocs > 1
+):
+    masterwarn(
+        f'concept_snapshot_params["compression"] = '
+        f'"{concept_snapshot_params["compression"]}" will not be applied to CO𝘕CEPT '
+        f'snapshots written by {nprocs} processes to a single file. '
+        f'Set concept_snapshot_params["subfiles"] = True to enable compression.'
+    )
 # Abort on unrecognised output kinds
 for key in output_dirs:
     if key not in (output_kinds + ('autosave',)):
@@ -5855,6 +6241,15 @@ if N_rungs < 1:
     abort(f'N_rungs = {N_rungs}, but at least one rung must exist')
 if N_rungs > 30:
     abort(f'N_rungs = {N_rungs}, but must not be greater than 30')
+# Abort for non-positive number of threads. Warn if the total number
+# of threads on a node exceeds the number of available CPU cores.
+if N_threads < 1:
+    abort(f'N_threads = {N_threads}, but at least one thread must be used per process')
+if node_master and N_threads > 1 and nprocs_node*N_threads > (os.cpu_count() or 1):
+    warn(
+        f'With N_threads = {N_threads} and {nprocs_node} processes on node {node}, '
+        f'the CPU cores of this node will be oversubscribed'
+    )
 # Warn about Δt_rung_factor != 1 (the default) when not using rungs,
 # as the value of Δt_rung_factor then does not matter.
 if N_rungs == 1 and Δt_rung_factor != 1:
@@ -5918,7 +6313,10 @@ if autosave_interval < 0:
 # Check keys and values in shortrange_params
 for d in shortrange_params.values():
     for key, val in d.items():
-        if key not in {'scale', 'range', 'tilesize', 'subtiling', 'tablesize'}:
+        if key not in {
+            'scale', 'range', 'tilesize', 'subtiling', 'tablesize', 'tableinterpolation',
+            'balancing',
+        }:
             masterwarn(f'Unrecognised parameter "{key}" in shortrange_params')
         if key == 'subtiling':
             if isinstance(val, str) and val != 'automatic':
@@ -78,6 +78,7 @@ def partition(size):
     indexᵖ_j_bgn='Py_ssize_t',
     indexᵖ_left='Py_ssize_t',
     indexᵖ_recv_bgn_ℓ='Py_ssize_t',
+    indexᵖ_recv_end_ℓ='Py_ssize_t',
     indexᵖ_right='Py_ssize_t',
     indexᵖ_send_bgn_i='Py_ssize_t',
     indexᵖ_send_bgn_ℓ='Py_ssize_t',
@@ -87,6 +88,7 @@ def partition(size):
     indexʳ_j='Py_ssize_t',
     indexʳ_left='Py_ssize_t',
     indexʳ_recv_bgn_ℓ='Py_ssize_t',
+    indexʳ_recv_end_ℓ='Py_ssize_t',
     indexʳ_right='Py_ssize_t',
     indexʳ_send_bgn_ℓ='Py_ssize_t',
     indexʳ_send_end_ℓ='Py_ssize_t',
@@ -118,6 +120,7 @@ def partition(size):
     rank_recv='int',
     rank_right='int',
     rank_send='int',
+    requests=list,
     rung_index='signed char',
     rung_index_i='signed char',
     rung_index_j='signed char',
@@ -127,6 +130,7 @@ def partition(size):
     rung_indices_jumped='signed char*',
     rung_indices_mv='signed char[::1]',
     rungs_N='Py_ssize_t*',
+    tag='int',
     Δmom='double*',
     Δmom_mv='double[::1]',
     ℓ='int',
@@ -385,17 +389,8 @@ def exchange(component, include_mom=True, progress_msg=False):
                 rank_other_i = -1  # flag as being equal to rank_other_j
                 continue
         # Find out how many particles to receive
-        n_particles_recv_tot = 0
-        for ℓ in range(1, nprocs):
-            rank_send = mod(rank + ℓ, nprocs)
-            rank_recv = mod(rank - ℓ, nprocs)
-            n_particles_recv_ℓ = sendrecv(
-                n_particles_send[rank_send],
-                dest=rank_send,
-                source=rank_recv,
-            )
-            n_particles_recv[rank_recv] = n_particles_recv_ℓ
-            n_particles_recv_tot += n_particles_recv_ℓ
+        Alltoall(n_particles_send_mv, n_particles_recv_mv)
+        n_particles_recv_tot = sum(n_particles_recv_mv)
         # The particles to be received will be so directly into the
         # component particle arrays. Enlarge these if necessary.
         n_particles_store = component.N_local + n_particles_recv_tot
@@ -419,43 +414,80 @@ def exchange(component, include_mom=True, progress_msg=False):
         data_mvs = [pos_mv]
         if include_mom:
             data_mvs += [mom_mv, Δmom_mv]
-        # Exchange particles between processes
+        # Exchange particles between processes. All messages are
+        # initiated at once using nonblocking communication, with each
+        # process receiving into its own disjoint section of the
+        # component data arrays. Messages of the different particle
+        # variables are distinguished by their tags.
+        requests = []
         indexᵖ_recv_bgn_ℓ = component.N_local  # start index for received data
         for ℓ in range(1, nprocs):
             rank_send = mod(rank + ℓ, nprocs)
             rank_recv = mod(rank - ℓ, nprocs)
             n_particles_send_ℓ = n_particles_send[rank_send]
             n_particles_recv_ℓ = n_particles_recv[rank_recv]
-            # Exchange particle data
             indexᵖ_send_bgn_ℓ = indicesᵖ_send_bgn[rank_send]
             indexᵖ_send_end_ℓ = indexᵖ_send_bgn_ℓ + n_particles_send_ℓ
             indexᵖ_recv_end_ℓ = indexᵖ_recv_bgn_ℓ + n_particles_recv_ℓ
             indexʳ_send_bgn_ℓ = 3*indexᵖ_send_bgn_ℓ
             indexʳ_send_end_ℓ = 3*indexᵖ_send_end_ℓ
             indexʳ_recv_bgn_ℓ = 3*indexᵖ_recv_bgn_ℓ
-            for data_mv in data_mvs:
-                Sendrecv(
-                    data_mv[indexʳ_send_bgn_ℓ:indexʳ_send_end_ℓ],
-                    dest=rank_send,
-                    recvbuf=data_mv[indexʳ_recv_bgn_ℓ:],
-                    source=rank_recv,
-                )
+            indexʳ_recv_end_ℓ = 3*indexᵖ_recv_end_ℓ
+            for tag, data_mv in enumerate(data_mvs):
+                if n_particles_recv_ℓ > 0:
+                    requests.append(Irecv(
+                        data_mv[indexʳ_recv_bgn_ℓ:indexʳ_recv_end_ℓ],
+                        source=rank_recv,
+                        tag=tag,
+                    ))
+                if n_particles_send_ℓ > 0:
+                    requests.append(Isend(
+                        data_mv[indexʳ_send_bgn_ℓ:indexʳ_send_end_ℓ],
+                        dest=rank_send,
+                        tag=tag,
+                    ))
             # If using IDs we also exchange these
             if component.use_ids:
-                Sendrecv(
-                    ids_mv[indexᵖ_send_bgn_ℓ:indexᵖ_send_end_ℓ],
-                    dest=rank_send,
-                    recvbuf=ids_mv[indexᵖ_recv_bgn_ℓ:],
-                    source=rank_recv,
-                )
+                if n_particles_recv_ℓ > 0:
+                    requests.append(Irecv(
+                        ids_mv[indexᵖ_recv_bgn_ℓ:indexᵖ_recv_end_ℓ],
+                        source=rank_recv,
+                        tag=3,
+                    ))
+                if n_particles_send_ℓ > 0:
+                    requests.append(Isend(
+                        ids_mv[indexᵖ_send_bgn_ℓ:indexᵖ_send_end_ℓ],
+                        dest=rank_send,
+                        tag=3,
+                    ))
             # If using rungs we also exchange the rung indices
             if component.use_rungs:
-                Sendrecv(
-                    rung_indices_mv[indexᵖ_send_bgn_ℓ:indexᵖ_send_end_ℓ],
-                    dest=rank_send,
-                    recvbuf=rung_indices_mv[indexᵖ_recv_bgn_ℓ:],
-                    source=rank_recv,
-                )
+                if n_particles_recv_ℓ > 0:
+                    requests.append(Irecv(
+                        rung_indices_mv[indexᵖ_recv_bgn_ℓ:indexᵖ_recv_end_ℓ],
+                        source=rank_recv,
+                        tag=4,
+                    ))
+                if n_particles_send_ℓ > 0:
+                    requests.append(Isend(
+                        rung_indices_mv[indexᵖ_send_bgn_ℓ:indexᵖ_send_end_ℓ],
+                        dest=rank_send,
+                        tag=4,
+                    ))
+            # Update the start index for received data
+            indexᵖ_recv_bgn_ℓ += n_particles_recv_ℓ
+        # Wait for all particle data to arrive
+        Waitall(requests)
+        # Update the rung populations due to the sent
+        # and received particles.
+        if component.use_rungs:
+            indexᵖ_recv_bgn_ℓ = component.N_local
+            for ℓ in range(1, nprocs):
+                rank_send = mod(rank + ℓ, nprocs)
+                rank_recv = mod(rank - ℓ, nprocs)
+                indexᵖ_send_bgn_ℓ = indicesᵖ_send_bgn[rank_send]
+                indexᵖ_send_end_ℓ = indexᵖ_send_bgn_ℓ + n_particles_send[rank_send]
+                indexᵖ_recv_end_ℓ = indexᵖ_recv_bgn_ℓ + n_particles_recv[rank_recv]
                 # Decrement rung population due to sent particles
                 for indexᵖ in range(indexᵖ_send_bgn_ℓ, indexᵖ_send_end_ℓ):
                     rung_index = rung_indices[indexᵖ]
@@ -468,8 +500,7 @@ def exchange(component, include_mom=True, progress_msg=False):
                     # Set the jumped rung index equal to
                     # the rung index, signalling no upcoming jump.
                     rung_indices_jumped[indexᵖ] = rung_index
-            # Update the start index for received data
-            indexᵖ_recv_bgn_ℓ += n_particles_recv_ℓ
+                indexᵖ_recv_bgn_ℓ = indexᵖ_recv_end_ℓ
         # Move particles into the holes left by the sent particles
         indexᵖ_hole_bgn = indexᵖ_right + 1
         indexᵖ_hole_end = pairmin(indexᵖ_hole_bgn + n_particles_send_tot, component.N_local)
@@ -542,6 +573,12 @@ indicesᵖ_send_bgn  = cython.address(indicesᵖ_send_bgn_mv[:])
     grid='double[:, :, ::1]',
     operation=str,
     # Locals
+    block_recv='double[:, :, :]',
+    block_send='double[:, :, :]',
+    blocks_recv=list,
+    buffers_recv=list,
+    dest='int',
+    direction='int',
     i='int',
     index_recv_bgn_i='Py_ssize_t',
     index_recv_end_i='Py_ssize_t',
@@ -557,7 +594,11 @@ indicesᵖ_send_bgn  = cython.address(indicesᵖ_send_bgn_mv[:])
     index_send_end_k='Py_ssize_t',
     j='int',
     k='int',
+    recvbuf_mv='double[::1]',
+    requests=list,
     reverse='bint',
+    sendbuf_mv='double[::1]',
+    source='int',
     returns='void',
 )
 def communicate_ghosts(grid, operation):
@@ -571,11 +612,20 @@ def communicate_ghosts(grid, operation):
         All local ghost points will be assigned values based on the
         values stored at the corresponding points on neighbour
         processes. Current ghost point values will be ignored.
+    The communication of all 26 faces/edges/corners is carried out
+    simultaneously using nonblocking MPI, with each message having its
+    own send and receive buffer. As the received data is only applied
+    once all communication is done and in a fixed order, the result is
+    deterministic.
     """
     if grid is None:
         return
     # Set the direction of communication depending on the operation
     reverse = (operation == '=')
+    requests = []
+    blocks_recv = []
+    buffers_recv = []
+    direction = -1
     # Loop over all 26 neighbour domains
     for i in range(-1, 2):
         if i == -1:
@@ -640,24 +690,44 @@ def communicate_ghosts(grid, operation):
                     index_send_end_k = ℤ[grid.shape[2]]
                     index_recv_bgn_k = ℤ[1*nghosts]
                     index_recv_end_k = ℤ[2*nghosts]
-                # Communicate this face/edge/corner
-                smart_mpi(
-                    grid[
-                        index_send_bgn_i:index_send_end_i,
-                        index_send_bgn_j:index_send_end_j,
-                        index_send_bgn_k:index_send_end_k,
-                    ],
-                    grid[
-                        index_recv_bgn_i:index_recv_end_i,
-                        index_recv_bgn_j:index_recv_end_j,
-                        index_recv_bgn_k:index_recv_end_k,
-                    ],
-                    dest  =rank_neighbouring_domain(+i, +j, +k),
-                    source=rank_neighbouring_domain(-i, -j, -k),
-                    reverse=reverse,
-                    mpifun='Sendrecv',
-                    operation=operation,
+                # Initiate communication of this face/edge/corner.
+                # The direction is used as the message tag, ensuring
+                # proper matching even when the same neighbour process
+                # is found in several directions.
+                direction += 1
+                block_send = grid[
+                    index_send_bgn_i:index_send_end_i,
+                    index_send_bgn_j:index_send_end_j,
+                    index_send_bgn_k:index_send_end_k,
+                ]
+                block_recv = grid[
+                    index_recv_bgn_i:index_recv_end_i,
+                    index_recv_bgn_j:index_recv_end_j,
+                    index_recv_bgn_k:index_recv_end_k,
+                ]
+                dest   = rank_neighbouring_domain(+i, +j, +k)
+                source = rank_neighbouring_domain(-i, -j, -k)
+                if reverse:
+                    block_send, block_recv = block_recv, block_send
+                    dest, source = source, dest
+                sendbuf_mv = get_buffer(
+                    block_send.shape[0]*block_send.shape[1]*block_send.shape[2],
+                    ('ghosts send', direction),
                 )
+                recvbuf_mv = get_buffer(
+                    block_recv.shape[0]*block_recv.shape[1]*block_recv.shape[2],
+                    ('ghosts recv', direction),
+                )
+                copy_to_contiguous(block_send, sendbuf_mv)
+                requests.append(Irecv(recvbuf_mv, source=source, tag=direction))
+                requests.append(Isend(sendbuf_mv, dest=dest, tag=direction))
+                blocks_recv.append(block_recv)
+                buffers_recv.append(recvbuf_mv)
+    # Wait for all communication to finish,
+    # then copy/add the received data into the grid.
+    Waitall(requests)
+    for direction in range(len(blocks_recv)):
+        copy_to_noncontiguous(buffers_recv[direction], blocks_recv[direction], operation)
 
 # Function for cutting out domains as cuboidal boxes in the best
 # possible way. The return value is an array of 3 elements; the number
@@ -801,28 +871,28 @@ def rank_neighbouring_domain(i, j, k):
     source='int',
     component_recv='Component',
     use_Δ_recv='bint',
+    buffer_index='int',
+    wait='bint',
     # Locals
     N_particles='Py_ssize_t',
     N_particles_recv='Py_ssize_t',
-    contain_particles='signed char*',
-    domain_layout_source='int[::1]',
+    count_recv=object,  # tuple, int or None
     indexᵖ='Py_ssize_t',
+    lowest_active_rung_recv='signed char',
     mv_recv='double[::1]',
     mv_recv_buf='double[::1]',
-    mv_recv_list=list,
     mv_send='double[::1]',
     mv_send_buf='double[::1]',
-    mv_send_list=list,
     n_send='Py_ssize_t',
     operation=str,
     ptr_recv='double*',
     ptr_recv_buf='double*',
     ptr_send='double*',
     ptr_send_buf='double*',
+    requests=list,
     rung='Py_ssize_t*',
     rung_N='Py_ssize_t',
     rung_index='signed char',
-    rung_indices='signed char*',
     rung_indices_buf='signed char[::1]',
     rung_indices_buf_ptr='signed char*',
     rung_indices_jumped='signed char*',
@@ -830,10 +900,9 @@ def rank_neighbouring_domain(i, j, k):
     rung_indices_jumped_buf_ptr='signed char*',
     rung_particle_index='Py_ssize_t',
     rungs_N='Py_ssize_t*',
-    subtiling_name=str,
+    tag='int',
     tile='Py_ssize_t**',
     tile_index='Py_ssize_t',
-    tile_indices_send_prev_ptr='Py_ssize_t*',
     tile_indices_send_ptr='Py_ssize_t*',
     tiles='Py_ssize_t***',
     tiles_rungs_N='Py_ssize_t**',
@@ -847,12 +916,13 @@ def rank_neighbouring_domain(i, j, k):
 def sendrecv_component(
     component_send, variables, pairing_level, interaction_name,
     tile_indices_send, dest, source, component_recv=None, use_Δ_recv=True,
+    buffer_index=0, wait=True,
 ):
     """This function operates in two modes:
     - Communicate data (no component_recv supplied):
       The data of component_send will be send and received
-      into the global component_buffer.
-      The component_buffer is then returned.
+      into the global component buffer with index buffer_index.
+      The component buffer is then returned.
     - Communicate and apply buffers (a component_recv is supplied):
       The data buffer of component_send will be send and
       received into the data buffers of component_recv. The received
@@ -874,12 +944,21 @@ def sendrecv_component(
     interaction_name. In the case of pairing_level == 'domain',
     no actual tiling should be used, and so here we use the trivial
     tiling. Note that the passed tile_indices_send should be identical
-    on all processes. After tile particles have been communicated,
+    on all processes. Either of dest and source may be MPI.PROC_NULL,
+    resulting in one-way communication.
+    After tile particles have been communicated,
     the returned buffer component will be tile sorted at the domain
     (tile, not subtile) level. Note that the particle order is not
     preserved when doing such a communication + tile sorting.
+    In communication mode, the particle data is communicated using
+    nonblocking MPI. If wait is False, this function returns as soon as
+    the communication has been initiated, leaving the returned
+    component buffer unfinished. The communication must then be
+    completed by calling sendrecv_component_wait(buffer_index) before
+    the component buffer is used. As two component buffers exist, the
+    communication into one of them may take place while the other
+    one is in use.
     """
-    global component_buffer, tile_indices_send_prev
     if component_send.representation != 'particles':
         abort('The sendrecv_component function is only implemented for particle components')
     # No communication is needed if the destination and source is
@@ -910,6 +989,15 @@ def sendrecv_component(
                 ℤ[component_send.highest_populated_rung + 1],
             ):
                 N_particles += rungs_N[rung_index]
+        # Communicate the number of particles together with the
+        # lowest active rung. Nothing is received if source is
+        # MPI.PROC_NULL.
+        count_recv = sendrecv(
+            (N_particles, component_send.lowest_active_rung),
+            dest=dest, sendtag=sendrecv_component_tags['count'],
+            source=source, recvtag=sendrecv_component_tags['count'],
+        )
+        N_particles_recv, lowest_active_rung_recv = (0, 0) if count_recv is None else count_recv
     else:  # operation == '+=':
         # When operation == '+=', we always send all particles back
         # to the process from which they originally came.
@@ -923,49 +1011,48 @@ def sendrecv_component(
         N_particles = component_send.N_local
         # Also extract tile variables from component_recv
         tiling_recv = component_recv.tilings[tiling_name]
-    N_particles_recv = sendrecv(N_particles, dest=dest, source=source)
+        count_recv = sendrecv(
+            N_particles,
+            dest=dest, sendtag=sendrecv_component_tags['count Δ'],
+            source=source, recvtag=sendrecv_component_tags['count Δ'],
+        )
+        N_particles_recv = 0 if count_recv is None else count_recv
     # In communicate mode (operation == '='),
-    # the global component_buffer is used as component_recv.
+    # a global component buffer is used as component_recv.
     if 𝔹[operation == '=']:
         # We cannot simply import Component from the species module,
         # as this would create an import loop. Instead, the first time
-        # the component_buffer is needed, we grab the type of the passed
+        # a component buffer is needed, we grab the type of the passed
         # component_send (Component) and instantiate such an instance.
-        if component_buffer is None:
-            component_buffer = type(component_send)('', 'cold dark matter', N=1)
+        component_recv = component_buffers[buffer_index]
+        if component_recv is None:
+            component_recv = type(component_send)('', 'cold dark matter', N=1)
+            component_buffers[buffer_index] = component_recv
         # Adjust important meta data on the buffer component
-        component_buffer.name             = component_send.name
-        component_buffer.species          = component_send.species
-        component_buffer.representation   = component_send.representation
-        component_buffer.N                = component_send.N
-        component_buffer.mass             = component_send.mass
-        component_buffer.softening_length = component_send.softening_length
-        component_buffer.use_rungs        = component_send.use_rungs
-        # Enlarge the data arrays of the component_buffer if necessary
-        component_buffer.N_local = N_particles_recv
-        if component_buffer.N_allocated < component_buffer.N_local:
+        component_recv.name             = component_send.name
+        component_recv.species          = component_send.species
+        component_recv.representation   = component_send.representation
+        component_recv.N                = component_send.N
+        component_recv.mass             = component_send.mass
+        component_recv.softening_length = component_send.softening_length
+        component_recv.use_rungs        = component_send.use_rungs
+        # Enlarge the data arrays of the component buffer if necessary
+        component_recv.N_local = N_particles_recv
+        if component_recv.N_allocated < component_recv.N_local:
             # Temporarily set use_rungs = True to ensure that the
             # rung_indices and rung_indices_jumped
             # get resized as well.
-            use_rungs = component_buffer.use_rungs
-            component_buffer.use_rungs = True
-            component_buffer.resize(component_buffer.N_local)
-            component_buffer.use_rungs = use_rungs
-        # Use component_buffer as component_recv
-        component_recv = component_buffer
-    # Operation-dependent preparations for the communication
-    if 𝔹[operation == '=']:
-        # In communication mode the particles within the tiles are
-        # temporarily copied to the mv_send_buf buffer.
-        # Make sure that this is large enough.
-        mv_send_buf = get_buffer(3*N_particles, 'send')
-        ptr_send_buf = cython.address(mv_send_buf[:])
+            use_rungs = component_recv.use_rungs
+            component_recv.use_rungs = True
+            component_recv.resize(component_recv.N_local)
+            component_recv.use_rungs = use_rungs
     else:  # operation == '+=':
         # We need to receive the data into a buffer, and then update the
         # local data by this amount. Get the buffer.
         mv_recv_buf = get_buffer(3*N_particles_recv, 'recv')
         ptr_recv_buf = cython.address(mv_recv_buf[:])
     # Do the communication for each variable
+    requests = []
     for variable in variables:
         # Get arrays to send and receive into
         if variable == 'pos':
@@ -991,60 +1078,58 @@ def sendrecv_component(
                 f'Variable "{variable}" supplied to sendrecv_component() '
                 f'but only "pos" and "mom" are implemented.'
             )
+        tag = sendrecv_component_tags[variable if 𝔹[operation == '='] else f'Δ{variable}']
         ptr_send = cython.address(mv_send[:])
         ptr_recv = cython.address(mv_recv[:])
         # In communication mode we only need to send the particular
         # particles within the specified tiles. Here we copy the
-        # variable of these specific particles to a buffer.
+        # variable of these specific particles to a buffer, dedicated
+        # to this variable as the communication is nonblocking.
+        # The communication into the component buffer is
+        # then initiated.
         if 𝔹[operation == '=']:
+            mv_send_buf = get_buffer(3*N_particles, ('sendrecv_component', variable))
+            ptr_send_buf = cython.address(mv_send_buf[:])
             n_send = copy_particles_in_tiles(
                 component_send,
                 tiling, tile_indices_send,
                 ptr_send, ptr_send_buf,
             )
-            mv_send = mv_send_buf[:n_send]
-        # Communicate the particle data
-        if 𝔹[operation == '=']:
-            Sendrecv(mv_send, recvbuf=mv_recv, dest=dest, source=source)
+            requests.append(
+                Irecv(mv_recv[:3*N_particles_recv], source=source, tag=tag)
+            )
+            requests.append(
+                Isend(mv_send_buf[:n_send], dest=dest, tag=tag)
+            )
         else:  # operation == '+='
-            Sendrecv(mv_send, recvbuf=mv_recv_buf, dest=dest, source=source)
-            copy_particles_in_tiles(
-                component_recv,
-                tiling_recv, tile_indices_send,
-                ptr_recv_buf, ptr_recv,
-                add=True,
+            Sendrecv(
+                mv_send, dest=dest, sendtag=tag,
+                recvbuf=mv_recv_buf, source=source, recvtag=tag,
             )
+            if source != MPI.PROC_NULL:
+                copy_particles_in_tiles(
+                    component_recv,
+                    tiling_recv, tile_indices_send,
+                    ptr_recv_buf, ptr_recv,
+                    add=True,
+                )
     # When in communication mode, we additionally need to communicate
     # the rung indices and rung jumps of the communicated particles.
     # If not using rungs, we skip this.
     if 𝔹[operation == '=' and component_send.use_rungs]:
-        # Create contiguous memory view over rung indices.
-        # We must only include the rung indices for
-        # particles within the specified tiles.
-        if rung_indices_arr.shape[0] < N_particles:
-            rung_indices_arr.resize(N_particles, refcheck=False)
-        rung_indices_buf = rung_indices_arr
+        # Fill contiguous buffers with the rung indices and the jumped
+        # rung indices. We must only include particles within the
+        # specified tiles. The buffers used are dedicated to this
+        # function, as the communication is nonblocking.
+        if rung_indices_send_arr.shape[0] < N_particles:
+            rung_indices_send_arr.resize(N_particles, refcheck=False)
+        if rung_indices_jumped_send_arr.shape[0] < N_particles:
+            rung_indices_jumped_send_arr.resize(N_particles, refcheck=False)
+        rung_indices_buf = rung_indices_send_arr
         rung_indices_buf_ptr = cython.address(rung_indices_buf[:])
-        n_send = 0
-        for tile_index in range(tile_indices_send.shape[0]):
-            tile_index = tile_indices_send_ptr[tile_index]
-            rungs_N    = tiles_rungs_N        [tile_index]
-            for rung_index in range(
-                ℤ[component_send.lowest_populated_rung],
-                ℤ[component_send.highest_populated_rung + 1],
-            ):
-                rung_N = rungs_N[rung_index]
-                for rung_particle_index in range(rung_N):
-                    rung_indices_buf_ptr[n_send] = rung_index
-                    n_send += 1
-        # Communicate rung indices
-        Sendrecv(rung_indices_buf[:n_send],
-            recvbuf=component_recv.rung_indices_mv, dest=dest, source=source)
-        # Fill buffer with jumped rung indices
-        # and communicate these as well.
-        rung_indices_jumped = component_send.rung_indices_jumped
-        rung_indices_jumped_buf = rung_indices_buf  # reuse buffer
+        rung_indices_jumped_buf = rung_indices_jumped_send_arr
         rung_indices_jumped_buf_ptr = cython.address(rung_indices_jumped_buf[:])
+        rung_indices_jumped = component_send.rung_indices_jumped
         n_send = 0
         for tile_index in range(tile_indices_send.shape[0]):
             tile_index = tile_indices_send_ptr[tile_index]
@@ -1058,11 +1143,83 @@ def sendrecv_component(
                 rung_N = rungs_N[rung_index]
                 for rung_particle_index in range(rung_N):
                     indexᵖ = rung[rung_particle_index]
+                    rung_indices_buf_ptr[n_send] = rung_index
                     rung_indices_jumped_buf_ptr[n_send] = rung_indices_jumped[indexᵖ]
                     n_send += 1
-        Sendrecv(rung_indices_jumped_buf[:n_send],
-            recvbuf=component_recv.rung_indices_jumped_mv, dest=dest, source=source)
-        # Count up how many particles occupy each rung
+        # Initiate communication of rung indices and jumped rung indices
+        tag = sendrecv_component_tags['rung_indices']
+        requests.append(Irecv(
+            component_recv.rung_indices_mv[:N_particles_recv], source=source, tag=tag,
+        ))
+        requests.append(Isend(
+            rung_indices_buf[:n_send], dest=dest, tag=tag,
+        ))
+        tag = sendrecv_component_tags['rung_indices_jumped']
+        requests.append(Irecv(
+            component_recv.rung_indices_jumped_mv[:N_particles_recv], source=source, tag=tag,
+        ))
+        requests.append(Isend(
+            rung_indices_jumped_buf[:n_send], dest=dest, tag=tag,
+        ))
+    # When in communication mode, store the information needed to
+    # finish up the communication, and either do so now or
+    # leave it for a later call to sendrecv_component_wait().
+    if 𝔹[operation == '=']:
+        sendrecv_component_pending[buffer_index] = (
+            requests, component_recv, tiling_name, interaction_name,
+            tile_indices_send, source, lowest_active_rung_recv,
+        )
+        if wait:
+            sendrecv_component_wait(buffer_index)
+    return component_recv
+
+# Function for finishing up communication initiated by the
+# sendrecv_component() function.
+@cython.header(
+    # Arguments
+    buffer_index='int',
+    # Locals
+    component_recv='Component',
+    contain_particles='signed char*',
+    domain_layout_source='int[::1]',
+    indexᵖ='Py_ssize_t',
+    interaction_name=str,
+    lowest_active_rung_recv='signed char',
+    pending=tuple,
+    requests=list,
+    rung_index='signed char',
+    rung_indices='signed char*',
+    rungs_N='Py_ssize_t*',
+    source='int',
+    subtiling_name=str,
+    tile_index='Py_ssize_t',
+    tile_indices_send='Py_ssize_t[::1]',
+    tile_indices_send_prev='Py_ssize_t[::1]',
+    tile_indices_send_prev_ptr='Py_ssize_t*',
+    tiles_rungs_N='Py_ssize_t**',
+    tiling_name=str,
+    tiling_recv='Tiling',
+    returns='Component',
+)
+def sendrecv_component_wait(buffer_index=0):
+    """This function waits for the nonblocking communication into the
+    component buffer with index buffer_index to finish, after which the
+    rung populations and tiling of the component buffer are set up.
+    The finished component buffer is returned. If no communication is
+    pending for the given buffer, None is returned.
+    """
+    pending = sendrecv_component_pending[buffer_index]
+    if pending is None:
+        return None
+    sendrecv_component_pending[buffer_index] = None
+    (
+        requests, component_recv, tiling_name, interaction_name,
+        tile_indices_send, source, lowest_active_rung_recv,
+    ) = pending
+    # Wait for all communication to finish
+    Waitall(requests)
+    # Count up how many particles occupy each rung
+    if component_recv.use_rungs:
         rung_indices = component_recv.rung_indices
         rungs_N = component_recv.rungs_N
         for rung_index in range(N_rungs):
@@ -1072,74 +1229,92 @@ def sendrecv_component(
             rungs_N[rung_index] += 1
         # Find and set lowest and highest populated rung
         component_recv.set_lowest_highest_populated_rung()
-        # Communicate the active rung
-        component_recv.lowest_active_rung = sendrecv(
-            component_send.lowest_active_rung, dest=dest, source=source,
-        )
+        # Set the active rung
+        component_recv.lowest_active_rung = lowest_active_rung_recv
         if component_recv.lowest_active_rung < component_recv.lowest_populated_rung:
             # There is no need to have the lowest active rung
             # be below the lowest populated rung.
             component_recv.lowest_active_rung = component_recv.lowest_populated_rung
-    # When in communication mode the buffer (recv) component
-    # needs to know its own tiling.
-    if 𝔹[operation == '=']:
-        # Ensure that the required tiling (and subtiling)
-        # is instantiated on the buffer component.
-        tiling_recv = component_recv.tilings.get(tiling_name)
-        if tiling_recv is None:
-            component_recv.init_tiling(tiling_name, initial_rung_size=0)
-            tiling_recv = component_recv.tilings[tiling_name]
-            if 𝔹[tiling_name != 'trivial']:
-                subtiling_name = f'{interaction_name} (subtiles)'
-                component_recv.init_tiling(subtiling_name, initial_rung_size=0)
-        # Place the tiling over the domain of the process
-        # with a rank given by 'source'.
+    # The buffer (recv) component needs to know its own tiling.
+    # Ensure that the required tiling (and subtiling)
+    # is instantiated on the buffer component.
+    tiling_recv = component_recv.tilings.get(tiling_name)
+    if tiling_recv is None:
+        component_recv.init_tiling(tiling_name, initial_rung_size=0)
+        tiling_recv = component_recv.tilings[tiling_name]
         if 𝔹[tiling_name != 'trivial']:
-            domain_layout_source = asarray(
-                np.unravel_index(source, domain_subdivisions),
-                dtype=C2np['int'],
-            )
-            tiling_recv.relocate(asarray(
-                (
-                    domain_layout_source[0]*domain_size_x,
-                    domain_layout_source[1]*domain_size_y,
-                    domain_layout_source[2]*domain_size_z,
-                ),
-                dtype=C2np['double'],
-            ))
-        # Perform tile sorting (but do not sort into subtiles)
-        if tile_indices_send_prev is None:
-            tiling_recv.sort(None, -1, already_reset=False)
-        else:
-            # We know that all particles (left over from the last call)
-            # are within tile_indices_send_prev. Reset particle
-            # information within tiling_recv before sorting into tiles.
-            tile_indices_send_prev_ptr = cython.address(tile_indices_send_prev[:])
-            tiles_rungs_N = tiling_recv.tiles_rungs_N
-            contain_particles = tiling_recv.contain_particles
-            for tile_index in range(tile_indices_send_prev.shape[0]):
-                tile_index = tile_indices_send_prev_ptr[tile_index]
-                rungs_N = tiles_rungs_N[tile_index]
-                for rung_index in range(N_rungs):
-                    rungs_N[rung_index] = 0
-                contain_particles[tile_index] = 0
-            tiling_recv.sort(None, -1, already_reset=True)
-        # Set the global tile_indices_send_prev,
-        # for use with the next call to this function.
-        tile_indices_send_prev = tile_indices_send
+            subtiling_name = f'{interaction_name} (subtiles)'
+            component_recv.init_tiling(subtiling_name, initial_rung_size=0)
+    # Place the tiling over the domain of the process
+    # with a rank given by 'source'. When nothing has been received
+    # (source is MPI.PROC_NULL), the placement is of no importance.
+    if 𝔹[tiling_name != 'trivial'] and source != MPI.PROC_NULL:
+        domain_layout_source = asarray(
+            np.unravel_index(source, domain_subdivisions),
+            dtype=C2np['int'],
+        )
+        tiling_recv.relocate(asarray(
+            (
+                domain_layout_source[0]*domain_size_x,
+                domain_layout_source[1]*domain_size_y,
+                domain_layout_source[2]*domain_size_z,
+            ),
+            dtype=C2np['double'],
+        ))
+    # Perform tile sorting (but do not sort into subtiles)
+    tile_indices_send_prev = tile_indices_send_prevs[buffer_index]
+    if tile_indices_send_prev is None:
+        tiling_recv.sort(None, -1, already_reset=False)
+    else:
+        # We know that all particles (left over from the last
+        # communication into this buffer) are within
+        # tile_indices_send_prev. Reset particle information
+        # within tiling_recv before sorting into tiles.
+        tile_indices_send_prev_ptr = cython.address(tile_indices_send_prev[:])
+        tiles_rungs_N = tiling_recv.tiles_rungs_N
+        contain_particles = tiling_recv.contain_particles
+        for tile_index in range(tile_indices_send_prev.shape[0]):
+            tile_index = tile_indices_send_prev_ptr[tile_index]
+            rungs_N = tiles_rungs_N[tile_index]
+            for rung_index in range(N_rungs):
+                rungs_N[rung_index] = 0
+            contain_particles[tile_index] = 0
+        tiling_recv.sort(None, -1, already_reset=True)
+    # Store tile_indices_send as tile_indices_send_prev
+    # for use with the next communication into this buffer.
+    tile_indices_send_prevs[buffer_index] = tile_indices_send
     return component_recv
 
-# Declare global buffers used by sendrecv_component() function.
-# The rung_indices_arr array is also used by the exchange() function
-# and the species.Component class.
+# Declare global buffers used by sendrecv_component() and
+# sendrecv_component_wait(). The rung_indices_arr array is also used
+# by the exchange() function and the species.Component class.
 cython.declare(
-    component_buffer='Component',
+    component_buffers=list,
     rung_indices_arr=object,  # np.ndarray
-    tile_indices_send_prev='Py_ssize_t[::1]',
+    rung_indices_send_arr=object,  # np.ndarray
+    rung_indices_jumped_send_arr=object,  # np.ndarray
+    sendrecv_component_pending=list,
+    sendrecv_component_tags=dict,
+    tile_indices_send_prevs=list,
 )
-component_buffer = None
+component_buffers = [None, None]
 rung_indices_arr = empty(1, dtype=C2np['signed char'])
-tile_indices_send_prev = None
+rung_indices_send_arr = empty(1, dtype=C2np['signed char'])
+rung_indices_jumped_send_arr = empty(1, dtype=C2np['signed char'])
+sendrecv_component_pending = [None, None]
+tile_indices_send_prevs = [None, None]
+# MPI tags used by sendrecv_component(), ensuring correct matching of
+# messages when several communications are in flight at once.
+sendrecv_component_tags = {
+    'count'              : 101,
+    'count Δ'            : 102,
+    'pos'                : 103,
+    'mom'                : 104,
+    'rung_indices'       : 105,
+    'rung_indices_jumped': 106,
+    'Δpos'               : 107,
+    'Δmom'               : 108,
+}
 
 # Helper function for the sendrecv_component() function,
 # handling copying of particle data within specified tiles to a buffer.
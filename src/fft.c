@@ -29,6 +29,9 @@ https://github.com/jmd-dk/concept/
  * together with fftw_execute (included in fftw3-mpi.h) constitutes the
  * necessary functions for using FFTW to do parallel, real, 3D in-place
  * transforms through Cython.
+ * When compiled with FFTW_OPENMP defined (and linked against the
+ * fftw3_omp library), the transforms are further carried out using
+ * several OpenMP threads within each MPI process.
  */
 
 /* Note on indexing
@@ -95,9 +98,21 @@ struct plans_struct make_plans(
     double* grid,
     unsigned rigor_flag,
     int fftw_wisdom_reuse,
+    int wisdom_known,
     char* wisdom_filename
 );
 
+/* This function returns 1 if FFTW is able to use multiple threads
+ * within each process, and 0 otherwise.
+ */
+int fftw_threaded(void) {
+#ifdef FFTW_OPENMP
+    return 1;
+#else
+    return 0;
+#endif
+}
+
 /* This function initializes fftw_mpi, allocates a grid,
  * decides the local lengths and starting indices and
  * creates forwards and backwards plans.
@@ -108,7 +123,9 @@ struct fftw_return_struct fftw_setup(
     ptrdiff_t gridsize_k,
     char* fftw_wisdom_rigor,
     int fftw_wisdom_reuse,
-    char* wisdom_filename
+    int wisdom_known,
+    char* wisdom_filename,
+    int nthreads
 ) {
     /* Arguments to this function:
      * - Linear gridsize of dimension 1.
@@ -118,6 +135,12 @@ struct fftw_return_struct fftw_setup(
      *   of the wisdom. In order of patience:
      *     "estimate", "measure", "patient", "exhaustive".
      * - Flag specifying whether or not to use pre-existing FFTW wisdom.
+     * - Flag specifying whether wisdom for this particular problem
+     *   is known to be present in the wisdom file.
+     * - Path to the wisdom file. This file acts as a database,
+     *   containing the accumulated wisdom of all problems.
+     * - Number of threads to use within each process. This has no
+     *   effect unless compiled with FFTW_OPENMP defined.
      */
 
     /* Size of last dimension with padding */
@@ -134,6 +157,19 @@ struct fftw_return_struct fftw_setup(
     else if (strcmp(fftw_wisdom_rigor, "exhaustive") == 0)
         rigor_flag = FFTW_EXHAUSTIVE;
 
+    /* Initialize threaded FFTW, which must be done prior to
+     * initializing parallel FFTW. All plans created hereafter
+     * will make use of nthreads threads.
+     */
+#ifdef FFTW_OPENMP
+    static int threads_initialized = 0;
+    if (! threads_initialized) {
+        fftw_init_threads();
+        threads_initialized = 1;
+    }
+    fftw_plan_with_nthreads(nthreads);
+#endif
+
     /* Initialize parallel FFTW (note that MPI_Init should not be
      * called, as MPI is already running via MPI4Py).
      * This function may be called multiple times in one MPI session
@@ -164,7 +200,9 @@ struct fftw_return_struct fftw_setup(
      * after plan creation. This is OK if the wisdom is not be reused.
      * If wisdom should be reused and already exists on the disk,
      * the wisdom is read and used directly to create the plans.
-     * If wisdom should be reused and it is not present on disk,
+     * If wisdom should be reused and it is not present on disk
+     * (the wisdom file may still exist, holding wisdom for
+     * other problems),
      * we carry out the plan creation process twice, with a wisdom dump
      * to the disk in between. This way, the final plans all end up the
      * same as if the wisdom already existed on disk prior to calling
@@ -189,6 +227,7 @@ struct fftw_return_struct fftw_setup(
             grid,
             rigor_flag,
             fftw_wisdom_reuse,
+            wisdom_known,
             wisdom_filename
         );
         plan_forward  = plans.forward;
@@ -196,6 +235,8 @@ struct fftw_return_struct fftw_setup(
         /* No further iteration needed if wisdom was read from disk */
         if (plans.reused)
             break;
+        /* The wisdom is now present on disk */
+        wisdom_known = 1;
     }
 
     /* Pack and return grid and plans */
@@ -219,6 +260,7 @@ struct plans_struct make_plans(
     double* grid,
     unsigned rigor_flag,
     int fftw_wisdom_reuse,
+    int wisdom_known,
     char* wisdom_filename
 ) {
     /* Process identification */
@@ -227,11 +269,14 @@ struct plans_struct make_plans(
     int master_rank = 0;
     int master = (rank == master_rank);
 
-    /* Read in previous wisdom and broadcast it */
+    /* Read in previous wisdom and broadcast it. The wisdom file
+     * contains wisdom for many different problems, and so successfully
+     * reading it does not imply that wisdom exists for this problem.
+     */
     int reused = 0;
     if (fftw_wisdom_reuse) {
         if (master)
-            reused = fftw_import_wisdom_from_filename(wisdom_filename);
+            reused = fftw_import_wisdom_from_filename(wisdom_filename) && wisdom_known;
         fftw_mpi_broadcast_wisdom(MPI_COMM_WORLD);
     }
     MPI_Bcast(&reused, 1, MPI_INT, master_rank, MPI_COMM_WORLD);
@@ -263,8 +308,12 @@ struct plans_struct make_plans(
     fftw_mpi_gather_wisdom(MPI_COMM_WORLD);
     fftw_mpi_broadcast_wisdom(MPI_COMM_WORLD);
 
-    /* Save newly acquired wisdom to disk, if it is to be reused */
+    /* Save newly acquired wisdom to disk, if it is to be reused.
+     * Prior to writing, we read in the wisdom file once more,
+     * merging in wisdom written by other jobs in the meantime.
+     */
     if (master && fftw_wisdom_reuse && ! reused) {
+        fftw_import_wisdom_from_filename(wisdom_filename);
         fftw_export_wisdom_to_filename(wisdom_filename);
     }
 
@@ -277,6 +326,19 @@ struct plans_struct make_plans(
     return plans;
 }
 
+/* Call this function to get rid of a grid and its plans,
+ * without cleaning up FFTW as a whole.
+ */
+void fftw_discard(
+    double* grid,
+    fftw_plan plan_forward,
+    fftw_plan plan_backward
+) {
+    fftw_free(grid);
+    fftw_destroy_plan(plan_forward);
+    fftw_destroy_plan(plan_backward);
+}
+
 /* Call this function when all FFTW work is done */
 void fftw_clean(
     double* grid,
@@ -27,12 +27,16 @@ from commons import *
 # Cython imports
 cimport('from ewald import ewald')
 cimport(
-    'from interactions import       '
-    '    combine_softening_lengths, '
-    '    get_softened_r3inv,        '
-    '    particle_particle,         '
+    'from interactions import         '
+    '    combine_softening_lengths,   '
+    '    get_particle_particle_batch, '
+    '    get_softened_r3inv,          '
+    '    particle_particle,           '
 )
 
+# OpenMP imports
+from cython.parallel import prange, threadid
+
 
 
 # Function for computing the gravitational factor
@@ -205,7 +209,11 @@ def gravity_pairwise(
         particle_particle_t_final = time()
         subtiling_r.computation_time += particle_particle_t_final - particle_particle_t_begin
 
-# Function implementing pairwise gravity (short-range only)
+# Function implementing pairwise gravity (short-range only).
+# The particle-particle pairings are gathered into batches of
+# contiguous (structure of arrays) particle data, allowing for
+# vectorized evaluation of the pairwise interactions, which are further
+# distributed over the available OpenMP threads.
 @cython.header(
     # Arguments
     interaction_name=str,
@@ -222,42 +230,74 @@ def gravity_pairwise(
     # Locals
     apply_to_i='bint',
     apply_to_j='bint',
+    batch='ParticleParticleBatch',
     factor_i='double',
-    factor_j='double',
     factors='const double*',
-    forcex_ij='double',
-    forcey_ij='double',
-    forcez_ij='double',
-    indexᵖ_j='Py_ssize_t',
-    indexˣ_i='Py_ssize_t',
-    indexˣ_j='Py_ssize_t',
-    particle_particle_t_begin='double',
-    particle_particle_t_final='double',
-    periodic_offset_x='double',
-    periodic_offset_y='double',
-    periodic_offset_z='double',
+    factors_r='double*',
+    factors_s='double*',
+    flags='Py_ssize_t',
+    index_job='Py_ssize_t',
+    index_Δx='Py_ssize_t',
+    index_Δy='Py_ssize_t',
+    index_Δz='Py_ssize_t',
+    job_index='Py_ssize_t',
+    jobs='Py_ssize_t*',
+    local_interaction='bint',
+    posx_r='double*',
+    posx_s='double*',
+    posy_r='double*',
+    posy_s='double*',
+    posz_r='double*',
+    posz_s='double*',
+    p0='double',
+    p1='double',
+    p2='double',
+    p3='double',
+    r='double',
     r2='double',
     r2_index_scaling='double',
     r2_max='double',
-    rung_index_i='signed char',
-    rung_index_j='signed char',
-    rung_index_s='signed char',
-    rung_indices_jumped_s='signed char*',
+    r2_scaled='double',
+    r3_inv_softened='double',
     shortrange_factor='double',
     shortrange_index='Py_ssize_t',
+    shortrange_index_max='Py_ssize_t',
+    size_r='Py_ssize_t',
+    size_s='Py_ssize_t',
+    slot_r='Py_ssize_t',
+    slot_r_bgn='Py_ssize_t',
+    slot_r_end='Py_ssize_t',
+    slot_s='Py_ssize_t',
+    slot_s_bgn='Py_ssize_t',
+    slot_s_end='Py_ssize_t',
+    slot_s_start='Py_ssize_t',
     softening='double',
-    subtile_contain_jumping_s='bint',
-    subtiling_r='Tiling',
+    softening2='double',
+    softening_h_inv='double',
+    softening_kernel_index='int',
+    softening_spline_factor='double',
+    t_begin='double',
     table='const double*',
-    total_factor='double',
+    table_order='int',
+    thread='int',
+    tile_index_bgn='Py_ssize_t',
+    total_factor_i='double',
+    total_factor_j='double',
     x_ji='double',
+    xi='double',
     y_ji='double',
+    yi='double',
     z_ji='double',
+    zi='double',
+    u='double',
+    Δ_r='double*',
+    Δ_s='double*',
     Δmom_r='double*',
     Δmom_s='double*',
-    Δmomx='double',
-    Δmomy='double',
-    Δmomz='double',
+    Δmomx_i='double',
+    Δmomy_i='double',
+    Δmomz_i='double',
+    τ='double',
     returns='void',
 )
 def gravity_pairwise_shortrange(
@@ -265,18 +305,39 @@ def gravity_pairwise_shortrange(
     tile_indices_receiver, tile_indices_supplier_paired, tile_indices_supplier_paired_N,
     extra_args,
 ):
+    t_begin = time()
     # Extract momentum update buffers
     Δmom_r = receiver.Δmom
     Δmom_s = supplier.Δmom
-    # Extract jumped rung indices of the supplier
-    # (the receiver is handled by particles_particles() below).
-    rung_indices_jumped_s = supplier.rung_indices_jumped
-    # Get table of softened gravitational short-range forces
+    # Get table of gravitational short-range forces. With nearest grid
+    # point lookup, softening is baked into the table. With interpolated
+    # lookup, only the smooth (non-Newtonian) part of the force is
+    # tabulated, with the softened Newtonian part computed exactly.
     softening = combine_softening_lengths(
         receiver.softening_length,
         supplier.softening_length,
     )
     table = get_shortrange_table(softening)
+    table_order = shortrange_table_order
+    softening_kernel_index = 0
+    softening2 = softening**2
+    softening_h_inv = 0
+    softening_spline_factor = 0
+    if table_order > 0:
+        if softening_kernel == 'none':
+            softening_kernel_index = 0
+        elif softening_kernel == 'plummer':
+            softening_kernel_index = 1
+        elif softening_kernel == 'spline':
+            # See get_softened_r3inv() in the interactions module
+            softening_kernel_index = 2
+            softening_h_inv = 1/(2.8*softening)
+            softening_spline_factor = 32*softening_h_inv**3
+        else:
+            abort(
+                f'Softening kernel "{softening_kernel}" not implemented '
+                f'for interpolated short-range force tables'
+            )
     # Get array of factors used for momentum updates;
     #   Δmom = -r⃗/r³*(G*mass_r*mass_s*Δt/a).
     # This array is indexed by the jumped rung index
@@ -284,82 +345,174 @@ def gravity_pairwise_shortrange(
     factors = compute_factors(receiver, supplier, ᔑdt_rungs)
     # Maximum r² beyond which the interaction is ignored
     r2_max = ℝ[shortrange_range**2]
-    # Factor used to scale r² to produce an index into the table
-    r2_index_scaling = ℝ[(shortrange_table_size - 1)/shortrange_table_maxr2]
-    # Loop over all (receiver, supplier) particle pairs (i, j)
-    indexᵖ_j = -1
-    for indexˣ_i, indexᵖ_j, indexˣ_j, rung_index_i, rung_index_s, x_ji, y_ji, z_ji, periodic_offset_x, periodic_offset_y, periodic_offset_z, apply_to_i, apply_to_j, factor_i, subtile_contain_jumping_s, particle_particle_t_begin, subtiling_r in particle_particle(
-        receiver, supplier, pairing_level,
-        tile_indices_receiver, tile_indices_supplier_paired, tile_indices_supplier_paired_N,
-        rank_supplier, interaction_name, only_supply, factors, forcerange=shortrange_range,
-    ):
-        # Translate coordinates so that they
-        # correspond to the nearest image.
-        with unswitch(6):
-            if periodic_offset_x or periodic_offset_y or periodic_offset_z:
-                x_ji += periodic_offset_x
-                y_ji += periodic_offset_y
-                z_ji += periodic_offset_z
-        # If the particle pair is separated by a distance larger
-        # than the range of the short-range force,
-        # ignore this interaction completely.
-        r2 = x_ji**2 + y_ji**2 + z_ji**2
-        if r2 > r2_max:
+    # Factor used to scale r² to produce an index into the table.
+    # Indices beyond the table are clamped, so that the lookup
+    # never reaches outside the table.
+    r2_index_scaling = shortrange_table_r2_index_scaling
+    shortrange_index_max = shortrange_table_index_max
+    # Gather and process the particle-particle pairings
+    # one batch at a time.
+    batch = get_particle_particle_batch()
+    tile_index_bgn = 0
+    while tile_index_bgn < tile_indices_receiver.shape[0]:
+        tile_index_bgn = batch.gather(
+            receiver, supplier, pairing_level,
+            tile_indices_receiver, tile_indices_supplier_paired, tile_indices_supplier_paired_N,
+            tile_index_bgn, rank_supplier, interaction_name, only_supply, shortrange_range,
+        )
+        if batch.N_jobs == 0:
             continue
-        # Compute the short-range force. Here the "force" is in units
-        # of inverse length squared, given by
-        #   force = -r⃗/r³ (x/sqrt(π) exp(-x²/4) + erfc(x/2)),
-        # where x = r/scale with scale the long/short-range
-        # force split scale.
-        # We have this whole expression except for r⃗ already tabulated.
-        # This tabulation has baked in softening of r⁻³.
-        shortrange_index = int(r2*r2_index_scaling)
-        shortrange_factor = table[shortrange_index]
-        # Momentum change of particle i due to particle j
-        with unswitch(3):
-            if apply_to_i:
-                total_factor = factor_i*shortrange_factor
-                Δmomx = x_ji*total_factor
-                Δmomy = y_ji*total_factor
-                Δmomz = z_ji*total_factor
-                Δmom_r[indexˣ_i + 0] += Δmomx
-                Δmom_r[indexˣ_i + 1] += Δmomy
-                Δmom_r[indexˣ_i + 2] += Δmomz
-        # Momentum change of particle j due to particle i
-        with unswitch(8):
-            if 𝔹[not only_supply]:
-                with unswitch(2):
-                    if apply_to_j:
-                        with unswitch(4):
-                            if subtile_contain_jumping_s:
-                                rung_index_j = rung_indices_jumped_s[indexᵖ_j]
+        batch.lookup_factors(factors)
+        # Extract batch variables
+        posx_r = batch.posx_r
+        posy_r = batch.posy_r
+        posz_r = batch.posz_r
+        posx_s = batch.posx_s
+        posy_s = batch.posy_s
+        posz_s = batch.posz_s
+        factors_r = batch.factors_r
+        factors_s = batch.factors_s
+        size_r = batch.size_r
+        size_s = batch.size_s
+        jobs = batch.jobs
+        Δ_r = batch.Δ_r
+        Δ_s = batch.Δ_s
+        # Carry out the jobs, distributed dynamically over the threads.
+        # Each thread accumulates momentum updates within its own
+        # section of the Δ_r and Δ_s buffers. Note that in-place
+        # operations on scalar variables are avoided within the
+        # parallel loop, as these would be interpreted as reductions.
+        for job_index in prange(
+            batch.N_jobs, nogil=True, schedule='dynamic', num_threads=N_threads,
+        ):
+            thread = threadid()
+            index_job = 5*job_index
+            slot_r_bgn = jobs[index_job + 0]
+            slot_r_end = jobs[index_job + 1]
+            slot_s_bgn = jobs[index_job + 2]
+            slot_s_end = jobs[index_job + 3]
+            flags      = jobs[index_job + 4]
+            apply_to_i        = flags & 1
+            apply_to_j        = flags & 2
+            local_interaction = flags & 4
+            # Loop over all receiver particles in the job
+            for slot_r in range(slot_r_bgn, slot_r_end):
+                xi = posx_r[slot_r]
+                yi = posy_r[slot_r]
+                zi = posz_r[slot_r]
+                factor_i = factors_r[slot_r]
+                Δmomx_i = 0
+                Δmomy_i = 0
+                Δmomz_i = 0
+                # Make sure not to double count the particle pairs
+                # of local interactions.
+                slot_s_start = slot_s_bgn
+                if local_interaction:
+                    slot_s_start = slot_s_bgn + (slot_r - slot_r_bgn) + 1
+                # Loop over the needed supplier particles in the job.
+                # Particle pairs separated by a distance larger than the
+                # range of the short-range force are masked out.
+                # The short-range force is
+                #   force = -r⃗/r³ (x/sqrt(π) exp(-x²/4) + erfc(x/2)),
+                # where x = r/scale with scale the long/short-range
+                # force split scale. We have this whole expression
+                # except for r⃗ tabulated. The branches on the table
+                # order, softening kernel and apply_to_j are all
+                # invariant within the job.
+                index_Δx = thread*size_s
+                index_Δy = index_Δx + N_threads*size_s
+                index_Δz = index_Δy + N_threads*size_s
+                for slot_s in range(slot_s_start, slot_s_end):
+                    x_ji = xi - posx_s[slot_s]
+                    y_ji = yi - posy_s[slot_s]
+                    z_ji = zi - posz_s[slot_s]
+                    r2 = x_ji*x_ji + y_ji*y_ji + z_ji*z_ji
+                    r2_scaled = r2*r2_index_scaling
+                    shortrange_index = min(
+                        cast(r2_scaled, 'Py_ssize_t'), shortrange_index_max,
+                    )
+                    if table_order == 0:
+                        # Nearest grid point lookup,
+                        # softening included in the table.
+                        shortrange_factor = table[shortrange_index]
+                    else:
+                        τ = r2_scaled - shortrange_index
+                        if table_order == 1:
+                            # Linear interpolation
+                            p0 = table[shortrange_index]
+                            p1 = table[shortrange_index + 1]
+                            shortrange_factor = p0 + τ*(p1 - p0)
+                        else:
+                            # Cubic (Catmull-Rom) interpolation
+                            p0 = table[shortrange_index    ]
+                            p1 = table[shortrange_index + 1]
+                            p2 = table[shortrange_index + 2]
+                            p3 = table[shortrange_index + 3]
+                            shortrange_factor = p1 + 0.5*τ*(
+                                p2 - p0 + τ*(
+                                    2*p0 - 5*p1 + 4*p2 - p3 + τ*(
+                                        3*(p1 - p2) + p3 - p0
+                                    )
+                                )
+                            )
+                        # Subtract the softened Newtonian r⁻³,
+                        # mirroring get_softened_r3inv().
+                        if softening_kernel_index == 0:
+                            r3_inv_softened = 0
+                            if r2 > 0:
+                                r3_inv_softened = 1/(r2*sqrt(r2))
+                        elif softening_kernel_index == 1:
+                            r3_inv_softened = 1/((r2 + softening2)*sqrt(r2 + softening2))
+                        else:
+                            r = sqrt(r2)
+                            u = r*softening_h_inv
+                            if u >= 1:
+                                r3_inv_softened = 1/(r2*r)
+                            elif u < 0.5:
+                                r3_inv_softened = softening_spline_factor*(
+                                    1./3. + u*u*(-6./5. + u)
+                                )
                             else:
-                                rung_index_j = rung_index_s
-                        with unswitch(3):
-                            if apply_to_i:
-                                if rung_index_i == rung_index_j:
-                                    Δmom_s[indexˣ_j + 0] -= Δmomx
-                                    Δmom_s[indexˣ_j + 1] -= Δmomy
-                                    Δmom_s[indexˣ_j + 2] -= Δmomz
-                                    continue
-                        factor_j = factors[rung_index_j]
-                        total_factor = factor_j*shortrange_factor
-                        Δmom_s[indexˣ_j + 0] -= x_ji*total_factor
-                        Δmom_s[indexˣ_j + 1] -= y_ji*total_factor
-                        Δmom_s[indexˣ_j + 2] -= z_ji*total_factor
+                                r3_inv_softened = softening_spline_factor*(
+                                    2./3. + u*(-3./2. + u*(6./5. - 1./3.*u))
+                                    - 1./(480.*u*u*u)
+                                )
+                        shortrange_factor = shortrange_factor - r3_inv_softened
+                    shortrange_factor = shortrange_factor*(r2 <= r2_max)
+                    # Momentum change of particle i due to particle j
+                    total_factor_i = factor_i*shortrange_factor
+                    Δmomx_i = Δmomx_i + x_ji*total_factor_i
+                    Δmomy_i = Δmomy_i + y_ji*total_factor_i
+                    Δmomz_i = Δmomz_i + z_ji*total_factor_i
+                    # Momentum change of particle j due to particle i
+                    if apply_to_j:
+                        total_factor_j = factors_s[slot_s]*shortrange_factor
+                        Δ_s[index_Δx + slot_s] = Δ_s[index_Δx + slot_s] - x_ji*total_factor_j
+                        Δ_s[index_Δy + slot_s] = Δ_s[index_Δy + slot_s] - y_ji*total_factor_j
+                        Δ_s[index_Δz + slot_s] = Δ_s[index_Δz + slot_s] - z_ji*total_factor_j
+                # Store the accumulated momentum change of particle i
+                if apply_to_i:
+                    index_Δx = thread*size_r + slot_r
+                    index_Δy = index_Δx + N_threads*size_r
+                    index_Δz = index_Δy + N_threads*size_r
+                    Δ_r[index_Δx] = Δ_r[index_Δx] + Δmomx_i
+                    Δ_r[index_Δy] = Δ_r[index_Δy] + Δmomy_i
+                    Δ_r[index_Δz] = Δ_r[index_Δz] + Δmomz_i
+        # Add the accumulated momentum updates to the particles
+        batch.scatter(Δmom_r, Δmom_s, only_supply)
     # Add computation time to the running total,
     # for use with automatic subtiling refinement.
-    if indexᵖ_j != -1:
-        particle_particle_t_final = time()
-        subtiling_r.computation_time += particle_particle_t_final - particle_particle_t_begin
+    if batch.subtiling_r is not None:
+        batch.subtiling_r.computation_time += time() - t_begin
 
-# Function that tabulates the gravitational short-range force,
-# including softening.
+# Function that tabulates the gravitational short-range force
 @cython.header(
     # Arguments
     softening='double',
     # Locals
     i='Py_ssize_t',
+    i_offset='Py_ssize_t',
+    n='Py_ssize_t',
     r='double',
     r2='double',
     r3_inv='double',
@@ -373,52 +526,80 @@ def gravity_pairwise_shortrange(
 def get_shortrange_table(softening):
     # This function tabulates the short-range factor
     #   -r⁻³(x/sqrt(π)exp(-x²/4) + erfc(x/2)),
-    # though in a softened version.
-    # The tabulation is quadratic in r, which is the distance
-    # between two particles, while x = r/scale with scale the
-    # long/short-range force split scale.
-    # Softening for small r is applied to the Newtonian part only,
-    # so that the tabulation becomes
+    # with r the distance between two particles and x = r/scale with
+    # scale the long/short-range force split scale. The tabulation
+    # is quadratic in r. We only need the tabulation for
+    # 0 <= r <= range, where range is the maximum reach of the
+    # short-range force. Softening for small r is applied to the
+    # Newtonian part only, so that the full softened factor becomes
     #     -r⁻³(x/sqrt(π)exp(-x²/4) + erfc(x/2)) - (r⁻³_softened - r⁻³)
-    #   = -r⁻³(x/sqrt(π)exp(-x²/4) + erfc(x/2) - 1) - r⁻³_softened
-    # We only need the tabulation for 0 <= r <= range, where range
-    # is the maximum reach of the short-range force.
+    #   = -r⁻³(x/sqrt(π)exp(-x²/4) + erfc(x/2) - 1) - r⁻³_softened.
+    # For nearest grid point lookups, this full factor is tabulated.
+    # For interpolated lookups, only the first term is tabulated, as
+    # this is smooth (tending to 1/(6sqrt(π)scale³) at r = 0), whereas
+    # the second term is not well resolved by a table of modest size.
+    # The softened Newtonian term is then computed exactly at the
+    # time of lookup, and so the table does not depend on softening.
     # All tables are cached.
+    if shortrange_table_order > 0:
+        softening = -1
     # Look up table in the cache
     table = shortrange_tables.get(softening)
     if table is not None:
         # Table found
         table_ptr = cython.address(table[:])
         return table_ptr
-    # The distances at which the tabulation will be carried out,
-    # quadratically spaced.
-    r_tabulation = np.sqrt(
-        linspace(
-            0,
-            shortrange_table_maxr2,
-            shortrange_table_size,
-        )
-    )
-    # Create the table. The i'th element of table really corresponds
-    # to the value at r[i+½]. Nearest grid point lookups
-    # can then be performed by cheap floor (int casting) indexing.
     table = empty(shortrange_table_size, dtype=C2np['double'])
-    for i in range(shortrange_table_size - 1):
-        r2 = 0.5*(r_tabulation[i]**2 + r_tabulation[i+1]**2)
-        r = sqrt(r2)
-        x = r*ℝ[1/shortrange_scale]
-        r3_inv = 1/(r2*r)
-        r3_inv_softened = get_softened_r3inv(r2, softening)
-        table[i] = (
-            - r3_inv*(1/sqrt(π)*x*exp(-ℝ[0.5*x]**2) + (erfc(ℝ[0.5*x]) - 1))
-            - r3_inv_softened
+    if shortrange_table_order == 0:
+        # The distances at which the tabulation will be carried out,
+        # quadratically spaced.
+        r_tabulation = np.sqrt(
+            linspace(
+                0,
+                shortrange_table_maxr2,
+                shortrange_table_size,
+            )
         )
-    # The last element in table is not populated above.
-    # This element is guaranteed to never be accessed as it would
-    # require an r > shortrange_range due to the way
-    # shortrange_table_maxr2 is constructed. To demonstrate our
-    # trust in this, we here assign it NaN.
-    table[shortrange_table_size - 1] = NaN
+        # Create the table. The i'th element of table really
+        # corresponds to the value at r[i+½]. Nearest grid point
+        # lookups can then be performed by cheap floor
+        # (int casting) indexing.
+        for i in range(shortrange_table_size - 1):
+            r2 = 0.5*(r_tabulation[i]**2 + r_tabulation[i+1]**2)
+            r = sqrt(r2)
+            x = r*ℝ[1/shortrange_scale]
+            r3_inv = 1/(r2*r)
+            r3_inv_softened = get_softened_r3inv(r2, softening)
+            table[i] = (
+                - r3_inv*(1/sqrt(π)*x*exp(-ℝ[0.5*x]**2) + (erfc(ℝ[0.5*x]) - 1))
+                - r3_inv_softened
+            )
+        # The last element in table is not populated above. Lookups
+        # beyond the end of the table are clamped to this element,
+        # and so we assign it a value of zero.
+        table[shortrange_table_size - 1] = 0
+    else:
+        # Tabulate the smooth part at the nodes r²[k] = k/scaling.
+        # For cubic interpolation, node k is stored at index k + 1,
+        # leaving room for a ghost node at each end of the table.
+        i_offset = (shortrange_table_order == 3)
+        n = shortrange_table_size - 2*i_offset
+        for i in range(n):
+            r2 = i/shortrange_table_r2_index_scaling
+            if r2 == 0:
+                table[i_offset + i] = ℝ[1/(6*sqrt(π)*shortrange_scale**3)]
+                continue
+            r = sqrt(r2)
+            x = r*ℝ[1/shortrange_scale]
+            r3_inv = 1/(r2*r)
+            table[i_offset + i] = (
+                - r3_inv*(1/sqrt(π)*x*exp(-ℝ[0.5*x]**2) + (erfc(ℝ[0.5*x]) - 1))
+            )
+        if i_offset:
+            # Populate the ghost nodes by quadratic extrapolation
+            table[0] = 3*table[1] - 3*table[2] + table[3]
+            i = shortrange_table_size - 1
+            table[i] = 3*table[i - 1] - 3*table[i - 2] + table[i - 3]
     # Store in cache and return pointer by calling this function anew
     shortrange_tables[softening] = table
     return get_shortrange_table(softening)
@@ -428,13 +609,31 @@ cython.declare(
     shortrange_scale='double',
     shortrange_range='double',
     shortrange_table_size='Py_ssize_t',
+    shortrange_table_order='int',
     shortrange_table_maxr2='double',
+    shortrange_table_r2_index_scaling='double',
+    shortrange_table_index_max='Py_ssize_t',
     shortrange_tables=dict,
 )
 shortrange_scale      = shortrange_params['gravity']['scale'    ]
 shortrange_range      = shortrange_params['gravity']['range'    ]
 shortrange_table_size = shortrange_params['gravity']['tablesize']
+shortrange_table_order = {'ngp': 0, 'linear': 1, 'cubic': 3}[
+    shortrange_params['gravity']['tableinterpolation']
+]
 shortrange_table_maxr2 = (1 + 1/shortrange_table_size)*shortrange_range**2
+# The scaling from r² to (lower) table index, as well as the maximum
+# allowed (lower) table index, ensuring that all table elements
+# needed for the lookup are within the table.
+if shortrange_table_order == 0:
+    shortrange_table_r2_index_scaling = (shortrange_table_size - 1)/shortrange_table_maxr2
+    shortrange_table_index_max = shortrange_table_size - 1
+elif shortrange_table_order == 1:
+    shortrange_table_r2_index_scaling = (shortrange_table_size - 1)/shortrange_table_maxr2
+    shortrange_table_index_max = shortrange_table_size - 2
+else:
+    shortrange_table_r2_index_scaling = (shortrange_table_size - 3)/shortrange_table_maxr2
+    shortrange_table_index_max = shortrange_table_size - 4
 shortrange_tables = {}
 
 # Function implementing pairwise gravity (non-periodic)
@@ -58,8 +58,13 @@ from communication import get_domain_info
 
 # Class storing the internal state for generation of pseudo-random
 # numbers and implementing probability distributions.
+# Besides the bit stream generators of NumPy, the counter-based stream
+# 'Philox-counter' is available, for which random numbers may further
+# be drawn directly given a counter, without any internal state.
 @cython.cclass
 class PseudoRandomNumberGenerator:
+    # Name of the counter-based stream
+    stream_counter = 'Philox-counter'
     # Find all bit stream generators available in NumPy,
     # e.g. 'PCG64DXSM' (Permuted Congruential Generator)
     # and 'MT19937' (Mersenne Twister).
@@ -89,6 +94,10 @@ class PseudoRandomNumberGenerator:
         """
         public object seed  # Python int or None
         public str stream
+        public bint counter_based
+        unsigned long long int key0
+        unsigned long long int key1
+        Py_ssize_t counter
         Py_ssize_t cache_size
         object bit_generator  # np.random.BitGenerator
         object generator  # np.random.Generator
@@ -106,6 +115,16 @@ class PseudoRandomNumberGenerator:
         self.seed = seed
         self.stream = stream
         self.cache_size = cache_size
+        # The counter-based stream is keyed by the seed, with the
+        # counter used for sequential draws starting from 0.
+        self.counter_based = (stream == self.stream_counter)
+        if self.counter_based:
+            if seed is None:
+                seed = np.random.SeedSequence().entropy
+            self.key0 = seed & 0xFFFFFFFF
+            self.key1 = (seed >> 32) & 0xFFFFFFFF
+            self.counter = 0
+            stream = 'Philox'
         # Look up requested bit stream generator
         bit_generator = self.streams.get(stream)
         if bit_generator is None and stream == 'PCG64DXSM':
@@ -118,7 +137,9 @@ class PseudoRandomNumberGenerator:
             stream = 'PCG64'
             bit_generator = self.streams.get(stream)
         if bit_generator is None:
-            streams_str = ', '.join([f'"{stream}"' for stream in self.streams])
+            streams_str = ', '.join(
+                [f'"{stream}"' for stream in self.streams] + [f'"{self.stream_counter}"']
+            )
             abort(
                 f'Pseudo-random bit generator "{stream}" not available in NumPy. '
                 f'The available ones are {streams_str}.'
@@ -149,7 +170,10 @@ class PseudoRandomNumberGenerator:
             self.index_uniform = 0
             # Draw new batch of uniform pseudo-random numbers
             # in the half-open interval [0, 1).
-            self.cache_uniform = self.generator.uniform(0, 1, size=self.cache_size)
+            if self.counter_based:
+                self.cache_uniform = self.draw_counter_based('uniform')
+            else:
+                self.cache_uniform = self.generator.uniform(0, 1, size=self.cache_size)
         # Look up in cache
         x = self.cache_uniform[self.index_uniform]
         # Transform
@@ -171,7 +195,10 @@ class PseudoRandomNumberGenerator:
             self.index_gaussian = 0
             # Draw new batch of Gaussian pseudo-random numbers
             # with unit standard deviation and mean 0.
-            self.cache_gaussian = self.generator.normal(0, 1, size=self.cache_size)
+            if self.counter_based:
+                self.cache_gaussian = self.draw_counter_based('gaussian')
+            else:
+                self.cache_gaussian = self.generator.normal(0, 1, size=self.cache_size)
         # Look up in cache
         x = self.cache_gaussian[self.index_gaussian]
         # Transform
@@ -192,13 +219,178 @@ class PseudoRandomNumberGenerator:
             self.index_rayleigh = 0
             # Draw new batch of Rayleigh pseudo-random numbers
             # with unit scale.
-            self.cache_rayleigh = self.generator.rayleigh(1, size=self.cache_size)
+            if self.counter_based:
+                self.cache_rayleigh = self.draw_counter_based('rayleigh')
+            else:
+                self.cache_rayleigh = self.generator.rayleigh(1, size=self.cache_size)
         # Look up in cache
         x = self.cache_rayleigh[self.index_rayleigh]
         # Transform
         x *= scale
         return x
 
+    # Method for filling an entire buffer with pseudo-random numbers,
+    # consuming the random stream exactly as repeated calls to the
+    # scalar methods above would. For the uniform distribution, the
+    # half-open interval is [a, b), while a is the scale for the
+    # Gaussian and Rayleigh distributions.
+    @cython.pheader(
+        # Arguments
+        distribution=str,
+        data='double[::1]',
+        a='double',
+        b='double',
+        # Locals
+        cache='double[::1]',
+        i='Py_ssize_t',
+        index='Py_ssize_t',
+        j='Py_ssize_t',
+        n='Py_ssize_t',
+        n_chunk='Py_ssize_t',
+        offset='double',
+        scale='double',
+        returns='void',
+    )
+    def fill(self, distribution, data, a=0, b=1):
+        n = data.shape[0]
+        offset = 0
+        scale = a
+        if distribution == 'uniform':
+            offset = a
+            scale = b - a
+        elif distribution not in ('gaussian', 'rayleigh'):
+            abort(f'fill() got unknown distribution = "{distribution}"')
+        i = 0
+        while i < n:
+            # Look up the next cache index, letting the scalar methods
+            # handle the drawing of a new batch when the cache is
+            # exhausted.
+            if distribution == 'uniform':
+                index = self.index_uniform + 1
+                if index == self.cache_size:
+                    data[i] = self.uniform(a, b)
+                    i += 1
+                    continue
+                cache = self.cache_uniform
+            elif distribution == 'gaussian':
+                index = self.index_gaussian + 1
+                if index == self.cache_size:
+                    data[i] = self.gaussian(a)
+                    i += 1
+                    continue
+                cache = self.cache_gaussian
+            else:  # distribution == 'rayleigh'
+                index = self.index_rayleigh + 1
+                if index == self.cache_size:
+                    data[i] = self.rayleigh(a)
+                    i += 1
+                    continue
+                cache = self.cache_rayleigh
+            # Copy over as much of the cache as possible
+            n_chunk = pairmin(self.cache_size - index, n - i)
+            for j in range(n_chunk):
+                data[i + j] = offset + scale*cache[index + j]
+            i += n_chunk
+            index += n_chunk - 1
+            if distribution == 'uniform':
+                self.index_uniform = index
+            elif distribution == 'gaussian':
+                self.index_gaussian = index
+            else:  # distribution == 'rayleigh'
+                self.index_rayleigh = index
+
+    # Method for drawing a new batch of sequential pseudo-random numbers
+    # from the counter-based stream, with unit scale.
+    @cython.header(
+        # Arguments
+        distribution=str,
+        # Locals
+        data='double[::1]',
+        i='Py_ssize_t',
+        u='double',
+        returns='double[::1]',
+    )
+    def draw_counter_based(self, distribution):
+        data = empty(self.cache_size, dtype=C2np['double'])
+        for i in range(self.cache_size):
+            # Sequential draws make use of the fourth counter word,
+            # keeping them separate from counters
+            # of the form (c0, c1, c2, 0).
+            u = self.counter_uniform(self.counter, 0, 0, 1)
+            self.counter += 1
+            with unswitch:
+                if distribution == 'uniform':
+                    data[i] = u
+                elif distribution == 'gaussian':
+                    # Box-Muller transform
+                    data[i] = sqrt(-2*log(1 - u))*cos(
+                        ℝ[2*π]*self.counter_uniform(self.counter, 0, 0, 1)
+                    )
+                    self.counter += 1
+                elif distribution == 'rayleigh':
+                    data[i] = sqrt(-2*log(1 - u))
+                else:
+                    abort(f'draw_counter_based() got unknown distribution = "{distribution}"')
+        return data
+
+    # Counter-based uniform distribution over the half-open interval
+    # [0, 1), with the returned value fully determined by the seed and
+    # the passed counter (c0, c1, c2, c3). Only the lower 32 bits of
+    # each counter word are used, so negative values are allowed.
+    # The Philox4x32-10 bijection is used.
+    @cython.header(
+        # Arguments
+        c0='Py_ssize_t',
+        c1='Py_ssize_t',
+        c2='Py_ssize_t',
+        c3='Py_ssize_t',
+        # Locals
+        k0='unsigned long long int',
+        k1='unsigned long long int',
+        prod0='unsigned long long int',
+        prod1='unsigned long long int',
+        round_index='int',
+        x0='unsigned long long int',
+        x1='unsigned long long int',
+        x2='unsigned long long int',
+        x3='unsigned long long int',
+        returns='double',
+    )
+    def counter_uniform(self, c0, c1=0, c2=0, c3=0):
+        x0 = c0 & 0xFFFFFFFF
+        x1 = c1 & 0xFFFFFFFF
+        x2 = c2 & 0xFFFFFFFF
+        x3 = c3 & 0xFFFFFFFF
+        k0 = self.key0
+        k1 = self.key1
+        for round_index in range(10):
+            prod0 = 0xD2511F53*x0
+            prod1 = 0xCD9E8D57*x2
+            x0 = ((prod1 >> 32) ^ x1 ^ k0) & 0xFFFFFFFF
+            x1 = prod1 & 0xFFFFFFFF
+            x2 = ((prod0 >> 32) ^ x3 ^ k1) & 0xFFFFFFFF
+            x3 = prod0 & 0xFFFFFFFF
+            k0 = (k0 + 0x9E3779B9) & 0xFFFFFFFF
+            k1 = (k1 + 0xBB67AE85) & 0xFFFFFFFF
+        # Combine the first two words into 53 random bits
+        return ((x0 >> 5)*67108864 + (x1 >> 6))*ℝ[1/9007199254740992]
+
+    # Counter-based Rayleigh distribution
+    @cython.header(
+        # Arguments
+        scale='double',
+        c0='Py_ssize_t',
+        c1='Py_ssize_t',
+        c2='Py_ssize_t',
+        c3='Py_ssize_t',
+        # Locals
+        u='double',
+        returns='double',
+    )
+    def counter_rayleigh(self, scale, c0, c1=0, c2=0, c3=0):
+        u = self.counter_uniform(c0, c1, c2, c3)
+        return scale*sqrt(-2*log(1 - u))
+
 # Instantiate pseudo-random number generator with a unique
 # seed on each process, meant for general-purpose use.
 # Also wrap its methods in easy to use but badly performing functions.
@@ -214,7 +406,6 @@ prng_general = PseudoRandomNumberGenerator(
     b='double',
     # Locals
     data='double[::1]',
-    i='Py_ssize_t',
     shape=tuple,
     returns=object,  # double or np.ndarray
 )
@@ -222,16 +413,7 @@ def random_general(distribution, size, a=0, b=0):
     shape = tuple(any2list(size))
     size = np.prod(shape)
     data = empty(size, dtype=C2np['double'])
-    for i in range(size):
-        with unswitch:
-            if distribution == 'uniform':
-                data[i] = prng_general.uniform(a, b)
-            elif distribution == 'gaussian':
-                data[i] = prng_general.gaussian(a)
-            elif distribution == 'rayleigh':
-                data[i] = prng_general.rayleigh(a)
-            else:
-                abort(f'random_general() got unknown distribution = "{distribution}"')
+    prng_general.fill(distribution, data, a, b)
     if size == 1:
         return data[0]
     else:
@@ -615,6 +797,8 @@ buffer_names = {
     diff_dim='int',
     slab_structure='double[:, :, ::1]',
     nongaussianity='double',
+    slab_extra='double[:, :, ::1]',
+    amplitude_extra='double',
     # Locals
     amplitude='double',
     amplitude_const='double',
@@ -636,17 +820,26 @@ buffer_names = {
     re='double',
     sinθ='double',
     slab='double[:, :, ::1]',
+    slab_extra_ptr='double*',
     slab_ptr='double*',
     slab_structure_ptr='double*',
     tensor_rank='int',
+    use_extra='bint',
     θ='double',
     returns='double[:, :, ::1]',
 )
 def realize_grid(
     gridsize, component, a, amplitude_or_amplitudes, variable,
     multi_index=None, lattice=None, diff_dim=-1, slab_structure=None, nongaussianity=0,
+    slab_extra=None, amplitude_extra=1,
 ):
-    """Note that this function returns a slab in real space"""
+    """Note that this function returns a slab in real space.
+    An additional Fourier space structure may be supplied as slab_extra,
+    which will then be added (with a constant amplitude of
+    amplitude_extra) to the amplitude-weighted structure prior to
+    applying the tensor structure. This allows for realising e.g.
+    first- and higher-order displacement fields together.
+    """
     index0 = index1 = 0
     if variable == 0 or isinstance(multi_index, str):
         # We are realising either ϱ or 𝒫 (multi_index == 'trace')
@@ -673,6 +866,10 @@ def realize_grid(
     if slab_structure is None:
         slab_structure = get_slab_structure(gridsize, component, a, variable)
     slab_structure_ptr = cython.address(slab_structure[:, :, :])
+    # Additional structure
+    use_extra = (slab_extra is not None)
+    if use_extra:
+        slab_extra_ptr = cython.address(slab_extra[:, :, :])
     # Handle constant or varying amplitude
     amplitude_const = 0
     if isinstance(amplitude_or_amplitudes, (int, float, np.integer, np.floating)):
@@ -693,6 +890,12 @@ def realize_grid(
                 amplitude = amplitude_const
         re = slab_structure_ptr[index    ]
         im = slab_structure_ptr[index + 1]
+        # Add in the additional structure, absorbing the amplitude
+        with unswitch:
+            if use_extra:
+                re = amplitude*re + amplitude_extra*slab_extra_ptr[index    ]
+                im = amplitude*im + amplitude_extra*slab_extra_ptr[index + 1]
+                amplitude = 1
         # Rotate the complex phase due to shift
         with unswitch:
             if lattice.shift != (0, 0, 0):
@@ -838,12 +1041,38 @@ def get_slab_structure(gridsize, component, a, variable, use_gridˣ=False):
 cython.declare(slab_structure_infos=dict)
 slab_structure_infos = {}
 
+# Function filling buffers with the next batch of primordial noise in
+# polar form, with the amplitudes and phases drawn from their respective
+# pseudo-random number generators. Fixing of the amplitude and shifting
+# of the phase are applied.
+@cython.header(
+    # Arguments
+    prng_amplitudes='PseudoRandomNumberGenerator',
+    prng_phases='PseudoRandomNumberGenerator',
+    amplitudes='double[::1]',
+    phases='double[::1]',
+    # Locals
+    i='Py_ssize_t',
+    returns='void',
+)
+def draw_polar_noise(prng_amplitudes, prng_phases, amplitudes, phases):
+    if primordial_amplitude_fixed:
+        amplitudes[:] = 1
+    else:
+        prng_amplitudes.fill('rayleigh', amplitudes, 1/sqrt(2))
+    prng_phases.fill('uniform', phases, -π, π)
+    if primordial_phase_shift:
+        for i in range(phases.shape[0]):
+            phases[i] += primordial_phase_shift
+
 # Function that populates a slab decomposed grid
 # with primordial noise.
 @cython.header(
     # Arguments
     slab='double[:, :, ::1]',
     # Locals
+    amplitudes='double[::1]',
+    factor='double',
     gridsize='Py_ssize_t',
     i_conj='Py_ssize_t',
     im='double',
@@ -851,14 +1080,19 @@ slab_structure_infos = {}
     imprint_conj='bint',
     index='Py_ssize_t',
     index_conj='Py_ssize_t',
+    index_noise='Py_ssize_t',
     inside_slab='bint',
     j_conj='Py_ssize_t',
     j_global_conj='Py_ssize_t',
     ki='Py_ssize_t',
+    ki_counter='Py_ssize_t',
     kj='Py_ssize_t',
+    kj_counter='Py_ssize_t',
     kk='Py_ssize_t',
     lower_x_zdc='bint',
+    upper_x_zdc='bint',
     msg=list,
+    phases='double[::1]',
     prng_ampliudes='PseudoRandomNumberGenerator',
     prng_phases='PseudoRandomNumberGenerator',
     r='double',
@@ -914,6 +1148,13 @@ def generate_primordial_noise(slab):
     ( ki = 0,  kj < 0, kk = 0). We refer to this ~half of th z DC plane
     as the 'lower x' part. We thus choose to copy the lower x part of
     the z DC plane onto the upper x part of the z DC plane.
+    With the counter-based random stream, the random numbers are
+    instead obtained directly from the mode k⃗ = (ki, kj, kk), used as
+    the counter. The invariance with respect to the grid size and the
+    number of processes is then automatic, and so each process only
+    visits the modes of its local slab. The upper x part of the z DC
+    plane is then populated by the process itself, by evaluating the
+    random numbers at the conjugate (lower x) mode.
     Note that neither the origin nor the Nyquist planes will be touched
     by this function.
     """
@@ -938,6 +1179,39 @@ def generate_primordial_noise(slab):
     # amplitudes and phases, using the same seeds on all processes.
     prng_ampliudes = PseudoRandomNumberGenerator(random_seeds['primordial amplitudes'])
     prng_phases    = PseudoRandomNumberGenerator(random_seeds['primordial phases'])
+    if prng_phases.counter_based:
+        # Visit only the local modes, drawing random numbers directly
+        # from the mode (ki, kj, kk).
+        for index, ki, kj, kk, factor, θ in fourier_loop(gridsize, skip_origin=True):
+            # For the upper x part of the z DC plane,
+            # use the conjugate of the lower x mode.
+            ki_counter = ki
+            kj_counter = kj
+            upper_x_zdc = False
+            if kk == 0:
+                upper_x_zdc = (ki > 0) | ((ki == 0) & (kj > 0))
+                if upper_x_zdc:
+                    ki_counter = -ki
+                    kj_counter = -kj
+            # Draw random numbers
+            r = 1
+            with unswitch:
+                if not primordial_amplitude_fixed:
+                    r = prng_ampliudes.counter_rayleigh(1/sqrt(2), ki_counter, kj_counter, kk)
+            θ = prng_phases.counter_uniform(ki_counter, kj_counter, kk)*ℝ[2*π] - π
+            # Finalize random noise
+            with unswitch:
+                if primordial_phase_shift:
+                    θ += primordial_phase_shift
+            re = r*cos(θ)
+            im = r*sin(θ)
+            if upper_x_zdc:
+                im = -im
+            # Imprint onto grid point
+            slab_ptr[index    ] = re
+            slab_ptr[index + 1] = im
+        masterprint('done')
+        return
     # Burn the first random number for both generators, corresponding to
     # the origin of the grid. As the grid points are visited in the
     # order given by the Fourier space-filling curve, the sequence of
@@ -947,13 +1221,16 @@ def generate_primordial_noise(slab):
     prng_phases.uniform()
     # Traverse Fourier space from the inside out, drawing random
     # Gaussian numbers as we go and store them in the slabs.
+    # The random numbers are drawn in batches, in polar form.
+    amplitudes = empty(prng_phases.cache_size, dtype=C2np['double'])
+    phases     = empty(prng_phases.cache_size, dtype=C2np['double'])
+    index_noise = phases.shape[0] - 1
     for index, ki, kj, kk, inside_slab in fourier_curve_loop(gridsize, skip_origin=True):
-        # Draw random numbers
-        r = 1
-        with unswitch:
-            if not primordial_amplitude_fixed:
-                r = prng_ampliudes.rayleigh(1/sqrt(2))
-        θ = prng_phases.uniform(-π, π)
+        # Look up random numbers, drawing a new batch if needed
+        index_noise += 1
+        if index_noise == ℤ[phases.shape[0]]:
+            index_noise = 0
+            draw_polar_noise(prng_ampliudes, prng_phases, amplitudes, phases)
         # Check whether the random numbers should be imprinted onto the
         # local slab, either at the current grid point (ki, kj, kk)
         # or its conjugate (-ki, -kj, -kk) in case of kk = 0.
@@ -969,9 +1246,8 @@ def generate_primordial_noise(slab):
         if not imprint and not imprint_conj:
             continue
         # Finalize random noise
-        with unswitch:
-            if primordial_phase_shift:
-                θ += primordial_phase_shift
+        r = amplitudes[index_noise]
+        θ = phases[index_noise]
         re = r*cos(θ)
         im = r*sin(θ)
         # Imprint onto grid point
@@ -991,27 +1267,37 @@ def generate_primordial_noise(slab):
     # Argumetns
     component='Component',
     a='double',
+    datasets=dict,
+    writer=object,  # callable
     # Locals
-    amplitude='double',
+    amplitude_extra_mom='double',
+    amplitude_extra_pos='double',
     amplitudes='double[::1]',
     backscale='bint',
     cosmoresults=object,  # CosmoResults
+    dataset_ids=object,  # h5py.Dataset
+    dataset_mom=object,  # h5py.Dataset
+    dataset_pos=object,  # h5py.Dataset
     dim='int',
-    dim0='int',
-    dim1='int',
     do_2lpt='bint',
-    factor='double',
+    do_3lpt='bint',
+    factors_extra_mom=list,
+    factors_extra_pos=list,
     fft_factor='double',
+    fixed_ids='bint',
+    fixed_mom='bint',
+    fixed_pos='bint',
     gridsize='Py_ssize_t',
     growth_fac_D='double',
     growth_fac_D2='double',
     growth_fac_f='double',
     growth_fac_f2='double',
     id_bgn='Py_ssize_t',
-    index='Py_ssize_t',
+    index_file_bgn='Py_ssize_t',
     indexᵖ_bgn='Py_ssize_t',
     indexʳ='Py_ssize_t',
     lattice='Lattice',
+    lpt_sources=list,
     n_different_sized='Py_ssize_t',
     n_local='Py_ssize_t',
     n_particles='Py_ssize_t',
@@ -1020,22 +1306,22 @@ def generate_primordial_noise(slab):
     particle_components=list,
     pos='double*',
     slab='double[:, :, ::1]',
-    slab_2lpt='double[:, :, ::1]',
-    slab_2lpt_ptr='double*',
-    slab_nongaussian='double[:, :, ::1]',
-    slab_ptr='double*',
-    slab_xx='double[:, :, ::1]',
-    slab_xx_ptr='double*',
-    slab_yy='double[:, :, ::1]',
-    slab_yy_arr=object,  # np.ndarray
-    slab_yy_ptr='double*',
-    slab_zz='double[:, :, ::1]',
-    slab_zz_ptr='double*',
-    variable='int',
-    velocity_factor='double',
+    slab_extra_mom='double[:, :, ::1]',
+    slab_extra_pos='double[:, :, ::1]',
+    slabs_extra=list,
+    streaming='bint',
+    velocity_scale='double',
     returns='void',
 )
-def realize_particles(component, a):
+def realize_particles(component, a, datasets=None, writer=None):
+    """If datasets is given, the particles are not realised in memory
+    but written directly to the passed (HDF5) datasets, one chunk of
+    slab planes at a time. Here datasets should map each of 'pos',
+    'mom' and (if using IDs) 'ids' to a tuple of the dataset and a flag
+    specifying fixed-point format, while writer should be a function
+    with signature writer(dataset, data, index, fixed, dim) performing
+    the actual writing, with dim = -1 for one-dimensional datasets.
+    """
     options = component.realization_options
     if component.representation != 'particles':
         abort(f'realize_particles() called with non-particle component {component.name}')
@@ -1047,8 +1333,15 @@ def realize_particles(component, a):
             f'Cannot perform realisation of {component.name} '
             f'with N = {component.N}, as N is not evenly divisible by {nprocs} processes'
         )
-    component.N_local = component.N//nprocs
-    component.resize(component.N_local)
+    streaming = (datasets is not None)
+    if streaming:
+        dataset_pos, fixed_pos = datasets['pos']
+        dataset_mom, fixed_mom = datasets['mom']
+        if component.use_ids:
+            dataset_ids, fixed_ids = datasets['ids']
+    else:
+        component.N_local = component.N//nprocs
+        component.resize(component.N_local)
     # Prepare lattice options
     if not component.preic_lattice:
         abort(
@@ -1116,16 +1409,24 @@ def realize_particles(component, a):
     # Get growth factors if needed
     nongaussianity = options['nongaussianity']
     do_2lpt = (options['lpt'] > 1)
+    do_3lpt = (options['lpt'] > 2)
     if backscale or nongaussianity or do_2lpt:
         cosmoresults = compute_cosmo(class_call_reason='in order to get growth factor')
         growth_fac_D  = cosmoresults.growth_fac_D (a)
         growth_fac_f  = cosmoresults.growth_fac_f (a)
         growth_fac_D2 = cosmoresults.growth_fac_D2(a)
         growth_fac_f2 = cosmoresults.growth_fac_f2(a)
+    # When using back-scaling, the velocity field is realised as a
+    # scaled version of the displacement field. All velocity
+    # contributions below are given relative to this scaling.
+    velocity_scale = 1
+    if backscale:
+        velocity_scale = a*hubble(a)*growth_fac_f
     # Realise particles, one lattice at a time
     fft_factor = float(gridsize)**(-3)
     n_particles = gridsize**3
     indexᵖ_bgn = 0
+    index_file_bgn = 0
     id_bgn = n_particles_realized['particles_tally']
     for lattice in lattice:
         # Initialize particles on the lattice
@@ -1137,131 +1438,127 @@ def realize_particles(component, a):
                 )*(len(lattice) > 1)
             )
         )
-        n_local = preinitialize_particles(component, n_particles, indexᵖ_bgn, id_bgn, lattice)
+        if streaming:
+            # Only the IDs are written here, while the lattice
+            # positions are added to the displacements when streaming
+            # these to disk.
+            n_local = 0
+            if component.use_ids:
+                stream_ids(gridsize, dataset_ids, fixed_ids, writer, index_file_bgn, id_bgn)
+        else:
+            n_local = preinitialize_particles(
+                component, n_particles, indexᵖ_bgn, id_bgn, lattice,
+            )
         masterprint('done')
-        # Realise positions and momenta (1LPT)
-        for variable in range(2):
-            if variable == 0:
-                if backscale:
-                    masterprint('Displacing particle positions and boosting momenta ...')
-                else:
-                    masterprint('Displacing particle positions ...')
-            elif variable == 1:
-                masterprint('Boosting particle momenta ...')
-            # Fetch δ or θ amplitudes. Note that the displacement field
-            # has a sign difference relative to direct realisation of δ.
-            factor = 2*variable - 1
-            amplitudes = get_amplitudes(gridsize, component, a, variable=variable, factor=factor)
-            # Displace positions or boost velocities
-            # using the Zel'dovich approximation.
-            for dim in range(3):
-                slab = realize_grid(gridsize, component, a, amplitudes, 1, dim, lattice)
-                displace_particles(component, slab, a, n_particles, indexᵖ_bgn, variable, dim)
-                if backscale:
-                    # Assign momenta using the displacement field
-                    # if using back-scaling.
-                    velocity_factor = a*hubble(a)*growth_fac_f
-                    displace_particles(
-                        component, slab, a, n_particles, indexᵖ_bgn, 1, dim, velocity_factor,
-                    )
-            masterprint('done')
-            # Done with both positions and momenta if using back-scaling
-            if backscale:
-                break
-        # Add non-Gaussian contributions to positions and momenta
+        # Fetch δ amplitudes. Note that the displacement field
+        # has a sign difference relative to direct realisation of δ.
+        amplitudes = get_amplitudes(gridsize, component, a, variable=0, factor=-1)
+        # Collect the non-Gaussian and higher-order (nLPT) contributions
+        # to the displacement and velocity fields as Fourier space
+        # sources, each with a factor for the displacement and one for
+        # the velocity. These are added to the first-order Gaussian
+        # structure within the realisation, so that the complete fields
+        # are obtained using a single transform per dimension.
+        slabs_extra = []
+        factors_extra_pos = []
+        factors_extra_mom = []
         if nongaussianity:
-            masterprint(
-                'Displacing particle positions and boosting momenta '
-                '(local non-Gaussianity) ...'
-            )
-            # Fetch δ amplitudes
-            factor = -1
-            amplitudes = get_amplitudes(gridsize, component, a, variable=0, factor=factor)
-            # Create purely non-Gaussian δ grid. The sign aplied to the
-            # Gaussian displacement field is applied here as well.
+            masterprint('Computing local non-Gaussian source ...')
+            # Create purely non-Gaussian δ grid. The sign applied to
+            # the Gaussian displacement field is applied here as well.
             slab = realize_grid(
                 gridsize, component, a, amplitudes, 0,
-                lattice=lattice, nongaussianity=factor*nongaussianity,
+                lattice=lattice, nongaussianity=-nongaussianity,
             )
             # Transform to Fourier space
             fft(slab, 'forward')
-            slab_nongaussian = asarray(slab).copy()
-            # Displace positions and boost velocities
-            amplitude = fft_factor
-            velocity_factor = a*hubble(a)*growth_fac_f
-            for dim in range(3):
-                slab = realize_grid(
-                    gridsize, component, a, amplitude, 1, dim, lattice,
-                    slab_structure=slab_nongaussian,
-                )
-                displace_particles(
-                    component, slab, a, n_particles, indexᵖ_bgn, 0, dim,
-                )
-                displace_particles(
-                    component, slab, a, n_particles, indexᵖ_bgn, 1, dim, velocity_factor,
-                )
+            slabs_extra.append(asarray(slab).copy())
+            factors_extra_pos.append(fft_factor)
+            factors_extra_mom.append(fft_factor*a*hubble(a)*growth_fac_f/velocity_scale)
             masterprint('done')
-        # Add second-order (2LPT) contributions to positions and momenta
         if do_2lpt:
-            masterprint('Displacing particle positions and boosting momenta (2LPT) ...')
-            # Fetch δ amplitudes
-            amplitudes = get_amplitudes(gridsize, component, a, variable=0, factor=-1)
-            # Create ψ_xx (= ∂ₓψₓ), ψ_yy, ψ_zz
-            slab_xx = asarray(
-                realize_grid(gridsize, component, a, amplitudes, 1, 0, lattice, 0)
-            ).copy()
-            slab_yy = slab_yy_arr = asarray(
-                realize_grid(gridsize, component, a, amplitudes, 1, 1, lattice, 1)
-            ).copy()
-            slab_zz = (
-                realize_grid(gridsize, component, a, amplitudes, 1, 2, lattice, 2)
+            lpt_sources = get_lpt_sources(gridsize, component, a, amplitudes, lattice, do_3lpt)
+            slabs_extra.append(lpt_sources[0])
+            factors_extra_pos.append(fft_factor*growth_fac_D2/growth_fac_D**2)
+            factors_extra_mom.append(
+                fft_factor*growth_fac_D2/growth_fac_D**2*a*hubble(a)*growth_fac_f2/velocity_scale
             )
-            slab_xx_ptr = cython.address(slab_xx[:, :, :])
-            slab_yy_ptr = cython.address(slab_yy[:, :, :])
-            slab_zz_ptr = cython.address(slab_zz[:, :, :])
-            # Create 2LPT source
-            #   + ψ_xx*ψ_yy + ψ_yy*ψ_zz + ψ_zz*ψ_xx
-            #   - ψ_xy**2   - ψ_yz**2   - ψ_zx**2
-            slab_2lpt_ptr = slab_xx_ptr
-            for index in range(slab_xx.shape[0]*slab_xx.shape[1]*slab_xx.shape[2]):
-                slab_2lpt_ptr[index] *= slab_yy_ptr[index] + slab_zz_ptr[index]
-                slab_2lpt_ptr[index] += slab_yy_ptr[index] * slab_zz_ptr[index]
-            slab_yy_arr.resize(0, refcheck=False)
-            for dim0 in range(3):
-                dim1 = (dim0 + 1)%3
-                slab = realize_grid(gridsize, component, a, amplitudes, 1, dim0, lattice, dim1)
-                slab_ptr = cython.address(slab[:, :, :])
-                for index in range(slab.shape[0]*slab.shape[1]*slab.shape[2]):
-                    with unswitch(1):
-                        if dim0 < 2:
-                            slab_2lpt_ptr[index] -= slab_ptr[index]**2
-                        else:
-                            slab_ptr[index] = slab_2lpt_ptr[index] - slab_ptr[index]**2
-            # Transform the completed 2LPT source to Fourier space
-            fft(slab, 'forward')
-            slab_2lpt = asarray(slab).copy()
-            slab_2lpt_ptr = cython.address(slab_2lpt[:, :, :])
-            # Displace positions and boost velocities
-            amplitude = fft_factor*growth_fac_D2/growth_fac_D**2
-            velocity_factor = a*hubble(a)*growth_fac_f2
-            for dim in range(3):
-                slab = realize_grid(
-                    gridsize, component, a, amplitude, 1, dim, lattice,
-                    slab_structure=slab_2lpt,
+            if do_3lpt:
+                # The third-order growth rate is taken to be 3f,
+                # as in Einstein-de Sitter.
+                slabs_extra.append(lpt_sources[1])
+                factors_extra_pos.append(fft_factor)
+                factors_extra_mom.append(fft_factor*a*hubble(a)*3*growth_fac_f/velocity_scale)
+        # A single source is used as is, while several sources are
+        # combined into a displacement and a velocity source.
+        slab_extra_pos = slab_extra_mom = None
+        amplitude_extra_pos = amplitude_extra_mom = 1
+        if len(slabs_extra) == 1:
+            slab_extra_pos = slab_extra_mom = slabs_extra[0]
+            amplitude_extra_pos = factors_extra_pos[0]
+            amplitude_extra_mom = factors_extra_mom[0]
+        elif len(slabs_extra) > 1:
+            slab_extra_pos = combine_slabs(slabs_extra, factors_extra_pos)
+            slab_extra_mom = combine_slabs(slabs_extra, factors_extra_mom, slabs_extra[0])
+        slabs_extra.clear()
+        # When back-scaling without additional sources, the velocity
+        # field is directly proportional to the displacement field.
+        if backscale and slab_extra_mom is None:
+            masterprint('Displacing particle positions and boosting momenta ...')
+        else:
+            masterprint('Displacing particle positions ...')
+        for dim in range(3):
+            slab = realize_grid(
+                gridsize, component, a, amplitudes, 1, dim, lattice,
+                slab_extra=slab_extra_pos, amplitude_extra=amplitude_extra_pos,
+            )
+            if streaming:
+                stream_particles(
+                    component, slab, a, dataset_pos, fixed_pos, writer, index_file_bgn,
+                    0, dim, 1, lattice,
                 )
+                if backscale and slab_extra_mom is None:
+                    stream_particles(
+                        component, slab, a, dataset_mom, fixed_mom, writer, index_file_bgn,
+                        1, dim, velocity_scale, lattice,
+                    )
+                continue
+            displace_particles(component, slab, a, n_particles, indexᵖ_bgn, 0, dim)
+            if backscale and slab_extra_mom is None:
                 displace_particles(
-                    component, slab, a, n_particles, indexᵖ_bgn, 0, dim,
+                    component, slab, a, n_particles, indexᵖ_bgn, 1, dim, velocity_scale,
                 )
+        masterprint('done')
+        if not backscale or slab_extra_mom is not None:
+            masterprint('Boosting particle momenta ...')
+            # Fetch θ amplitudes unless back-scaling
+            if not backscale:
+                amplitudes = get_amplitudes(gridsize, component, a, variable=1, factor=1)
+            for dim in range(3):
+                slab = realize_grid(
+                    gridsize, component, a, amplitudes, 1, dim, lattice,
+                    slab_extra=slab_extra_mom, amplitude_extra=amplitude_extra_mom,
+                )
+                if streaming:
+                    stream_particles(
+                        component, slab, a, dataset_mom, fixed_mom, writer, index_file_bgn,
+                        1, dim, velocity_scale, lattice,
+                    )
+                    continue
                 displace_particles(
-                    component, slab, a, n_particles, indexᵖ_bgn, 1, dim, velocity_factor,
+                    component, slab, a, n_particles, indexᵖ_bgn, 1, dim, velocity_scale,
                 )
             masterprint('done')
         # Prepare for next lattice
         id_bgn += n_particles
         indexᵖ_bgn += n_local
+        index_file_bgn += n_particles
     # Done realising particles
     n_particles_realized['particles_tally'] = id_bgn
     n_particles_realized['components_tally'] += 1
+    if streaming:
+        masterprint('done')
+        return
     # Ensure toroidal boundaries and exchange
     # particles among the processes.
     pos = component.pos
@@ -1277,6 +1574,229 @@ n_particles_realized = {
     'particles_tally': 0
 }
 
+# Function for computing the Fourier space sources of the second-order
+# (2LPT) and possibly third-order (3LPT) displacement fields
+@cython.header(
+    # Arguments
+    gridsize='Py_ssize_t',
+    component='Component',
+    a='double',
+    amplitudes='double[::1]',
+    lattice='Lattice',
+    do_3lpt='bint',
+    # Locals
+    dim0='int',
+    dim1='int',
+    fft_factor='double',
+    index='Py_ssize_t',
+    size='Py_ssize_t',
+    slab='double[:, :, ::1]',
+    slab_2lpt='double[:, :, ::1]',
+    slab_2lpt_ptr='double*',
+    slab_3lpt='double[:, :, ::1]',
+    slab_3lpt_ptr='double*',
+    slab_ptr='double*',
+    slab_xx='double[:, :, ::1]',
+    slab_xx_ptr='double*',
+    slab_xy='double[:, :, ::1]',
+    slab_xy_ptr='double*',
+    slab_yy='double[:, :, ::1]',
+    slab_yy_arr=object,  # np.ndarray
+    slab_yy_ptr='double*',
+    slab_yz='double[:, :, ::1]',
+    slab_yz_ptr='double*',
+    slab_zx='double[:, :, ::1]',
+    slab_zx_ptr='double*',
+    slab_zz='double[:, :, ::1]',
+    slab_zz_ptr='double*',
+    slab_μ2='double[:, :, ::1]',
+    slab_μ2_ptr='double*',
+    slab_ψ0='double[:, :, ::1]',
+    slab_ψ0_ptr='double*',
+    slab_ψ1='double[:, :, ::1]',
+    slab_ψ1_ptr='double*',
+    slabs_ψ=dict,
+    returns=list,
+)
+def get_lpt_sources(gridsize, component, a, amplitudes, lattice, do_3lpt=False):
+    """The passed amplitudes should be those of the (first-order)
+    displacement field ψ. With ψ_ij = ∂ⱼψᵢ, the 2LPT source is
+      S⁽²⁾ = + ψ_xx*ψ_yy + ψ_yy*ψ_zz + ψ_zz*ψ_xx
+             - ψ_xy**2   - ψ_yz**2   - ψ_zx**2,
+    with the 2LPT displacement field given by D₂/D²∇∇⁻²S⁽²⁾.
+    The 3LPT source is
+      S⁽³⁾ = 1/3 det(ψ_ij) - 10/21 μ₂(ψ_ij, ψ⁽²⁾_ij),
+    with ψ⁽²⁾_ij = ∂ⱼ∂ᵢ∇⁻²S⁽²⁾ and
+      μ₂(A, B) = ½Σᵢ≠ⱼ(A_ii*B_jj - A_ij*B_ij),
+    such that the 3LPT displacement field is ∇∇⁻²S⁽³⁾. Here the
+    third-order growth factors have been taken to be
+    D₃ₐ = -D³/3 and D₃ᵦ = 10/21 D³, as in Einstein-de Sitter, while
+    the (small) transverse part has been neglected.
+    All sources are returned in Fourier space, in unnormalised form.
+    """
+    masterprint('Computing 2LPT source{} ...'.format(' and 3LPT source'*do_3lpt))
+    fft_factor = float(gridsize)**(-3)
+    if not do_3lpt:
+        # Create ψ_xx, ψ_yy, ψ_zz
+        slab_xx = asarray(
+            realize_grid(gridsize, component, a, amplitudes, 1, 0, lattice, 0)
+        ).copy()
+        slab_yy = slab_yy_arr = asarray(
+            realize_grid(gridsize, component, a, amplitudes, 1, 1, lattice, 1)
+        ).copy()
+        slab_zz = (
+            realize_grid(gridsize, component, a, amplitudes, 1, 2, lattice, 2)
+        )
+        slab_xx_ptr = cython.address(slab_xx[:, :, :])
+        slab_yy_ptr = cython.address(slab_yy[:, :, :])
+        slab_zz_ptr = cython.address(slab_zz[:, :, :])
+        # Create 2LPT source, with the diagonal part first
+        slab_2lpt_ptr = slab_xx_ptr
+        for index in range(slab_xx.shape[0]*slab_xx.shape[1]*slab_xx.shape[2]):
+            slab_2lpt_ptr[index] *= slab_yy_ptr[index] + slab_zz_ptr[index]
+            slab_2lpt_ptr[index] += slab_yy_ptr[index] * slab_zz_ptr[index]
+        slab_yy_arr.resize(0, refcheck=False)
+        for dim0 in range(3):
+            dim1 = (dim0 + 1)%3
+            slab = realize_grid(gridsize, component, a, amplitudes, 1, dim0, lattice, dim1)
+            slab_ptr = cython.address(slab[:, :, :])
+            for index in range(slab.shape[0]*slab.shape[1]*slab.shape[2]):
+                with unswitch(1):
+                    if dim0 < 2:
+                        slab_2lpt_ptr[index] -= slab_ptr[index]**2
+                    else:
+                        slab_ptr[index] = slab_2lpt_ptr[index] - slab_ptr[index]**2
+        # Transform the completed 2LPT source to Fourier space
+        fft(slab, 'forward')
+        slab_2lpt = asarray(slab).copy()
+        masterprint('done')
+        return [slab_2lpt]
+    # For 3LPT we need all components of ψ_ij simultaneously
+    slabs_ψ = {}
+    for dim0 in range(3):
+        for dim1 in range(dim0, 3):
+            slabs_ψ[dim0, dim1] = slabs_ψ[dim1, dim0] = asarray(
+                realize_grid(gridsize, component, a, amplitudes, 1, dim0, lattice, dim1)
+            ).copy()
+    slab_xx = slabs_ψ[0, 0]
+    slab_yy = slabs_ψ[1, 1]
+    slab_zz = slabs_ψ[2, 2]
+    slab_xy = slabs_ψ[0, 1]
+    slab_yz = slabs_ψ[1, 2]
+    slab_zx = slabs_ψ[2, 0]
+    slab_xx_ptr = cython.address(slab_xx[:, :, :])
+    slab_yy_ptr = cython.address(slab_yy[:, :, :])
+    slab_zz_ptr = cython.address(slab_zz[:, :, :])
+    slab_xy_ptr = cython.address(slab_xy[:, :, :])
+    slab_yz_ptr = cython.address(slab_yz[:, :, :])
+    slab_zx_ptr = cython.address(slab_zx[:, :, :])
+    size = slab_xx.shape[0]*slab_xx.shape[1]*slab_xx.shape[2]
+    slab = get_fftw_slab(gridsize)
+    slab_ptr = cython.address(slab[:, :, :])
+    # Create the determinant part of the 3LPT source
+    for index in range(size):
+        slab_ptr[index] = ℝ[1/3.]*(
+            + slab_xx_ptr[index]*(
+                slab_yy_ptr[index]*slab_zz_ptr[index] - slab_yz_ptr[index]**2
+            )
+            - slab_xy_ptr[index]*(
+                slab_xy_ptr[index]*slab_zz_ptr[index] - slab_yz_ptr[index]*slab_zx_ptr[index]
+            )
+            + slab_zx_ptr[index]*(
+                slab_xy_ptr[index]*slab_yz_ptr[index] - slab_yy_ptr[index]*slab_zx_ptr[index]
+            )
+        )
+    fft(slab, 'forward')
+    slab_3lpt = asarray(slab).copy()
+    slab_3lpt_ptr = cython.address(slab_3lpt[:, :, :])
+    # Create 2LPT source
+    for index in range(size):
+        slab_ptr[index] = (
+            + slab_xx_ptr[index]*slab_yy_ptr[index]
+            + slab_yy_ptr[index]*slab_zz_ptr[index]
+            + slab_zz_ptr[index]*slab_xx_ptr[index]
+            - slab_xy_ptr[index]**2
+            - slab_yz_ptr[index]**2
+            - slab_zx_ptr[index]**2
+        )
+    fft(slab, 'forward')
+    slab_2lpt = asarray(slab).copy()
+    # Accumulate μ₂(ψ_ij, ψ⁽²⁾_ij), realising one component
+    # of ψ⁽²⁾_ij at a time.
+    slab_μ2 = zeros(asarray(slab).shape, dtype=C2np['double'])
+    slab_μ2_ptr = cython.address(slab_μ2[:, :, :])
+    for dim0 in range(3):
+        for dim1 in range(dim0, 3):
+            slab = realize_grid(
+                gridsize, component, a, fft_factor, 1, dim0, lattice, dim1,
+                slab_structure=slab_2lpt,
+            )
+            slab_ptr = cython.address(slab[:, :, :])
+            if dim0 == dim1:
+                # Diagonal component, contributing ½(Tr(ψ) - ψ_ii)ψ⁽²⁾_ii
+                slab_ψ0 = slabs_ψ[(dim0 + 1)%3, (dim0 + 1)%3]
+                slab_ψ1 = slabs_ψ[(dim0 + 2)%3, (dim0 + 2)%3]
+                slab_ψ0_ptr = cython.address(slab_ψ0[:, :, :])
+                slab_ψ1_ptr = cython.address(slab_ψ1[:, :, :])
+                for index in range(size):
+                    slab_μ2_ptr[index] += 0.5*(
+                        slab_ψ0_ptr[index] + slab_ψ1_ptr[index]
+                    )*slab_ptr[index]
+            else:
+                # Off-diagonal component, contributing -ψ_ij ψ⁽²⁾_ij
+                slab_ψ0 = slabs_ψ[dim0, dim1]
+                slab_ψ0_ptr = cython.address(slab_ψ0[:, :, :])
+                for index in range(size):
+                    slab_μ2_ptr[index] -= slab_ψ0_ptr[index]*slab_ptr[index]
+    slabs_ψ.clear()
+    # Transform μ₂ to Fourier space and add it to the 3LPT source
+    slab = get_fftw_slab(gridsize)
+    slab_ptr = cython.address(slab[:, :, :])
+    for index in range(size):
+        slab_ptr[index] = slab_μ2_ptr[index]
+    slab_μ2 = None
+    fft(slab, 'forward')
+    for index in range(size):
+        slab_3lpt_ptr[index] -= ℝ[10/21.]*slab_ptr[index]
+    masterprint('done')
+    return [slab_2lpt, slab_3lpt]
+
+# Function for computing linear combinations of slabs,
+# Σᵢ factors[i]*slabs[i]. The result is stored in slab_combined,
+# which may be one of the passed slabs.
+@cython.header(
+    # Arguments
+    slabs=list,
+    factors=list,
+    slab_combined='double[:, :, ::1]',
+    # Locals
+    factor='double',
+    i='Py_ssize_t',
+    index='Py_ssize_t',
+    size='Py_ssize_t',
+    slab='double[:, :, ::1]',
+    slab_combined_ptr='double*',
+    slab_ptr='double*',
+    returns='double[:, :, ::1]',
+)
+def combine_slabs(slabs, factors, slab_combined=None):
+    slab = slabs[0]
+    if slab_combined is None:
+        slab_combined = empty(asarray(slab).shape, dtype=C2np['double'])
+    slab_combined_ptr = cython.address(slab_combined[:, :, :])
+    size = slab.shape[0]*slab.shape[1]*slab.shape[2]
+    for i in range(len(slabs)):
+        slab = slabs[i]
+        slab_ptr = cython.address(slab[:, :, :])
+        factor = factors[i]
+        if i == 0:
+            for index in range(size):
+                slab_combined_ptr[index] = factor*slab_ptr[index]
+        else:
+            for index in range(size):
+                slab_combined_ptr[index] += factor*slab_ptr[index]
+    return slab_combined
+
 # Function for pre-initialising particles, meaning placing them at
 # lattice points, zeroing momenta and assigning IDs.
 @cython.pheader(
@@ -1397,6 +1917,119 @@ def preinitialize_particles(component, n_particles=-1, indexᵖ_bgn=0, id_bgn=0,
     # on this process.
     return n_local
 
+# Function for writing a realised displacement field (or velocity field)
+# directly to a dataset on disk, as particle positions (or momenta).
+# The particles are taken to be placed at the lattice points, with the
+# particle index within the dataset given by the lattice point.
+@cython.header(
+    # Arguments
+    component='Component',
+    slab='double[:, :, ::1]',
+    a='double',
+    dataset_h5=object,  # h5py.Dataset
+    fixed='bint',
+    writer=object,  # callable
+    index_file_bgn='Py_ssize_t',
+    variable='int',
+    dim='int',
+    factor='double',
+    lattice='Lattice',
+    # Locals
+    buffer='double[::1]',
+    gridsize='Py_ssize_t',
+    i='Py_ssize_t',
+    i_bgn='Py_ssize_t',
+    i_end='Py_ssize_t',
+    index='Py_ssize_t',
+    j='Py_ssize_t',
+    k='Py_ssize_t',
+    l='Py_ssize_t',
+    mass='double',
+    n_planes='Py_ssize_t',
+    slab_start_i='Py_ssize_t',
+    value='double',
+    returns='void',
+)
+def stream_particles(
+    component, slab, a, dataset_h5, fixed, writer, index_file_bgn, variable, dim, factor, lattice,
+):
+    if variable == 1:
+        # Momenta; momⁱ = a*m*uⁱ
+        mass = a**(-3*component.w_eff(a=a))*component.mass
+        factor *= a*mass
+    elif variable != 0:
+        abort(f'stream_particles() got variable = {variable} ∉ {{0, 1}}')
+    # The real-space slab is distributed along the first dimension
+    gridsize = slab.shape[1]
+    slab_start_i = slab.shape[0]*rank
+    # Write out a chunk of slab planes at a time
+    n_planes = pairmax(1, ℤ[2**20]//gridsize**2)
+    buffer = empty(n_planes*gridsize**2, dtype=C2np['double'])
+    for i_bgn in range(0, slab.shape[0], n_planes):
+        i_end = pairmin(i_bgn + n_planes, slab.shape[0])
+        index = 0
+        for i in range(i_bgn, i_end):
+            for j in range(gridsize):
+                for k in range(gridsize):
+                    value = slab[i, j, k]
+                    with unswitch(3):
+                        if variable == 0:
+                            # Add the lattice position
+                            l = (
+                                ℤ[
+                                      ℤ[ℤ[-(dim == 0)] & ℤ[slab_start_i + i]]
+                                    | ℤ[ℤ[-(dim == 1)] & j]
+                                ]
+                                    | ℤ[-(dim == 2)] & k
+                            )
+                            value = mod(
+                                value + (
+                                    l + ℝ[0.5*cell_centered + lattice.shift[dim]]
+                                )*ℝ[boxsize/gridsize],
+                                boxsize,
+                            )
+                        else:
+                            value *= factor
+                    buffer[index] = value
+                    index += 1
+        writer(
+            dataset_h5, asarray(buffer)[:index],
+            index_file_bgn + (slab_start_i + i_bgn)*gridsize**2, fixed, dim,
+        )
+
+# Function for writing particle IDs directly to a dataset on disk,
+# in accordance with stream_particles().
+@cython.header(
+    # Arguments
+    gridsize='Py_ssize_t',
+    dataset_h5=object,  # h5py.Dataset
+    fixed='bint',
+    writer=object,  # callable
+    index_file_bgn='Py_ssize_t',
+    id_bgn='Py_ssize_t',
+    # Locals
+    index='Py_ssize_t',
+    index_bgn='Py_ssize_t',
+    index_end='Py_ssize_t',
+    step='Py_ssize_t',
+    returns='void',
+)
+def stream_ids(gridsize, dataset_h5, fixed, writer, index_file_bgn, id_bgn):
+    index_bgn = (gridsize//nprocs)*gridsize**2*rank
+    index_end = index_bgn + (gridsize//nprocs)*gridsize**2
+    step = pairmax(ℤ[2**20], gridsize**2)
+    for index in range(index_bgn, index_end, step):
+        writer(
+            dataset_h5,
+            np.arange(
+                id_bgn + index, id_bgn + pairmin(index + step, index_end),
+                dtype=np.uint64,
+            ),
+            index_file_bgn + index,
+            fixed,
+            -1,
+        )
+
 # Function for applying a displacement field to particles;
 # either displacing their positions or boosting their velocities.
 @cython.header(
@@ -257,6 +257,63 @@ class Spline:
             ᔑ *= -1
         return ᔑ
 
+    # Method returning the knots of the spline together with the
+    # coefficients of the cubic polynomials between them.
+    @cython.pheader(
+        # Locals
+        M='double[::1]',
+        coefficients='double[:, ::1]',
+        diag='double[::1]',
+        h='double',
+        h_lower='double',
+        i='Py_ssize_t',
+        n='Py_ssize_t',
+        rhs='double[::1]',
+        w='double',
+        x='double[::1]',
+        y='double[::1]',
+        returns=tuple,
+    )
+    def get_coefficients(self):
+        """The knots x are given in terms of the splined variable,
+        i.e. log(x) if logx is True. The i'th row of the coefficients
+        holds (c₀, c₁, c₂, c₃) so that the spline is given by
+        c₀ + c₁*Δx + c₂*Δx² + c₃*Δx³ with Δx = x - x[i],
+        for x[i] ≤ x ≤ x[i + 1]. Natural boundary conditions
+        are used, matching both GSL and SciPy.
+        """
+        if self.logy:
+            abort(f'Spline "{self.name}": Spline coefficients not available for logged y data')
+        x = np.log(self.x) if self.logx else asarray(self.x).copy()
+        y = self.y
+        n = x.shape[0]
+        # Solve the tridiagonal system for the second derivatives M
+        # at the knots, using the Thomas algorithm.
+        M    = zeros(n, dtype=C2np['double'])
+        diag = zeros(n, dtype=C2np['double'])
+        rhs  = zeros(n, dtype=C2np['double'])
+        for i in range(1, n - 1):
+            h_lower = x[i] - x[i - 1]
+            h = x[i + 1] - x[i]
+            diag[i] = 2*(h_lower + h)
+            rhs[i] = 6*((y[i + 1] - y[i])/h - (y[i] - y[i - 1])/h_lower)
+        for i in range(2, n - 1):
+            h_lower = x[i] - x[i - 1]
+            w = h_lower/diag[i - 1]
+            diag[i] -= w*h_lower
+            rhs[i] -= w*rhs[i - 1]
+        for i in range(n - 2, 0, -1):
+            M[i] = (rhs[i] - (x[i + 1] - x[i])*M[i + 1])/diag[i]
+        # Construct polynomial coefficients
+        coefficients = empty((n - 1, 4), dtype=C2np['double'])
+        for i in range(n - 1):
+            h = x[i + 1] - x[i]
+            coefficients[i, 0] = y[i]
+            coefficients[i, 1] = (y[i + 1] - y[i])/h - h*(2*M[i] + M[i + 1])/6
+            coefficients[i, 2] = 0.5*M[i]
+            coefficients[i, 3] = (M[i + 1] - M[i])/(6*h)
+        return x, coefficients
+
     # Method for checking whether a given number
     # is within the tabulated interval.
     @cython.header(
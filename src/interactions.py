@@ -29,6 +29,7 @@ cimport(
     'from communication import     '
     '    rank_neighbouring_domain, '
     '    sendrecv_component,       '
+    '    sendrecv_component_wait,  '
 )
 cimport('from ewald import get_ewald_grid')
 cimport(
@@ -42,6 +43,7 @@ cimport(
     '    fourier_operate,                     '
     '    get_fftw_slab,                       '
     '    interpolate_domaingrid_to_particles, '
+    '    interpolate_domaingrids_to_particles,'
     '    interpolate_upstream,                '
     '    nullify_modes,                       '
 )
@@ -51,6 +53,9 @@ cimport(
     '    tentatively_refine_subtiling,          '
 )
 
+# OpenMP imports
+from cython.parallel import prange
+
 # Pure Python imports
 from communication import get_domain_info
 from mesh import group_components
@@ -227,6 +232,10 @@ def component_component(
         # Replace the subtilings with slightly refined versions
         subtilings_under_tentative_refinement.add(interaction_name)
         tentatively_refine_subtiling(interaction_name)
+    # Reassign the domain pairs between the processes
+    # if balancing of the short-range work is due.
+    if 𝔹[pairing_level == 'tile'] and shortrange_params[interaction_name]['balancing'] > 0:
+        balance_domain_pairs(interaction_name)
     # Pair each receiver with all suppliers and let them interact
     pairs = []
     tile_sorted = set()
@@ -376,23 +385,32 @@ subtiling_shapes_judged = empty(3*nprocs, dtype=C2np['Py_ssize_t']) if master el
     pairing_level=str,
     interaction_extra_args=dict,
     # Locals
+    N_domain_pairs='Py_ssize_t',
+    balanced='bint',
+    costs='double[::1]',
     domain_pair_nr='Py_ssize_t',
     instantaneous='bint',
     interact='bint',
     only_supply_communication='bint',
+    only_supply_pairings='bint',
     only_supply_passed='bint',
+    prefetch='bint',
     rank_recv='int',
     rank_send='int',
     ranks_recv='int[::1]',
     ranks_send='int[::1]',
     supplier_extrl='Component',
+    supplier_extrl_next='Component',
     supplier_local='Component',
     tile_indices='Py_ssize_t[:, ::1]',
     tile_indices_receiver='Py_ssize_t[::1]',
     tile_indices_supplier='Py_ssize_t[::1]',
+    tile_indices_supplier_next='Py_ssize_t[::1]',
     tile_indices_supplier_paired='Py_ssize_t**',
     tile_indices_supplier_paired_N='Py_ssize_t*',
+    t_begin='double',
     tile_pairings_index='Py_ssize_t',
+    variable=str,
     returns='void',
 )
 def domain_domain(
@@ -414,9 +432,22 @@ def domain_domain(
     If affected is an empty list, this is not really an interaction.
     In this case, every domain will both send and receive from every
     other domain.
+    The communication of the supplier for the next domain pair is
+    initiated (using nonblocking MPI) prior to carrying out the
+    interaction of the current domain pair, so that the communication
+    is hidden behind computation. In particular, the local
+    domain-domain interaction (always the first domain pair) is
+    carried out while the supplier particles of the
+    neighbouring domains are in flight.
+    When the short-range work is balanced between the processes
+    (see balance_domain_pairs()), each domain boundary is computed by
+    whichever of the two processes sharing it is currently
+    assigned the boundary.
     """
     # To satisfy the compiler
     tile_indices_receiver = tile_indices_supplier = None
+    supplier_extrl_next = None
+    costs = None
     tile_indices_supplier_paired = tile_indices_supplier_paired_N = NULL
     # Flag specifying whether or not this interaction is instantaneous.
     # For instantaneous interactions, we need to apply the updates to
@@ -441,9 +472,38 @@ def domain_domain(
     # component, we extract usage (2) into its own flag,
     # "only_supply_communication".
     only_supply_communication = (only_supply if 𝔹[receiver is supplier] else True)
-    ranks_send, ranks_recv = domain_domain_communication(pairing_level, only_supply_communication)
+    # When balancing the short-range work between the processes, the
+    # communication pattern of only_supply_communication == True is
+    # used, though with each domain pair only carried out by the
+    # process currently assigned to it. The results are then send back
+    # as usual, as the interaction itself is still carried out
+    # with only_supply == False.
+    balanced = (
+        pairing_level == 'tile'
+        and not only_supply_communication
+        and shortrange_params[interaction_name]['balancing'] > 0
+    )
+    if balanced:
+        only_supply_communication = True
+        ranks_send, ranks_recv = domain_domain_communication_balanced(interaction_name)
+        costs = domain_pair_costs[interaction_name]
+    else:
+        ranks_send, ranks_recv = domain_domain_communication(
+            pairing_level, only_supply_communication,
+        )
     # Backup of the passed only_supply boolean
     only_supply_passed = only_supply
+    # The supplier for the next domain pair is to be communicated while
+    # the interaction of the current domain pair is carried out.
+    # This is not possible for instantaneous interactions which update
+    # the dependent variables of the local supplier directly,
+    # as these updates should be included in what is communicated.
+    prefetch = True
+    if instantaneous:
+        for variable in affected:
+            if variable in dependent:
+                prefetch = False
+    N_domain_pairs = ranks_send.shape[0]
     # Pair this process/domain with whichever other
     # processes/domains are needed. This process is paired
     # with two other processes simultaneously. This process/rank sends
@@ -453,7 +513,17 @@ def domain_domain(
     # On each process, the local receiver and the external
     # (received) supplier_extrl then interact.
     supplier_local = supplier
-    for domain_pair_nr in range(ranks_send.shape[0]):
+    if prefetch:
+        # Initiate communication for the first domain pair
+        supplier_extrl_next = sendrecv_component(
+            supplier_local, dependent, pairing_level, interaction_name,
+            domain_domain_tile_indices_supplier(
+                interaction_name, receiver, only_supply_communication, pairing_level, 0,
+            ),
+            dest=ranks_send[0], source=ranks_recv[0],
+            buffer_index=0, wait=False,
+        )
+    for domain_pair_nr in range(N_domain_pairs):
         # Process ranks to send to and receive from
         rank_send = ranks_send[domain_pair_nr]
         rank_recv = ranks_recv[domain_pair_nr]
@@ -479,6 +549,10 @@ def domain_domain(
         # flag), or whether the only_supply flag should be changed.
         interact = True
         only_supply = only_supply_passed
+        with unswitch:
+            if balanced:
+                # Domain pairs not assigned to the local process
+                interact = (rank_recv != MPI.PROC_NULL)
         with unswitch:
             if 𝔹[receiver is supplier] and 𝔹[pairing_level == 'domain']:
                 if rank_send == rank_recv != rank:
@@ -530,10 +604,27 @@ def domain_domain(
                 tile_indices_receiver = tile_indices_supplier = tile_indices_trivial
                 tile_indices_supplier_paired = tile_indices_trivial_paired
                 tile_indices_supplier_paired_N = tile_indices_trivial_paired_N
-        supplier_extrl = sendrecv_component(
-            supplier_local, dependent, pairing_level, interaction_name, tile_indices_supplier,
-            dest=rank_send, source=rank_recv,
-        )
+        if prefetch:
+            # Finish the communication of the supplier for this
+            # domain pair, then initiate the communication for the next
+            # domain pair, using the other component buffer.
+            supplier_extrl = supplier_extrl_next
+            sendrecv_component_wait(domain_pair_nr % 2)
+            if domain_pair_nr + 1 < N_domain_pairs:
+                supplier_extrl_next = sendrecv_component(
+                    supplier_local, dependent, pairing_level, interaction_name,
+                    domain_domain_tile_indices_supplier(
+                        interaction_name, receiver, only_supply_communication,
+                        pairing_level, domain_pair_nr + 1,
+                    ),
+                    dest=ranks_send[domain_pair_nr + 1], source=ranks_recv[domain_pair_nr + 1],
+                    buffer_index=(domain_pair_nr + 1) % 2, wait=False,
+                )
+        else:
+            supplier_extrl = sendrecv_component(
+                supplier_local, dependent, pairing_level, interaction_name, tile_indices_supplier,
+                dest=rank_send, source=rank_recv,
+            )
         # Let the local receiver interact with the external
         # supplier_extrl. This will update the affected variable buffers
         # (e.g. Δmom for gravity) of the local receiver, and of the
@@ -543,19 +634,30 @@ def domain_domain(
                 if 𝔹[pairing_level == 'tile']:
                     # Get the supplier tiles with which to pair each
                     # receiver tile and perform the interaction
-                    # at the tile level.
+                    # at the tile level. When balancing, the local
+                    # domain pair must still not double count the
+                    # tile pairs.
+                    only_supply_pairings = only_supply_communication
+                    with unswitch:
+                        if balanced:
+                            if domain_pair_nr == 0:
+                                only_supply_pairings = False
                     tile_pairings_index = get_tile_pairings(
                         interaction_name,
                         receiver,
                         rank_recv,
-                        only_supply_communication,
+                        only_supply_pairings,
                         domain_pair_nr,
                         tile_indices_receiver,
                         tile_indices_supplier,
                     )
                     tile_indices_supplier_paired   = tile_pairings_cache  [tile_pairings_index]
                     tile_indices_supplier_paired_N = tile_pairings_N_cache[tile_pairings_index]
-            # Perform the interaction
+            # Perform the interaction, measuring its cost if needed
+            # for balancing the short-range work.
+            with unswitch:
+                if balanced:
+                    t_begin = time()
             interaction(
                 𝕊[interaction_name if 𝔹[pairing_level == 'tile'] else 'trivial'],
                 receiver,
@@ -569,11 +671,18 @@ def domain_domain(
                 tile_indices_supplier_paired_N,
                 interaction_extra_args,
             )
+            with unswitch:
+                if balanced:
+                    costs[domain_pair_nr] += time() - t_begin
         # Send the populated buffers (e.g. Δmom for gravity) back to the
         # process from which the external supplier_extrl came. Note that
         # we should not do this in the case of a local interaction
         # (rank_send == rank) or in a case where only_supply is True.
-        if rank_send != rank and not only_supply:
+        # When balancing, nothing is to be send back if the domain
+        # pair is carried out on neither of the two processes.
+        if rank_send != rank and not only_supply and not (
+            rank_send == MPI.PROC_NULL and rank_recv == MPI.PROC_NULL
+        ):
             # For non-instantaneous interactions, the received Δ values
             # should be added to the Δ's of the local supplier_local.
             # For instantaneous interactions, the received Δ values
@@ -601,6 +710,31 @@ tile_indices_trivial_paired[0] = cython.address(tile_indices_trivial[:])
 tile_indices_trivial_paired_N = malloc(1*sizeof('Py_ssize_t'))
 tile_indices_trivial_paired_N[0] = tile_indices_trivial.shape[0]
 
+# Helper function for the domain_domain function,
+# returning the indices of the tiles of the local supplier which are
+# to be communicated under the domain-domain pairing
+# with number domain_pair_nr.
+@cython.header(
+    # Arguments
+    interaction_name=str,
+    component='Component',
+    only_supply='bint',
+    pairing_level=str,
+    domain_pair_nr='Py_ssize_t',
+    # Locals
+    tile_indices='Py_ssize_t[:, ::1]',
+    returns='Py_ssize_t[::1]',
+)
+def domain_domain_tile_indices_supplier(
+    interaction_name, component, only_supply, pairing_level, domain_pair_nr,
+):
+    if pairing_level == 'domain':
+        return tile_indices_trivial
+    tile_indices = domain_domain_tile_indices(
+        interaction_name, component, only_supply, domain_pair_nr,
+    )
+    return tile_indices[1, :]
+
 # Function returning the process ranks with which to pair
 # the local process/domain in the domain_domain function,
 # depending on the pairing level and supplier only supplies
@@ -730,6 +864,172 @@ def domain_domain_communication(pairing_level, only_supply):
 cython.declare(domain_domain_communication_dict=dict)
 domain_domain_communication_dict = {}
 
+# Function returning the process ranks with which to pair the local
+# process/domain in the domain_domain function, when the short-range
+# work of the given interaction is balanced between the processes.
+# The communication pattern is that of pairing_level == 'tile' and
+# only_supply == True, in which each pair of neighbouring domains
+# appears twice; once on each of the two processes. Of these, only the
+# domain pair on the process currently assigned to the shared domain
+# boundary is kept, with the ranks of the other replaced
+# by MPI.PROC_NULL.
+@cython.header(
+    # Arguments
+    interaction_name=str,
+    # Locals
+    direction_index='Py_ssize_t',
+    domain_pair_nr='Py_ssize_t',
+    ranks=tuple,
+    ranks_recv='int[::1]',
+    ranks_recv_balanced='int[::1]',
+    ranks_send='int[::1]',
+    ranks_send_balanced='int[::1]',
+    uppers='signed char[:, ::1]',
+    returns=tuple,
+)
+def domain_domain_communication_balanced(interaction_name):
+    ranks = domain_domain_communication_dict.get((interaction_name, 'balanced'))
+    if ranks:
+        return ranks
+    ranks_send, ranks_recv = domain_domain_communication('tile', True)
+    ranks_send_balanced = asarray(ranks_send).copy()
+    ranks_recv_balanced = asarray(ranks_recv).copy()
+    # The domain pairs come in pairs of opposite directions,
+    # the first of which (odd domain_pair_nr) has the local domain as
+    # the upper domain, with the receiver tiles at the lower
+    # boundary of the local domain.
+    uppers = domain_pair_uppers[interaction_name]
+    for domain_pair_nr in range(1, ranks_send.shape[0]):
+        direction_index = (domain_pair_nr - 1)//2
+        if domain_pair_nr % 2:
+            if not uppers[ranks_recv[domain_pair_nr], direction_index]:
+                ranks_recv_balanced[domain_pair_nr] = MPI.PROC_NULL
+            if not uppers[rank, direction_index]:
+                ranks_send_balanced[domain_pair_nr] = MPI.PROC_NULL
+        else:
+            if uppers[rank, direction_index]:
+                ranks_recv_balanced[domain_pair_nr] = MPI.PROC_NULL
+            if uppers[ranks_send[domain_pair_nr], direction_index]:
+                ranks_send_balanced[domain_pair_nr] = MPI.PROC_NULL
+    ranks = (ranks_send_balanced, ranks_recv_balanced)
+    domain_domain_communication_dict[interaction_name, 'balanced'] = ranks
+    return ranks
+
+# Function for balancing the short-range work of the given interaction
+# between the processes. The domain decomposition itself is fixed, but
+# the interaction across each of the boundaries shared between
+# neighbouring domains may be computed by either of the two processes.
+# This function reassigns these boundaries based on the interaction
+# cost measured in domain_domain() for each domain pair, so that the
+# total cost of the most loaded process is reduced. The reassignment
+# takes place every shortrange_params[interaction_name]['balancing']
+# time steps. This function must be called by all processes.
+@cython.header(
+    # Arguments
+    interaction_name=str,
+    # Locals
+    boundary_cost='double',
+    boundary_costs='double[::1]',
+    boundary_index='Py_ssize_t',
+    costs='double[::1]',
+    costs_all='double[:, ::1]',
+    direction_index='Py_ssize_t',
+    domain_pair_offsets='Py_ssize_t[:, ::1]',
+    loads='double[::1]',
+    neighbours='int[:, ::1]',
+    rank_lower='int',
+    rank_other='int',
+    rank_owner='int',
+    rank_upper='int',
+    uppers='signed char[:, ::1]',
+    returns='void',
+)
+def balance_domain_pairs(interaction_name):
+    # The assignment of the boundaries are stored in the uppers array,
+    # with uppers[rank_lower, direction_index] specifying whether the
+    # boundary between the domain of rank_lower and its neighbour
+    # in the given direction is computed by this upper neighbour
+    # (1, the default) or by rank_lower itself (0).
+    uppers = domain_pair_uppers.get(interaction_name)
+    if uppers is None:
+        uppers = ones((nprocs, 13), dtype=C2np['signed char'])
+        domain_pair_uppers[interaction_name] = uppers
+        domain_pair_costs[interaction_name] = zeros(27, dtype=C2np['double'])
+        domain_pair_balancing_time_steps[interaction_name] = (
+            universals.time_step + shortrange_params[interaction_name]['balancing']
+        )
+        return
+    if universals.time_step < domain_pair_balancing_time_steps[interaction_name]:
+        return
+    domain_pair_balancing_time_steps[interaction_name] = (
+        universals.time_step + shortrange_params[interaction_name]['balancing']
+    )
+    # Gather the measured costs of all domain pairs on all processes,
+    # and reset the local costs.
+    costs = domain_pair_costs[interaction_name]
+    costs_all = empty((nprocs, costs.shape[0]), dtype=C2np['double'])
+    Allgather(costs, costs_all)
+    costs[:] = 0
+    loads = np.sum(costs_all, axis=1)
+    # Get the rank of the upper neighbour of each domain
+    # in each of the 13 directions.
+    domain_domain_communication('tile', True)
+    domain_pair_offsets = domain_domain_communication_dict['tile', True, 'domain_pair_offsets']
+    neighbours = empty((nprocs, 13), dtype=C2np['int'])
+    for rank_lower in range(nprocs):
+        for direction_index in range(13):
+            neighbours[rank_lower, direction_index] = domain_info.layout[tuple(np.mod(
+                asarray(np.unravel_index(rank_lower, domain_subdivisions))
+                + asarray(domain_pair_offsets[2*direction_index + 1, :]),
+                domain_subdivisions,
+            ))]
+    # Look up the measured cost of each boundary, as obtained by the
+    # process currently assigned to it. Boundaries between a domain and
+    # itself (periodic images) are left alone.
+    boundary_costs = zeros(nprocs*13, dtype=C2np['double'])
+    for rank_lower in range(nprocs):
+        for direction_index in range(13):
+            rank_upper = neighbours[rank_lower, direction_index]
+            if rank_upper == rank_lower:
+                continue
+            if uppers[rank_lower, direction_index]:
+                boundary_cost = costs_all[rank_upper, 2*direction_index + 1]
+            else:
+                boundary_cost = costs_all[rank_lower, 2*direction_index + 2]
+            boundary_costs[rank_lower*13 + direction_index] = boundary_cost
+    # Greedily reassign boundaries, most costly first, whenever doing so
+    # lowers the larger of the loads of the two processes involved.
+    # As the computation is carried out identically on all processes,
+    # all processes end up with the same assignment.
+    for boundary_index in np.argsort(-asarray(boundary_costs), kind='stable'):
+        boundary_cost = boundary_costs[boundary_index]
+        if boundary_cost == 0:
+            break
+        rank_lower = boundary_index//13
+        direction_index = boundary_index%13
+        rank_upper = neighbours[rank_lower, direction_index]
+        if uppers[rank_lower, direction_index]:
+            rank_owner, rank_other = rank_upper, rank_lower
+        else:
+            rank_owner, rank_other = rank_lower, rank_upper
+        if loads[rank_other] + boundary_cost < loads[rank_owner]:
+            uppers[rank_lower, direction_index] = not uppers[rank_lower, direction_index]
+            loads[rank_owner] -= boundary_cost
+            loads[rank_other] += boundary_cost
+    # Remove the cached ranks corresponding to the old assignment
+    domain_domain_communication_dict.pop((interaction_name, 'balanced'), None)
+# The assignment of domain boundaries, the measured domain pair costs
+# and the time steps at which to rebalance next, for each interaction
+# with balancing of the short-range work.
+cython.declare(
+    domain_pair_uppers=dict,
+    domain_pair_costs=dict,
+    domain_pair_balancing_time_steps=dict,
+)
+domain_pair_uppers = {}
+domain_pair_costs = {}
+domain_pair_balancing_time_steps = {}
+
 # Function returning the indices of the tiles of the local receiver and
 # supplier which take part in tile-tile interactions under the
 # domain-domain pairing with number domain_pair_nr.
@@ -1326,6 +1626,45 @@ def get_neighbourtile_pair_index(tiles_offset_i, tiles_offset_j, tiles_offset_k)
     # ((i + 1)*3 + (j + 1))*3 + (k + 1), which we write out below.
     return i*9 + j*3 + k + 13
 
+# Function returning the subtiling of the supplier to use for
+# particle-particle pairing. When the receiver and supplier components
+# are the same and the receiver and supplier domains are also the same,
+# we now have a case where (tiling_r is tiling_s) and
+# (subtiling_r is subtiling_s) are both True. This is OK for
+# the coarse tiling, but not for the subtiling, as here we need
+# to re-sort the particles during the pairing. That is, we need to
+# keep track of the sorting of the receiver tiles into subtiles while
+# also keeping track of the sorting of the supplier tiles into subtiles.
+# We thus always need two separate subtiling_{r/s} instances, which we
+# do not have in the case mentioned. When this is the case, we make use
+# of a second, separate Tiling instance. If however the subtiling in
+# use is the trivial tiling, the re-sorting has no effect, and so we do
+# not have to worry.
+@cython.header(
+    # Arguments
+    receiver='Component',
+    supplier='Component',
+    rank_supplier='int',
+    interaction_name=str,
+    subtiling_name=str,
+    # Locals
+    subtiling_name_2=str,
+    subtiling_s='Tiling',
+    subtiling_s_2='Tiling',
+    returns='Tiling',
+)
+def get_subtiling_supplier(receiver, supplier, rank_supplier, interaction_name, subtiling_name):
+    subtiling_s = supplier.tilings[subtiling_name]
+    if receiver.name == supplier.name and rank == rank_supplier and subtiling_name != 'trivial':
+        subtiling_name_2 = f'{interaction_name} (subtiles 2)'
+        if subtiling_name_2 not in supplier.tilings:
+            supplier.tilings.pop(subtiling_name)
+            subtiling_s_2 = supplier.init_tiling(subtiling_name)
+            supplier.tilings[subtiling_name  ] = subtiling_s
+            supplier.tilings[subtiling_name_2] = subtiling_s_2
+        subtiling_s = supplier.tilings[subtiling_name_2]
+    return subtiling_s
+
 # Generic function implementing particle-particle pairing.
 # Note that this function returns a generator and so should only be
 # called within a loop.
@@ -1348,6 +1687,7 @@ def get_neighbourtile_pair_index(tiles_offset_i, tiles_offset_j, tiles_offset_k)
             'subtile_pairings_cache',
             'subtile_pairings_N_cache',
         'get_neighbourtile_pair_index',
+        'get_subtiling_supplier',
     ),
 )
 def particle_particle(
@@ -1415,9 +1755,7 @@ def particle_particle(
         subtiles_rungs_N_s='Py_ssize_t**',
         subtiles_s='Py_ssize_t***',
         subtiling_name=str,
-        subtiling_name_2=str,
         subtiling_s='Tiling',
-        subtiling_s_2='Tiling',
         tile_contain_onlyinactive_r='bint',
         tile_contain_particles_r='signed char',
         tile_contain_particles_s='signed char',
@@ -1498,30 +1836,12 @@ def particle_particle(
     tiling_location_s         = cython.address(tiling_s.location[:])
     tiles_s                   = tiling_s.tiles
     tiles_contain_particles_s = tiling_s.contain_particles
-    # Extract subtiling variables from supplier.
-    # When the receiver and supplier components are the same
-    # and the receiver and supplier domains are also the same,
-    # we now have a case where (tiling_r is tiling_s) and
-    # (subtiling_r is subtiling_s) are both True. This is OK for
-    # the coarse tiling, but not for the subtiling, as here we need
-    # to re-sort the particles during the iteration below. That is,
-    # we need to keep track of the sorting of the receiver tiles
-    # into subtiles while also keeping track of the sorting of the
-    # supplier tiles into subtiles. We thus always need two separate
-    # subtiling_{r/s} instances, which we do not have in the case
-    # mentioned. When this is the case, we make use of a second,
-    # separate Tiling instance. If however the subtiling in use is the
-    # trivial tiling, the re-sorting has no effect, and so we do not
-    # have to worry.
-    subtiling_s = supplier.tilings[subtiling_name]
-    if 𝔹[receiver.name == supplier.name and rank == rank_supplier and subtiling_name != 'trivial']:
-        subtiling_name_2 = f'{interaction_name} (subtiles 2)'
-        if subtiling_name_2 not in supplier.tilings:
-            supplier.tilings.pop(subtiling_name)
-            subtiling_s_2 = supplier.init_tiling(subtiling_name)
-            supplier.tilings[subtiling_name  ] = subtiling_s
-            supplier.tilings[subtiling_name_2] = subtiling_s_2
-        subtiling_s = supplier.tilings[subtiling_name_2]
+    # Extract subtiling variables from supplier. See the
+    # get_subtiling_supplier() function for why this is not always
+    # the same as the subtiling of the receiver.
+    subtiling_s = get_subtiling_supplier(
+        receiver, supplier, rank_supplier, interaction_name, subtiling_name,
+    )
     subtiles_s                   = subtiling_s.tiles
     subtiles_contain_particles_s = subtiling_s.contain_particles
     # Get subtile pairings between each
@@ -1807,6 +2127,721 @@ tile_location_r_ptr = cython.address(tile_location_r[:])
 tile_location_s_ptr = cython.address(tile_location_s[:])
 tiles_offset_ptr    = cython.address(tiles_offset[:])
 
+# Class used to gather the particle-particle pairings of a set of
+# receiver tiles into a batch, making it possible to carry out the
+# pairwise interactions using tight, vectorizable loops distributed
+# over several OpenMP threads within each process (see the N_threads
+# parameter). The receiver and supplier particles of the batch are
+# copied into contiguous "slots", with each slot storing a particle
+# index, the (possibly jumped) rung index of the particle and the
+# particle position. The positions are stored as separate x, y and z
+# arrays (structure of arrays), with supplier positions translated to
+# the nearest image of the receiver tile. The batch further stores a
+# list of "jobs", each of which pairs a contiguous range of receiver
+# slots with a contiguous range of supplier slots, corresponding to a
+# rung pair of a subtile pair within the particle_particle() iterator.
+# The jobs are independent and can thus be distributed over the
+# threads, with each thread accumulating the momentum updates in its
+# own part of the Δ_r and Δ_s buffers (indexed by the slots). These are
+# then reduced and added to the Δmom of the receiver and supplier by
+# the scatter() method.
+@cython.cclass
+class ParticleParticleBatch:
+    # Initialisation method
+    @cython.header(
+        # Arguments
+        num_threads='int',
+    )
+    def __init__(self, num_threads):
+        # The triple quoted string below serves as the type declaration
+        # for the data attributes of the ParticleParticleBatch type.
+        # It will get picked up by the pyxpp script
+        # and included in the .pxd file.
+        """
+        int          num_threads
+        Tiling       subtiling_r
+        Py_ssize_t   N_r
+        Py_ssize_t   N_s
+        Py_ssize_t   N_jobs
+        Py_ssize_t   size_r
+        Py_ssize_t   size_s
+        Py_ssize_t   size_jobs
+        Py_ssize_t   size_subtiles
+        Py_ssize_t*  indices_r
+        Py_ssize_t*  indices_s
+        signed char* rungs_r
+        signed char* rungs_s
+        double*      posx_r
+        double*      posy_r
+        double*      posz_r
+        double*      posx_s
+        double*      posy_s
+        double*      posz_s
+        double*      factors_r
+        double*      factors_s
+        double*      Δ_r
+        double*      Δ_s
+        Py_ssize_t*  jobs
+        Py_ssize_t*  subtile_slots_r
+        Py_ssize_t*  subtile_slots_s
+        """
+        self.num_threads = num_threads
+        self.subtiling_r = None
+        # The number of receiver slots, supplier slots and jobs
+        # currently in use, as well as their allocated sizes.
+        self.N_r = 0
+        self.N_s = 0
+        self.N_jobs = 0
+        self.size_r = 1
+        self.size_s = 1
+        self.size_jobs = 1
+        self.size_subtiles = 1
+        # The receiver and supplier slots
+        self.indices_r = malloc(self.size_r*sizeof('Py_ssize_t'))
+        self.indices_s = malloc(self.size_s*sizeof('Py_ssize_t'))
+        self.rungs_r = malloc(self.size_r*sizeof('signed char'))
+        self.rungs_s = malloc(self.size_s*sizeof('signed char'))
+        self.posx_r = malloc(self.size_r*sizeof('double'))
+        self.posy_r = malloc(self.size_r*sizeof('double'))
+        self.posz_r = malloc(self.size_r*sizeof('double'))
+        self.posx_s = malloc(self.size_s*sizeof('double'))
+        self.posy_s = malloc(self.size_s*sizeof('double'))
+        self.posz_s = malloc(self.size_s*sizeof('double'))
+        # Interaction specific factors of the slots,
+        # see the lookup_factors() method.
+        self.factors_r = malloc(self.size_r*sizeof('double'))
+        self.factors_s = malloc(self.size_s*sizeof('double'))
+        # Buffers of momentum updates, with a separate section for each
+        # dimension and thread. The momentum update of a receiver slot
+        # due to a given thread is stored at
+        #   Δ_r[(dim*num_threads + thread)*size_r + slot],
+        # and similarly for supplier slots, so that consecutive slots
+        # are contiguous in memory. These buffers are always
+        # nullified between batches.
+        self.Δ_r = malloc(3*self.num_threads*self.size_r*sizeof('double'))
+        self.Δ_s = malloc(3*self.num_threads*self.size_s*sizeof('double'))
+        self.nullify_Δ()
+        # The jobs. Each job is stored as five integers
+        #   (slot_r_bgn, slot_r_end, slot_s_bgn, slot_s_end, flags),
+        # with flags specifying whether the interaction is to be applied
+        # to the receiver (bit 0) and supplier (bit 1) particles, and
+        # whether this is a local interaction where the receiver and
+        # supplier slots refer to the same particles (bit 2), in which
+        # case only each distinct pair should be visited once.
+        self.jobs = malloc(5*self.size_jobs*sizeof('Py_ssize_t'))
+        # Mappings from subtile and rung indices to the first slot of
+        # the corresponding particles, indexed as
+        # subtile_slots_{r/s}[subtile_index*N_rungs + rung_index].
+        self.subtile_slots_r = malloc(self.size_subtiles*sizeof('Py_ssize_t'))
+        self.subtile_slots_s = malloc(self.size_subtiles*sizeof('Py_ssize_t'))
+
+    # Method for nullifying the buffers of momentum updates
+    @cython.header(
+        # Arguments
+        index='Py_ssize_t',
+        returns='void',
+    )
+    def nullify_Δ(self):
+        for index in range(3*self.num_threads*self.size_r):
+            self.Δ_r[index] = 0
+        for index in range(3*self.num_threads*self.size_s):
+            self.Δ_s[index] = 0
+
+    # Method for ensuring room for at least N_r receiver slots
+    # and N_s supplier slots.
+    @cython.header(
+        # Arguments
+        N_r='Py_ssize_t',
+        N_s='Py_ssize_t',
+        returns='void',
+    )
+    def ensure_slots(self, N_r, N_s):
+        if N_r <= self.size_r and N_s <= self.size_s:
+            return
+        if N_r > self.size_r:
+            self.size_r = 2*N_r
+            self.indices_r = realloc(self.indices_r, self.size_r*sizeof('Py_ssize_t'))
+            self.rungs_r = realloc(self.rungs_r, self.size_r*sizeof('signed char'))
+            self.posx_r = realloc(self.posx_r, self.size_r*sizeof('double'))
+            self.posy_r = realloc(self.posy_r, self.size_r*sizeof('double'))
+            self.posz_r = realloc(self.posz_r, self.size_r*sizeof('double'))
+            self.factors_r = realloc(self.factors_r, self.size_r*sizeof('double'))
+            self.Δ_r = realloc(self.Δ_r, 3*self.num_threads*self.size_r*sizeof('double'))
+        if N_s > self.size_s:
+            self.size_s = 2*N_s
+            self.indices_s = realloc(self.indices_s, self.size_s*sizeof('Py_ssize_t'))
+            self.rungs_s = realloc(self.rungs_s, self.size_s*sizeof('signed char'))
+            self.posx_s = realloc(self.posx_s, self.size_s*sizeof('double'))
+            self.posy_s = realloc(self.posy_s, self.size_s*sizeof('double'))
+            self.posz_s = realloc(self.posz_s, self.size_s*sizeof('double'))
+            self.factors_s = realloc(self.factors_s, self.size_s*sizeof('double'))
+            self.Δ_s = realloc(self.Δ_s, 3*self.num_threads*self.size_s*sizeof('double'))
+        # The layout of the (enlarged) momentum update buffers
+        # has changed. As these are always nullified between batches,
+        # we can simply nullify them completely.
+        self.nullify_Δ()
+
+    # Method for ensuring room for at least N_jobs jobs
+    @cython.header(
+        # Arguments
+        N_jobs='Py_ssize_t',
+        returns='void',
+    )
+    def ensure_jobs(self, N_jobs):
+        if N_jobs <= self.size_jobs:
+            return
+        self.size_jobs = 2*N_jobs
+        self.jobs = realloc(self.jobs, 5*self.size_jobs*sizeof('Py_ssize_t'))
+
+    # Method for gathering a batch of particle-particle pairings,
+    # starting from the receiver tile given by
+    # tile_indices_receiver[tile_index_bgn]. Receiver tiles are added
+    # to the batch until the number of slots exceeds
+    # particle_particle_batch_size. The returned value is the index
+    # into tile_indices_receiver at which the next batch should begin.
+    # The logic follows that of the particle_particle() iterator.
+    @cython.header(
+        # Arguments
+        receiver='Component',
+        supplier='Component',
+        pairing_level=str,
+        tile_indices_receiver='Py_ssize_t[::1]',
+        tile_indices_supplier_paired='Py_ssize_t**',
+        tile_indices_supplier_paired_N='Py_ssize_t*',
+        tile_index_bgn='Py_ssize_t',
+        rank_supplier='int',
+        interaction_name=str,
+        only_supply='bint',
+        forcerange='double',
+        # Locals
+        N_jobs='Py_ssize_t',
+        N_r='Py_ssize_t',
+        N_s='Py_ssize_t',
+        N_subtiles='Py_ssize_t',
+        all_subtile_pairings='Py_ssize_t***',
+        all_subtile_pairings_N='Py_ssize_t**',
+        apply_to_i='bint',
+        apply_to_j='bint',
+        dim='int',
+        highest_populated_rung_r='signed char',
+        highest_populated_rung_s='signed char',
+        indexᵖ='Py_ssize_t',
+        index_job='Py_ssize_t',
+        indexˣ='Py_ssize_t',
+        indices_r='Py_ssize_t*',
+        indices_s='Py_ssize_t*',
+        jobs='Py_ssize_t*',
+        local_interaction_flag_0='bint',
+        local_interaction_flag_1='bint',
+        local_interaction_flag_2='bint',
+        lowest_active_rung_r='signed char',
+        lowest_active_rung_s='signed char',
+        lowest_populated_rung_r='signed char',
+        lowest_populated_rung_s='signed char',
+        only_supply_communication='bint',
+        periodic_offset_ptr='double*',
+        pos_r='double*',
+        pos_s='double*',
+        posx_r='double*',
+        posx_s='double*',
+        posy_r='double*',
+        posy_s='double*',
+        posz_r='double*',
+        posz_s='double*',
+        rung='Py_ssize_t*',
+        rung_N='Py_ssize_t',
+        rung_N_r='Py_ssize_t',
+        rung_N_s='Py_ssize_t',
+        rung_index='signed char',
+        rung_index_r='signed char',
+        rung_index_r_bgn='signed char',
+        rung_index_r_end='signed char',
+        rung_index_s='signed char',
+        rung_index_s_bgn='signed char',
+        rung_index_s_end='signed char',
+        rung_indices_jumped_r='signed char*',
+        rung_indices_jumped_s='signed char*',
+        rung_particle_index='Py_ssize_t',
+        rungs_N='Py_ssize_t*',
+        rungs_N_r='Py_ssize_t*',
+        rungs_N_s='Py_ssize_t*',
+        rungs_r='signed char*',
+        rungs_s='signed char*',
+        slot_r='Py_ssize_t',
+        slot_s='Py_ssize_t',
+        subtile='Py_ssize_t**',
+        subtile_contain_jumping='bint',
+        subtile_contain_onlyinactive_r='bint',
+        subtile_contain_particles_r='signed char',
+        subtile_contain_particles_s='signed char',
+        subtile_index_r='Py_ssize_t',
+        subtile_index_s='Py_ssize_t',
+        subtile_pairings='Py_ssize_t**',
+        subtile_pairings_N='Py_ssize_t*',
+        subtile_pairings_N_r='Py_ssize_t',
+        subtile_pairings_index='Py_ssize_t',
+        subtile_pairings_r='Py_ssize_t*',
+        subtile_slots_r='Py_ssize_t*',
+        subtile_slots_s='Py_ssize_t*',
+        subtiles_contain_particles_r='signed char*',
+        subtiles_contain_particles_s='signed char*',
+        subtiles_r='Py_ssize_t***',
+        subtiles_rungs_N_r='Py_ssize_t**',
+        subtiles_rungs_N_s='Py_ssize_t**',
+        subtiles_s='Py_ssize_t***',
+        subtiling_name=str,
+        subtiling_r='Tiling',
+        subtiling_s='Tiling',
+        tile_contain_onlyinactive_r='bint',
+        tile_contain_particles_r='signed char',
+        tile_contain_particles_s='signed char',
+        tile_extent='double*',
+        tile_index_r='Py_ssize_t',
+        tile_index_r_i='Py_ssize_t',
+        tile_index_s='Py_ssize_t',
+        tile_index3D_r='Py_ssize_t*',
+        tile_index3D_s='Py_ssize_t*',
+        tile_indices_supplier='Py_ssize_t*',
+        tile_indices_supplier_N='Py_ssize_t',
+        tile_location_s_dim='double',
+        tile_pair_index='int',
+        tile_separation='double',
+        tiles_contain_particles_r='signed char*',
+        tiles_contain_particles_s='signed char*',
+        tiling_location_r='double*',
+        tiling_location_s='double*',
+        tiling_name=str,
+        tiling_r='Tiling',
+        tiling_s='Tiling',
+        returns='Py_ssize_t',
+    )
+    def gather(
+        self, receiver, supplier, pairing_level,
+        tile_indices_receiver, tile_indices_supplier_paired, tile_indices_supplier_paired_N,
+        tile_index_bgn, rank_supplier, interaction_name, only_supply, forcerange,
+    ):
+        # Extract particle variables from the receiver and supplier
+        pos_r = receiver.pos
+        pos_s = supplier.pos
+        lowest_active_rung_r     = receiver.lowest_active_rung
+        lowest_populated_rung_r  = receiver.lowest_populated_rung
+        highest_populated_rung_r = receiver.highest_populated_rung
+        rung_indices_jumped_r    = receiver.rung_indices_jumped
+        lowest_active_rung_s     = supplier.lowest_active_rung
+        lowest_populated_rung_s  = supplier.lowest_populated_rung
+        highest_populated_rung_s = supplier.highest_populated_rung
+        rung_indices_jumped_s    = supplier.rung_indices_jumped
+        # Extract tilings and subtilings
+        if pairing_level == 'tile':
+            tiling_name    = f'{interaction_name} (tiles)'
+            subtiling_name = f'{interaction_name} (subtiles)'
+        else:  # pairing_level == 'domain':
+            tiling_name = subtiling_name = 'trivial'
+        tiling_r = receiver.tilings[tiling_name]
+        tiling_location_r         = cython.address(tiling_r.location[:])
+        tile_extent               = cython.address(tiling_r.tile_extent[:])
+        tiles_contain_particles_r = tiling_r.contain_particles
+        subtiling_r = receiver.tilings[subtiling_name]
+        subtiles_r                   = subtiling_r.tiles
+        subtiles_contain_particles_r = subtiling_r.contain_particles
+        N_subtiles                   = subtiling_r.size
+        tiling_s = supplier.tilings[tiling_name]
+        tiling_location_s         = cython.address(tiling_s.location[:])
+        tiles_contain_particles_s = tiling_s.contain_particles
+        subtiling_s = get_subtiling_supplier(
+            receiver, supplier, rank_supplier, interaction_name, subtiling_name,
+        )
+        subtiles_s                   = subtiling_s.tiles
+        subtiles_contain_particles_s = subtiling_s.contain_particles
+        self.subtiling_r = subtiling_r
+        # Get subtile pairings between each
+        # of the 27 possible tile pairings.
+        only_supply_communication = (only_supply if receiver.name == supplier.name else True)
+        subtile_pairings_index = get_subtile_pairings(
+            subtiling_r, forcerange, only_supply_communication,
+        )
+        all_subtile_pairings = subtile_pairings_cache[subtile_pairings_index]
+        all_subtile_pairings_N = subtile_pairings_N_cache[subtile_pairings_index]
+        # Range of receiver and supplier rungs
+        if only_supply:
+            rung_index_r_bgn = lowest_active_rung_r
+        else:
+            rung_index_r_bgn = lowest_populated_rung_r
+        rung_index_r_end = highest_populated_rung_r + 1
+        rung_index_s_end = highest_populated_rung_s + 1
+        # Mappings from subtiles and rungs to slots
+        if self.size_subtiles < N_subtiles*N_rungs:
+            self.size_subtiles = N_subtiles*N_rungs
+            self.subtile_slots_r = realloc(
+                self.subtile_slots_r, self.size_subtiles*sizeof('Py_ssize_t'),
+            )
+            self.subtile_slots_s = realloc(
+                self.subtile_slots_s, self.size_subtiles*sizeof('Py_ssize_t'),
+            )
+        subtile_slots_r = self.subtile_slots_r
+        subtile_slots_s = self.subtile_slots_s
+        # Local pointers into the slots and jobs
+        indices_r = self.indices_r
+        indices_s = self.indices_s
+        rungs_r = self.rungs_r
+        rungs_s = self.rungs_s
+        posx_r = self.posx_r
+        posy_r = self.posy_r
+        posz_r = self.posz_r
+        posx_s = self.posx_s
+        posy_s = self.posy_s
+        posz_s = self.posz_s
+        jobs = self.jobs
+        # Local pointer into the global array of particle position
+        # offsets due to the periodicity.
+        periodic_offset_ptr = cython.address(periodic_offset[:])
+        # Flags specifying whether the force between particle i and j
+        # should be applied to i and j. If only_supply is True,
+        # the values below are correct. Otherwise, other values
+        # will be set further down.
+        apply_to_i = True
+        apply_to_j = False
+        # Loop over the requested tiles in the receiver,
+        # starting from tile_index_bgn.
+        N_r = N_s = N_jobs = 0
+        for tile_index_r_i in range(tile_index_bgn, tile_indices_receiver.shape[0]):
+            # Stop when the batch is full
+            if N_r + N_s >= particle_particle_batch_size:
+                break
+            # Lookup supplier tile indices with which to pair the
+            # current receiver tile.
+            tile_indices_supplier   = tile_indices_supplier_paired  [tile_index_r_i]
+            tile_indices_supplier_N = tile_indices_supplier_paired_N[tile_index_r_i]
+            tile_index_r = tile_indices_receiver[tile_index_r_i]
+            # Skip tile if it does not contain any particles at all,
+            # or only inactive particles when only_supply is True.
+            tile_contain_particles_r = tiles_contain_particles_r[tile_index_r]
+            if tile_contain_particles_r < 1 + only_supply:
+                continue
+            tile_contain_onlyinactive_r = (tile_contain_particles_r == 1)
+            # Sort particles within the receiver tile into subtiles
+            tile_index3D_r = tiling_r.tile_index3D(tile_index_r)
+            for dim in range(3):
+                tile_location_r_ptr[dim] = (
+                    tiling_location_r[dim] + tile_index3D_r[dim]*tile_extent[dim]
+                )
+            subtiling_r.relocate(tile_location_r)
+            subtiling_r.sort(tiling_r, tile_index_r)
+            subtiles_rungs_N_r = subtiling_r.tiles_rungs_N
+            # Copy the receiver particles into slots
+            for subtile_index_r in range(N_subtiles):
+                subtile_contain_particles_r = subtiles_contain_particles_r[subtile_index_r]
+                if subtile_contain_particles_r < 1 + only_supply:
+                    continue
+                subtile_contain_jumping = (subtile_contain_particles_r == 3)
+                subtile = subtiles_r        [subtile_index_r]
+                rungs_N = subtiles_rungs_N_r[subtile_index_r]
+                for rung_index in range(rung_index_r_bgn, rung_index_r_end):
+                    subtile_slots_r[subtile_index_r*N_rungs + rung_index] = N_r
+                    rung_N = rungs_N[rung_index]
+                    if rung_N == 0:
+                        continue
+                    if N_r + rung_N > self.size_r:
+                        self.ensure_slots(N_r + rung_N, 0)
+                        indices_r = self.indices_r
+                        rungs_r = self.rungs_r
+                        posx_r = self.posx_r
+                        posy_r = self.posy_r
+                        posz_r = self.posz_r
+                    rung = subtile[rung_index]
+                    for rung_particle_index in range(rung_N):
+                        indexᵖ = rung[rung_particle_index]
+                        indices_r[N_r] = indexᵖ
+                        indexˣ = 3*indexᵖ
+                        posx_r[N_r] = pos_r[indexˣ + 0]
+                        posy_r[N_r] = pos_r[indexˣ + 1]
+                        posz_r[N_r] = pos_r[indexˣ + 2]
+                        if subtile_contain_jumping:
+                            rungs_r[N_r] = rung_indices_jumped_r[indexᵖ]
+                        else:
+                            rungs_r[N_r] = rung_index
+                        N_r += 1
+            # Loop over the requested tiles in the supplier
+            for tile_index_s in range(tile_indices_supplier_N):
+                tile_index_s = tile_indices_supplier[tile_index_s]
+                # Skip tile if it does not contain any particles at
+                # all, or if both the receiver and supplier tile
+                # contains particles on inactive rows only.
+                tile_contain_particles_s = tiles_contain_particles_s[tile_index_s]
+                if tile_contain_particles_s == 0:
+                    continue
+                if tile_contain_onlyinactive_r and tile_contain_particles_s == 1:
+                    continue
+                # Sort particles within the supplier tile into subtiles,
+                # determining the tile offset and the periodic particle
+                # offset along the way.
+                tile_index3D_s = tiling_s.tile_index3D(tile_index_s)
+                for dim in range(3):
+                    tiles_offset_ptr[dim] = tile_index3D_s[dim] - tile_index3D_r[dim]
+                    tile_location_s_dim = (
+                        tiling_location_s[dim] + tile_index3D_s[dim]*tile_extent[dim]
+                    )
+                    tile_location_s_ptr[dim] = tile_location_s_dim
+                    tile_separation = tile_location_s_dim - tile_location_r_ptr[dim]
+                    if tile_separation > ℝ[0.5*boxsize]:
+                        periodic_offset_ptr[dim] = boxsize
+                    elif tile_separation < ℝ[-0.5*boxsize]:
+                        periodic_offset_ptr[dim] = ℝ[-boxsize]
+                    else:
+                        periodic_offset_ptr[dim] = 0
+                subtiling_s.relocate(tile_location_s)
+                subtiling_s.sort(tiling_s, tile_index_s)
+                subtiles_rungs_N_s = subtiling_s.tiles_rungs_N
+                # Copy the supplier particles into slots, translating
+                # their positions so that they correspond to the
+                # nearest image of the receiver tile.
+                for subtile_index_s in range(N_subtiles):
+                    subtile_contain_particles_s = subtiles_contain_particles_s[subtile_index_s]
+                    if subtile_contain_particles_s == 0:
+                        continue
+                    subtile_contain_jumping = (subtile_contain_particles_s == 3)
+                    subtile = subtiles_s        [subtile_index_s]
+                    rungs_N = subtiles_rungs_N_s[subtile_index_s]
+                    for rung_index in range(lowest_populated_rung_s, rung_index_s_end):
+                        subtile_slots_s[subtile_index_s*N_rungs + rung_index] = N_s
+                        rung_N = rungs_N[rung_index]
+                        if rung_N == 0:
+                            continue
+                        if N_s + rung_N > self.size_s:
+                            self.ensure_slots(0, N_s + rung_N)
+                            indices_s = self.indices_s
+                            rungs_s = self.rungs_s
+                            posx_s = self.posx_s
+                            posy_s = self.posy_s
+                            posz_s = self.posz_s
+                        rung = subtile[rung_index]
+                        for rung_particle_index in range(rung_N):
+                            indexᵖ = rung[rung_particle_index]
+                            indices_s[N_s] = indexᵖ
+                            indexˣ = 3*indexᵖ
+                            posx_s[N_s] = pos_s[indexˣ + 0] - periodic_offset_ptr[0]
+                            posy_s[N_s] = pos_s[indexˣ + 1] - periodic_offset_ptr[1]
+                            posz_s[N_s] = pos_s[indexˣ + 2] - periodic_offset_ptr[2]
+                            if subtile_contain_jumping:
+                                rungs_s[N_s] = rung_indices_jumped_s[indexᵖ]
+                            else:
+                                rungs_s[N_s] = rung_index
+                            N_s += 1
+                # Get the needed subtile pairings for the selected
+                # receiver and supplier tiles.
+                tile_pair_index = get_neighbourtile_pair_index(
+                    tiles_offset_ptr[0], tiles_offset_ptr[1], tiles_offset_ptr[2],
+                )
+                subtile_pairings   = all_subtile_pairings  [tile_pair_index]
+                subtile_pairings_N = all_subtile_pairings_N[tile_pair_index]
+                # Flag specifying whether this is a local interaction
+                local_interaction_flag_0 = (
+                    receiver.name == supplier.name and rank == rank_supplier
+                    and (tile_index_r == tile_index_s)
+                )
+                # Loop over all subtiles in the selected receiver tile
+                for subtile_index_r in range(N_subtiles):
+                    subtile_contain_particles_r = subtiles_contain_particles_r[subtile_index_r]
+                    if subtile_contain_particles_r < 1 + only_supply:
+                        continue
+                    subtile_contain_onlyinactive_r = (subtile_contain_particles_r == 1)
+                    rungs_N_r            = subtiles_rungs_N_r[subtile_index_r]
+                    subtile_pairings_r   = subtile_pairings  [subtile_index_r]
+                    subtile_pairings_N_r = subtile_pairings_N[subtile_index_r]
+                    # Loop over the needed supplier subtiles
+                    for subtile_index_s in range(subtile_pairings_N_r):
+                        subtile_index_s = subtile_pairings_r[subtile_index_s]
+                        subtile_contain_particles_s = (
+                            subtiles_contain_particles_s[subtile_index_s]
+                        )
+                        if subtile_contain_particles_s == 0:
+                            continue
+                        if subtile_contain_onlyinactive_r and subtile_contain_particles_s == 1:
+                            continue
+                        rungs_N_s = subtiles_rungs_N_s[subtile_index_s]
+                        # Flag specifying whether this is
+                        # a local interaction.
+                        local_interaction_flag_1 = (
+                            local_interaction_flag_0
+                            and (subtile_index_r == subtile_index_s)
+                        )
+                        # Loop over all rungs in the receiver subtile
+                        for rung_index_r in range(rung_index_r_bgn, rung_index_r_end):
+                            rung_N_r = rungs_N_r[rung_index_r]
+                            if rung_N_r == 0:
+                                continue
+                            # Pair active receiver rungs with all
+                            # supplier rungs and inactive receiver
+                            # rungs with active supplier rungs only.
+                            rung_index_s_bgn = lowest_populated_rung_s
+                            if not only_supply:
+                                if rung_index_r < lowest_active_rung_r:
+                                    apply_to_i = False
+                                    rung_index_s_bgn = lowest_active_rung_s
+                                else:
+                                    apply_to_i = True
+                            # Do not double count local rung pairs
+                            if local_interaction_flag_1 and (rung_index_s_bgn < rung_index_r):
+                                rung_index_s_bgn = rung_index_r
+                            slot_r = subtile_slots_r[subtile_index_r*N_rungs + rung_index_r]
+                            # Loop over the needed supplier rungs
+                            for rung_index_s in range(rung_index_s_bgn, rung_index_s_end):
+                                rung_N_s = rungs_N_s[rung_index_s]
+                                if rung_N_s == 0:
+                                    continue
+                                if not only_supply:
+                                    apply_to_j = (rung_index_s >= lowest_active_rung_s)
+                                local_interaction_flag_2 = (
+                                    local_interaction_flag_1
+                                    and (rung_index_r == rung_index_s)
+                                )
+                                slot_s = subtile_slots_s[subtile_index_s*N_rungs + rung_index_s]
+                                # Record the job
+                                if N_jobs == self.size_jobs:
+                                    self.ensure_jobs(N_jobs + 1)
+                                    jobs = self.jobs
+                                index_job = 5*N_jobs
+                                jobs[index_job + 0] = slot_r
+                                jobs[index_job + 1] = slot_r + rung_N_r
+                                jobs[index_job + 2] = slot_s
+                                jobs[index_job + 3] = slot_s + rung_N_s
+                                jobs[index_job + 4] = (
+                                    apply_to_i + 2*apply_to_j + 4*local_interaction_flag_2
+                                )
+                                N_jobs += 1
+        else:
+            # All receiver tiles have been gathered
+            tile_index_r_i = tile_indices_receiver.shape[0]
+        self.N_r = N_r
+        self.N_s = N_s
+        self.N_jobs = N_jobs
+        return tile_index_r_i
+
+    # Method for looking up interaction specific factors of all slots
+    # of the batch, given an array of factors indexed by the (jumped)
+    # rung index. The results are stored in factors_r and factors_s.
+    @cython.header(
+        # Arguments
+        factors='const double*',
+        # Locals
+        factors_r='double*',
+        factors_s='double*',
+        rungs_r='signed char*',
+        rungs_s='signed char*',
+        slot='Py_ssize_t',
+        returns='void',
+    )
+    def lookup_factors(self, factors):
+        factors_r = self.factors_r
+        factors_s = self.factors_s
+        rungs_r = self.rungs_r
+        rungs_s = self.rungs_s
+        for slot in range(self.N_r):
+            factors_r[slot] = factors[rungs_r[slot]]
+        for slot in range(self.N_s):
+            factors_s[slot] = factors[rungs_s[slot]]
+
+    # Method for adding the momentum updates accumulated within the
+    # batch to the Δmom of the receiver and supplier. If only_supply is
+    # True, only the receiver is updated. The momentum update buffers
+    # are nullified in the process.
+    @cython.header(
+        # Arguments
+        Δmom_r='double*',
+        Δmom_s='double*',
+        only_supply='bint',
+        returns='void',
+    )
+    def scatter(self, Δmom_r, Δmom_s, only_supply):
+        self.scatter_slots(self.Δ_r, self.indices_r, self.N_r, self.size_r, Δmom_r)
+        if not only_supply:
+            self.scatter_slots(self.Δ_s, self.indices_s, self.N_s, self.size_s, Δmom_s)
+
+    # Helper method for the scatter() method
+    @cython.header(
+        # Arguments
+        Δ='double*',
+        indices='Py_ssize_t*',
+        N='Py_ssize_t',
+        size='Py_ssize_t',
+        Δmom='double*',
+        # Locals
+        dim='int',
+        index='Py_ssize_t',
+        index_thread='Py_ssize_t',
+        indexˣ='Py_ssize_t',
+        num_threads='int',
+        slot='Py_ssize_t',
+        thread='int',
+        Δ_slot='double',
+        returns='void',
+    )
+    def scatter_slots(self, Δ, indices, N, size, Δmom):
+        # Reduce the momentum updates of all threads into the sections
+        # belonging to the first thread. This is done in parallel over
+        # the slots, which are independent.
+        num_threads = self.num_threads
+        if num_threads > 1:
+            for slot in prange(N, nogil=True, schedule='static', num_threads=num_threads):
+                for dim in range(3):
+                    index = dim*num_threads*size + slot
+                    Δ_slot = Δ[index]
+                    for thread in range(1, num_threads):
+                        index_thread = index + thread*size
+                        Δ_slot = Δ_slot + Δ[index_thread]
+                        Δ[index_thread] = 0
+                    Δ[index] = Δ_slot
+        # Add the reduced momentum updates to the particles.
+        # This is done serially, as the same particle may occupy
+        # several slots.
+        for slot in range(N):
+            indexˣ = 3*indices[slot]
+            for dim in range(3):
+                index = dim*num_threads*size + slot
+                Δmom[indexˣ + dim] += Δ[index]
+                Δ[index] = 0
+
+    # This method is automatically called when a ParticleParticleBatch
+    # instance is garbage collected. All manually allocated memory
+    # is freed.
+    def __dealloc__(self):
+        free(self.indices_r)
+        free(self.indices_s)
+        free(self.rungs_r)
+        free(self.rungs_s)
+        free(self.posx_r)
+        free(self.posy_r)
+        free(self.posz_r)
+        free(self.posx_s)
+        free(self.posy_s)
+        free(self.posz_s)
+        free(self.factors_r)
+        free(self.factors_s)
+        free(self.Δ_r)
+        free(self.Δ_s)
+        free(self.jobs)
+        free(self.subtile_slots_r)
+        free(self.subtile_slots_s)
+
+# Function returning the ParticleParticleBatch instance
+# to use for threaded particle-particle interactions.
+@cython.header(returns='ParticleParticleBatch')
+def get_particle_particle_batch():
+    global particle_particle_batch
+    if particle_particle_batch is None:
+        particle_particle_batch = ParticleParticleBatch(N_threads)
+    return particle_particle_batch
+# Global variables used by the get_particle_particle_batch() function
+# and ParticleParticleBatch class. The batch size is the number of
+# slots (receiver and supplier particles) after which no further
+# receiver tiles are added to a batch.
+cython.declare(
+    particle_particle_batch='ParticleParticleBatch',
+    particle_particle_batch_size='Py_ssize_t',
+)
+particle_particle_batch = None
+particle_particle_batch_size = 2**16
+
 # Function for converting a pair of softening lengths
 # into a single softening length.
 @cython.header(
@@ -1931,6 +2966,7 @@ def get_softened_r3inv(r2, ϵ):
     interlace_downstream=str,
     ᔑdt=dict,
     ᔑdt_key=object,  # str or tuple
+    t_positions='double',
     # Locals
     all_receiver_downstream_gridsizes_equal_global='bint',
     all_supplier_upstream_gridsizes_equal_global='bint',
@@ -1979,13 +3015,13 @@ def get_softened_r3inv(r2, ϵ):
     suppliers_gridsizes_upstream=list,
     Δx='double',
     θ='double',
-    ᐁᵢgrid_downstream='double[:, :, ::1]',
+    ᐁgrids_downstream=list,
     returns='void',
 )
 def particle_mesh(
     receivers, suppliers, gridsize_global, quantity, force, method, potential, interpolation_order,
     deconvolve_upstream, deconvolve_downstream, interlace_upstream, interlace_downstream,
-    ᔑdt, ᔑdt_key,
+    ᔑdt, ᔑdt_key, t_positions=-1,
 ):
     """
     This function will update the momenta of all receiver components due
@@ -2014,8 +3050,9 @@ def particle_mesh(
         Fourier space to obtain the downstream force grid
         in Fourier space.
       - Transform to real space downstream force grid.
-    - Interpolate the real-space downstream force grid onto
-      the receivers, applying the force.
+    - Interpolate the three components of the real-space downstream
+      force grid onto the receivers, applying the force. For particle
+      receivers, this is done in a single pass over the particles.
       The force application uses the prescription
         Δmom = -component.mass*∂ⁱφ*ᔑdt[ᔑdt_key].
     """
@@ -2081,11 +3118,21 @@ def particle_mesh(
     # Interpolate suppliers onto global Fourier slabs by first
     # interpolating them onto individual upstream grids, transforming to
     # Fourier space and then adding them together.
-    slab_global = interpolate_upstream(
-        suppliers, suppliers_gridsizes_upstream, gridsize_global, quantity, interpolation_order,
-        ᔑdt, deconvolve_upstream, interlace_upstream,
-        output_space='Fourier',
-    )
+    # If reuse of previous potentials is enabled, the resulting slabs
+    # may instead be obtained through extrapolation. This requires
+    # knowledge of the time of the supplier positions.
+    if potential_reuse_steps > 0 and t_positions != -1:
+        slab_global = get_source_slab_reusable(
+            suppliers, suppliers_gridsizes_upstream, gridsize_global, quantity,
+            interpolation_order, ᔑdt, deconvolve_upstream, interlace_upstream,
+            t_positions,
+        )
+    else:
+        slab_global = interpolate_upstream(
+            suppliers, suppliers_gridsizes_upstream, gridsize_global, quantity,
+            interpolation_order, ᔑdt, deconvolve_upstream, interlace_upstream,
+            output_space='Fourier',
+        )
     slab_global_ptr = cython.address(slab_global[:, :, :])
     # Convert slab_global values to potential
     # and possibly perform upstream and/or downstream deconvolutions.
@@ -2131,6 +3178,9 @@ def particle_mesh(
         )
         # Physical grid spacing of downstream potential grid
         Δx = boxsize/gridsize_downstream
+        # List for holding the three components
+        # of the downstream force grid.
+        ᐁgrids_downstream = [None]*3
         # Obtain downstream slab potential from global slab potential
         if gridsize_downstream == gridsize_global:
             # The downstream and global grid sizes are the same, so we
@@ -2238,9 +3288,9 @@ def particle_mesh(
                     if fourier_diff:
                         # Fourier space differentiation.
                         # For each dimension, differentiate the grid
-                        # to obtain the force and apply this force.
+                        # to obtain the force.
                         for dim in range(3):
-                            masterprint(f'Obtaining and applying the {"xyz"[dim]}-force ...')
+                            masterprint(f'Obtaining the {"xyz"[dim]}-force ...')
                             # Get reference to
                             # or copy of slab_downstream
                             if mutate_slab_downstream_ok and dim == 2:
@@ -2265,17 +3315,12 @@ def particle_mesh(
                                 f'Transforming to real space force {downstream_description}...'
                             )
                             fft(slab_downstream_subgroup, 'backward')
-                            grid_downstream = domain_decompose(
+                            ᐁgrids_downstream[dim] = domain_decompose(
                                 slab_downstream_subgroup,
-                                'grid_updownstream',
+                                f'grid_updownstream_{"xyz"[dim]}',
                                 do_ghost_communication=True,
                             )
                             masterprint('done')
-                            # Apply force
-                            apply_particle_mesh_force(
-                                grid_downstream, dim, group[representation], interpolation_order,
-                                ᔑdt, ᔑdt_key, lattice_downstream,
-                            )
                             masterprint('done')
                     else:
                         # Real space differentiation.
@@ -2307,9 +3352,9 @@ def particle_mesh(
                         )
                         masterprint('done')
                         # For each dimension, differentiate the grid
-                        # to obtain the force and apply this force.
+                        # to obtain the force.
                         for dim in range(3):
-                            masterprint(f'Obtaining and applying the {"xyz"[dim]}-force ...')
+                            masterprint(f'Obtaining the {"xyz"[dim]}-force ...')
                             # Differentiate the downstream potential in
                             # real space using finite difference. We
                             # need to properly populate the ghost points
@@ -2320,20 +3365,173 @@ def particle_mesh(
                             # means that the momentum grid will
                             # automatically get ghost points populated
                             # correctly as well.
-                            ᐁᵢgrid_downstream = diff_domaingrid(
+                            ᐁgrids_downstream[dim] = diff_domaingrid(
                                 grid_downstream, dim, differentiation_order,
-                                Δx, 'force_downstream',
+                                Δx, f'force_downstream_{"xyz"[dim]}',
                                 do_ghost_communication=True,
                             )
-                            # Apply force
-                            apply_particle_mesh_force(
-                                ᐁᵢgrid_downstream, dim, group[representation], interpolation_order,
-                                ᔑdt, ᔑdt_key, lattice_downstream,
-                            )
                             masterprint('done')
+                    # Apply all three force components to the receivers
+                    # in one go, letting particle receivers share the
+                    # interpolation weights between the components.
+                    masterprint('Applying the force ...')
+                    apply_particle_mesh_forces(
+                        ᐁgrids_downstream[0], ᐁgrids_downstream[1], ᐁgrids_downstream[2],
+                        group[representation], interpolation_order,
+                        ᔑdt, ᔑdt_key, lattice_downstream,
+                    )
+                    masterprint('done')
                     if len(lattice_downstream) > 1:
                         masterprint('done')
 
+# Function for obtaining the global Fourier space slab of the source
+# density for particle_mesh(), either by interpolating the suppliers
+# through interpolate_upstream() or by linearly extrapolating in time
+# the two latest such slabs computed for the same suppliers and
+# specifications. The slabs are labelled by the time t_positions of
+# the supplier positions. Each time the slab is computed anew, the slab
+# extrapolated to the same time is compared to it, with the number of
+# allowed consecutive extrapolations doubled if the relative error is
+# within potential_reuse_tol and halved otherwise. The number of allowed
+# consecutive extrapolations never exceeds potential_reuse_steps.
+@cython.header(
+    # Arguments
+    suppliers=list,
+    suppliers_gridsizes_upstream=list,
+    gridsize_global='Py_ssize_t',
+    quantity=str,
+    interpolation_order='int',
+    ᔑdt=dict,
+    deconvolve_upstream='bint',
+    interlace_upstream=str,
+    t_positions='double',
+    # Locals
+    cache_entry=dict,
+    component='Component',
+    error='double',
+    extrapolation_factor='double',
+    index='Py_ssize_t',
+    key=tuple,
+    key_other=tuple,
+    n_allowed='Py_ssize_t',
+    norm2='double',
+    size='Py_ssize_t',
+    slab_global='double[:, :, ::1]',
+    slab_global_ptr='double*',
+    slab_new='double[:, :, ::1]',
+    slab_new_ptr='double*',
+    slab_old='double[:, :, ::1]',
+    slab_old_ptr='double*',
+    value='double',
+    Δ2='double',
+    returns='double[:, :, ::1]',
+)
+def get_source_slab_reusable(
+    suppliers, suppliers_gridsizes_upstream, gridsize_global, quantity,
+    interpolation_order, ᔑdt, deconvolve_upstream, interlace_upstream, t_positions,
+):
+    global source_slabs_cache_time
+    key = (
+        tuple([component.name for component in suppliers]),
+        tuple(suppliers_gridsizes_upstream),
+        gridsize_global,
+        quantity,
+        interpolation_order,
+        deconvolve_upstream,
+        interlace_upstream,
+    )
+    # At the first call of a new kick, free the slabs of all cache
+    # entries not in use during the previous kick, e.g. due to changed
+    # grid sizes or suppliers. Entries in use during the previous kick
+    # have their time of use equal to source_slabs_cache_time.
+    if t_positions > source_slabs_cache_time:
+        for key_other, cache_entry in list(source_slabs_cache.items()):
+            if cache_entry['time used'] < source_slabs_cache_time:
+                source_slabs_cache.pop(key_other)
+        source_slabs_cache_time = t_positions
+    cache_entry = source_slabs_cache.get(key)
+    if cache_entry is None:
+        cache_entry = source_slabs_cache[key] = {
+            'slabs': [], 'times': [], 'n_allowed': 0, 'n_extrapolated': 0,
+        }
+    cache_entry['time used'] = t_positions
+    # Linear extrapolation factor for going from
+    # the latest slab to the current time.
+    extrapolation_factor = 0
+    if len(cache_entry['slabs']) == 2:
+        slab_old, slab_new = cache_entry['slabs']
+        slab_old_ptr = cython.address(slab_old[:, :, :])
+        slab_new_ptr = cython.address(slab_new[:, :, :])
+        size = slab_new.shape[0]*slab_new.shape[1]*slab_new.shape[2]
+        if cache_entry['times'][1] != cache_entry['times'][0]:
+            extrapolation_factor = (
+                (t_positions - cache_entry['times'][1])
+                /(cache_entry['times'][1] - cache_entry['times'][0])
+            )
+        # Extrapolate if allowed
+        if cache_entry['n_extrapolated'] < cache_entry['n_allowed']:
+            masterprint('Extrapolating source density from previous time steps ...')
+            slab_global = get_fftw_slab(gridsize_global)
+            slab_global_ptr = cython.address(slab_global[:, :, :])
+            for index in range(size):
+                slab_global_ptr[index] = slab_new_ptr[index] + extrapolation_factor*(
+                    slab_new_ptr[index] - slab_old_ptr[index]
+                )
+            cache_entry['n_extrapolated'] += 1
+            masterprint('done')
+            return slab_global
+    # Compute the slab anew
+    slab_global = interpolate_upstream(
+        suppliers, suppliers_gridsizes_upstream, gridsize_global, quantity,
+        interpolation_order, ᔑdt, deconvolve_upstream, interlace_upstream,
+        output_space='Fourier',
+    )
+    slab_global_ptr = cython.address(slab_global[:, :, :])
+    size = slab_global.shape[0]*slab_global.shape[1]*slab_global.shape[2]
+    # If the positions are unchanged since the latest stored slab, as
+    # for an 'init' kick following a kick at a sync time, this slab
+    # is replaced. Otherwise, estimate the error of the extrapolation
+    # to the current time and update the allowed number of
+    # consecutive extrapolations.
+    if cache_entry['times'] and cache_entry['times'][-1] == t_positions:
+        slab_new = cache_entry['slabs'].pop()
+        cache_entry['times'].pop()
+    elif len(cache_entry['slabs']) == 2:
+        Δ2 = 0
+        norm2 = 0
+        for index in range(size):
+            value = slab_global_ptr[index]
+            Δ2 += (
+                value - slab_new_ptr[index]
+                - extrapolation_factor*(slab_new_ptr[index] - slab_old_ptr[index])
+            )**2
+            norm2 += value**2
+        Δ2 = allreduce(Δ2, op=MPI.SUM)
+        norm2 = allreduce(norm2, op=MPI.SUM)
+        error = sqrt(Δ2/norm2) if norm2 > 0 else 0
+        n_allowed = cache_entry['n_allowed']
+        if error <= potential_reuse_tol:
+            n_allowed = pairmin(pairmax(2*n_allowed, 1), potential_reuse_steps)
+        else:
+            n_allowed //= 2
+        cache_entry['n_allowed'] = n_allowed
+        # Recycle the memory of the oldest slab
+        slab_new = cache_entry['slabs'].pop(0)
+        cache_entry['times'].pop(0)
+    else:
+        slab_new = empty(asarray(slab_global).shape, dtype=C2np['double'])
+    slab_new[...] = slab_global
+    cache_entry['slabs'].append(slab_new)
+    cache_entry['times'].append(t_positions)
+    cache_entry['n_extrapolated'] = 0
+    return slab_global
+
+# Cache used by the get_source_slab_reusable() function, together with
+# the time of the (supplier) positions of the latest kick using it.
+cython.declare(source_slabs_cache=dict, source_slabs_cache_time='double')
+source_slabs_cache = {}
+source_slabs_cache_time = -1
+
 # Function for applying a scalar grid of the force along the dim'th
 # dimension to receiver components.
 @cython.header(
@@ -2401,6 +3599,55 @@ def apply_particle_mesh_force(
                 )*grid_ptr[index]
         masterprint('done')
 
+# Function for applying the three scalar grids of the force along each
+# dimension to receiver components. For particle receivers, all three
+# force components are interpolated in a single pass over the
+# particles. For fluid receivers, this is equivalent to calling
+# apply_particle_mesh_force() once for each dimension.
+@cython.header(
+    # Arguments
+    gridx='double[:, :, ::1]',
+    gridy='double[:, :, ::1]',
+    gridz='double[:, :, ::1]',
+    receivers=list,
+    interpolation_order='int',
+    ᔑdt=dict,
+    ᔑdt_key=object,  # str or tuple
+    lattice='Lattice',
+    # Locals
+    dim='int',
+    grid='double[:, :, ::1]',
+    receiver='Component',
+    ᔑdt_key_receiver=object,  # str or tuple
+    returns='void',
+)
+def apply_particle_mesh_forces(
+    gridx, gridy, gridz, receivers, interpolation_order, ᔑdt, ᔑdt_key,
+    lattice=None,
+):
+    for receiver in receivers:
+        if receiver.representation == 'particles':
+            masterprint(f'Applying force to {receiver.name} ...')
+            # When ᔑdt_key is a (2-)tuple, the last element needs to be
+            # substituted with the name of the receiver.
+            ᔑdt_key_receiver = ᔑdt_key
+            if isinstance(ᔑdt_key, tuple):
+                ᔑdt_key_receiver = (ᔑdt_key[0], receiver.name)
+            # Update all three momentum components of all particles
+            # through interpolation in the grids, using the same
+            # conversion from force to momentum change as in
+            # apply_particle_mesh_force().
+            interpolate_domaingrids_to_particles(
+                gridx, gridy, gridz, receiver, 'mom', interpolation_order,
+                lattice, -receiver.mass*ᔑdt[ᔑdt_key_receiver],
+            )
+            masterprint('done')
+        else:  # receiver.representation == 'fluid'
+            for dim, grid in enumerate((gridx, gridy, gridz)):
+                apply_particle_mesh_force(
+                    grid, dim, [receiver], interpolation_order, ᔑdt, ᔑdt_key, lattice,
+                )
+
 # Function implementing progress messages used for the short-range
 # kicks intertwined with drift operations.
 @cython.pheader(
@@ -2843,6 +4090,7 @@ register('gravity', ['ppnonperiodic', 'pp', 'p3m', 'pm'], 'gravitational')
     ᔑdt=dict,
     interaction_type=str,
     printout='bint',
+    t_positions='double',
     # Locals
     extra_message=str,
     force=str,
@@ -2851,7 +4099,7 @@ register('gravity', ['ppnonperiodic', 'pp', 'p3m', 'pm'], 'gravitational')
     quantity=str,
     ᔑdt_key=tuple,
 )
-def gravity(method, receivers, suppliers, ᔑdt, interaction_type, printout):
+def gravity(method, receivers, suppliers, ᔑdt, interaction_type, printout, t_positions=-1):
     force = 'gravity'
     # Set up variables used by potential/grid (PM and P³M) methods
     if method in {'pm', 'p3m'}:
@@ -2893,7 +4141,7 @@ def gravity(method, receivers, suppliers, ᔑdt, interaction_type, printout):
             potential_specs.interpolation_order,
             potential_specs.deconvolve.upstream, potential_specs.deconvolve.downstream,
             potential_specs.interlace .upstream, potential_specs.interlace .downstream,
-            ᔑdt, ᔑdt_key,
+            ᔑdt, ᔑdt_key, t_positions,
         )
         if printout:
             masterprint('done')
@@ -2918,7 +4166,7 @@ def gravity(method, receivers, suppliers, ᔑdt, interaction_type, printout):
                 potential_specs.interpolation_order,
                 potential_specs.deconvolve.upstream, potential_specs.deconvolve.downstream,
                 potential_specs.interlace .upstream, potential_specs.interlace .downstream,
-                ᔑdt, ᔑdt_key,
+                ᔑdt, ᔑdt_key, t_positions,
             )
         # The short-range PP part
         if 𝔹['any' in interaction_type] or 𝔹['short' in interaction_type]:
@@ -2970,6 +4218,7 @@ register('lapse', 'pm')
     ᔑdt=dict,
     interaction_type=str,
     printout='bint',
+    t_positions='double',
     # Locals
     force=str,
     potential=str,
@@ -2977,7 +4226,7 @@ register('lapse', 'pm')
     quantity=str,
     ᔑdt_key=tuple,
 )
-def lapse(method, receivers, suppliers, ᔑdt, interaction_type, printout):
+def lapse(method, receivers, suppliers, ᔑdt, interaction_type, printout, t_positions=-1):
     force = 'lapse'
     # While the receivers list stores the correct components,
     # the suppliers store the lapse component as well as all the
@@ -3029,7 +4278,7 @@ def lapse(method, receivers, suppliers, ᔑdt, interaction_type, printout):
             potential_specs.interpolation_order,
             potential_specs.deconvolve.upstream, potential_specs.deconvolve.downstream,
             potential_specs.interlace .upstream, potential_specs.interlace .downstream,
-            ᔑdt, ᔑdt_key,
+            ᔑdt, ᔑdt_key, t_positions,
         )
         if printout:
             masterprint('done')
@@ -38,6 +38,7 @@ cimport(
     '    cosmic_time,          '
     '    hubble,               '
     '    remove_doppelgängers, '
+    '    scale_factor,         '
     '    Ḣ,                    '
     '    ȧ,                    '
     '    ä,                    '
@@ -178,6 +179,7 @@ class CosmoResults:
         # Store the cosmo object as a hidden attribute
         self._cosmo = cosmo
         # Determine the filename for read/write
+        self.pool_dirname = None
         if filename:
             # If a filename is given, no ID is needed. Set it to None.
             self.id = None
@@ -203,8 +205,35 @@ class CosmoResults:
                 extension='hdf5',
             )
             self.id = os.path.basename(self.filename).removesuffix('.hdf5')
+            # Perturbations are additionally stored within a pool,
+            # shared between all CLASS runs with the same parameters
+            # apart from the k modes. The pool directory is named
+            # similarly to the above file, though with the k modes left
+            # out of the hash.
+            if 'k_output_values' in self.params:
+                self.pool_dirname = get_reusable_filename(
+                    'class',
+                    {
+                        str(key).replace(' ', ''): str(val).replace(' ', '').lower()
+                        for key, val in self.params.items()
+                        if key != 'k_output_values'
+                    },
+                    class__VERSION_,
+                    class__ARGUMENT_LENGTH_MAX_,
+                    class_a_min,
+                    extension='pool',
+                )
+        # Indices of the k modes to be computed by CLASS, as well as
+        # perturbations reused from the pool, mapping k indices to
+        # perturbations (on the master process only). These are
+        # determined by the load_pooled() method.
+        self.k_indices_compute = None
+        self.perturbations_pooled = {}
         # Message that gets printed if and when CLASS is called
         self.class_call_reason = class_call_reason
+        # Flag specifying whether some perturbations are not tabulated
+        # early enough, as determined by the find_a_min() method.
+        self.a_min_insufficient = False
         # Add methods which return transfer function splines for a
         # given a. The method names are those of the registered
         # transfer functions given by transferfunctions_registered.
@@ -238,14 +267,34 @@ class CosmoResults:
             # the perturbations. All other values will be available to
             # all node masters.
             if 'k_output_values' in self.params:
-                # Compute perturbations. Do this in 'MPI' mode,
-                # meaning utilizing all available nodes.
-                self._cosmo, self.k_node_indices = call_class(
-                    self.params,
-                    sleep_time=(0.1, 1),
-                    mode='MPI',
-                    class_call_reason=self.class_call_reason,
-                )
+                # Only compute perturbations at the k modes
+                # not already present in the pool.
+                if self.k_indices_compute is None:
+                    self.load_pooled()
+                k_output_values = self.params['k_output_values'].split(',')
+                if self.k_indices_compute.shape[0] == 0:
+                    # All perturbations are available from the pool.
+                    # Call CLASS for the background only, leaving out
+                    # all of the extra parameters concerning the
+                    # perturbations, as CLASS would not read these.
+                    self._cosmo = call_class(
+                        mode='single node',
+                        class_call_reason=self.class_call_reason,
+                    )
+                    self.k_node_indices = empty(0, dtype=C2np['Py_ssize_t'])
+                else:
+                    # Compute perturbations. Do this in 'MPI' mode,
+                    # meaning utilizing all available nodes.
+                    self._cosmo, self.k_node_indices = call_class(
+                        self.params | {
+                            'k_output_values': ','.join([
+                                k_output_values[k] for k in self.k_indices_compute
+                            ]),
+                        },
+                        sleep_time=(0.1, 1),
+                        mode='MPI',
+                        class_call_reason=self.class_call_reason,
+                    )
             else:
                 # Do not compute perturbations. This call should be
                 # very fast and so we compute it in 'single node'
@@ -445,138 +494,172 @@ class CosmoResults:
             _, self._background['a'] = remove_doppelgängers(
                 self._background['a'], self._background['a'], copy=True)
         return self._background
+    # Method adding species specific perturbation keys to the set
+    # self.needed_keys['perturbations'], based on the species present
+    # in the current simulation. The species are returned as a list.
+    def add_needed_perturbation_keys(self):
+        class_species_present_list = (universals_dict['class_species_present']
+            .decode().replace('[', r'\[').replace(']', r'\]').split('+'))
+        for class_species_present in class_species_present_list:
+            if not class_species_present:
+                continue
+            if class_species_present == 'metric':
+                # For the special "metric" species, what we need is
+                # the metric potentials ϕ and ψ along with the
+                # conformal time derivative of H_T in 𝘕-body gauge.
+                self.needed_keys['perturbations'] |= {r'^phi$', r'^psi$', r'^H_T_prime$'}
+            elif class_species_present == 'lapse':
+                # For the special "lapse" species, what we need is
+                # the conformal time derivative of H_T
+                # in 𝘕-body gauge.
+                self.needed_keys['perturbations'] |= {r'^H_T_prime$'}
+            else:
+                self.needed_keys['perturbations'] |= {
+                    # Density
+                    rf'^delta_{class_species_present}$',
+                    # Velocity
+                    rf'^theta_{class_species_present}$',
+                    # # Pressure
+                    rf'^cs2_{class_species_present}$',
+                    # Shear stress
+                    rf'^shear_{class_species_present}$',
+                }
+                # For decaying cold dark matter we perform a
+                # transformation of θ, for which the conformal time
+                # derivative of H_T in 𝘕-body gauge is required.
+                if class_species_present == 'dcdm':
+                    self.needed_keys['perturbations'] |= {r'^H_T_prime$'}
+        return class_species_present_list
     # The raw perturbations
     @property
     def perturbations(self):
         if not hasattr(self, '_perturbations'):
-            # Add species specific perturbation keys to the set
-            # self.needed_keys['perturbations'], based on the
-            # species present in the current simulation.
-            class_species_present_list = (universals_dict['class_species_present']
-                .decode().replace('[', r'\[').replace(']', r'\]').split('+'))
-            for class_species_present in class_species_present_list:
-                if not class_species_present:
-                    continue
-                if class_species_present == 'metric':
-                    # For the special "metric" species, what we need is
-                    # the metric potentials ϕ and ψ along with the
-                    # conformal time derivative of H_T in 𝘕-body gauge.
-                    self.needed_keys['perturbations'] |= {r'^phi$', r'^psi$', r'^H_T_prime$'}
-                elif class_species_present == 'lapse':
-                    # For the special "lapse" species, what we need is
-                    # the conformal time derivative of H_T
-                    # in 𝘕-body gauge.
-                    self.needed_keys['perturbations'] |= {r'^H_T_prime$'}
-                else:
-                    self.needed_keys['perturbations'] |= {
-                        # Density
-                        rf'^delta_{class_species_present}$',
-                        # Velocity
-                        rf'^theta_{class_species_present}$',
-                        # # Pressure
-                        rf'^cs2_{class_species_present}$',
-                        # Shear stress
-                        rf'^shear_{class_species_present}$',
-                    }
-                    # For decaying cold dark matter we perform a
-                    # transformation of θ, for which the conformal time
-                    # derivative of H_T in 𝘕-body gauge is required.
-                    if class_species_present == 'dcdm':
-                        self.needed_keys['perturbations'] |= {r'^H_T_prime$'}
+            class_species_present_list = self.add_needed_perturbation_keys()
             if not self.load('perturbations'):
-                # Get perturbations from CLASS
-                self._perturbations = self.cosmo.get_perturbations()
-                # The perturbation data is distributed on
-                # the node masters. Let these operate on the data.
-                Barrier()
-                if node_master:
-                    # Only scalar perturbations are used
-                    self._perturbations = self._perturbations['scalar']
-                    # Only keep the needed perturbations given in the
-                    # self.needed_keys['perturbations'] set, as well as
-                    # any additional perturbations defined in the user
-                    # parameter class_extra_perturbations. These extra
-                    # perturbations are not used directly, but will be
-                    # dumped along with the rest to the disk. Only the
-                    # node master processes will ever store these
-                    # extra perturbations. A copy of the data is used,
-                    # making freeing of the original
-                    # CLASS data possible.
-                    self._perturbations = [
-                        {
-                            key: arr.copy()
-                            for key, arr in perturbation.items()
-                            if any([key == pattern or re.search(pattern, key) for pattern in (
-                                self.needed_keys['perturbations'] | class_extra_perturbations_class
-                            )])
-                         }
-                         for perturbation in self._perturbations
-                    ]
-                    if master:
-                        gather_into_master = len(self.k_magnitudes) > len(self.k_node_indices)
-                        for rank_send in node_master_ranks:
-                            if rank_send == rank:
-                                continue
-                            send(gather_into_master, dest=rank_send)
-                    else:
-                        gather_into_master = recv(source=master_rank)
-                    if gather_into_master:
-                        # The master process needs to know which
-                        # process store which k modes.
-                        if master:
-                            k_processes_indices = empty(len(self.k_magnitudes),
-                                dtype=C2np['Py_ssize_t'])
-                            k_processes_indices[self.k_node_indices] = rank
-                            for rank_recv in node_master_ranks:
-                                if rank_recv == rank:
-                                    continue
-                                k_processes_indices[recv(source=rank_recv)] = rank_recv
-                        else:
-                            send(asarray(self.k_node_indices), dest=master_rank)
-                        # Grab perturbation keys
-                        keys = sorted(list(self._perturbations[0].keys()))
-                        # If no k modes at all were delegated a given
-                        # node, a fake k mode will be present. Having at
-                        # least one k mode on all nodes simplifies the
-                        # above logic, but now it is time to get rid of
-                        # this additional k mode.
-                        if len(self.k_node_indices) == 0:
-                            for perturbation in self._perturbations:
-                                for key in keys:
-                                    perturbation[key].resize(0, refcheck=False)
-                                    perturbation.pop(key)
-                            self._perturbations = []
-                        # Gather all perturbations into the
-                        # master process. Communicate these as list
-                        # of dicts mapping str's to arrays.
+                # Look up perturbations in the pool,
+                # leaving only the remaining k modes for CLASS.
+                if self.k_indices_compute is None:
+                    self.load_pooled()
+                self._perturbations = []
+                if self.k_indices_compute.shape[0] > 0:
+                    # Get perturbations from CLASS
+                    self._perturbations = self.cosmo.get_perturbations()
+                    # The perturbation data is distributed on
+                    # the node masters. Let these operate on the data.
+                    Barrier()
+                    if node_master:
+                        # Only scalar perturbations are used
+                        self._perturbations = self._perturbations['scalar']
+                        # Only keep the needed perturbations given in the
+                        # self.needed_keys['perturbations'] set, as well as
+                        # any additional perturbations defined in the user
+                        # parameter class_extra_perturbations. These extra
+                        # perturbations are not used directly, but will be
+                        # dumped along with the rest to the disk. Only the
+                        # node master processes will ever store these
+                        # extra perturbations. A copy of the data is used,
+                        # making freeing of the original
+                        # CLASS data possible.
+                        self._perturbations = [
+                            {
+                                key: arr.copy()
+                                for key, arr in perturbation.items()
+                                if any([key == pattern or re.search(pattern, key) for pattern in (
+                                    self.needed_keys['perturbations'] | class_extra_perturbations_class
+                                )])
+                             }
+                             for perturbation in self._perturbations
+                        ]
                         if master:
-                            all_perturbations = [{} for k in self.k_magnitudes]
-                            for k, perturbation in zip(self.k_node_indices, self._perturbations):
-                                all_perturbations[k] = perturbation
-                            for rank_recv, perturbation in zip(
-                                k_processes_indices,
-                                all_perturbations,
-                            ):
-                                if rank_recv == rank:
+                            gather_into_master = (
+                                self.k_indices_compute.shape[0] > len(self.k_node_indices)
+                            )
+                            for rank_send in node_master_ranks:
+                                if rank_send == rank:
                                     continue
-                                for key in keys:
-                                    size = recv(source=rank_recv)
-                                    buffer = get_buffer(size, 'perturbation')
-                                    Recv(buffer, source=rank_recv)
-                                    perturbation[key] = asarray(buffer).copy()
-                            # The master process now holds perturbations
-                            # from all nodes in all_perturbations.
-                            self._perturbations = all_perturbations
+                                send(gather_into_master, dest=rank_send)
                         else:
-                            for perturbation in self._perturbations:
-                                for key in keys:
-                                    send(len(perturbation[key]), dest=master_rank)
-                                    Send(perturbation[key], dest=master_rank)
-                                    # Once the data has been
-                                    # communicated, delete it from the
-                                    # slave (node master) process.
-                                    perturbation[key].resize(0, refcheck=False)
-                                    perturbation.pop(key)
+                            gather_into_master = recv(source=master_rank)
+                        if gather_into_master:
+                            # The master process needs to know which
+                            # process store which k modes.
+                            if master:
+                                k_processes_indices = empty(self.k_indices_compute.shape[0],
+                                    dtype=C2np['Py_ssize_t'])
+                                k_processes_indices[self.k_node_indices] = rank
+                                for rank_recv in node_master_ranks:
+                                    if rank_recv == rank:
+                                        continue
+                                    k_processes_indices[recv(source=rank_recv)] = rank_recv
+                            else:
+                                send(asarray(self.k_node_indices), dest=master_rank)
+                            # Grab perturbation keys
+                            keys = sorted(list(self._perturbations[0].keys()))
+                            # If no k modes at all were delegated a given
+                            # node, a fake k mode will be present. Having at
+                            # least one k mode on all nodes simplifies the
+                            # above logic, but now it is time to get rid of
+                            # this additional k mode.
+                            if len(self.k_node_indices) == 0:
+                                for perturbation in self._perturbations:
+                                    for key in keys:
+                                        perturbation[key].resize(0, refcheck=False)
+                                        perturbation.pop(key)
+                                self._perturbations = []
+                            # Gather all perturbations into the
+                            # master process. Communicate these as list
+                            # of dicts mapping str's to arrays.
+                            if master:
+                                all_perturbations = [{} for k in self.k_indices_compute]
+                                for k, perturbation in zip(self.k_node_indices, self._perturbations):
+                                    all_perturbations[k] = perturbation
+                                for rank_recv, perturbation in zip(
+                                    k_processes_indices,
+                                    all_perturbations,
+                                ):
+                                    if rank_recv == rank:
+                                        continue
+                                    for key in keys:
+                                        size = recv(source=rank_recv)
+                                        buffer = get_buffer(size, 'perturbation')
+                                        Recv(buffer, source=rank_recv)
+                                        perturbation[key] = asarray(buffer).copy()
+                                # The master process now holds perturbations
+                                # from all nodes in all_perturbations.
+                                self._perturbations = all_perturbations
+                            else:
+                                for perturbation in self._perturbations:
+                                    for key in keys:
+                                        send(len(perturbation[key]), dest=master_rank)
+                                        Send(perturbation[key], dest=master_rank)
+                                        # Once the data has been
+                                        # communicated, delete it from the
+                                        # slave (node master) process.
+                                        perturbation[key].resize(0, refcheck=False)
+                                        perturbation.pop(key)
+                # Add the perturbations newly computed by CLASS to the
+                # pool, then merge in the perturbations reused from
+                # the pool. Only perturbation keys common to all k modes
+                # are kept.
+                if master:
+                    if self._perturbations:
+                        self.save_pooled(self._perturbations)
+                    if self.perturbations_pooled:
+                        perturbations_computed = iter(self._perturbations)
+                        self._perturbations = [
+                            (
+                                self.perturbations_pooled.pop(k)
+                                if k in self.perturbations_pooled
+                                else next(perturbations_computed)
+                            )
+                            for k in range(len(self.params['k_output_values'].split(',')))
+                        ]
+                        keys = set.intersection(*[
+                            set(perturbation.keys()) for perturbation in self._perturbations
+                        ])
+                        for perturbation in self._perturbations:
+                            for key in set(perturbation.keys()) - keys:
+                                perturbation.pop(key)
                 # The master process now holds all perturbations
                 # while the other node masters do not store any.
                 # Throw a warning if perturbations specified in
@@ -601,7 +684,8 @@ class CosmoResults:
                 # the C-space memory and delete any extra CLASS
                 # perturbations (which have now been saved to disk).
                 self.load_everything('perturbations')
-                self.cosmo.struct_cleanup()
+                if self._cosmo is not None:
+                    self._cosmo.struct_cleanup()
                 # Now remove the extra CLASS perturbations not used by
                 # this simulation. If we are running the class utility
                 # and not a simulation, keep the
@@ -619,164 +703,110 @@ class CosmoResults:
                         for perturbation in self._perturbations:
                             perturbation[key].resize(0, refcheck=False)
                             perturbation.pop(key)
-            # As we only need perturbations defined within the
-            # simulation timespan, a >= a_begin, we now cut off the
-            # lower tail of all perturbations.
-            if master:
-                def find_a_min(universals_a_begin, do_warn=True):
-                    for perturbation in self._perturbations:
-                        a_values = perturbation['a']
-                        # Find the index in a_values which corresponds to
-                        # universals.a_begin, using a binary search.
-                        index_lower = 0
-                        index_upper = a_values.shape[0] - 1
-                        a_lower = a_values[index_lower]
-                        a_upper = a_values[index_upper]
-                        if a_lower > universals_a_begin:
-                            msg = (
-                                f'Not all perturbations are defined at '
-                                f'a_begin = {universals_a_begin}.'
-                            )
-                            if class_a_min > 0 and universals_a_begin < class_a_min:
-                                msg += (
-                                    f' Note that CLASS perturbations earlier than '
-                                    f'a_min = {class_a_min} in source/perturbations.c '
-                                    f'will not be used. If you really want perturbations '
-                                    f'at still earlier times, decrease this a_min '
-                                    f'and recompile CLASS.'
-                                )
-                            elif universals_a_begin < universals.a_begin:
-                                msg += (
-                                    ' It may help to decrease the CLASS parameter '
-                                    '"perturb_integration_stepsize" and/or '
-                                    '"perturb_sampling_stepsize".'
-                                )
-                            abort(msg)
-                        index, a_value = 0, -1
-                        while index_upper - index_lower > 1 and a_value != universals_a_begin:
-                            index = (index_lower + index_upper)//2
-                            a_value = a_values[index]
-                            if a_value > universals_a_begin:
-                                index_upper = index
-                            elif a_value < universals_a_begin:
-                                index_lower = index
-                        # Include times slightly earlier
-                        # than absolutely needed.
-                        index -= 3
-                        if index < 0:
-                            if do_warn:
-                                warn(
-                                    'Some perturbations are not tabulated by CLASS '
-                                    'at times early enough to be satisfactory. '
-                                    'It may help to decrease the CLASS parameter '
-                                    '"perturb_integration_stepsize" and/or '
-                                    '"perturb_sampling_stepsize".'
-                                )
-                            index = 0
-                        yield index, a_values[index], perturbation
-                # Find the minimum scale factor value
-                # needed across all k modes.
-                universals_a_begin_min = universals.a_begin
-                for index, universals_a_begin, perturbation in find_a_min(
-                    universals_a_begin_min,
-                    do_warn=True,
-                ):
-                    if universals_a_begin < universals_a_begin_min:
-                        universals_a_begin_min = universals_a_begin
-                # Remove perturbations earlier than
-                # universals_a_begin_min. We have to copy the data,
-                # as otherwise the array will not be owning the data,
-                # meaning that it cannot be freed by Python's
-                # garbage collection.
-                for index, universals_a_begin, perturbation in find_a_min(
-                    universals_a_begin_min,
-                    do_warn=False,
-                ):
-                    for key, val in perturbation.items():
-                        perturbation[key] = asarray(val[index:]).copy()
-            # The perturbations stored by the master process will now be
-            # distributed among all processes, each storing part of the
-            # total data. We could also give every process a copy of the
-            # entire data set, but as it can take up several GB, this
-            # can be a waste of memory. First the master process divides
-            # the k modes fairly among the processes, so that the memory
-            # burden is shared amongst all processes (and hence nodes).
-            n_modes = bcast(len(self._perturbations) if master else None)
-            if n_modes == self.k_magnitudes.size:
-                keys = bcast(tuple(self._perturbations[0].keys()) if master else None)
-                # Let the master divvy up the perturbations
+            # Perturbations loaded from the CLASS dump file are mapped
+            # in by each process for its own k modes only, while newly
+            # computed perturbations are held by the master process.
+            if bcast(self._perturbations is None if master else None):
+                self.map_perturbations()
+            else:
+                # As we only need perturbations defined within the
+                # simulation timespan, a >= a_begin, we now cut off the
+                # lower tail of all perturbations.
                 if master:
-                    sizes = [np.sum([val.size for val in perturbation.values()])
-                        for perturbation in self._perturbations]
-                    indices = arange(n_modes, dtype=C2np['Py_ssize_t'])[np.argsort(sizes)]
-                    n_surplus = n_modes % nprocs
-                    indices_procs_deque = collections.deque(indices[n_surplus:])
-                    indices_procs = [[] for _ in range(nprocs)]
-                    while indices_procs_deque:
-                        for method in ('pop', 'popleft'):
-                            for indices_proc in indices_procs:
-                                if indices_procs_deque:
-                                    indices_proc.append(getattr(indices_procs_deque, method)())
-                    for index, indices_proc in zip(indices[:n_surplus], reversed(indices_procs)):
-                        indices_proc.append(index)
-                    indices_procs = [asarray(sorted(indices), dtype=C2np['Py_ssize_t'])
-                        for indices in indices_procs]
-                    for rank_other, indices in enumerate(indices_procs):
-                        if rank_other == rank:
-                            continue
-                        # Send the global perturbation indices
-                        send(indices.size, dest=rank_other)
-                        Send(indices, dest=rank_other)
-                        # Send the perturbation data
-                        for index in indices:
-                            perturbation = self._perturbations[index]
+                    # Find the minimum scale factor value
+                    # needed across all k modes.
+                    universals_a_begin_min = universals.a_begin
+                    for index, universals_a_begin, perturbation in self.find_a_min(
+                        self._perturbations,
+                        universals_a_begin_min,
+                        do_warn=True,
+                    ):
+                        if universals_a_begin < universals_a_begin_min:
+                            universals_a_begin_min = universals_a_begin
+                    # Remove perturbations earlier than
+                    # universals_a_begin_min. We have to copy the data,
+                    # as otherwise the array will not be owning the data,
+                    # meaning that it cannot be freed by Python's
+                    # garbage collection.
+                    for index, universals_a_begin, perturbation in self.find_a_min(
+                        self._perturbations,
+                        universals_a_begin_min,
+                        do_warn=False,
+                    ):
+                        for key, val in perturbation.items():
+                            perturbation[key] = asarray(val[index:]).copy()
+                # The perturbations stored by the master process will now be
+                # distributed among all processes, each storing part of the
+                # total data. We could also give every process a copy of the
+                # entire data set, but as it can take up several GB, this
+                # can be a waste of memory. First the master process divides
+                # the k modes fairly among the processes, so that the memory
+                # burden is shared amongst all processes (and hence nodes).
+                n_modes = bcast(len(self._perturbations) if master else None)
+                if n_modes == self.k_magnitudes.size:
+                    keys = bcast(tuple(self._perturbations[0].keys()) if master else None)
+                    # Let the master divvy up the perturbations
+                    if master:
+                        indices_procs = self.distribute_k_modes([
+                            np.sum([val.size for val in perturbation.values()])
+                            for perturbation in self._perturbations
+                        ])
+                        for rank_other, indices in enumerate(indices_procs):
+                            if rank_other == rank:
+                                continue
+                            # Send the global perturbation indices
+                            send(indices.size, dest=rank_other)
+                            Send(indices, dest=rank_other)
+                            # Send the perturbation data
+                            for index in indices:
+                                perturbation = self._perturbations[index]
+                                for key in keys:
+                                    send(perturbation[key].size, dest=rank_other)
+                                    Send(perturbation[key], dest=rank_other)
+                                    # Once the data has been communicated,
+                                    # delete it from the master process.
+                                    perturbation[key].resize(0, refcheck=False)
+                                    perturbation.pop(key)
+                        self.k_indices = indices_procs[rank]
+                        self._perturbations = [self._perturbations[index]
+                            for index in self.k_indices]
+                    else:
+                        # Receive the global perturbation indices
+                        self.k_indices = empty(recv(source=master_rank), dtype=C2np['Py_ssize_t'])
+                        Recv(self.k_indices, source=master_rank)
+                        # Receive the perturbation data
+                        self._perturbations = [{} for _ in range(self.k_indices.size)]
+                        for perturbation in self._perturbations:
                             for key in keys:
-                                send(perturbation[key].size, dest=rank_other)
-                                Send(perturbation[key], dest=rank_other)
-                                # Once the data has been communicated,
-                                # delete it from the master process.
-                                perturbation[key].resize(0, refcheck=False)
-                                perturbation.pop(key)
-                    self.k_indices = indices_procs[rank]
-                    self._perturbations = [self._perturbations[index]
-                        for index in self.k_indices]
-                else:
-                    # Receive the global perturbation indices
-                    self.k_indices = empty(recv(source=master_rank), dtype=C2np['Py_ssize_t'])
-                    Recv(self.k_indices, source=master_rank)
-                    # Receive the perturbation data
-                    self._perturbations = [{} for _ in range(self.k_indices.size)]
-                    for perturbation in self._perturbations:
-                        for key in keys:
-                            perturbation[key] = empty(
-                                recv(source=master_rank),
-                                dtype=C2np['double'],
-                            )
-                            Recv(perturbation[key], source=master_rank)
-                Barrier()
-                # All processes should be aware of the k indices of all
-                # other processes. We have this as the list of arrays
-                # indices_procs on the master process, but we now store
-                # it as a single array. This array will give the
-                # ordering of the k modes after a call to allgatherv
-                # on the perturbation data.
-                if master:
-                    self.k_indices_all = np.argsort(np.concatenate(indices_procs))
+                                perturbation[key] = empty(
+                                    recv(source=master_rank),
+                                    dtype=C2np['double'],
+                                )
+                                Recv(perturbation[key], source=master_rank)
+                    Barrier()
+                    # All processes should be aware of the k indices of all
+                    # other processes. We have this as the list of arrays
+                    # indices_procs on the master process, but we now store
+                    # it as a single array. This array will give the
+                    # ordering of the k modes after a call to allgatherv
+                    # on the perturbation data.
+                    if master:
+                        self.k_indices_all = np.argsort(np.concatenate(indices_procs))
+                    else:
+                        self.k_indices_all = empty(
+                            self.k_magnitudes.shape[0],
+                            dtype=C2np['Py_ssize_t'],
+                        )
+                    Bcast(self.k_indices_all)
+                elif n_modes == 0:
+                    # No perturbations exist
+                    self._perturbations = []
                 else:
-                    self.k_indices_all = empty(
-                        self.k_magnitudes.shape[0],
-                        dtype=C2np['Py_ssize_t'],
+                    # A wrong number of perturbations exist
+                    abort(
+                        f'Only {n_modes} of the expected {self.k_magnitudes.size} '
+                        'perturbation k modes exist.'
                     )
-                Bcast(self.k_indices_all)
-            elif n_modes == 0:
-                # No perturbations exist
-                self._perturbations = []
-            else:
-                # A wrong number of perturbations exist
-                abort(
-                    f'Only {n_modes} of the expected {self.k_magnitudes.size} '
-                    'perturbation k modes exist.'
-                )
             # Now the perturbation data is fairly distributed amongst
             # all processes.
             # As perturbations comprise the vast majority of the
@@ -800,6 +830,153 @@ class CosmoResults:
             if 'lapse' in class_species_present_list:
                 self.construct_delta_lapse()
         return self._perturbations
+    # Generator used for finding the index into the tabulated
+    # perturbations corresponding to (just before) the given scale
+    # factor value, for each of the passed perturbations.
+    def find_a_min(self, perturbations, universals_a_begin, do_warn=True):
+        for perturbation in perturbations:
+            a_values = perturbation['a']
+            # Find the index in a_values which corresponds to
+            # universals.a_begin, using a binary search.
+            index_lower = 0
+            index_upper = a_values.shape[0] - 1
+            a_lower = a_values[index_lower]
+            a_upper = a_values[index_upper]
+            if a_lower > universals_a_begin:
+                msg = (
+                    f'Not all perturbations are defined at '
+                    f'a_begin = {universals_a_begin}.'
+                )
+                if class_a_min > 0 and universals_a_begin < class_a_min:
+                    msg += (
+                        f' Note that CLASS perturbations earlier than '
+                        f'a_min = {class_a_min} in source/perturbations.c '
+                        f'will not be used. If you really want perturbations '
+                        f'at still earlier times, decrease this a_min '
+                        f'and recompile CLASS.'
+                    )
+                elif universals_a_begin < universals.a_begin:
+                    msg += (
+                        ' It may help to decrease the CLASS parameter '
+                        '"perturb_integration_stepsize" and/or '
+                        '"perturb_sampling_stepsize".'
+                    )
+                abort(msg)
+            index, a_value = 0, -1
+            while index_upper - index_lower > 1 and a_value != universals_a_begin:
+                index = (index_lower + index_upper)//2
+                a_value = a_values[index]
+                if a_value > universals_a_begin:
+                    index_upper = index
+                elif a_value < universals_a_begin:
+                    index_lower = index
+            # Include times slightly earlier
+            # than absolutely needed.
+            index -= 3
+            if index < 0:
+                # Record the insufficient tabulation, allowing for
+                # a collective warning by the caller.
+                self.a_min_insufficient = True
+                if do_warn:
+                    self.warn_a_min()
+                index = 0
+            yield index, a_values[index], perturbation
+    # Method for warning about perturbations not tabulated
+    # sufficiently early. The warning is emitted by the calling process,
+    # unless collective is True, in which case the master process emits
+    # the warning if any process has encountered insufficient
+    # perturbations (as recorded by find_a_min()).
+    def warn_a_min(self, collective=False):
+        warn_func = warn
+        if collective:
+            if not allreduce(self.a_min_insufficient, op=MPI.LOR):
+                return
+            warn_func = masterwarn
+        warn_func(
+            'Some perturbations are not tabulated by CLASS '
+            'at times early enough to be satisfactory. '
+            'It may help to decrease the CLASS parameter '
+            '"perturb_integration_stepsize" and/or '
+            '"perturb_sampling_stepsize".'
+        )
+    # Method for fairly dividing the k modes among the processes,
+    # given the size of the perturbation data at each k mode.
+    def distribute_k_modes(self, sizes):
+        """A list of sorted arrays of k indices is returned,
+        one for each process. The k modes are assigned alternately from
+        the large and the small end of the sizes, so that the memory
+        burden is shared equally amongst all processes.
+        """
+        n_modes = len(sizes)
+        indices = arange(n_modes, dtype=C2np['Py_ssize_t'])[np.argsort(sizes)]
+        n_surplus = n_modes % nprocs
+        indices_procs_deque = collections.deque(indices[n_surplus:])
+        indices_procs = [[] for _ in range(nprocs)]
+        while indices_procs_deque:
+            for method in ('pop', 'popleft'):
+                for indices_proc in indices_procs:
+                    if indices_procs_deque:
+                        indices_proc.append(getattr(indices_procs_deque, method)())
+        for index, indices_proc in zip(indices[:n_surplus], reversed(indices_procs)):
+            indices_proc.append(index)
+        indices_procs = [asarray(sorted(indices), dtype=C2np['Py_ssize_t'])
+            for indices in indices_procs]
+        return indices_procs
+    # Method for mapping in the perturbations of the k modes of this
+    # process from the CLASS dump file.
+    def map_perturbations(self):
+        """Rather than the master process reading in all perturbations
+        and distributing them, each process maps in the perturbations of
+        its own k modes directly from the file. The perturbation arrays
+        are memory-mapped (copy-on-write), meaning that data is only
+        read in from disk once it is actually accessed.
+        """
+        # Let the master divvy up the k modes, based on the sizes
+        # of the stored perturbations.
+        keys = bcast(self.perturbation_keys_mapped if master else None)
+        indices_procs = bcast(
+            self.distribute_k_modes(self.perturbation_sizes_mapped) if master else None
+        )
+        self.k_indices = indices_procs[rank]
+        self.k_indices_all = asarray(
+            np.argsort(np.concatenate(indices_procs)), dtype=C2np['Py_ssize_t'],
+        )
+        # Map in the perturbations of the local k modes
+        self._perturbations = []
+        if self.k_indices.shape[0] > 0:
+            with open_hdf5(self.filename, mode='r', individual=True) as hdf5_file:
+                perturbations_h5 = hdf5_file['perturbations']
+                for k in self.k_indices:
+                    perturbation_h5 = perturbations_h5[str(k)]
+                    self._perturbations.append({
+                        key: map_hdf5_dataset(perturbation_h5[key.replace('/', '__per__')])
+                        for key in keys
+                    })
+        # As we only need perturbations defined within the
+        # simulation timespan, a >= a_begin, we now cut off the
+        # lower tail of all perturbations. The minimum scale factor
+        # value needed across all k modes is found collectively,
+        # as is the need for warning about insufficient perturbations.
+        universals_a_begin_min = universals.a_begin
+        self.a_min_insufficient = False
+        for index, universals_a_begin, perturbation in self.find_a_min(
+            self._perturbations,
+            universals_a_begin_min,
+            do_warn=False,
+        ):
+            if universals_a_begin < universals_a_begin_min:
+                universals_a_begin_min = universals_a_begin
+        self.warn_a_min(collective=True)
+        universals_a_begin_min = allreduce(universals_a_begin_min, op=MPI.MIN)
+        # Remove perturbations earlier than universals_a_begin_min.
+        # As the arrays are mapped, this does not copy any data.
+        for index, universals_a_begin, perturbation in self.find_a_min(
+            self._perturbations,
+            universals_a_begin_min,
+            do_warn=False,
+        ):
+            for key, val in perturbation.items():
+                perturbation[key] = val[index:]
     # Method which makes sure that everything is loaded
     def load_everything(self, already_loaded=None):
         """If some attribute is already loaded, it can be specified
@@ -1201,14 +1378,17 @@ class CosmoResults:
         os.makedirs(os.path.dirname(self.filename), exist_ok=True)
         with open_hdf5(self.filename, mode='a') as hdf5_file:
             # CLASS parameters as attributes on a group.
-            # This should be the first element to be saved.
+            # This should be the first element to be saved, though the
+            # parameters are written regardless if not present, as the
+            # file may have been evicted from the cache by another
+            # process in the meantime.
+            if 'params' not in hdf5_file:
+                params_h5 = hdf5_file.create_group('params')
+                for key, val in self.params.items():
+                    key = key.replace('/', '__per__')
+                    params_h5.attrs[key] = val
+                hdf5_file.flush()
             if element == 'params':
-                if 'params' not in hdf5_file:
-                    params_h5 = hdf5_file.create_group('params')
-                    for key, val in self.params.items():
-                        key = key.replace('/', '__per__')
-                        params_h5.attrs[key] = val
-                    hdf5_file.flush()
                 # Done saving to disk
                 return
             # Start by checking that the params in the file match
@@ -1271,6 +1451,11 @@ class CosmoResults:
             else:
                 abort(f'CosmoResults.save was called with the unknown element of "{element}"')
             hdf5_file.flush()
+        # Keep the size of the CLASS cache in check
+        if element == 'perturbations':
+            evict_reusable(
+                'class', class_cache_size, protected=(self.filename, self.pool_dirname),
+            )
     # Method for loading a piece of raw CLASS data from the dump file
     def load(self, element):
         """This method will attempt to load the element given.
@@ -1284,6 +1469,8 @@ class CosmoResults:
             return bcast()
         if not os.path.isfile(self.filename):
             return bcast(False)
+        if self.id is not None:
+            touch_reusable(self.filename)
         # The master process attempts to load the given element
         # from the file given by self.filename.
         with open_hdf5(self.filename, mode='r') as hdf5_file:
@@ -1355,72 +1542,185 @@ class CosmoResults:
                     n_modes -= 1
                 if n_modes == 0:
                     return bcast(False)
-                masterprint(f'Loading CLASS perturbations from "{self.filename}" ...')
-                self._perturbations = [None]*len(self.k_magnitudes)
+                n_modes_expected = len(self.k_magnitudes)
                 # Check that the file contain perturbations at all
                 # k modes. This is not the case if the process that
                 # originally wrote the file ended prematurely. In this
                 # case, no other error is necessarily detected.
-                if n_modes < len(self._perturbations):
+                if n_modes < n_modes_expected:
                     abort(
                         f'The file "{self.filename}" only contains perturbations for {n_modes} '
                         f'k modes, whereas it should contain perturbations for '
-                        f'{len(self._perturbations)} k modes. This can happen if the creation of '
+                        f'{n_modes_expected} k modes. This can happen if the creation of '
                         f'this file was ended prematurely. You should remove this file and rerun '
                         f'this simulation.'
                     )
-                if n_modes > len(self._perturbations):
+                if n_modes > n_modes_expected:
                     abort(
                         f'The file "{self.filename}" contains perturbations for {n_modes} '
                         f'k modes, whereas it should contain perturbations for '
-                        f'{len(self._perturbations)} k modes. I cannot explain this mismatch, and '
+                        f'{n_modes_expected} k modes. I cannot explain this mismatch, and '
                         f'I cannot use these perturbations.'
                     )
-                # Load the perturbations
+                # Find the needed perturbations present in the file.
+                # The perturbation data itself is not read in here, but
+                # is later mapped in by each process for its own
+                # k modes only. All k modes store the same perturbations,
+                # all tabulated at the same number of times as 'a'.
                 needed_keys = self.needed_keys['perturbations'].copy()
                 if special_params.get('special') == 'class':
                     needed_keys |= class_extra_perturbations_class
-                for key, d in perturbations_h5.items():
-                    if key == 'k_magnitudes':
-                        continue
-                    self._perturbations[int(key)] = {
-                        key.replace('__per__', '/'): dset[...]
-                        for key, dset in d.items()
-                        if any([key.replace('__per__', '/') == pattern
-                            or re.search(pattern, key.replace('__per__', '/'))
-                            for pattern in needed_keys
-                        ])
-                    }
-                masterprint('done')
+                keys = [
+                    key.replace('__per__', '/') for key in perturbations_h5['0'].keys()
+                    if any([key.replace('__per__', '/') == pattern
+                        or re.search(pattern, key.replace('__per__', '/'))
+                        for pattern in needed_keys
+                    ])
+                ]
                 # Check that all needed perturbations were present
-                # in the file. Some of the species specific
-                # perturbations does not exist for all species
-                # (e.g. "cs2" does not exist for photons). Therefore,
-                # species specific perturbations are only considered
-                # missing if "delta" is missing.
-                perturbations_loaded = set(self.perturbations[0].keys())
-                perturbations_missing = {perturbation_missing
-                    for perturbation_missing in needed_keys
-                    if not any([key == perturbation_missing or re.search(perturbation_missing, key)
-                        for key in perturbations_loaded])
-                }
-                for class_species_present in (universals_dict['class_species_present']
-                    .decode().replace('[', r'\[').replace(']', r'\]').split('+')):
-                    perturbations_missing -= {
-                        rf'^theta_{class_species_present}$',
-                        rf'^cs2_{class_species_present}$',
-                        rf'^shear_{class_species_present}$',
-                    }
+                # in the file.
+                perturbations_missing = self.get_perturbations_missing(keys, needed_keys)
                 if perturbations_missing:
                     masterprint(
                         'Not all needed perturbations were present in the file. '
                         'CLASS will be rerun.'
                     )
                     return bcast(False)
+                masterprint(f'Mapping CLASS perturbations from "{self.filename}" ...')
+                self.perturbation_keys_mapped = keys
+                self.perturbation_sizes_mapped = [
+                    len(keys)*perturbations_h5[f'{k}/a'].shape[0] for k in range(n_modes)
+                ]
+                self._perturbations = None
+                masterprint('done')
             else:
                 abort(f'CosmoResults.load was called with the unknown element of "{element}"')
         # Loading of specified element completed successfully
         return bcast(True)
+    # Method returning the needed perturbations not present
+    # among the given perturbation keys.
+    def get_perturbations_missing(self, keys, needed_keys):
+        """Some of the species specific perturbations does not exist
+        for all species (e.g. "cs2" does not exist for photons).
+        Therefore, species specific perturbations are only considered
+        missing if "delta" is missing.
+        """
+        perturbations_missing = {perturbation_missing
+            for perturbation_missing in needed_keys
+            if not any([key == perturbation_missing or re.search(perturbation_missing, key)
+                for key in keys])
+        }
+        for class_species_present in (universals_dict['class_species_present']
+            .decode().replace('[', r'\[').replace(']', r'\]').split('+')):
+            perturbations_missing -= {
+                rf'^theta_{class_species_present}$',
+                rf'^cs2_{class_species_present}$',
+                rf'^shear_{class_species_present}$',
+            }
+        return perturbations_missing
+    # Method for reusing perturbations from the pool of perturbations
+    # previously computed with the same CLASS parameters,
+    # though possibly at different k modes.
+    def load_pooled(self):
+        """Each file within the pool directory stores perturbations
+        for a given set of k modes, together with the k modes themselves
+        (in the exact str representation passed to CLASS). Any of the
+        k modes of this CosmoResults object present in some file within
+        the pool will be loaded in by the master process and stored in
+        the self.perturbations_pooled dict. The indices of the k modes
+        not found in the pool (and which thus have to be computed by
+        CLASS) are stored in self.k_indices_compute on all processes.
+        """
+        k_output_values = self.params['k_output_values'].split(',')
+        self.perturbations_pooled = {}
+        if master and class_reuse and self.pool_dirname and os.path.isdir(self.pool_dirname):
+            self.add_needed_perturbation_keys()
+            needed_keys = self.needed_keys['perturbations'] | class_extra_perturbations_class
+            k_indices = {k_output_value: k for k, k_output_value in enumerate(k_output_values)}
+            for filename in sorted(glob(f'{self.pool_dirname}/*.hdf5')):
+                if len(self.perturbations_pooled) == len(k_output_values):
+                    break
+                used = False
+                try:
+                    hdf5_file = open_hdf5(filename, mode='r', raise_exception=True)
+                except OSError:
+                    # The file has been evicted by another process
+                    continue
+                with hdf5_file:
+                    k_output_values_pooled = [
+                        k_output_value.decode()
+                        for k_output_value in hdf5_file['k_output_values'][...]
+                    ]
+                    # Only use files with all needed perturbations
+                    if self.get_perturbations_missing(
+                        [key.replace('__per__', '/') for key in hdf5_file['0'].keys()],
+                        self.needed_keys['perturbations'],
+                    ):
+                        continue
+                    for index, k_output_value in enumerate(k_output_values_pooled):
+                        k = k_indices.get(k_output_value)
+                        if k is None or k in self.perturbations_pooled:
+                            continue
+                        self.perturbations_pooled[k] = {
+                            key.replace('__per__', '/'): dset[...]
+                            for key, dset in hdf5_file[str(index)].items()
+                            if any([key.replace('__per__', '/') == pattern
+                                or re.search(pattern, key.replace('__per__', '/'))
+                                for pattern in needed_keys
+                            ])
+                        }
+                        used = True
+                # Mark the file as recently used
+                if used:
+                    touch_reusable(filename)
+            if self.perturbations_pooled:
+                masterprint(
+                    f'Reusing CLASS perturbations at {len(self.perturbations_pooled)} '
+                    f'of {len(k_output_values)} k modes from "{self.pool_dirname}"'
+                )
+        k_indices_pooled = bcast(set(self.perturbations_pooled.keys()) if master else None)
+        self.k_indices_compute = asarray(
+            [k for k in range(len(k_output_values)) if k not in k_indices_pooled],
+            dtype=C2np['Py_ssize_t'],
+        )
+    # Method for adding the perturbations at the k modes given by
+    # self.k_indices_compute to the pool.
+    def save_pooled(self, perturbations):
+        """The perturbations are written to a temporary file which is
+        then atomically renamed into the pool, so that other running
+        instances of CO𝘕CEPT never see partially written files. The file
+        name is a hash of the k modes, and so concurrent writing of the
+        same perturbations simply results in one of the (identical)
+        files replacing the other.
+        """
+        if self.pool_dirname is None or not master:
+            return
+        k_output_values = self.params['k_output_values'].split(',')
+        k_output_values_pooled = [k_output_values[k] for k in self.k_indices_compute]
+        filename = get_reusable_filename(
+            f'class/{os.path.basename(self.pool_dirname)}',
+            k_output_values_pooled,
+            extension='hdf5',
+        )
+        if os.path.isfile(filename):
+            return
+        os.makedirs(self.pool_dirname, exist_ok=True)
+        filename_tmp = f'{filename}.tmp_{node_name}_{os.getpid()}'
+        with open_hdf5(filename_tmp, mode='w') as hdf5_file:
+            hdf5_file.create_dataset(
+                'k_output_values',
+                data=asarray([k_output_value.encode() for k_output_value in k_output_values_pooled]),
+            )
+            for index, perturbation in enumerate(perturbations):
+                perturbation_h5 = hdf5_file.create_group(str(index))
+                for key, val in perturbation.items():
+                    dset = perturbation_h5.create_dataset(
+                        key.replace('/', '__per__'),
+                        (val.shape[0], ),
+                        dtype=C2np['double'],
+                    )
+                    dset[:] = val
+        os.replace(filename_tmp, filename)
 
 # Class for processing and storing transfer functions of k and a.
 # The processing consists purely of data cleanup and interpolations.
@@ -1459,6 +1759,13 @@ class TransferFunction:
         object splines  # np.ndarray of dtype object
         list a_values
         list interval_boarders
+        Py_ssize_t[::1] interval_offsets
+        double[::1] interval_boarders_all
+        Py_ssize_t[:, ::1] spline_offsets
+        Py_ssize_t[:, ::1] spline_sizes
+        Py_ssize_t[::1] spline_cursors
+        double[::1] spline_x
+        double[:, ::1] spline_coefficients
         """
         # Ensure that the cosmological perturbations has been loaded
         cosmoresults.perturbations
@@ -2063,6 +2370,8 @@ class TransferFunction:
                         Send(spline.x, dest=master_rank)
                         Send(spline.y, dest=master_rank)
             masterprint('done')
+        # Pack the splines into contiguous arrays for fast evaluation
+        self.pack_splines()
         # All perturbations have been processed
         Barrier()
         masterprint('done')
@@ -2167,6 +2476,77 @@ class TransferFunction:
     def power_law(x, factor, exponent):
         return factor*x**exponent
 
+    # Method for packing the splines of all local k modes into
+    # contiguous arrays of knots and polynomial coefficients, together
+    # with the interval boarders of all local k modes. Evaluation of the
+    # transfer functions then requires no Python objects.
+    @cython.header(
+        # Locals
+        coefficients='double[:, ::1]',
+        i='Py_ssize_t',
+        interval_boarders='double[::1]',
+        k_local='Py_ssize_t',
+        offset='Py_ssize_t',
+        size='Py_ssize_t',
+        spline='Spline',
+        x='double[::1]',
+    )
+    def pack_splines(self):
+        # Interval boarders
+        self.interval_offsets = zeros(self.k_gridsize_local + 1, dtype=C2np['Py_ssize_t'])
+        for k_local in range(self.k_gridsize_local):
+            interval_boarders = self.interval_boarders[k_local]
+            self.interval_offsets[k_local + 1] = (
+                self.interval_offsets[k_local] + interval_boarders.shape[0]
+            )
+        self.interval_boarders_all = empty(
+            self.interval_offsets[self.k_gridsize_local], dtype=C2np['double'],
+        )
+        for k_local in range(self.k_gridsize_local):
+            interval_boarders = self.interval_boarders[k_local]
+            offset = self.interval_offsets[k_local]
+            self.interval_boarders_all[offset:offset + interval_boarders.shape[0]] = (
+                interval_boarders
+            )
+        # Spline knots and coefficients. Each spline with n knots
+        # occupies n rows of the coefficient array, the last of which
+        # is unused.
+        self.spline_offsets = -ones(
+            (self.k_gridsize_local, self.n_intervals), dtype=C2np['Py_ssize_t'],
+        )
+        self.spline_sizes = zeros(
+            (self.k_gridsize_local, self.n_intervals), dtype=C2np['Py_ssize_t'],
+        )
+        offset = 0
+        for k_local in range(self.k_gridsize_local):
+            for i in range(self.n_intervals):
+                spline = self.splines[k_local, i]
+                if spline is None:
+                    continue
+                if not spline.logx:
+                    abort(
+                        f'Spline "{spline.name}" is not logarithmic in the scale factor, '
+                        f'which is required for packing'
+                    )
+                self.spline_offsets[k_local, i] = offset
+                self.spline_sizes[k_local, i] = spline.x.shape[0]
+                offset += spline.x.shape[0]
+        self.spline_x = empty(offset, dtype=C2np['double'])
+        self.spline_coefficients = zeros((offset, 4), dtype=C2np['double'])
+        for k_local in range(self.k_gridsize_local):
+            for i in range(self.n_intervals):
+                spline = self.splines[k_local, i]
+                if spline is None:
+                    continue
+                x, coefficients = spline.get_coefficients()
+                offset = self.spline_offsets[k_local, i]
+                size = self.spline_sizes[k_local, i]
+                self.spline_x[offset:offset + size] = x
+                self.spline_coefficients[offset:offset + size - 1, :] = coefficients
+        # The index of the most recently used polynomial
+        # for each k mode, used for accelerated lookup.
+        self.spline_cursors = zeros(self.k_gridsize_local, dtype=C2np['Py_ssize_t'])
+
     # Method which finds out which scale factor interval a given scale
     # factor value lies within, given the local perturbation index.
     @cython.header(
@@ -2174,37 +2554,83 @@ class TransferFunction:
         k_local='Py_ssize_t',
         a='double',
         # Locals
-        a_max='double',
         index='Py_ssize_t',
         index_lower='Py_ssize_t',
         index_upper='Py_ssize_t',
-        interval_boarders='double[::1]',
-        state_changed='bint',
+        offset='Py_ssize_t',
         returns='Py_ssize_t',
     )
     def get_interval(self, k_local, a):
-        # Get all intervals for this perturbation
-        interval_boarders = self.interval_boarders[k_local]
-        # Find specific interval using binary search
-        a_max = interval_boarders[interval_boarders.shape[0] - 1]
-        if a >= a_max:
-            index = interval_boarders.shape[0] - 2
-        else:
-            index_lower = 0
-            index_upper = interval_boarders.shape[0] - 2
-            state_changed = True
-            while state_changed:
-                state_changed = False
-                index = (index_lower + index_upper)//2
-                if index != index_lower and interval_boarders[index] <= a:
-                    index_lower = index
-                    state_changed = True
-                if index != index_upper and a < interval_boarders[index + 1]:
-                    index_upper = index
-                    state_changed = True
-            if index_upper == index_lower + 1:
-                index = index_upper
-        return index
+        # Find specific interval among all intervals for this
+        # perturbation using binary search.
+        offset = self.interval_offsets[k_local]
+        index_upper = self.interval_offsets[k_local + 1] - 1 - offset
+        if a >= self.interval_boarders_all[offset + index_upper]:
+            return index_upper - 1
+        index_lower = 0
+        while index_upper - index_lower > 1:
+            index = (index_lower + index_upper)//2
+            if self.interval_boarders_all[offset + index] <= a:
+                index_lower = index
+            else:
+                index_upper = index
+        return index_lower
+
+    # Method which finds the row within self.spline_coefficients of the
+    # polynomial to use for the k'th transfer function within the i'th
+    # interval, at x = log(a).
+    @cython.header(
+        # Arguments
+        k_local='Py_ssize_t',
+        i='Py_ssize_t',
+        x='double',
+        # Locals
+        abs_tol='double',
+        index='Py_ssize_t',
+        index_lower='Py_ssize_t',
+        index_upper='Py_ssize_t',
+        offset='Py_ssize_t',
+        size='Py_ssize_t',
+        x_max='double',
+        x_min='double',
+        returns='Py_ssize_t',
+    )
+    def get_row(self, k_local, i, x):
+        offset = self.spline_offsets[k_local, i]
+        size = self.spline_sizes[k_local, i]
+        index_lower = offset
+        index_upper = offset + size - 1
+        # Check that x is within the interpolation interval,
+        # allowing for the same slack as the Spline class.
+        x_min = self.spline_x[index_lower]
+        x_max = self.spline_x[index_upper]
+        if x < x_min or x > x_max:
+            abs_tol = 1e-9*(x_max - x_min) + machine_ϵ
+            if not (
+                    x > x_min - (abs_tol + 0.5*(self.spline_x[index_lower + 1] - x_min))
+                and x < x_max + (abs_tol + 0.5*(x_max - self.spline_x[index_upper - 1]))
+            ):
+                abort(
+                    f'Could not interpolate {self.var_name} transfer function of '
+                    f'{self.class_species} to log(a) = {x} because it is outside '
+                    f'the tabulated interval [{x_min}, {x_max}]'
+                )
+        # Check whether the last used polynomial applies.
+        # If not, locate the polynomial using binary search.
+        index = self.spline_cursors[k_local]
+        if (
+                index >= index_lower and index < index_upper
+            and self.spline_x[index] <= x and x <= self.spline_x[index + 1]
+        ):
+            return index
+        while index_upper - index_lower > 1:
+            index = (index_lower + index_upper)//2
+            if self.spline_x[index] <= x:
+                index_lower = index
+            else:
+                index_upper = index
+        self.spline_cursors[k_local] = index_lower
+        return index_lower
 
     # Method for evaluating the k'th transfer function
     # at a given scale factor.
@@ -2213,20 +2639,29 @@ class TransferFunction:
         k_local='Py_ssize_t',
         a='double',
         # Locals
-        exponent='double',
-        factor='double',
         i='Py_ssize_t',
-        spline='Spline',
+        row='Py_ssize_t',
+        x='double',
+        Δx='double',
         returns='double',
     )
     def eval(self, k_local, a):
         i = self.get_interval(k_local, a)
-        factor   = self.factors  [k_local, i]
-        exponent = self.exponents[k_local, i]
-        spline   = self.splines  [k_local, i]
+        x = log(a)
+        row = self.get_row(k_local, i, x)
+        Δx = x - self.spline_x[row]
         # The spline is over transfer(a) - trend(a)
         # with trend(a) = factor*a**exponent.
-        return spline.eval(a) + factor*a**exponent
+        return (
+            self.spline_coefficients[row, 0] + Δx*(
+                self.spline_coefficients[row, 1] + Δx*(
+                    self.spline_coefficients[row, 2] + Δx*(
+                        self.spline_coefficients[row, 3]
+                    )
+                )
+            )
+            + self.factors[k_local, i]*a**self.exponents[k_local, i]
+        )
 
     # Main method for getting the transfer function as function of k
     # at a specific value of the scale factor.
@@ -2236,25 +2671,20 @@ class TransferFunction:
         a_next='double',
         weight=str,
         # Locals
-        a_i='double',
+        a_j='double',
         a_values='double[::1]',
-        a_values_list=list,
         fac_density='int',
-        i='Py_ssize_t',
-        index_min='Py_ssize_t',
         index_max='Py_ssize_t',
+        index_min='Py_ssize_t',
+        j='Py_ssize_t',
         k_local='Py_ssize_t',
-        n_side_points='int',
-        size='Py_ssize_t',
-        spline='Spline',
+        n_points='Py_ssize_t',
         t='double',
         t_next='double',
-        t_values='double[::1]',
-        w_eff_i='double',
-        weighted_transfer='double[::1]',
-        weighted_transfer_arr=object,  # np.ndarray
-        weights='double[::1]',
-        weights_arr=object,  # np.ndarray
+        w_eff_j='double',
+        weight_j='double',
+        Δt='double',
+        Σweights='double',
         returns='double[::1]',
     )
     def as_function_of_k(self, a, a_next=-1, weight=None):
@@ -2283,77 +2713,58 @@ class TransferFunction:
                     f'as_function_of_k() was called with a_next = {a_next}, weight = "{weight}". '
                     f'When using a weight you must also specify a_next.'
                 )
-            # Number of additional tabulated points to include on both
-            # sides of the interval [a, a_next]. Should not exceed
-            # "crossover" set in TransferFunction.process.
-            n_side_points = 1
-            # Number of points in the averaging integrands between each
+            # Number of points in the averaging integrals between each
             # pair of points in the tabulated transfer functions.
             fac_density = 10
-            # Grab buffers for the integrands
-            weights_arr           = self.as_function_of_k_buffers['weights']
-            weighted_transfer_arr = self.as_function_of_k_buffers['weighted_transfer']
-            weights, weighted_transfer = weights_arr, weighted_transfer_arr
             # The averaging integrals are over cosmic time,
-            # not scale factor.
-            t, t_next = cosmic_time(a), cosmic_time(a_next)
-            # For each k, compute and store the averaged transfer
-            # function over the time step, and also the averaged
-            # weight by itself.
+            # not scale factor. We use Simpson's rule on a grid
+            # equidistant in cosmic time, shared between all k modes.
+            # The number of points is set by the k mode with
+            # the densest tabulation within [a, a_next].
+            n_points = 2*fac_density
             for k_local in range(self.k_gridsize_local):
-                # Get array of a values between a and a_next at which
-                # the k'th transfer function is tabulated.
                 a_values = self.a_values[k_local]
                 index_min = np.searchsorted(a_values, a, 'right')
                 index_max = np.searchsorted(a_values, a_next, 'left')
-                index_min -= n_side_points + 1
-                index_max += n_side_points
-                if index_min < 0:
-                    index_min = 0
-                if index_max > a_values.shape[0] - 1:
-                    index_max = a_values.shape[0] - 1
-                a_values = linspace(
-                    a_values[index_min], a_values[index_max], (index_max - index_min)*fac_density,
-                )
-                size = a_values.shape[0]
-                # Compute weighted transfer function values
-                # at the tabulated times.
-                if size > weighted_transfer.shape[0]:
-                    weights_arr          .resize(size, refcheck=False)
-                    weighted_transfer_arr.resize(size, refcheck=False)
-                    weights, weighted_transfer = weights_arr, weighted_transfer_arr
-                for i in range(size):
-                    a_i = a_values[i]
-                    with unswitch:
-                        if weight == '1':
-                            weights[i] = 1.0
-                        elif weight == 'a**(-3*w_eff-1)':
-                            w_eff_i = self.component.w_eff(a=a_i)
-                            weights[i] = a_i**(-3*w_eff_i - 1)
-                        elif weight == 'a**(3*w_eff-2)':
-                            w_eff_i = self.component.w_eff(a=a_i)
-                            weights[i] = a_i**(3*w_eff_i - 2)
-                        elif weight == 'a**(-3*w_eff)':
-                            w_eff_i = self.component.w_eff(a=a_i)
-                            weights[i] = a_i**(-3*w_eff_i)
-                        else:
-                            abort(f'weight "{weight}" not implemented in as_function_of_k()')
-                    weighted_transfer[i] = weights[i]*self.eval(k_local, a_i)
-                    # Replace the i'th scale factor value with the
-                    # corresponding cosmic time.
-                    a_values[i] = cosmic_time(a_i)
-                # All scale factor values have now been replaced
-                # with cosmic times.
-                t_values = a_values
-                # Compute and store the weighted transfer function
-                # 1/(ᔑ weight(t) dt) * ᔑ weight(t)*transfer(t) dt.
-                spline_weights           = Spline(t_values, weights[:size], 'weight(t)')
-                spline_weighted_transfer = Spline(
-                    t_values, weighted_transfer[:size], 'weight(t)*transfer(t)'
-                )
-                self.data_local[k_local] = (spline_weighted_transfer.integrate(t, t_next)
-                    /spline_weights.integrate(t, t_next)
-                )
+                n_points = pairmax(n_points, (index_max - index_min + 1)*fac_density)
+            n_points += 1 - n_points % 2
+            t, t_next = cosmic_time(a), cosmic_time(a_next)
+            Δt = (t_next - t)/(n_points - 1)
+            # Accumulate the weighted transfer function
+            # 1/(ᔑ weight(t) dt) * ᔑ weight(t)*transfer(t) dt
+            # for all k at once. As the weights only depend on time,
+            # these are computed once per point.
+            self.data_local[:] = 0
+            Σweights = 0
+            for j in range(n_points):
+                if j == 0:
+                    a_j = a
+                elif j == n_points - 1:
+                    a_j = a_next
+                else:
+                    a_j = scale_factor(t + j*Δt)
+                with unswitch:
+                    if weight == '1':
+                        weight_j = 1
+                    elif weight == 'a**(-3*w_eff-1)':
+                        w_eff_j = self.component.w_eff(a=a_j)
+                        weight_j = a_j**(-3*w_eff_j - 1)
+                    elif weight == 'a**(3*w_eff-2)':
+                        w_eff_j = self.component.w_eff(a=a_j)
+                        weight_j = a_j**(3*w_eff_j - 2)
+                    elif weight == 'a**(-3*w_eff)':
+                        w_eff_j = self.component.w_eff(a=a_j)
+                        weight_j = a_j**(-3*w_eff_j)
+                    else:
+                        abort(f'weight "{weight}" not implemented in as_function_of_k()')
+                # Simpson coefficients 1, 4, 2, 4, ..., 2, 4, 1
+                if 0 < j < n_points - 1:
+                    weight_j *= 2*(1 + j%2)
+                Σweights += weight_j
+                for k_local in range(self.k_gridsize_local):
+                    self.data_local[k_local] += weight_j*self.eval(k_local, a_j)
+            for k_local in range(self.k_gridsize_local):
+                self.data_local[k_local] *= 1/Σweights
         else:
             # For each k, compute and store the transfer function
             # at the given a.
@@ -2363,12 +2774,6 @@ class TransferFunction:
         smart_mpi(self.data_local, self.data, mpifun='allgatherv')
         self.data = asarray(self.data)[self.k_indices_all]
         return self.data
-    # Persistent buffers used by the as_function_of_k() method,
-    # shared among all instances.
-    as_function_of_k_buffers = {
-        'weights'          : empty(1, dtype=C2np['double']),
-        'weighted_transfer': empty(1, dtype=C2np['double']),
-    }
 
     # Method for evaluating the derivative of the k'th transfer
     # function with respect to the scale factor, at a specific value of
@@ -2378,23 +2783,34 @@ class TransferFunction:
         k_local='Py_ssize_t',
         a='double',
         # Locals
-        exponent='double',
-        factor='double',
         i='Py_ssize_t',
-        spline='Spline',
+        row='Py_ssize_t',
+        x='double',
+        Δx='double',
         returns='double',
     )
     def eval_deriv(self, k_local, a):
         i = self.get_interval(k_local, a)
-        factor   = self.factors  [k_local, i]
-        exponent = self.exponents[k_local, i]
-        spline   = self.splines  [k_local, i]
+        x = log(a)
+        row = self.get_row(k_local, i, x)
+        Δx = x - self.spline_x[row]
         # The spline is over transfer(a) - trend(a)
-        # with trend(a) = factor*a**exponent.
-        # We then have to add dtrend(a)/da = factor*a**(exponent - 1)
-        # to the derivative of the spline to obtain the derivative of
-        # the transfer function.
-        return spline.eval_deriv(a) + factor*exponent*a**(exponent - 1)
+        # with trend(a) = factor*a**exponent, as a function of log(a).
+        # We then have to divide the derivative of the spline by a and
+        # add dtrend(a)/da = factor*exponent*a**(exponent - 1) to obtain
+        # the derivative of the transfer function.
+        return (
+            (
+                self.spline_coefficients[row, 1] + Δx*(
+                    2*self.spline_coefficients[row, 2] + Δx*(
+                        3*self.spline_coefficients[row, 3]
+                    )
+                )
+            )/a
+            + self.factors[k_local, i]*self.exponents[k_local, i]*a**(
+                self.exponents[k_local, i] - 1
+            )
+        )
 
     # Method for getting the derivative of the transfer function
     # with respect to the scale factor, evaluated at a,
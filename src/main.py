@@ -47,8 +47,11 @@ cimport(
 cimport(
     'from snapshot import        '
     '    get_initial_conditions, '
+    '    get_subfiles_dirname,   '
     '    save,                   '
+    '    wait_for_snapshots,     '
 )
+cimport('from mesh import plan_fftw')
 cimport('from utilities import delegate')
 
 # Pure Python imports
@@ -109,6 +112,9 @@ def timeloop():
         f'Domain decomposition: '
         f'{domain_subdivisions[0]}×{domain_subdivisions[1]}×{domain_subdivisions[2]}'
     )
+    # Acquire FFTW wisdom for all needed grid sizes up front
+    if fftw_wisdom_preplan and fftw_wisdom_reuse:
+        plan_fftw()
     # Determine and set the correct initial values for the cosmic time
     # universals.t and the scale factor universals.a = a(universals.t).
     init_time()
@@ -353,6 +359,20 @@ def timeloop():
                 # Apply full kick to fluids, full long-range kick to
                 # particles and fully apply internal sources.
                 kick_long(components, Δt, sync_time, 'full')
+                # Particle components not making use of short-range
+                # tiles are never sorted in memory by the above
+                # tile sorting. For such (typically PM-only)
+                # components, we instead periodically sort the
+                # particles in memory according to the Morton index of
+                # the grid cell they occupy, so that the interpolation
+                # to and from potential grids hits the grids in order.
+                # As with the tile sorting, the Δmom buffers are used
+                # for the sorting.
+                if 𝔹[particle_reordering] and time_step%particle_reordering_period == 0:
+                    for component in components:
+                        if component.representation != 'particles' or component.tilings:
+                            continue
+                        component.morton_sort()
                 # Set universal time and scale factor to match end of
                 # this base time step (the location of drifts).
                 universals.t += 0.5*Δt
@@ -462,6 +482,8 @@ def timeloop():
     # All dumps completed; end of main time loop
     print_timestep_footer(components)
     print_timestep_heading(time_step, Δt, bottleneck, components, end=True)
+    # Finish off snapshots still being written in the background
+    wait_for_snapshots()
     # Remove dumped autosave, if any
     if master and os.path.isdir(autosave_subdir):
         masterprint('Removing autosave ...')
@@ -1096,6 +1118,7 @@ cython.declare(ᔑdt_rungs=dict)
     receivers=list,
     suppliers=list,
     t_end='double',
+    t_positions='double',
     t_start='double',
     ᔑdt=dict,
     returns='void',
@@ -1135,12 +1158,23 @@ def kick_long(components, Δt, sync_time, step_type):
     # Apply the effect of all internal source terms
     for component in components:
         component.apply_internal_sources(ᔑdt, a_end)
+    # The time of the (particle) positions during the kick. For 'init'
+    # kicks, the positions are at the beginning of the kick, while for
+    # 'full' kicks they are half a base time step ahead (or at the
+    # sync time, should this come first).
+    t_positions = t_start
+    if step_type == 'full':
+        t_positions += 0.5*Δt
+        if t_positions + Δt_reltol*Δt + 2*machine_ϵ > sync_time:
+            t_positions = sync_time
     # Find all long-range interactions
     interactions_list = interactions.find_interactions(components, 'long-range')
     # Invoke each long-range interaction sequentially
     printout = True
     for force, method, receivers, suppliers in interactions_list:
-        getattr(interactions, force)(method, receivers, suppliers, ᔑdt, 'long-range', printout)
+        getattr(interactions, force)(
+            method, receivers, suppliers, ᔑdt, 'long-range', printout, t_positions,
+        )
 
 # Function which kicks all short-range rungs a single time
 @cython.header(
@@ -1811,18 +1845,17 @@ def activate_terminate(components, a, Δt, act='activate terminate'):
     output_filenames=dict,
     # Locals
     autosave_auxiliary_filename_new=str,
-    autosave_auxiliary_filename_old=str,
     autosave_filename_new=str,
-    autosave_filename_old=str,
     lines=list,
     returns='void',
 )
 def autosave(components, time_step, Δt_begin, Δt, output_filenames):
+    # The auxiliary file of any previous autosave still being written
+    # in the background must be moved in place before we overwrite it.
+    wait_for_snapshots()
     masterprint('Autosaving ...')
     # Temporary file names
-    autosave_filename_old = autosave_filename.removesuffix('.hdf5') + '_old.hdf5'
     autosave_filename_new = autosave_filename.removesuffix('.hdf5') + '_new.hdf5'
-    autosave_auxiliary_filename_old = f'{autosave_auxiliary_filename}_old'
     autosave_auxiliary_filename_new = f'{autosave_auxiliary_filename}_new'
     # Save auxiliary file containing information
     # about the current time-stepping.
@@ -1876,39 +1909,73 @@ def autosave(components, time_step, Δt_begin, Δt, output_filenames):
             print('\n'.join(lines), file=autosave_auxiliary_file)
     Barrier()
     # Save CO𝘕CEPT snapshot. Include all components regardless
-    # of the snapshot_select['save'] user parameter.
-    save(components, autosave_filename_new, snapshot_type='concept', save_all=True)
-    # Cleanup, always keeping a set of autosave files intact
-    if master:
-        # Rename old versions of the autosave files
-        if os.path.isfile(autosave_auxiliary_filename):
-            os.replace(
-                autosave_auxiliary_filename,
-                autosave_auxiliary_filename_old,
-            )
-        if os.path.isfile(autosave_filename):
-            os.replace(
-                autosave_filename,
-                autosave_filename_old,
-            )
-        # Rename new versions of the autosave files
-        if os.path.isfile(autosave_auxiliary_filename_new):
-            os.replace(
-                autosave_auxiliary_filename_new,
-                autosave_auxiliary_filename,
-            )
-        if os.path.isfile(autosave_filename_new):
-            os.replace(
-                autosave_filename_new,
-                autosave_filename,
-            )
-        # Remove old versions of the autosave files
-        if os.path.isfile(autosave_auxiliary_filename_old):
-            os.remove(autosave_auxiliary_filename_old)
-        if os.path.isfile(autosave_filename_old):
-            os.remove(autosave_filename_old)
+    # of the snapshot_select['save'] user parameter. The new autosave
+    # files replace the old ones once the snapshot is completely
+    # written, which may happen in the background. Any virtual datasets
+    # should refer to the sub-files by their final location.
+    save(
+        components, autosave_filename_new,
+        snapshot_type='concept', save_all=True, callback=finalize_autosave,
+        filename_final=autosave_filename,
+    )
     masterprint('done')
 
+# Function replacing the previous autosave files with the new ones,
+# called once the new autosaved snapshot is completely written to disk.
+@cython.pheader(
+    # Locals
+    autosave_auxiliary_filename_new=str,
+    autosave_auxiliary_filename_old=str,
+    autosave_filename_new=str,
+    autosave_filename_old=str,
+    filename=str,
+    filename_new=str,
+    filename_old=str,
+    filenames=list,
+    returns='void',
+)
+def finalize_autosave():
+    if not master:
+        return
+    # Temporary file names. The sub-file directories of the snapshots
+    # are moved along with the snapshot files.
+    autosave_filename_old = autosave_filename.removesuffix('.hdf5') + '_old.hdf5'
+    autosave_filename_new = autosave_filename.removesuffix('.hdf5') + '_new.hdf5'
+    autosave_auxiliary_filename_old = f'{autosave_auxiliary_filename}_old'
+    autosave_auxiliary_filename_new = f'{autosave_auxiliary_filename}_new'
+    filenames = [
+        (
+            autosave_auxiliary_filename,
+            autosave_auxiliary_filename_old,
+            autosave_auxiliary_filename_new,
+        ),
+        (
+            autosave_filename,
+            autosave_filename_old,
+            autosave_filename_new,
+        ),
+        (
+            get_subfiles_dirname(autosave_filename),
+            get_subfiles_dirname(autosave_filename_old),
+            get_subfiles_dirname(autosave_filename_new),
+        ),
+    ]
+    # Cleanup, always keeping a set of autosave files intact.
+    # Rename old versions of the autosave files.
+    for filename, filename_old, filename_new in filenames:
+        if os.path.exists(filename):
+            os.replace(filename, filename_old)
+    # Rename new versions of the autosave files
+    for filename, filename_old, filename_new in filenames:
+        if os.path.exists(filename_new):
+            os.replace(filename_new, filename)
+    # Remove old versions of the autosave files
+    for filename, filename_old, filename_new in filenames:
+        if os.path.isdir(filename_old):
+            shutil.rmtree(filename_old)
+        elif os.path.isfile(filename_old):
+            os.remove(filename_old)
+
 # Function checking for the existence of an autosaved snapshot and
 # auxiliary file belonging to this run. If so, the auxiliary file will
 # be read and its contents will be returned. The universal time will
@@ -2443,6 +2510,8 @@ if jobid != -1:
         # Instead of running a simulation, run some utility
         # as defined by the special_params dict.
         delegate()
+        # Finish off snapshots still being written in the background
+        wait_for_snapshots()
     else:
         # Set paths to autosaved snapshot and auxiliary file
         autosave_subdir = '{}/{}'.format(output_dirs['autosave'], os.path.basename(param))
@@ -36,6 +36,9 @@ cimport(
 # Pure Python imports
 from communication import get_domain_info
 
+# OpenMP imports
+from cython.parallel import prange, threadid
+
 # Function pointer types used in this module
 pxd('ctypedef double* (*func_dstar_ddd)(double, double, double)')
 
@@ -62,9 +65,14 @@ cdef extern from "fft.c":
                                   ptrdiff_t gridsize_k,
                                   char*     rigor,
                                   bint      fftw_wisdom_reuse,
+                                  bint      wisdom_known,
                                   char*     wisdom_filename,
+                                  int       nthreads,
                                   )
+    bint fftw_threaded()
     void fftw_execute(fftw_plan plan)
+    void fftw_discard(double* grid, fftw_plan plan_forward,
+                                    fftw_plan plan_backward)
     void fftw_clean(double* grid, fftw_plan plan_forward,
                                   fftw_plan plan_backward)
 """)
@@ -457,6 +465,148 @@ def interpolate_domaingrid_to_particles(
                 value *= factor
         ptr_dim[indexˣ] += value
 
+# Function for doing lookup in three grids with scalar values,
+# corresponding to the three components of a vector field, and
+# interpolating to the particle positions.
+@cython.pheader(
+    # Argument
+    gridx='double[:, :, ::1]',
+    gridy='double[:, :, ::1]',
+    gridz='double[:, :, ::1]',
+    component='Component',
+    variable=str,
+    order='int',
+    lattice='Lattice',
+    factor='double',
+    # Locals
+    cellsize='double',
+    gridx_ptr='double*',
+    gridy_ptr='double*',
+    gridz_ptr='double*',
+    index='Py_ssize_t',
+    indexˣ='Py_ssize_t',
+    offset_x='double',
+    offset_y='double',
+    offset_z='double',
+    posxˣ='double*',
+    posyˣ='double*',
+    poszˣ='double*',
+    ptr='double*',
+    size_j='Py_ssize_t',
+    size_k='Py_ssize_t',
+    value_x='double',
+    value_y='double',
+    value_z='double',
+    weight='double',
+    x='double',
+    y='double',
+    z='double',
+    returns='void',
+)
+def interpolate_domaingrids_to_particles(
+    gridx, gridy, gridz, component, variable, order, lattice=None, factor=1,
+):
+    """This function updates all three dimensions of variable ('pos',
+    'mom' or 'Δmom') of the component, through interpolation in the
+    three grids of a given order, one grid for each dimension. This is
+    equivalent to calling interpolate_domaingrid_to_particles() once for
+    each dimension, but with the interpolation weights computed only
+    once for each particle. All grids must have the same shape.
+    If the grid values should be multiplied by a factor prior to adding
+    them to the variable, this may be specified.
+    """
+    if not (1 <= order <= 4):
+        abort(
+            f'interpolate_domaingrids_to_particles() called '
+            f'with order = {order} ∉ {{1, 2, 3, 4}}'
+        )
+    if not (asarray(gridx).shape == asarray(gridy).shape == asarray(gridz).shape):
+        abort(
+            f'interpolate_domaingrids_to_particles() called with grids of differing shapes '
+            f'{asarray(gridx).shape}, {asarray(gridy).shape}, {asarray(gridz).shape}'
+        )
+    if lattice is None:
+        lattice = Lattice()
+    # Extract pointer to particle data
+    if variable == 'pos':
+        ptr = component.pos
+    elif variable == 'mom':
+        ptr = component.mom
+    elif variable == 'Δmom':
+        ptr = component.Δmom
+    else:
+        abort(
+            f'interpolate_domaingrids_to_particles() called with variable = "{variable}" '
+            f'∉ {{"pos", "mom", "Δmom"}}'
+        )
+    # Offsets needed for the interpolation, as in
+    # interpolate_domaingrid_to_particles().
+    cellsize = domain_size_x/(gridx.shape[0] - ℤ[2*nghosts])  # we have cubic grid cells
+    offset_x = (
+        + domain_bgn_x
+        - (1 + machine_ϵ)*(nghosts - 0.5*cell_centered + lattice.shift[0])*cellsize
+    )
+    offset_y = (
+        + domain_bgn_y
+        - (1 + machine_ϵ)*(nghosts - 0.5*cell_centered + lattice.shift[1])*cellsize
+    )
+    offset_z = (
+        + domain_bgn_z
+        - (1 + machine_ϵ)*(nghosts - 0.5*cell_centered + lattice.shift[2])*cellsize
+    )
+    # Extract particle positions and grids
+    posxˣ = component.posxˣ
+    posyˣ = component.posyˣ
+    poszˣ = component.poszˣ
+    size_j, size_k = gridx.shape[1], gridx.shape[2]
+    gridx_ptr = cython.address(gridx[:, :, :])
+    gridy_ptr = cython.address(gridy[:, :, :])
+    gridz_ptr = cython.address(gridz[:, :, :])
+    # Interpolate onto each particle, with the interpolation weights
+    # computed once and shared between the three grids.
+    for indexˣ in range(0, 3*component.N_local, 3):
+        # Get, translate and scale the coordinates so that
+        # nghosts - ½ < r < shape[r] - nghosts - ½ for r ∈ {x, y, z}.
+        x = (posxˣ[indexˣ] - offset_x)*ℝ[(1/cellsize)*(1 - machine_ϵ)]
+        y = (posyˣ[indexˣ] - offset_y)*ℝ[(1/cellsize)*(1 - machine_ϵ)]
+        z = (poszˣ[indexˣ] - offset_z)*ℝ[(1/cellsize)*(1 - machine_ϵ)]
+        # Carry out the interpolation according to the order
+        value_x = 0
+        value_y = 0
+        value_z = 0
+        with unswitch:
+            if order == 1:  # NGP interpolation
+                for index, weight in particle_interpolation_loop_NGP(
+                    x, y, z, size_j, size_k,
+                ):
+                    value_x += gridx_ptr[index]*weight
+                    value_y += gridy_ptr[index]*weight
+                    value_z += gridz_ptr[index]*weight
+            elif order == 2:  # CIC interpolation
+                for index, weight in particle_interpolation_loop_CIC(
+                    x, y, z, size_j, size_k,
+                ):
+                    value_x += gridx_ptr[index]*weight
+                    value_y += gridy_ptr[index]*weight
+                    value_z += gridz_ptr[index]*weight
+            elif order == 3:  # TSC interpolation
+                for index, weight in particle_interpolation_loop_TSC(
+                    x, y, z, size_j, size_k,
+                ):
+                    value_x += gridx_ptr[index]*weight
+                    value_y += gridy_ptr[index]*weight
+                    value_z += gridz_ptr[index]*weight
+            else:  # order == 4  # PCS interpolation
+                for index, weight in particle_interpolation_loop_PCS(
+                    x, y, z, size_j, size_k,
+                ):
+                    value_x += gridx_ptr[index]*weight
+                    value_y += gridy_ptr[index]*weight
+                    value_z += gridz_ptr[index]*weight
+        ptr[indexˣ    ] += value_x*factor
+        ptr[indexˣ + 1] += value_y*factor
+        ptr[indexˣ + 2] += value_z*factor
+
 # Function for interpolating a certain quantity from components
 # (particles and fluids) onto global domain grids using intermediate
 # upstream grids.
@@ -1589,6 +1739,21 @@ def interpolate_particles(
     poszˣ = component.poszˣ
     size_j, size_k = grid.shape[1], grid.shape[2]
     grid_ptr = cython.address(grid[:, :, :])
+    # Use the threaded implementation when running with several threads
+    # per process and the local grid is thick enough to be split into
+    # a sufficient number of independent x slabs.
+    if N_threads > 1 and grid.shape[0] >= ℤ[4*interpolation_chunk_width_min]:
+        if constant_contribution:
+            contribution_ptr = NULL
+        interpolate_particles_threaded(
+            component.N_local, posxˣ, posyˣ, poszˣ,
+            contribution, contribution_factor, contribution_ptr,
+            order, grid_ptr, grid.shape[0], size_j, size_k,
+            offset_x, offset_y, offset_z, cellsize,
+        )
+        if do_ghost_communication:
+            communicate_ghosts(grid, '+=')
+        return
     for indexˣ in range(0, 3*component.N_local, 3):
         # Get the total contribution from this particle
         with unswitch:
@@ -1631,6 +1796,241 @@ def interpolate_particles(
     if do_ghost_communication:
         communicate_ghosts(grid, '+=')
 
+# Helper function for interpolate_particles(), carrying out the
+# interpolation using several threads. To avoid race conditions on the
+# grid, the particles are binned into chunks of neighbouring x slabs of
+# the grid, each chunk being at least interpolation_chunk_width_min
+# slabs thick. As no particle reaches more than two slabs outside of its
+# own chunk, chunks of equal parity never write to the same grid cells,
+# and so all even chunks are processed in parallel, followed by all odd
+# chunks. The binning is stable, keeping the particles within each chunk
+# in memory order, which after a tile sort is spatially coherent.
+# The interpolation weights are computed inline using per-thread
+# buffers, as the global weights_x, weights_y and weights_z used by the
+# particle_interpolation_loop_*() iterators cannot be shared between
+# threads. When contribution_ptr is NULL, the constant contribution
+# is used for all particles.
+@cython.header(
+    # Arguments
+    N_local='Py_ssize_t',
+    posxˣ='double*',
+    posyˣ='double*',
+    poszˣ='double*',
+    contribution='double',
+    contribution_factor='double',
+    contribution_ptr='double*',
+    order='int',
+    grid_ptr='double*',
+    size_i='Py_ssize_t',
+    size_j='Py_ssize_t',
+    size_k='Py_ssize_t',
+    offset_x='double',
+    offset_y='double',
+    offset_z='double',
+    cellsize='double',
+    # Locals
+    chunk='Py_ssize_t',
+    chunk_pair='Py_ssize_t',
+    chunk_width='Py_ssize_t',
+    colour='int',
+    contribution_particle='double',
+    dim='int',
+    dist='double',
+    i='Py_ssize_t',
+    index='Py_ssize_t',
+    index_i='Py_ssize_t',
+    index_j='Py_ssize_t',
+    index_k='Py_ssize_t',
+    index_r='Py_ssize_t',
+    index_weights='Py_ssize_t',
+    indexᵖ='Py_ssize_t',
+    indexˣ='Py_ssize_t',
+    j='Py_ssize_t',
+    k='Py_ssize_t',
+    n_chunks='Py_ssize_t',
+    n_chunks_colour='Py_ssize_t',
+    order_max='Py_ssize_t',
+    r='double',
+    slot='Py_ssize_t',
+    thread='int',
+    tmp='double',
+    tmp2='double',
+    tmp3='double',
+    weight0='double',
+    weight1='double',
+    weight2='double',
+    weight3='double',
+    weight_i='double',
+    weight_ij='double',
+    weights='double*',
+    x='double',
+    y='double',
+    z='double',
+    returns='void',
+)
+def interpolate_particles_threaded(
+    N_local, posxˣ, posyˣ, poszˣ, contribution, contribution_factor, contribution_ptr,
+    order, grid_ptr, size_i, size_j, size_k, offset_x, offset_y, offset_z, cellsize,
+):
+    global interpolation_chunk_particles, interpolation_chunk_particles_size
+    global interpolation_chunk_offsets, interpolation_chunk_offsets_size
+    global interpolation_weights_threads, interpolation_weights_threads_size
+    # Choose the chunk width so that each colour gets a few chunks
+    # per thread, for the dynamic scheduling to balance the load.
+    chunk_width = pairmax(
+        interpolation_chunk_width_min, size_i//ℤ[4*N_threads],
+    )
+    n_chunks = size_i//chunk_width + 1
+    order_max = highest_interpolation_order_implemented
+    # Enlarge buffers if needed
+    if interpolation_chunk_particles_size < N_local:
+        interpolation_chunk_particles_size = N_local
+        interpolation_chunk_particles = realloc(
+            interpolation_chunk_particles,
+            2*interpolation_chunk_particles_size*sizeof('Py_ssize_t'),
+        )
+    if interpolation_chunk_offsets_size < n_chunks + 1:
+        interpolation_chunk_offsets_size = n_chunks + 1
+        interpolation_chunk_offsets = realloc(
+            interpolation_chunk_offsets,
+            interpolation_chunk_offsets_size*sizeof('Py_ssize_t'),
+        )
+    if interpolation_weights_threads_size < N_threads:
+        interpolation_weights_threads_size = N_threads
+        interpolation_weights_threads = realloc(
+            interpolation_weights_threads,
+            3*order_max*N_threads*sizeof('double'),
+        )
+    weights = interpolation_weights_threads
+    # Bin the particles into chunks using a counting sort. The second
+    # half of the interpolation_chunk_particles buffer temporarily
+    # stores the chunk of each particle, while the particle indices
+    # sorted by chunk are stored in the first half.
+    for chunk in range(n_chunks + 1):
+        interpolation_chunk_offsets[chunk] = 0
+    for indexᵖ in range(N_local):
+        x = (posxˣ[3*indexᵖ] - offset_x)*ℝ[(1/cellsize)*(1 - machine_ϵ)]
+        chunk = pairmin(cast(x, 'Py_ssize_t')//chunk_width, ℤ[n_chunks - 1])
+        interpolation_chunk_particles[N_local + indexᵖ] = chunk
+        interpolation_chunk_offsets[chunk + 1] += 1
+    for chunk in range(n_chunks):
+        interpolation_chunk_offsets[chunk + 1] += interpolation_chunk_offsets[chunk]
+    for indexᵖ in range(N_local):
+        chunk = interpolation_chunk_particles[N_local + indexᵖ]
+        interpolation_chunk_particles[interpolation_chunk_offsets[chunk]] = indexᵖ
+        interpolation_chunk_offsets[chunk] += 1
+    # The offsets now mark the chunk ends. Shift them back.
+    for chunk in range(n_chunks, 0, -1):
+        interpolation_chunk_offsets[chunk] = interpolation_chunk_offsets[chunk - 1]
+    interpolation_chunk_offsets[0] = 0
+    # Interpolate all even chunks followed by all odd chunks,
+    # distributing the chunks of each colour dynamically over the
+    # threads. Note that in-place operations on scalar variables are
+    # avoided within the parallel loop, as these would be interpreted
+    # as reductions.
+    for colour in range(2):
+        n_chunks_colour = (n_chunks - colour + 1)//2
+        for chunk_pair in prange(
+            n_chunks_colour, nogil=True, schedule='dynamic', num_threads=N_threads,
+        ):
+            thread = threadid()
+            index_weights = thread*ℤ[3*order_max]
+            chunk = 2*chunk_pair + colour
+            for slot in range(
+                interpolation_chunk_offsets[chunk], interpolation_chunk_offsets[chunk + 1],
+            ):
+                indexᵖ = interpolation_chunk_particles[slot]
+                indexˣ = 3*indexᵖ
+                # Get the total contribution from this particle
+                if contribution_ptr == NULL:
+                    contribution_particle = contribution
+                else:
+                    contribution_particle = contribution_factor*contribution_ptr[indexˣ]
+                # Get, translate and scale the coordinates as in
+                # interpolate_particles().
+                x = (posxˣ[indexˣ] - offset_x)*ℝ[(1/cellsize)*(1 - machine_ϵ)]
+                y = (posyˣ[indexˣ] - offset_y)*ℝ[(1/cellsize)*(1 - machine_ϵ)]
+                z = (poszˣ[indexˣ] - offset_z)*ℝ[(1/cellsize)*(1 - machine_ϵ)]
+                # Set the interpolation weights along each dimension,
+                # mirroring the set_weights_*() functions.
+                for dim in range(3):
+                    if dim == 0:
+                        r = x
+                    elif dim == 1:
+                        r = y
+                    else:
+                        r = z
+                    index = index_weights + dim*order_max
+                    if order == 1:  # NGP
+                        index_r = cast(r + 0.5, 'Py_ssize_t')
+                        weights[index] = 1
+                    elif order == 2:  # CIC
+                        index_r = cast(r, 'Py_ssize_t')
+                        dist = r - index_r
+                        weights[index    ] = 1 - dist
+                        weights[index + 1] = dist
+                    elif order == 3:  # TSC
+                        index_r = cast(r + 0.5, 'Py_ssize_t')
+                        dist = r - index_r
+                        index_r = index_r - 1
+                        weight0 = 0.125 + 0.5*(dist*dist - dist)
+                        weight1 = 0.75 - dist*dist
+                        weights[index    ] = weight0
+                        weights[index + 1] = weight1
+                        weights[index + 2] = 1 - weight0 - weight1
+                    else:  # order == 4  # PCS
+                        index_r = cast(r, 'Py_ssize_t') - 1
+                        dist = r - index_r
+                        tmp = 2 - dist
+                        tmp2 = tmp*tmp
+                        tmp3 = tmp*tmp2
+                        weight0 = 1./6.*tmp3
+                        weight2 = 2./3. - tmp2 + 0.5*tmp3
+                        weight3 = 1./6.*(dist - 1)*(dist - 1)*(dist - 1)
+                        weights[index    ] = weight0
+                        weights[index + 1] = 1 - weight0 - weight2 - weight3
+                        weights[index + 2] = weight2
+                        weights[index + 3] = weight3
+                    if dim == 0:
+                        index_i = index_r
+                    elif dim == 1:
+                        index_j = index_r
+                    else:
+                        index_k = index_r
+                # Add the weighted contribution to the grid
+                for i in range(order):
+                    weight_i = contribution_particle*weights[index_weights + i]
+                    for j in range(order):
+                        weight_ij = weight_i*weights[
+                            index_weights + order_max + j
+                        ]
+                        index = ((index_i + i)*size_j + index_j + j)*size_k + index_k
+                        for k in range(order):
+                            grid_ptr[index + k] += weight_ij*weights[
+                                index_weights + 2*order_max + k
+                            ]
+# Buffers used by the interpolate_particles_threaded() function,
+# together with the minimum thickness of the x slab chunks. No particle
+# interpolation reaches more than one slab below or two slabs above the
+# slab of the particle, and so chunks of thickness 3 or more are
+# separated by at least one chunk thickness within each colour.
+cython.declare(
+    interpolation_chunk_particles='Py_ssize_t*',
+    interpolation_chunk_particles_size='Py_ssize_t',
+    interpolation_chunk_offsets='Py_ssize_t*',
+    interpolation_chunk_offsets_size='Py_ssize_t',
+    interpolation_chunk_width_min='Py_ssize_t',
+    interpolation_weights_threads='double*',
+    interpolation_weights_threads_size='Py_ssize_t',
+)
+interpolation_chunk_particles = malloc(1*sizeof('Py_ssize_t'))
+interpolation_chunk_particles_size = 0
+interpolation_chunk_offsets = malloc(1*sizeof('Py_ssize_t'))
+interpolation_chunk_offsets_size = 0
+interpolation_chunk_width_min = 3
+interpolation_weights_threads = malloc(1*sizeof('double'))
+interpolation_weights_threads_size = 0
+
 # Function for adding together a certain quantity
 # from several fluid components.
 @cython.header(
@@ -3584,7 +3984,6 @@ def trim_slab(slab):
     nullify=object,  # bint, str or list of str's
     trim='bint',
     # Locals
-    acquire='bint',
     as_expected='bint',
     fftw_plans_index='Py_ssize_t',
     fftw_struct=fftw_return_struct,
@@ -3598,7 +3997,6 @@ def trim_slab(slab):
     slab_size_j='Py_ssize_t',
     slab_start_i='Py_ssize_t',
     slab_start_j='Py_ssize_t',
-    wisdom_filename=str,
     returns='double[:, :, ::1]',
 )
 def get_fftw_slab(gridsize, buffer_name=None, nullify=False, trim=False):
@@ -3630,27 +4028,9 @@ def get_fftw_slab(gridsize, buffer_name=None, nullify=False, trim=False):
     if not cython.compiled:
         slab = empty(shape, dtype=C2np['double'])
     else:
-        # Get path to FFTW wisdom file
-        wisdom_filename = get_wisdom_filename(gridsize)
         # Initialise fftw_mpi, allocate the grid, initialise the
         # local grid sizes and start indices and do FFTW planning.
-        acquire = False
-        if master:
-            os.makedirs(os.path.dirname(wisdom_filename), exist_ok=True)
-            if gridsize not in wisdom_acquired and not os.path.isfile(wisdom_filename):
-                acquire = True
-                masterprint(
-                    f'Acquiring FFTW wisdom ({fftw_wisdom_rigor}) for grid size {gridsize} ...'
-                )
-        fftw_struct = fftw_setup(
-            gridsize, gridsize, gridsize,
-            bytes(fftw_wisdom_rigor, encoding='ascii'),
-            fftw_wisdom_reuse,
-            bytes(wisdom_filename, encoding='ascii'),
-        )
-        if acquire:
-            masterprint('done')
-        wisdom_acquired[gridsize] = True
+        fftw_struct = setup_fftw(gridsize)
         # Unpack every variable from fftw_struct
         # and compare to expected values.
         slab_size_i   = int(fftw_struct.gridsize_local_i)
@@ -3719,15 +4099,215 @@ fftw_plans_backward = malloc(fftw_plans_size*sizeof('fftw_plan'))
 # fftw_plans_forward and fftw_plans_backward.
 cython.declare(fftw_plans_mapping=dict)
 fftw_plans_mapping = {}
+
+# Helper function for the get_fftw_slab() function, which initialises
+# FFTW, allocates a slab and creates its plans, acquiring FFTW wisdom
+# as necessary.
+@cython.header(
+    # Arguments
+    gridsize='Py_ssize_t',
+    # Locals
+    acquire='bint',
+    fftw_struct=fftw_return_struct,
+    known='bint',
+    wisdom_filename=str,
+    returns=fftw_return_struct,
+)
+def setup_fftw(gridsize):
+    global fftw_threaded_warned
+    # Get path to the FFTW wisdom database and check whether wisdom
+    # for this problem is already present within it.
+    wisdom_filename = get_wisdom_filename()
+    known = (fftw_wisdom_reuse and is_wisdom_known(gridsize))
+    acquire = False
+    if master:
+        os.makedirs(os.path.dirname(wisdom_filename), exist_ok=True)
+        if gridsize not in wisdom_acquired and not known:
+            acquire = True
+            masterprint(
+                f'Acquiring FFTW wisdom ({fftw_wisdom_rigor}) for grid size {gridsize} ...'
+            )
+    # When running with several threads per process, FFTW
+    # carries out the transforms using all of these threads,
+    # provided that the threaded FFTW library is available.
+    if N_threads > 1 and not fftw_threaded() and not fftw_threaded_warned:
+        fftw_threaded_warned = True
+        masterwarn(
+            f'N_threads = {N_threads}, but FFTW is not available with threading '
+            f'support. Fourier transforms will be carried out using a single thread '
+            f'per process. Reinstall FFTW with --enable-openmp to fix this.'
+        )
+    fftw_struct = fftw_setup(
+        gridsize, gridsize, gridsize,
+        bytes(fftw_wisdom_rigor, encoding='ascii'),
+        fftw_wisdom_reuse,
+        known,
+        bytes(wisdom_filename, encoding='ascii'),
+        N_threads,
+    )
+    if fftw_wisdom_reuse and not known:
+        record_wisdom(gridsize)
+    if acquire:
+        masterprint('done')
+    wisdom_acquired[gridsize] = True
+    return fftw_struct
 # Dict keeping track of what FFTW wisdom has already been acquired
 cython.declare(wisdom_acquired=dict)
 wisdom_acquired = {}
+# Flag specifying whether a warning about missing threading support
+# in FFTW has already been emitted.
+cython.declare(fftw_threaded_warned='bint')
+fftw_threaded_warned = False
 
-# Helper function for the get_fftw_slab() function,
-# which construct the absolute path to the wisdom file to use.
+# Function for acquiring FFTW wisdom for all of the given grid sizes
+# up front, rather than lazily as the slabs are needed.
+@cython.pheader(
+    # Arguments
+    gridsizes=object,  # iterable of ints or None
+    # Locals
+    fftw_struct=fftw_return_struct,
+    gridsize='Py_ssize_t',
+    gridsizes_planned=list,
+    returns=list,
+)
+def plan_fftw(gridsizes=None):
+    """If no grid sizes are passed, all global grid sizes needed by
+    the parameters are used (see get_fftw_gridsizes()). Grid sizes for
+    which wisdom already exists in the wisdom database are skipped.
+    The slabs and plans created while acquiring the wisdom are thrown
+    away immediately, and so this is only of use when the wisdom is
+    reused (fftw_wisdom_reuse is True). The grid sizes for which wisdom
+    has been acquired are returned.
+    """
+    gridsizes_planned = []
+    # No planning takes place in pure Python mode
+    if not cython.compiled:
+        return gridsizes_planned
+    if gridsizes is None:
+        gridsizes = get_fftw_gridsizes()
+    for gridsize in sorted(set(gridsizes)):
+        if gridsize%nprocs != 0 or gridsize%2 != 0:
+            masterwarn(
+                f'Skipping FFTW planning of grid size {gridsize} '
+                f'as this is not even and divisible by {nprocs} processes'
+            )
+            continue
+        if gridsize in wisdom_acquired or is_wisdom_known(gridsize):
+            continue
+        fftw_struct = setup_fftw(gridsize)
+        fftw_discard(fftw_struct.grid, fftw_struct.plan_forward, fftw_struct.plan_backward)
+        gridsizes_planned.append(gridsize)
+    return gridsizes_planned
+
+# Function returning the global grid sizes of all distributed FFTs
+# needed according to the parameters.
+@cython.pheader(
+    # Locals
+    d=dict,
+    gridsize='Py_ssize_t',
+    gridsizes=set,
+    options=dict,
+    output_kind=str,
+    returns=list,
+)
+def get_fftw_gridsizes():
+    gridsizes = set()
+    # Global potential grids
+    for d in potential_options['gridsize']['global'].values():
+        for gridsize in d.values():
+            gridsizes.add(gridsize)
+    # Grids used for output
+    for output_kind, options in {
+        'powerspec': powerspec_options,
+        'bispec'   : bispec_options,
+    }.items():
+        if any([output_times[time_param].get(output_kind) for time_param in ('a', 't')]):
+            for gridsize in options['global gridsize'].values():
+                gridsizes.add(gridsize)
+    return sorted([gridsize for gridsize in gridsizes if gridsize > 0])
+
+# Function checking whether FFTW wisdom for the given grid size (and the
+# current number of processes, threads and rigour level) exists in the
+# wisdom database. The answer is looked up in the index accompanying
+# the database, listing the problems for which the database
+# contains wisdom.
 @cython.header(
     # Arguments
     gridsize='Py_ssize_t',
+    # Locals
+    entry=tuple,
+    known='bint',
+    rigor_levels=list,
+    returns='bint',
+)
+def is_wisdom_known(gridsize):
+    # Ensure that the path to the wisdom database is known
+    # to all processes before only the master proceeds.
+    get_wisdom_filename()
+    if not master:
+        return bcast()
+    known = False
+    # Wisdom gathered at some rigour level may be used
+    # for planning at all lower levels.
+    rigor_levels = ['estimate', 'measure', 'patient', 'exhaustive']
+    for entry in read_wisdom_index():
+        if entry[:3] == (gridsize, nprocs, N_threads) and (
+            rigor_levels.index(entry[3]) >= rigor_levels.index(fftw_wisdom_rigor)
+        ):
+            known = True
+            break
+    return bcast(known)
+
+# Function for adding FFTW wisdom for the given grid size (and the
+# current number of processes, threads and rigour level)
+# to the index of the wisdom database.
+@cython.header(
+    # Arguments
+    gridsize='Py_ssize_t',
+    # Locals
+    index_filename=str,
+    returns='void',
+)
+def record_wisdom(gridsize):
+    if not master:
+        return
+    index_filename = get_wisdom_index_filename()
+    with open_file(index_filename, mode='a', encoding='utf-8') as f:
+        f.write(f'{gridsize} {nprocs} {N_threads} {fftw_wisdom_rigor}\n')
+
+# Function returning the entries of the index of the wisdom database,
+# as a list of (gridsize, nprocs, N_threads, rigor) tuples.
+@cython.header(
+    # Locals
+    entries=list,
+    index_filename=str,
+    line=str,
+    words=list,
+    returns=list,
+)
+def read_wisdom_index():
+    entries = []
+    index_filename = get_wisdom_index_filename()
+    if not os.path.isfile(index_filename):
+        return entries
+    with open_file(index_filename, mode='r', encoding='utf-8') as f:
+        for line in f:
+            words = line.split()
+            if len(words) != 4:
+                continue
+            entries.append((int(words[0]), int(words[1]), int(words[2]), words[3]))
+    return entries
+
+# Function returning the path to the index of the wisdom database
+@cython.header(
+    returns=str,
+)
+def get_wisdom_index_filename():
+    return os.path.splitext(get_wisdom_filename())[0] + '.index'
+
+# Helper function for the get_fftw_slab() function,
+# which construct the absolute path to the wisdom database to use.
+@cython.header(
     # Locals
     content=str,
     fftw_pkgconfig_filename=str,
@@ -3742,11 +4322,13 @@ wisdom_acquired = {}
     process_count_max='Py_ssize_t',
     returns=str,
 )
-def get_wisdom_filename(gridsize):
-    """The FFTW wisdom file name is built as a hash of several things:
-    - The passed grid size.
-    - The total number of processes.
-    - The global FFTW wisdom rigour.
+def get_wisdom_filename():
+    """All FFTW wisdom is accumulated within a single file, acting as
+    a database, with an accompanying index file listing the problems
+    (grid size, number of processes, number of threads per process
+    and rigour level) for which the database holds wisdom. The wisdom
+    file name is built as a hash of the things which prohibit wisdom
+    from being merged together:
     - The FFTW version.
     - The name of the node "owning" the wisdom in the case of
       fftw_wisdom_share being False. Here a node is said to own the
@@ -3756,11 +4338,14 @@ def get_wisdom_filename(gridsize):
       chosen arbitrarily as the wisdom to stick with.
       When fftw_wisdom_share is True, this part of the key is constant.
     """
-    global fftw_version, wisdom_owner
+    global fftw_version, wisdom_owner, wisdom_database_filename
+    if wisdom_database_filename:
+        return wisdom_database_filename
     # The master process constructs the file name
     # and then broadcasts it.
     if not master:
-        return bcast()
+        wisdom_database_filename = bcast()
+        return wisdom_database_filename
     # Get the version of FFTW in use
     if not fftw_version:
         fftw_version = '<unknown>'
@@ -3797,15 +4382,17 @@ def get_wisdom_filename(gridsize):
     # The full path to the wisdom file
     filename = get_reusable_filename(
         'fftw',
-        gridsize, nprocs, fftw_wisdom_rigor, fftw_version, wisdom_owner,
+        fftw_version, wisdom_owner,
         extension='wisdom',
     )
     # Broadcast and return result
-    return bcast(filename)
+    wisdom_database_filename = bcast(filename)
+    return wisdom_database_filename
 # Constant strings set and used by the get_wisdom_filename function
-cython.declare(fftw_version=str, wisdom_owner=str)
+cython.declare(fftw_version=str, wisdom_owner=str, wisdom_database_filename=str)
 fftw_version = ''
 wisdom_owner = ''
+wisdom_database_filename = ''
 
 # Function performing Fourier transformations of slab decomposed grids
 @cython.header(
@@ -5220,7 +5807,7 @@ def set_weights_PCS(x, weights):
     return index
 # Allocate global weights arrays to be used with the above functions
 cython.declare(
-    highest_implemented_interpolation_order='int',
+    highest_interpolation_order_implemented='int',
     weights_x='double*',
     weights_y='double*',
     weights_z='double*',
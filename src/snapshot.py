@@ -37,6 +37,7 @@ cimport(
     '    get_fftw_slab,    '
     '    slab_decompose,   '
 )
+cimport('from ic import realize_particles')
 cimport(
     'from species import         '
     '    Component,              '
@@ -66,6 +67,9 @@ class ConceptSnapshot:
     # Large chunks are fine as no temporary buffer is used.
     # The maximum possible chunk size is limited by MPI, though.
     chunk_size_max = 2**30  # 1 GB
+    # Number of particles within each HDF5 chunk of the particle
+    # datasets, when not specified by the user.
+    chunk_size_auto = 2**16
 
     # Class method for identifying a file to be a snapshot of this type
     @classmethod
@@ -106,12 +110,19 @@ class ConceptSnapshot:
         # Argument
         filename=str,
         save_all='bint',
+        callback=object,  # callable or None
+        components_realize=object,  # sequence of Components
+        filename_final=str,
         # Locals
         N='Py_ssize_t',
         N_local='Py_ssize_t',
         N_str=str,
         component='Component',
-        end_local='Py_ssize_t',
+        dataset_name=str,
+        datasets=dict,
+        dtype=object,  # np.dtype
+        failures=list,
+        fixed='bint',
         fluidscalar='FluidScalar',
         id_max='Py_ssize_t',
         ids_mv_unsigned=object,  # np.ndarray
@@ -119,20 +130,64 @@ class ConceptSnapshot:
         index='Py_ssize_t',
         multi_index=object,  # tuple or str
         name=object,  # str or int
+        offsets='Py_ssize_t[::1]',
         plural=str,
         shape=tuple,
         slab_end='Py_ssize_t',
         slab_start='Py_ssize_t',
         slab_trimmed='double[:, :, ::1]',
-        start_local='Py_ssize_t',
+        subfile_datasets=object,  # list or None
+        subfiles_dirname=str,
+        subfiles_dirname_final=str,
+        thread=object,  # threading.Thread
         returns=str,
     )
-    def save(self, filename, save_all=False):
-        # Attach missing extension to filename
+    def save(
+        self, filename, save_all=False, callback=None, components_realize=(),
+        filename_final='',
+    ):
+        """Particle components within components_realize are not
+        expected to hold any data. Instead, these are realised directly
+        into the snapshot file, in chunks, so that the particle data
+        never has to be held in memory.
+        If the snapshot is to be renamed once completely written,
+        its final filename should be passed as filename_final, so that
+        the virtual datasets refer to the sub-file directory by its
+        final name. The sub-file directory must then be renamed
+        along with the snapshot file.
+        """
+        # Attach missing extension to filenames
         if not filename.endswith('.hdf5'):
             filename += '.hdf5'
+        if not filename_final:
+            filename_final = filename
+        if not filename_final.endswith('.hdf5'):
+            filename_final += '.hdf5'
+        # Finish off any snapshots still being written
+        # in the background.
+        wait_for_snapshots()
         # Print out message
         masterprint(f'Saving snapshot "{filename}" ...')
+        # When using sub-files, each process writes its particle data
+        # to its own file within the sub-file directory. The particle
+        # datasets to be written to the sub-file are collected
+        # in subfile_datasets and written after the snapshot file
+        # itself has been written.
+        subfile_datasets = None
+        subfiles_dirname = ''
+        subfiles_dirname_final = ''
+        if concept_snapshot_params['subfiles'] and any([
+            component.representation == 'particles' and component not in components_realize
+            for component in self.components
+        ]):
+            subfile_datasets = []
+            subfiles_dirname = get_subfiles_dirname(filename)
+            subfiles_dirname_final = get_subfiles_dirname(filename_final)
+            if master:
+                if os.path.isdir(subfiles_dirname):
+                    shutil.rmtree(subfiles_dirname)
+                os.makedirs(subfiles_dirname)
+            Barrier()
         with open_hdf5(filename, mode='w', driver='mpio', comm=comm) as hdf5_file:
             # Save used base units
             hdf5_file.attrs['unit time'  ] = self.units['time']
@@ -144,6 +199,8 @@ class ConceptSnapshot:
             hdf5_file.attrs['boxsize']       = correct_float(self.params['boxsize'])
             hdf5_file.attrs[unicode('Ωb')]   = correct_float(self.params['Ωb'])
             hdf5_file.attrs[unicode('Ωcdm')] = correct_float(self.params['Ωcdm'])
+            if subfile_datasets is not None:
+                hdf5_file.attrs['subfiles'] = nprocs
             # Store each component as a separate group
             # within /components.
             for component in self.components:
@@ -157,19 +214,64 @@ class ConceptSnapshot:
                         f'Writing out {component.name} '
                         f'({N_str} {component.species}) particle{plural} ...'
                     )
+                    if component in components_realize:
+                        # Realise the particles directly into datasets
+                        # within the snapshot file. As the mass is set
+                        # by the realisation, the particle attributes
+                        # are saved afterwards.
+                        datasets = {}
+                        for dataset_name in ('pos', 'mom'):
+                            dtype, fixed = self.get_particle_dtype(dataset_name)
+                            datasets[dataset_name] = (
+                                self.create_particle_dataset(
+                                    component_h5, dataset_name, (N, 3), dtype,
+                                    concept_snapshot_params['compression'] if nprocs == 1 else None,
+                                ),
+                                fixed,
+                            )
+                            if fixed:
+                                datasets[dataset_name][0].attrs['format'] = 'fixed'
+                        if component.use_ids:
+                            datasets['ids'] = (
+                                self.create_particle_dataset(
+                                    component_h5, 'ids', (N, ), np.uint64,
+                                    concept_snapshot_params['compression'] if nprocs == 1 else None,
+                                ),
+                                False,
+                            )
+                        realize_particles(
+                            component, self.params['a'], datasets, self.write_particle_data,
+                        )
+                        component_h5.attrs['mass'] = correct_float(component.mass)
+                        component_h5.attrs['N'] = N
+                        hdf5_file.flush()
+                        Barrier()
+                        masterprint('done')
+                        continue
                     # Save particle attributes
                     component_h5.attrs['mass'] = correct_float(component.mass)
                     component_h5.attrs['N'] = N
-                    # Get local indices of the particle data
-                    start_local = int(np.sum(smart_mpi(N_local, mpifun='allgather')[:rank]))
-                    end_local = start_local + component.N_local
+                    # Get global offsets of the particle data
+                    # of each process.
+                    offsets = asarray(
+                        np.concatenate((
+                            [0], np.cumsum(smart_mpi(N_local, mpifun='allgather')),
+                        )),
+                        dtype=C2np['Py_ssize_t'],
+                    )
+                    if subfile_datasets is not None:
+                        component_h5.attrs['subfile offsets'] = asarray(offsets)
                     # Save particle data
                     if save_all or component.snapshot_vars['save']['pos']:
-                        pos_h5 = component_h5.create_dataset('pos', (N, 3), dtype=C2np['double'])
-                        pos_h5[start_local:end_local, :] = component.pos_mv3[:N_local, :]
+                        self.save_particle_dataset(
+                            component_h5, subfile_datasets, subfiles_dirname_final, 'pos',
+                            asarray(component.pos_mv3)[:N_local, :], offsets,
+                        )
                     if save_all or component.snapshot_vars['save']['mom']:
-                        mom_h5 = component_h5.create_dataset('mom', (N, 3), dtype=C2np['double'])
-                        mom_h5[start_local:end_local, :] = component.mom_mv3[:N_local, :]
+                        self.save_particle_dataset(
+                            component_h5, subfile_datasets, subfiles_dirname_final, 'mom',
+                            asarray(component.mom_mv3)[:N_local, :], offsets,
+                        )
                     if component.use_ids:
                         # Store IDs as unsigned integers using as few
                         # bits as possible. We explicitly reinterpret
@@ -187,9 +289,11 @@ class ConceptSnapshot:
                             dtype = np.uint16
                         else:
                             dtype = np.uint8
-                        ids_h5 = component_h5.create_dataset('ids', (N, ), dtype=dtype)
                         ids_mv_unsigned = asarray(component.ids_mv).view(np.uint64)
-                        ids_h5[start_local:end_local] = ids_mv_unsigned[:N_local]
+                        self.save_particle_dataset(
+                            component_h5, subfile_datasets, subfiles_dirname_final, 'ids',
+                            ids_mv_unsigned[:N_local], offsets, dtype,
+                        )
                 elif component.representation == 'fluid':
                     # Write out progress message
                     masterprint(
@@ -288,11 +392,233 @@ class ConceptSnapshot:
                 hdf5_file.flush()
                 Barrier()
                 masterprint('done')
+        # Write out the particle data to the sub-files
+        if subfile_datasets is not None:
+            if concept_snapshot_params['asynchronous']:
+                # Hand the writing of the sub-file over to a background
+                # thread. As the simulation continues to alter the
+                # particle data, this data is first copied to staging
+                # buffers owned by the thread. The thread only performs
+                # serial I/O to the sub-file of this process and never
+                # makes use of MPI. In particular it must not call
+                # abort(), and so errors are recorded in failures and
+                # picked up within wait_for_snapshots().
+                subfile_datasets = [
+                    (group_name, dataset_name, asarray(data).copy(), dtype, fixed)
+                    for group_name, dataset_name, data, dtype, fixed in subfile_datasets
+                ]
+                failures = []
+                thread = threading.Thread(
+                    target=write_subfile_background,
+                    args=(self, subfiles_dirname, subfile_datasets, failures),
+                    name=f'snapshot writer {rank}',
+                    daemon=True,
+                )
+                thread.start()
+                snapshots_in_progress.append((thread, failures, filename, callback))
+                masterprint('done')
+                return filename
+            self.write_subfile(subfiles_dirname, subfile_datasets)
+            Barrier()
+        if callback is not None:
+            callback()
         # Done saving the snapshot
         masterprint('done')
         # Return the filename of the saved file
         return filename
 
+    # Method for saving a particle dataset (positions, momenta or IDs)
+    # of a component, either directly within the snapshot file
+    # or within the sub-files. In the latter case, the dataset is
+    # appended to subfile_datasets for later writing to the sub-file
+    # of this process, while a virtual dataset referring to the
+    # sub-files is created within the snapshot file. The sub-files are
+    # referred to through the (final) name of their directory,
+    # relative to the snapshot file.
+    @cython.header(
+        # Arguments
+        component_h5=object,  # h5py.Group
+        subfile_datasets=object,  # list or None
+        subfiles_dirname_final=str,
+        dataset_name=str,
+        data=object,  # np.ndarray
+        offsets='Py_ssize_t[::1]',
+        dtype=object,  # np.dtype or None
+        # Locals
+        compression=object,  # str or None
+        dataset_h5=object,  # h5py.Dataset
+        fixed='bint',
+        h5py=object,  # module
+        layout=object,  # h5py.VirtualLayout
+        N='Py_ssize_t',
+        other_rank='int',
+        shape_tail=tuple,
+        size='Py_ssize_t',
+        source=object,  # h5py.VirtualSource
+        returns='void',
+    )
+    def save_particle_dataset(
+        self, component_h5, subfile_datasets, subfiles_dirname_final, dataset_name, data,
+        offsets, dtype=None,
+    ):
+        N = offsets[nprocs]
+        shape_tail = data.shape[1:]
+        # Determine the data type to use on disk
+        fixed = False
+        if dtype is None:
+            dtype, fixed = self.get_particle_dtype(dataset_name)
+        if subfile_datasets is None:
+            # Create the dataset within the snapshot file, with all
+            # processes writing to their own part. Parallel writes to
+            # a single file do not support compression filters.
+            compression = None
+            if nprocs == 1:
+                compression = concept_snapshot_params['compression']
+            dataset_h5 = self.create_particle_dataset(
+                component_h5, dataset_name, (N, ) + shape_tail, dtype, compression,
+            )
+            self.write_particle_data(dataset_h5, data, offsets[rank], fixed)
+        else:
+            # Postpone the writing of the data to the sub-file
+            subfile_datasets.append((component_h5.name, dataset_name, data, dtype, fixed))
+            # Create a virtual dataset within the snapshot file,
+            # stitching together the datasets of all sub-files.
+            # This is a collective operation.
+            with warnings.catch_warnings(action='ignore', category=UserWarning):
+                import h5py
+            layout = h5py.VirtualLayout(shape=(N, ) + shape_tail, dtype=dtype)
+            for other_rank in range(nprocs):
+                size = offsets[other_rank + 1] - offsets[other_rank]
+                if size == 0:
+                    continue
+                source = h5py.VirtualSource(
+                    f'{os.path.basename(subfiles_dirname_final)}/{other_rank}.hdf5',
+                    f'{component_h5.name}/{dataset_name}',
+                    shape=(size, ) + shape_tail,
+                )
+                layout[offsets[other_rank]:offsets[other_rank + 1]] = source
+            dataset_h5 = component_h5.create_virtual_dataset(dataset_name, layout)
+        if fixed:
+            dataset_h5.attrs['format'] = 'fixed'
+
+    # Method returning the data type to use on disk for the given
+    # particle dataset, together with a flag specifying whether
+    # fixed-point format is used. Positions may be stored as 32-bit
+    # fixed-point numbers relative to the box.
+    @cython.header(
+        # Arguments
+        dataset_name=str,
+        # Locals
+        dataformat=object,  # int or str
+        returns=tuple,
+    )
+    def get_particle_dtype(self, dataset_name):
+        dataformat = concept_snapshot_params['dataformat'][dataset_name]
+        if dataformat == 'fixed':
+            return np.uint32, True
+        elif dataformat == 32:
+            return C2np['float'], False
+        return C2np['double'], False
+
+    # Method for writing the particle datasets collected by
+    # save_particle_dataset() to the sub-file of this process.
+    # This is a non-collective operation, which is allowed to run
+    # in a background thread. Any MPI calls (including those of abort()
+    # and open_hdf5()) are then disallowed, and so the sub-file is
+    # opened through h5py directly. As the file is new and private to
+    # this process, there is no need to wait for it to become available.
+    @cython.pheader(
+        # Arguments
+        subfiles_dirname=str,
+        subfile_datasets=list,
+        # Locals
+        data=object,  # np.ndarray
+        dataset_h5=object,  # h5py.Dataset
+        dataset_name=str,
+        dtype=object,  # np.dtype
+        fixed='bint',
+        group_name=str,
+        h5py=object,  # module
+        returns='void',
+    )
+    def write_subfile(self, subfiles_dirname, subfile_datasets):
+        with warnings.catch_warnings(action='ignore', category=UserWarning):
+            import h5py
+        with h5py.File(f'{subfiles_dirname}/{rank}.hdf5', mode='w') as subfile:
+            for group_name, dataset_name, data, dtype, fixed in subfile_datasets:
+                dataset_h5 = self.create_particle_dataset(
+                    subfile.require_group(group_name), dataset_name, data.shape, dtype,
+                    concept_snapshot_params['compression'],
+                )
+                self.write_particle_data(dataset_h5, data, 0, fixed)
+                if fixed:
+                    dataset_h5.attrs['format'] = 'fixed'
+
+    # Method for creating a chunked (and possibly compressed)
+    # particle dataset.
+    @cython.header(
+        # Arguments
+        group_h5=object,  # h5py.Group or h5py.File
+        dataset_name=str,
+        shape=tuple,
+        dtype=object,  # np.dtype
+        compression=object,  # str or None
+        # Locals
+        chunk_size='Py_ssize_t',
+        chunks=object,  # tuple or None
+        size='Py_ssize_t',
+        returns=object,  # h5py.Dataset
+    )
+    def create_particle_dataset(self, group_h5, dataset_name, shape, dtype, compression):
+        size = shape[0]
+        chunks = None
+        if size > 0:
+            chunk_size = concept_snapshot_params['chunk size']
+            if chunk_size < 1:
+                chunk_size = self.chunk_size_auto
+            chunks = (pairmin(chunk_size, size), ) + shape[1:]
+        else:
+            compression = None
+        return group_h5.create_dataset(
+            dataset_name, shape, dtype=dtype,
+            chunks=chunks, compression=compression, shuffle=bool(compression),
+        )
+
+    # Method for writing particle data in blocks to a dataset,
+    # starting at index_file within the dataset. If dim is given, the
+    # one-dimensional data is written to this column of the dataset.
+    @cython.pheader(
+        # Arguments
+        dataset_h5=object,  # h5py.Dataset
+        data=object,  # np.ndarray
+        index_file='Py_ssize_t',
+        fixed='bint',
+        dim='int',
+        # Locals
+        N_local='Py_ssize_t',
+        data_block=object,  # np.ndarray
+        index='Py_ssize_t',
+        index_end='Py_ssize_t',
+        step='Py_ssize_t',
+        returns='void',
+    )
+    def write_particle_data(self, dataset_h5, data, index_file, fixed, dim=-1):
+        N_local = data.shape[0]
+        step = pairmax(
+            1, self.chunk_size_max//8//np.prod(data.shape[1:], dtype=C2np['Py_ssize_t']),
+        )
+        for index in range(0, N_local, step):
+            index_end = pairmin(index + step, N_local)
+            data_block = data[index:index_end]
+            if fixed:
+                data_block = np.mod(
+                    np.floor(data_block*(2**32/self.params['boxsize'])), 2**32,
+                ).astype(dataset_h5.dtype)
+            if dim == -1:
+                dataset_h5[index_file + index:index_file + index_end] = data_block
+            else:
+                dataset_h5[index_file + index:index_file + index_end, dim] = data_block
+
     # Method for loading in a CO𝘕CEPT snapshot from disk
     @cython.pheader(
         # Argument
@@ -306,24 +632,29 @@ class ConceptSnapshot:
         boltzmann_order='Py_ssize_t',
         chunk_size='Py_ssize_t',
         component='Component',
+        dataset_name=str,
         domain_size_i='Py_ssize_t',
         domain_size_j='Py_ssize_t',
         domain_size_k='Py_ssize_t',
         fluidscalar='FluidScalar',
         grid='double*',
         gridsize='Py_ssize_t',
+        has_ids='bint',
         id_counter='Py_ssize_t',
         ids='Py_ssize_t*',
         index='Py_ssize_t',
+        index_begin='Py_ssize_t',
+        index_end='Py_ssize_t',
         index_i='Py_ssize_t',
         index_i_file='Py_ssize_t',
         indexᵖ='Py_ssize_t',
-        indexᵖ_file='Py_ssize_t',
         indexʳ='Py_ssize_t',
         mass='double',
         mom='double*',
         multi_index=tuple,
         name=str,
+        offsets='Py_ssize_t[::1]',
+        other_rank='Py_ssize_t',
         plural=str,
         pos='double*',
         representation=str,
@@ -407,20 +738,14 @@ class ConceptSnapshot:
                     N_str = get_cubenum_strrep(N)
                     plural = ('s' if N > 1 else '')
                     masterprint(f'Reading in {name} ({N_str} {species}) particle{plural} ...')
-                    # Extract HDF5 datasets
-                    pos_h5 = None
+                    # Check for needed HDF5 datasets
                     if component.snapshot_vars['load']['pos']:
                         if 'pos' not in component_h5:
                             abort(f'No positions ("pos") found for component {component.name}')
-                        pos_h5 = component_h5['pos']
-                    mom_h5 = None
                     if component.snapshot_vars['load']['mom']:
                         if 'mom' not in component_h5:
                             abort(f'No momenta ("mom") found for component {component.name}')
-                        mom_h5 = component_h5['mom']
-                    ids_h5 = None
-                    if component.use_ids and 'ids' in component_h5:
-                        ids_h5 = component_h5['ids']
+                    has_ids = (component.use_ids and 'ids' in component_h5)
                     # Compute a fair distribution of
                     # particle data to the processes.
                     start_local, N_local = partition(N)
@@ -430,11 +755,11 @@ class ConceptSnapshot:
                     component.resize(N_local, only_loadable=True)
                     # Read particle data into the particle data arrays
                     dsets_arrs = []
-                    if pos_h5 is not None:
-                        dsets_arrs.append((pos_h5, asarray(component.pos_mv3)))
-                    if mom_h5 is not None:
-                        dsets_arrs.append((mom_h5, asarray(component.mom_mv3)))
-                    if ids_h5 is not None:
+                    if component.snapshot_vars['load']['pos']:
+                        dsets_arrs.append(('pos', asarray(component.pos_mv3)))
+                    if component.snapshot_vars['load']['mom']:
+                        dsets_arrs.append(('mom', asarray(component.mom_mv3)))
+                    if has_ids:
                         # The particle IDs are stored as unsigned
                         # {64, 32, 16, 8}-bit ints in the snapshot,
                         # while they are stored as signed 64-bit ints in
@@ -442,22 +767,47 @@ class ConceptSnapshot:
                         # unsigned 64-bit. The convertion from
                         # {32, 16, 8}-bit to 64-bit will be done on the
                         # fly by HDF5.
-                        dsets_arrs.append((ids_h5, asarray(component.ids_mv).view(np.uint64)))
+                        dsets_arrs.append(('ids', asarray(component.ids_mv).view(np.uint64)))
                     if N_local > 0:
-                        for dset, arr in dsets_arrs:
-                            # Load in using chunks
-                            chunk_size = np.min((N_local, ℤ[self.chunk_size_max//8//3]))
-                            for indexᵖ in range(0, N_local, chunk_size):
-                                if indexᵖ + chunk_size > N_local:
-                                    chunk_size = N_local - indexᵖ
-                                indexᵖ_file = start_local + indexᵖ
-                                source_sel = slice(indexᵖ_file, indexᵖ_file + chunk_size)
-                                dest_sel   = slice(indexᵖ,      indexᵖ      + chunk_size)
-                                if arr.ndim == 2:
-                                    # Positions, momenta
-                                    source_sel = (source_sel, slice(None))
-                                    dest_sel   = (dest_sel,   slice(None))
-                                dset.read_direct(arr, source_sel=source_sel, dest_sel=dest_sel)
+                        for dataset_name, arr in dsets_arrs:
+                            if 'subfile offsets' in component_h5.attrs:
+                                # Read directly from the sub-files
+                                # overlapping with the local part
+                                # of the data, circumventing the
+                                # virtual dataset.
+                                offsets = asarray(
+                                    component_h5.attrs['subfile offsets'],
+                                    dtype=C2np['Py_ssize_t'],
+                                )
+                                for other_rank in range(offsets.shape[0] - 1):
+                                    index_begin = pairmax(offsets[other_rank], start_local)
+                                    index_end = pairmin(
+                                        offsets[other_rank + 1], ℤ[start_local + N_local],
+                                    )
+                                    if index_begin >= index_end:
+                                        continue
+                                    with open_hdf5(
+                                        f'{get_subfiles_dirname(filename)}/{other_rank}.hdf5',
+                                        mode='r',
+                                        individual=True,
+                                    ) as subfile:
+                                        self.load_particle_dataset(
+                                            subfile[f'{component_h5.name}/{dataset_name}'],
+                                            component_h5[dataset_name],
+                                            arr,
+                                            index_begin - offsets[other_rank],
+                                            index_begin - start_local,
+                                            index_end - index_begin,
+                                        )
+                            else:
+                                self.load_particle_dataset(
+                                    component_h5[dataset_name],
+                                    component_h5[dataset_name],
+                                    arr,
+                                    start_local,
+                                    0,
+                                    N_local,
+                                )
                         # If the snapshot and the current run uses
                         # different systems of units, multiply the
                         # positions and momenta by the snapshot units.
@@ -474,7 +824,7 @@ class ConceptSnapshot:
                         # IDs but none are stored in the snapshot,
                         # assign IDs according to the order in which
                         # they are stored in the file.
-                        if component.use_ids and ids_h5 is None:
+                        if component.use_ids and not has_ids:
                             masterprint('Assigning particle IDs ...')
                             ids = component.ids
                             for indexᵖ in range(N_local):
@@ -609,6 +959,60 @@ class ConceptSnapshot:
         # Done loading the snapshot
         masterprint('done')
 
+    # Method for reading in count particles of a particle dataset
+    # (positions, momenta or IDs), starting at index_file within the
+    # dataset, into the array arr starting at index_arr. Attributes
+    # (e.g. the data format) are read from dataset_attrs_h5, which may
+    # differ from dataset_h5 when reading from sub-files.
+    @cython.header(
+        # Arguments
+        dataset_h5=object,  # h5py.Dataset
+        dataset_attrs_h5=object,  # h5py.Dataset
+        arr=object,  # np.ndarray
+        index_file='Py_ssize_t',
+        index_arr='Py_ssize_t',
+        count='Py_ssize_t',
+        # Locals
+        buffer=object,  # np.ndarray
+        chunk_size='Py_ssize_t',
+        dest_sel=object,  # slice or tuple
+        factor='double',
+        fixed='bint',
+        index='Py_ssize_t',
+        source_sel=object,  # slice or tuple
+        returns='void',
+    )
+    def load_particle_dataset(
+        self, dataset_h5, dataset_attrs_h5, arr, index_file, index_arr, count,
+    ):
+        if count == 0:
+            return
+        # Positions stored as 32-bit fixed-point numbers are read into
+        # a buffer and then converted to floating-point, placing each
+        # particle at the centre of its fixed-point cell.
+        fixed = (dataset_attrs_h5.attrs.get('format') == 'fixed')
+        chunk_size = pairmin(count, ℤ[self.chunk_size_max//8//3])
+        if fixed:
+            buffer = empty((chunk_size, ) + arr.shape[1:], dtype=np.uint32)
+            factor = dataset_attrs_h5.file.attrs['boxsize']/2**32
+        # Load in using chunks
+        for index in range(0, count, chunk_size):
+            if index + chunk_size > count:
+                chunk_size = count - index
+            source_sel = slice(index_file + index, index_file + index + chunk_size)
+            dest_sel   = slice(index_arr  + index, index_arr  + index + chunk_size)
+            if arr.ndim == 2:
+                # Positions, momenta
+                source_sel = (source_sel, slice(None))
+                dest_sel   = (dest_sel,   slice(None))
+            if fixed:
+                dataset_h5.read_direct(
+                    buffer, source_sel=source_sel, dest_sel=(slice(0, chunk_size), slice(None)),
+                )
+                arr[dest_sel] = (buffer[:chunk_size] + 0.5)*factor
+            else:
+                dataset_h5.read_direct(arr, source_sel=source_sel, dest_sel=dest_sel)
+
     # This method populate the snapshot with component data
     # and additional parameters.
     def populate(self, components, params=None):
@@ -956,8 +1360,12 @@ class GadgetSnapshot:
         num_write_files=list,
         num_write_files_tot='Py_ssize_t[:, ::1]',
         num_write_max='Py_ssize_t',
+        num_write_procs='Py_ssize_t[::1]',
         num_writeoute_jobs='Py_ssize_t',
+        offset='Py_ssize_t',
+        offsets_files=list,
         parallel_write='bint',
+        positional_write='bint',
         rank_next='int',
         rank_prev='int',
         request=object,  # mpi4py.MPI.Request
@@ -1126,14 +1534,33 @@ class GadgetSnapshot:
         # and following job, as well as whether it is up to this
         # specific job to also initialize the file, initialize
         # the block, finalize the block.
+        # When using positional writes, the order is irrelevant, as
+        # each job knows the offset into the (pre-sized) file at which
+        # to write its data.
         WriteoutJob = collections.namedtuple(
             'WriteoutJob',
             (
                 'initialize_file', 'initialize_block', 'finalize_block',
                 'jobid_prev', 'jobid_next',
                 'file_index', 'block_name', 'component_index', 'indices',
+                'offset',
             ),
         )
+        positional_write = (gadget_snapshot_params['parallel write'] == 'positional')
+        if positional_write:
+            # Write out the headers and block delimiters of all files,
+            # pre-sizing the files. Each process handles a subset of
+            # the files. All processes need to know the file offsets
+            # at which the data of each block begins.
+            Barrier()
+            offsets_files = [
+                self.write_skeleton(
+                    filename, num_files, file_index, num_write_files_tot[file_index], blocks,
+                    write=(file_index%nprocs == rank),
+                )
+                for file_index in range(num_files)
+            ]
+            Barrier()
         writeout_jobs = {}
         indices_components = zeros(len(self.components), dtype=C2np['Py_ssize_t'])
         for file_index, num_write_file in enumerate(num_write_files):
@@ -1150,9 +1577,23 @@ class GadgetSnapshot:
                 # Add (incomplete) writeout job IDs
                 for block_index, block_name in enumerate(blocks):
                     writeout_jobid = (file_index, block_index, component_index, rank)
+                    offset = -1
+                    if positional_write:
+                        # The data of this job goes after that of the
+                        # previous components within the block and after
+                        # that of the lower ranked processes
+                        # for this component.
+                        offset = offsets_files[file_index][block_name] + (
+                            np.sum(
+                                num_write_files_tot[file_index, :component_index],
+                                dtype=C2np['Py_ssize_t'],
+                            )
+                            + np.sum(num_write_procs[:rank], dtype=C2np['Py_ssize_t'])
+                        )*struct.calcsize(blocks[block_name]['type'])
                     writeout_jobs[writeout_jobid] = WriteoutJob(
                         *[None]*5,
                         file_index, block_name, component_index, (indexᵖ_bgn, indexᵖ_end),
+                        offset,
                     )
         # Let all processes know about all writeout job IDs
         writeout_jobids = sorted(itertools.chain(*allgather(list(writeout_jobs))))
@@ -1160,8 +1601,16 @@ class GadgetSnapshot:
         # Find neighbour writeout job IDs and update the missing
         # fields accordingly. If we are not writing in parallel,
         # let each writeout job depend on the previous one.
-        parallel_write = gadget_snapshot_params['parallel write']
+        # With positional writes, the jobs are independent.
+        parallel_write = bool(gadget_snapshot_params['parallel write'])
         for writeout_jobid, writeout_job in writeout_jobs.items():
+            if positional_write:
+                writeout_jobs[writeout_jobid] = writeout_job._replace(
+                    initialize_file=False,
+                    initialize_block=False,
+                    finalize_block=False,
+                )
+                continue
             index_left = 0
             index_rght = num_writeoute_jobs - 1
             index = -1
@@ -1297,6 +1746,7 @@ class GadgetSnapshot:
         indexʳ='Py_ssize_t',
         indexʳ_bgn='Py_ssize_t',
         indexʳ_end='Py_ssize_t',
+        mode=str,
         num_files='Py_ssize_t',
         num_write='Py_ssize_t',
         size_write='Py_ssize_t',
@@ -1344,7 +1794,10 @@ class GadgetSnapshot:
         # Begin block
         if writeout_job.initialize_block:
             self.write_block_bgn(filename, block_size, block_name)
-        # Write out the block contents in chunks
+        # Write out the block contents in chunks, either appending to
+        # the file or writing at the offset specified by the job
+        # within the pre-sized file.
+        mode = ('ab' if writeout_job.offset == -1 else 'r+b')
         chunk_singleprec_ptr = NULL
         chunk_doubleprec_ptr = NULL
         if chunk_singleprec is not None:
@@ -1357,7 +1810,9 @@ class GadgetSnapshot:
             indexʳ_end = 3*indexᵖ_end
             size_write = 3*num_write
             chunk_size = np.min((size_write, ℤ[self.chunk_size_max//8]))
-            with open_file(filename, mode='ab') as f:
+            with open_file(filename, mode=mode) as f:
+                if writeout_job.offset != -1:
+                    f.seek(writeout_job.offset)
                 indexʳ = indexʳ_bgn
                 while indexʳ != indexʳ_end:
                     if indexʳ + chunk_size > indexʳ_end:
@@ -1393,7 +1848,9 @@ class GadgetSnapshot:
                         )
         elif block_name == 'ID':
             chunk_size = np.min((num_write, ℤ[self.chunk_size_max//8]))
-            with open_file(filename, mode='ab') as f:
+            with open_file(filename, mode=mode) as f:
+                if writeout_job.offset != -1:
+                    f.seek(writeout_job.offset)
                 indexᵖ = indexᵖ_bgn
                 while indexᵖ != indexᵖ_end:
                     if indexᵖ + chunk_size > indexᵖ_end:
@@ -1414,6 +1871,43 @@ class GadgetSnapshot:
         if writeout_job.finalize_block:
             self.write_block_end(filename, block_size)
 
+    # Method for writing out the HEAD block as well as the beginning
+    # and end of all other blocks to a file, leaving room for the block
+    # data in between. The file offsets at which the data of each block
+    # should be written are returned. If write is False, nothing is
+    # written to disk, though the offsets are still returned.
+    def write_skeleton(
+        self, filename, num_files, file_index, num_particles_file_tot, blocks, write=True,
+    ):
+        if num_files > 1:
+            filename = f'{filename}/{output_bases["snapshot"]}.{file_index}'
+        # Determine the sizes of the block delimiters
+        with io.BytesIO() as f:
+            self.write_block_bgn(f, 0, self.block_name_header)
+            size_bgn = f.tell()
+        size_end = sizesC['I']
+        # Compute the offsets to the data of each block
+        offsets = {}
+        offset = size_bgn + self.headersize + size_end
+        for block_name, block in blocks.items():
+            offsets[block_name] = offset + size_bgn
+            block_size = np.sum(num_particles_file_tot)*struct.calcsize(block['type'])
+            offset += size_bgn + block_size + size_end
+        if not write:
+            return offsets
+        # Write out the header and block delimiters
+        self.write_header(filename, num_particles_file_tot)
+        with open_file(filename, mode='r+b') as f:
+            for block_name, block in blocks.items():
+                block_size = np.sum(num_particles_file_tot)*struct.calcsize(block['type'])
+                f.seek(offsets[block_name] - size_bgn)
+                self.write_block_bgn(f, block_size, block_name)
+                f.seek(offsets[block_name] + block_size)
+                self.write_block_end(f, block_size)
+            # Pre-size the file
+            f.truncate(offset)
+        return offsets
+
     # Method for divvying up the particles of each processes
     # between the files to be written.
     def divvy(self, return_num_files=False):
@@ -1741,11 +2235,11 @@ class GadgetSnapshot:
         N_local='Py_ssize_t',
         N_str=str,
         block=dict,
+        block_locations=list,
         block_name=str,
         block_size='Py_ssize_t',
         block_type=str,
         blocks=dict,
-        blocks_required=set,
         bytes_per_particle='int',
         bytes_per_particle_dim='int',
         check='int',
@@ -1761,9 +2255,9 @@ class GadgetSnapshot:
         components_skipped_names=list,
         data='double[::1]',
         data_components=list,
+        data_mmap=object,  # np.memmap
         data_value='double',
         dtype=object,
-        end_of_file='bint',
         filename_candidate=str,
         filename_glob=str,
         filename_i=str,
@@ -1800,11 +2294,12 @@ class GadgetSnapshot:
         num_particle_files=list,
         num_read='Py_ssize_t',
         num_read_file=list,
-        num_read_file_locals=list,
         num_read_files=list,
+        num_read_files_all=list,
         offset='Py_ssize_t',
+        offset_block='Py_ssize_t',
         offset_header='Py_ssize_t',
-        offset_nextblock='Py_ssize_t',
+        other_rank='int',
         plural=str,
         representation=str,
         size_read='Py_ssize_t',
@@ -2070,71 +2565,25 @@ class GadgetSnapshot:
             blocks.pop('POS', None)
         if not load_vel:
             blocks.pop('VEL', None)
-        # Read in each file in turn
+        # Locate the required blocks within each file up front, so that
+        # all processes know where to find their data and can read it
+        # in concurrently, without passing file offsets between them.
+        block_locations = bcast(
+            self.locate_blocks(filenames, offset_header, blocks, num_particles_files)
+            if master else None
+        )
+        # Get the number of particles of each type to be read in from
+        # each file by all processes, from which the byte ranges
+        # to be read in by the local process can be computed.
+        num_read_files_all = allgather(num_read_files)
+        # Read in each file in turn, with each process only touching
+        # the files containing particles assigned to it.
         for i, filename_i in enumerate(filenames):
-            if num_files > 1:
-                masterprint(f'Reading snapshot file {i}/{num_files - 1} ...')
+            if len(filenames) > 1:
+                masterprint(f'Reading snapshot file {i}/{len(filenames) - 1} ...')
             num_particles_file = np.sum(num_particles_files[i])
             num_read_file = num_read_files[i]
-            # Iterate over required blocks. The order is not important
-            # and will be determined from the file. All files should
-            # contain all of the required blocks.
-            offset_nextblock = offset_header
-            blocks_required = set(blocks.keys())
-            end_of_file = False
-            if self.snapformat == 1:
-                # For SnapFormat 1 the block names are left out of the
-                # snapshot, but they occur in a specific order.
-                # The header block has already been read in.
-                self.block_names = iter(self.get_blocks_info('names'))
-                next(self.block_names)
-            while True:
-                # Find next required block
-                if rank == 0:
-                    with open_file(filename_i, mode='rb') as f:
-                        while True:
-                            # Seek to next block
-                            offset_nextblock, block_size, block_name = (
-                                self.read_block_bgn(f, offset_nextblock)
-                            )
-                            if offset_nextblock == -1:
-                                end_of_file = True
-                                break
-                            if block_name not in blocks:
-                                masterprint(f'Skipping block "{block_name}"')
-                                continue
-                            if block_name not in blocks_required:
-                                masterwarn(f'Skipping repeated block "{block_name}"')
-                                continue
-                            if block_size%num_particles_file:
-                                abort(
-                                    f'File {filename_i} contains {num_particles_file} particles '
-                                    f'but its "{block_name}" block has a size of {block_size} '
-                                    f'bytes, which does not divide the particle number.'
-                                )
-                            # Arrived at required block
-                            offset = f.tell()
-                            break
-                    bcast(end_of_file)
-                    if end_of_file:
-                        if blocks_required == {'ID'}:
-                            # IDs are required but not found within the
-                            # file. We shall generate these ourselves.
-                            break
-                        elif blocks_required:
-                            plural = ('s' if len(blocks_required) > 1 else '')
-                            abort(
-                                f'Could not find required block{plural}',
-                                ', '.join([f'"{block_name}"' for block_name in blocks_required]),
-                            )
-                        break
-                    bcast((block_name, block_size))
-                else:
-                    end_of_file = bcast()
-                    if end_of_file:
-                        break
-                    block_name, block_size = bcast()
-                blocks_required.remove(block_name)
+            for block_name, (offset_block, block_size) in block_locations[i].items():
                 block = blocks[block_name]
                 data_components = block.get('data')
                 unit_components = block.get('unit')
@@ -2152,7 +2601,8 @@ class GadgetSnapshot:
                     )
                 # Iterate over all components. The block is organised
                 # so that all data belonging to a given component
-                # is provided consecutively.
+                # is provided consecutively, with the data of each
+                # component distributed over the processes in order.
                 if block_name in {'POS', 'VEL'}:
                     if bytes_per_particle_dim == 4:
                         # Single-precision floating point format
@@ -2168,68 +2618,62 @@ class GadgetSnapshot:
                     for j, (num_read, component, data, unit) in enumerate(
                         zip(num_read_file, self.components, data_components, unit_components)
                     ):
+                        if component is None or num_read == 0:
+                            continue
                         size_read = 3*num_read
-                        # Get file offset from previous process
-                        if rank > 0 or (nprocs > 1 and j > 0):
-                            offset = recv(source=mod(rank - 1, nprocs))
-                        # Read in block data
-                        if component is not None and num_read > 0:
-                            with open_file(filename_i, mode='rb') as f:
-                                # Seek to where the previous
-                                # process left off.
-                                f.seek(offset)
-                                # Read in using chunks
-                                chunk_size = np.min((size_read, ℤ[self.chunk_size_max//8]))
-                                for indexʳ in range(0, size_read, chunk_size):
-                                    if indexʳ + chunk_size > size_read:
-                                        chunk_size = size_read - indexʳ
-                                    chunk = data[indexʳ:(indexʳ + chunk_size)]
-                                    chunk_ptr = cython.address(chunk[:])
-                                    # Read in chunk, then copy it to
-                                    # double precision chunk while
-                                    # applying unit conversion. In the
-                                    # case of positions, safeguard
-                                    # against round-off errors.
-                                    chunk_arr = np.fromfile(
-                                        f,
-                                        dtype=dtype,
-                                        count=chunk_size,
-                                    )
-                                    if chunk_arr.shape[0] < chunk_size:
-                                        abort(f'Ran out of bytes in block "{block_name}"')
+                        # Read in block data through a memory map.
+                        # This is opened in copy-on-write mode as typed
+                        # memory views cannot be read-only.
+                        offset = offset_block + bytes_per_particle*(
+                            np.sum(num_particles_files[i][:j], dtype=C2np['Py_ssize_t'])
+                            + np.sum(
+                                [
+                                    num_read_files_all[other_rank][i][j]
+                                    for other_rank in range(rank)
+                                ],
+                                dtype=C2np['Py_ssize_t'],
+                            )
+                        )
+                        data_mmap = np.memmap(
+                            filename_i, dtype=dtype, mode='c', offset=offset, shape=size_read,
+                        )
+                        # Read in using chunks
+                        chunk_size = np.min((size_read, ℤ[self.chunk_size_max//8]))
+                        for indexʳ in range(0, size_read, chunk_size):
+                            if indexʳ + chunk_size > size_read:
+                                chunk_size = size_read - indexʳ
+                            chunk = data[indexʳ:(indexʳ + chunk_size)]
+                            chunk_ptr = cython.address(chunk[:])
+                            # Copy chunk into the double-precision
+                            # component data while applying
+                            # unit conversion.
+                            chunk_arr = data_mmap[indexʳ:(indexʳ + chunk_size)]
+                            if 𝔹[dtype is C2np['float']]:
+                                chunk_singleprec = chunk_arr
+                                chunk_singleprec_ptr = cython.address(chunk_singleprec[:])
+                            else:  # dtype is C2np['double']:
+                                chunk_doubleprec = chunk_arr
+                                chunk_doubleprec_ptr = cython.address(chunk_doubleprec[:])
+                            for index_chunk in range(chunk_size):
+                                with unswitch(1):
                                     if 𝔹[dtype is C2np['float']]:
-                                        chunk_singleprec = chunk_arr
-                                        chunk_singleprec_ptr = cython.address(chunk_singleprec[:])
-                                    else:  # dtype is C2np['double']:
-                                        chunk_doubleprec = chunk_arr
-                                        chunk_doubleprec_ptr = cython.address(chunk_doubleprec[:])
-                                    # Copy single-precision chunk
-                                    # into chunk while applying
-                                    # unit conversion.
-                                    for index_chunk in range(chunk_size):
-                                        with unswitch(1):
-                                            if 𝔹[dtype is C2np['float']]:
-                                                data_value = chunk_singleprec_ptr[index_chunk]*unit
-                                            else:  # dtype is C2np['double']
-                                                data_value = chunk_doubleprec_ptr[index_chunk]*unit
-                                        # In the case of positions,
-                                        # safeguard against
-                                        # round-off errors.
-                                        with unswitch(3):
-                                            if block_name == 'POS':
-                                                if data_value >= boxsize:
-                                                    data_value -= boxsize
-                                        chunk_ptr[index_chunk] = data_value
-                            # Crop the populated part of the data away
-                            # from the memory view. Note that this
-                            # changes the content of the block object
-                            # returned by get_blocks_info().
-                            data_components[j] = data[size_read:]
-                        # Update offset, to be used by the next process
-                        offset += size_read*dtype().itemsize
-                        # Inform the next process about the file offset
-                        if rank < nprocs - 1 or (nprocs > 1 and j < len(self.components) - 1):
-                            send(offset, dest=mod(rank + 1, nprocs))
+                                        data_value = chunk_singleprec_ptr[index_chunk]*unit
+                                    else:  # dtype is C2np['double']
+                                        data_value = chunk_doubleprec_ptr[index_chunk]*unit
+                                # In the case of positions,
+                                # safeguard against
+                                # round-off errors.
+                                with unswitch(3):
+                                    if block_name == 'POS':
+                                        if data_value >= boxsize:
+                                            data_value -= boxsize
+                                chunk_ptr[index_chunk] = data_value
+                        del data_mmap
+                        # Crop the populated part of the data away
+                        # from the memory view. Note that this
+                        # changes the content of the block object
+                        # returned by get_blocks_info().
+                        data_components[j] = data[size_read:]
                 elif block_name == 'ID':
                     # The particle IDs are stored as 32- or 64-bit
                     # unsigned ints. We read them in as signed ints,
@@ -2246,59 +2690,42 @@ class GadgetSnapshot:
                     for j, (num_read, component, ids_mv) in enumerate(
                         zip(num_read_file, self.components, data_components)
                     ):
-                        # Get file offset from previous process
-                        if rank > 0 or (nprocs > 1 and j > 0):
-                            offset = recv(source=mod(rank - 1, nprocs))
-                        # Read in block data
-                        if component is not None and component.use_ids and num_read > 0:
-                            with open_file(filename_i, mode='rb') as f:
-                                # Seek to where the previous
-                                # process left off.
-                                f.seek(offset)
-                                # Read in using chunks
-                                chunk_size = np.min((num_read, ℤ[self.chunk_size_max//8]))
-                                for indexᵖ in range(0, num_read, chunk_size):
-                                    if indexᵖ + chunk_size > num_read:
-                                        chunk_size = num_read - indexᵖ
-                                    # Read in chunk and copy it into the
-                                    # component data array, implicitly
-                                    # converting to 64-bit as necessary.
-                                    chunk_arr = np.fromfile(
-                                        f,
-                                        dtype=dtype,
-                                        count=chunk_size,
-                                    )
-                                    if chunk_arr.shape[0] < chunk_size:
-                                        abort(f'Ran out of bytes in block "{block_name}"')
-                                    ids_arr = asarray(ids_mv[indexᵖ:(indexᵖ + chunk_size)])
-                                    ids_arr[:] = chunk_arr
-                            # Crop the populated part of the data away
-                            # from the memory view. Note that this
-                            # changes the content of the block object
-                            # returned by get_blocks_info().
-                            data_components[j] = ids_mv[num_read:]
-                        # Update offset, to be used by the next process
-                        offset += num_read*dtype().itemsize
-                        # Inform the next process about the file offset
-                        if rank < nprocs - 1 or (nprocs > 1 and j < len(self.components) - 1):
-                            send(offset, dest=mod(rank + 1, nprocs))
+                        if component is None or not component.use_ids or num_read == 0:
+                            continue
+                        # Read in block data through a memory map,
+                        # implicitly converting to 64-bit as necessary.
+                        offset = offset_block + bytes_per_particle*(
+                            np.sum(num_particles_files[i][:j], dtype=C2np['Py_ssize_t'])
+                            + np.sum(
+                                [
+                                    num_read_files_all[other_rank][i][j]
+                                    for other_rank in range(rank)
+                                ],
+                                dtype=C2np['Py_ssize_t'],
+                            )
+                        )
+                        data_mmap = np.memmap(
+                            filename_i, dtype=dtype, mode='r', offset=offset, shape=num_read,
+                        )
+                        ids_arr = asarray(ids_mv[:num_read])
+                        ids_arr[:] = data_mmap
+                        del data_mmap
+                        # Crop the populated part of the data away
+                        # from the memory view. Note that this
+                        # changes the content of the block object
+                        # returned by get_blocks_info().
+                        data_components[j] = ids_mv[num_read:]
                 else:
                     abort(f'Does not know how to read {self.name} block "{block_name}"')
-                # Let all the processes catch up,
-                # ensuring that the file is closed.
-                Barrier()
             # If any of the components should make use of particle IDs
             # but none are stored in the snapshot file, assign IDs
             # according to the order in which the particles
             # are stored within the file.
-            if blocks_required == {'ID'}:
+            if 'ID' in blocks and 'ID' not in block_locations[i]:
                 masterprint('Assigning particle IDs ...')
                 block = blocks['ID']
                 data_components = block.get('data')
-                # Get number of particles of each type
-                # which should have been read by each process.
-                num_read_file_locals = allgather(num_read_file)
-                # Loop as when reading in, but do so in parallel
+                # Loop as when reading in
                 for j, (num_read, component, ids_mv) in enumerate(
                     zip(num_read_file, self.components, data_components)
                 ):
@@ -2307,8 +2734,8 @@ class GadgetSnapshot:
                     # Get local starting index
                     start_local = np.sum(
                         [
-                            num_read_file_local[j]
-                            for num_read_file_local in num_read_file_locals[:rank]
+                            num_read_files_all[other_rank][i][j]
+                            for other_rank in range(rank)
                         ],
                         dtype=C2np['Py_ssize_t'],
                     )
@@ -2322,8 +2749,8 @@ class GadgetSnapshot:
                     # Update ID counter, accounting for all processes
                     id_counters[j] += np.sum(
                         [
-                            num_read_file_local[j]
-                            for num_read_file_local in num_read_file_locals
+                            num_read_files_all[other_rank][i][j]
+                            for other_rank in range(nprocs)
                         ],
                         dtype=C2np['Py_ssize_t'],
                     )
@@ -2331,6 +2758,9 @@ class GadgetSnapshot:
             # Done loading this snapshot file
             if len(filenames) > 1:
                 masterprint('done')
+        # Let all the processes catch up,
+        # ensuring that all files are closed.
+        Barrier()
         # Done loading entire snapshot
         self.components = [
             component
@@ -2340,6 +2770,65 @@ class GadgetSnapshot:
         masterprint('done')
         masterprint('done')
 
+    # Method for locating the required blocks within each file
+    # of a snapshot. A list with an element for each file is returned,
+    # each element being a dict mapping block names to the file offset
+    # at which the data of the block begins and the size of the data.
+    # As the data is later read in through memory maps, each block is
+    # checked to lie entirely within the file, so that truncated files
+    # are caught here.
+    # Only the master process should call this method.
+    def locate_blocks(self, filenames, offset_header, blocks, num_particles_files):
+        block_locations = []
+        for filename_i, num_particles_file in zip(
+            filenames, map(np.sum, num_particles_files),
+        ):
+            block_locations.append({})
+            offset_nextblock = offset_header
+            blocks_required = set(blocks.keys())
+            if self.snapformat == 1:
+                # For SnapFormat 1 the block names are left out of the
+                # snapshot, but they occur in a specific order.
+                # The header block has already been read in.
+                self.block_names = iter(self.get_blocks_info('names'))
+                next(self.block_names)
+            with open_file(filename_i, mode='rb') as f:
+                file_size = os.fstat(f.fileno()).st_size
+                while blocks_required:
+                    # Seek to next block
+                    offset_nextblock, block_size, block_name = (
+                        self.read_block_bgn(f, offset_nextblock)
+                    )
+                    if offset_nextblock == -1:
+                        break
+                    if block_name not in blocks:
+                        masterprint(f'Skipping block "{block_name}"')
+                        continue
+                    if block_name not in blocks_required:
+                        masterwarn(f'Skipping repeated block "{block_name}"')
+                        continue
+                    if block_size%num_particles_file:
+                        abort(
+                            f'File {filename_i} contains {num_particles_file} particles '
+                            f'but its "{block_name}" block has a size of {block_size} '
+                            f'bytes, which does not divide the particle number.'
+                        )
+                    # Arrived at required block
+                    if f.tell() + block_size > file_size:
+                        abort(f'Ran out of bytes in block "{block_name}"')
+                    blocks_required.remove(block_name)
+                    block_locations[-1][block_name] = (f.tell(), block_size)
+            # IDs are allowed to be missing, in which case
+            # we shall generate these ourselves.
+            blocks_required.discard('ID')
+            if blocks_required:
+                plural = ('s' if len(blocks_required) > 1 else '')
+                abort(
+                    f'Could not find required block{plural}',
+                    ', '.join([f'"{block_name}"' for block_name in blocks_required]),
+                )
+        return block_locations
+
     # Method for reading in the initial HEAD block
     # of a GADGET snapshot file.
     def read_header(self, f):
@@ -3030,6 +3519,9 @@ class TipsySnapshot:
     params=dict,
     snapshot_type=str,
     save_all='bint',
+    callback=object,  # callable or None
+    components_realize=object,  # sequence of Components
+    filename_final=str,
     # Locals
     component='Component',
     components=list,
@@ -3039,7 +3531,8 @@ class TipsySnapshot:
 )
 def save(
     one_or_more_components, filename,
-    params=None, snapshot_type=snapshot_type, save_all=False,
+    params=None, snapshot_type=snapshot_type, save_all=False, callback=None,
+    components_realize=(), filename_final='',
 ):
     """The type of snapshot to be saved may be given as the
     snapshot_type argument. If not given, it defaults to the value
@@ -3050,6 +3543,16 @@ def save(
     the snapshot_vars component attribute. If you wish to overrule this
     and force every component to be included fully,
     set save_all to True.
+    A callback function may be passed, which will be called
+    (by all processes) once the snapshot has been completely written
+    to disk. For CO𝘕CEPT snapshots written asynchronously, this happens
+    within wait_for_snapshots().
+    Particle components listed in components_realize will be realised
+    directly into the snapshot file, which is only supported for
+    CO𝘕CEPT snapshots.
+    For CO𝘕CEPT snapshots with sub-files which are to be renamed once
+    completely written (e.g. by the callback), pass the final filename
+    as filename_final.
     """
     if not filename:
         abort('An empty filename was passed to snapshot.save()')
@@ -3090,7 +3593,87 @@ def save(
     # Save the snapshot to disk.
     # The (maybe altered) filename is returned,
     # which should also be the return value of this function.
-    return snapshot.save(filename, save_all)
+    if isinstance(snapshot, ConceptSnapshot):
+        return snapshot.save(
+            filename, save_all, callback, components_realize, filename_final,
+        )
+    if components_realize:
+        abort(
+            f'Realisation of particles directly into the snapshot file '
+            f'is not implemented for snapshots of type "{snapshot_type}"'
+        )
+    filename = snapshot.save(filename, save_all)
+    if callback is not None:
+        callback()
+    return filename
+
+# List of snapshots currently being written in the background,
+# stored as (thread, failures, filename, callback) tuples, with thread
+# the thread writing the sub-file of this process and failures a list
+# to which the thread adds the traceback of any error.
+cython.declare(snapshots_in_progress=list)
+snapshots_in_progress = []
+
+# Function for writing the sub-file of a CO𝘕CEPT snapshot, meant to be
+# run within a background thread. As MPI (and thus abort()) must not be
+# used from within this thread, errors are recorded in the passed
+# failures list rather than raised.
+@cython.pheader(
+    # Arguments
+    snapshot=object,  # ConceptSnapshot
+    subfiles_dirname=str,
+    subfile_datasets=list,
+    failures=list,
+    returns='void',
+)
+def write_subfile_background(snapshot, subfiles_dirname, subfile_datasets, failures):
+    try:
+        snapshot.write_subfile(subfiles_dirname, subfile_datasets)
+    except BaseException:
+        failures.append(traceback.format_exc())
+
+# Function for waiting on snapshots being written in the background,
+# as initiated by ConceptSnapshot.save() when using asynchronous
+# writing. Once all snapshots are completely written by all processes,
+# their callback functions will be called.
+# This is a collective operation.
+@cython.pheader(
+    # Locals
+    callback=object,  # callable or None
+    failures=list,
+    filename=str,
+    thread=object,  # threading.Thread
+    returns='void',
+)
+def wait_for_snapshots():
+    if not allreduce(len(snapshots_in_progress), op=MPI.SUM):
+        return
+    masterprint('Waiting for snapshots being written in the background ...')
+    for thread, failures, filename, callback in snapshots_in_progress:
+        thread.join()
+        if failures:
+            abort(
+                f'Process {rank} failed to write its part of snapshot "{filename}":\n'
+                + '\n'.join(failures)
+            )
+    Barrier()
+    for thread, failures, filename, callback in snapshots_in_progress:
+        if callback is not None:
+            callback()
+    snapshots_in_progress.clear()
+    masterprint('done')
+
+# Function returning the name of the directory containing
+# the sub-files of a CO𝘕CEPT snapshot. As the name is derived from
+# the snapshot filename, a snapshot must be moved or renamed together
+# with its sub-file directory.
+@cython.pheader(
+    # Arguments
+    filename=str,
+    returns=str,
+)
+def get_subfiles_dirname(filename):
+    return f'{filename.removesuffix(ConceptSnapshot.extension)}_subfiles'
 
 # Function that loads a snapshot file.
 # The type of snapshot can be any of the implemented.
@@ -2590,23 +2590,12 @@ class Component:
         # Locals
         N_subtiles='Py_ssize_t',
         count='Py_ssize_t',
-        data_quantity='double*',
         dim='int',
-        dim_quantity='Py_ssize_t',
         highest_populated_rung='signed char',
-        ids='Py_ssize_t*',
-        indexᵖ='Py_ssize_t',
-        indexʳ='Py_ssize_t',
-        indexˣ='Py_ssize_t',
-        indexˣ_tmp='Py_ssize_t',
         lowest_populated_rung='signed char',
-        quantity='int',
-        quantityx='double*',
-        quantityy='double*',
-        quantityz='double*',
+        order='Py_ssize_t*',
+        order_mv='Py_ssize_t[::1]',
         rung='Py_ssize_t*',
-        rung_indices='signed char*',
-        rung_indices_jumped='signed char*',
         rung_particle_index='Py_ssize_t',
         rungs_N='Py_ssize_t*',
         subtile='Py_ssize_t**',
@@ -2623,11 +2612,6 @@ class Component:
         tiling_location='double[::1]',
         tiling_plural=str,
         tiling_names=object,  # list, collections.Counter, str
-        tmp_ids='Py_ssize_t*',
-        tmp_ids_mv='Py_ssize_t[::1]',
-        tmp_rung_indices='signed char*',
-        tmp_rung_indices_mv='signed char[::1]',
-        tmp_quantity='double*',
         returns='void',
     )
     def tile_sort(self, tiling_name, subtiling_name=''):
@@ -2671,102 +2655,254 @@ class Component:
         subtiles                   = subtiling.tiles
         N_subtiles                 = subtiling.size
         subtiles_contain_particles = subtiling.contain_particles
-        # Iterate over the tiles and subtiles while keeping a counter
-        # keeping track of the particle visiting number. We copy the
-        # particle data (positions, momenta, IDs, rung indices) to a
-        # temporary buffer using the visiting order. After the iteration
-        # we then copy this sorted buffer into the original data arrays.
-        # For the 64-bit data (positions, momenta, IDs) we use Δmom as
-        # the temporary buffer, as this should not store any data at the
-        # time of calling this method. For the rungs, we use the
-        # rung_indices_arr buffer from the communication module, which
-        # we enlarge if needed. As the Δmom buffer can only store one
-        # quantity at a time (i.e. not all positions and all momenta
-        # and all IDs), we iterate over the tiles and subtiles several
-        # times: 2 times if not using IDs and 3 times if using IDs,
-        # with the first iteration handling the IDs. Importantly, the
-        # positions and rung indices must be sorted during the last
-        # iteration, as the iteration itself depends on these
-        # through subtiling.sort().
-        tmp_quantity = self.Δmom
-        tmp_ids_mv = asarray(self.Δmom_mv).view(C2np['Py_ssize_t'])
-        tmp_ids = cython.address(tmp_ids_mv[:])
-        ids = self.ids
-        rung_indices        = self.rung_indices
-        rung_indices_jumped = self.rung_indices_jumped
-        if self.use_rungs and rung_indices_arr.shape[0] < self.N_local:
-            rung_indices_arr.resize(self.N_local, refcheck=False)
-        tmp_rung_indices_mv = rung_indices_arr
-        tmp_rung_indices = cython.address(tmp_rung_indices_mv[:])
-        for quantity in range(int(not self.use_ids), 3):
-            if quantity == 1:
-                data_quantity = self.mom
-            elif quantity == 2:
-                data_quantity = self.pos
-            count = 0
-            # Loop over all tiles
-            for tile_index in range(tiling.size):
-                if tiles_contain_particles[tile_index] == 0:
+        # Iterate over the tiles and subtiles while recording the
+        # particle visiting order. The order is stored in the Δmom
+        # buffer (viewed as integers), as this should not store any
+        # data at the time of calling this method. The particle data is
+        # then permuted according to this order.
+        order_mv = asarray(self.Δmom_mv).view(C2np['Py_ssize_t'])
+        order = cython.address(order_mv[:])
+        count = 0
+        # Loop over all tiles
+        for tile_index in range(tiling.size):
+            if tiles_contain_particles[tile_index] == 0:
+                continue
+            # Sort particles within the tile into subtiles
+            tile_index3D = tiling.tile_index3D(tile_index)
+            for dim in range(3):
+                tile_location[dim] = tiling_location[dim] + tile_index3D[dim]*tile_extent[dim]
+            subtiling.relocate(tile_location)
+            subtiling.sort(tiling, tile_index)
+            subtiles_rungs_N = subtiling.tiles_rungs_N
+            # Loop over all subtiles in the tile
+            for subtile_index in range(N_subtiles):
+                if subtiles_contain_particles[subtile_index] == 0:
                     continue
-                # Sort particles within the tile into subtiles
-                tile_index3D = tiling.tile_index3D(tile_index)
-                for dim in range(3):
-                    tile_location[dim] = tiling_location[dim] + tile_index3D[dim]*tile_extent[dim]
-                subtiling.relocate(tile_location)
-                subtiling.sort(tiling, tile_index)
-                subtiles_rungs_N = subtiling.tiles_rungs_N
-                # Loop over all subtiles in the tile
-                for subtile_index in range(N_subtiles):
-                    if subtiles_contain_particles[subtile_index] == 0:
+                subtile = subtiles[subtile_index]
+                rungs_N = subtiles_rungs_N[subtile_index]
+                # Loop over all rungs in the subtile
+                for rung_index in range(lowest_populated_rung, ℤ[highest_populated_rung + 1]):
+                    rung_N = rungs_N[rung_index]
+                    if rung_N == 0:
                         continue
-                    subtile = subtiles[subtile_index]
-                    rungs_N = subtiles_rungs_N[subtile_index]
-                    # Loop over all rungs in the subtile
-                    for rung_index in range(lowest_populated_rung, ℤ[highest_populated_rung + 1]):
-                        rung_N = rungs_N[rung_index]
-                        if rung_N == 0:
-                            continue
-                        rung = subtile[rung_index]
-                        # Loop over all particles in the rung
-                        for rung_particle_index in range(rung_N):
-                            indexᵖ = rung[rung_particle_index]
-                            # Copy the data to the temporary buffers
-                            with unswitch(4):
-                                if quantity == 0:
-                                    # IDs
-                                    tmp_ids[count] = ids[indexᵖ]
-                                else:
-                                    # Momenta and positions
-                                    indexˣ = 3*indexᵖ
-                                    indexˣ_tmp = 3*count
-                                    for dim_quantity in range(3):
-                                        tmp_quantity[indexˣ_tmp + dim_quantity] = (
-                                            data_quantity[indexˣ + dim_quantity]
-                                        )
-                                    # Rungs
-                                    with unswitch(4):
-                                        if quantity == 2 and self.use_rungs:
-                                            tmp_rung_indices[count] = rung_indices[indexᵖ]
-                            count += 1
-            # Copy the sorted data back into the data arrays
-            if quantity == 0:
-                # IDs
-                for indexᵖ in range(self.N_local):
-                    ids[indexᵖ] = tmp_ids[indexᵖ]
-            else:
-                # Momenta and positions
-                for indexʳ in range(3*self.N_local):
-                    data_quantity[indexʳ] = tmp_quantity[indexʳ]
-            if quantity == 2 and self.use_rungs:
-                # Rungs
-                for indexᵖ in range(self.N_local):
-                    rung_index = tmp_rung_indices[indexᵖ]
-                    rung_indices       [indexᵖ] = rung_index
-                    rung_indices_jumped[indexᵖ] = rung_index  # no jump
+                    rung = subtile[rung_index]
+                    # Record the visiting order of all particles
+                    # in the rung.
+                    for rung_particle_index in range(rung_N):
+                        order[count] = rung[rung_particle_index]
+                        count += 1
+        self.permute(order)
         # Finally we need to re-sort the tiling
         tiling.sort()
         masterprint('done')
 
+    # Method for sorting particles in memory according to the Morton
+    # (Z-order) index of the grid cell they occupy, within a global grid
+    # of the given size. This improves the cache locality of particle
+    # interpolation to and from grids of similar size. If no grid size
+    # is given, the largest potential grid size of the component is
+    # used. As with tile_sort(), the Δmom buffer is used for the
+    # sorting, and so this must not store any data at the time of
+    # calling this method. Note that any tilings on the component are
+    # not re-sorted.
+    @cython.header(
+        # Arguments
+        gridsize='Py_ssize_t',
+        # Locals
+        bucket='Py_ssize_t',
+        cellsize_inv='double',
+        counts='Py_ssize_t*',
+        index_i='Py_ssize_t',
+        index_j='Py_ssize_t',
+        index_k='Py_ssize_t',
+        index_max='Py_ssize_t',
+        indexᵖ='Py_ssize_t',
+        indexˣ='Py_ssize_t',
+        key='Py_ssize_t',
+        keys='Py_ssize_t*',
+        keys_mv='Py_ssize_t[::1]',
+        keys_sorted='Py_ssize_t*',
+        keys_sorted_mv='Py_ssize_t[::1]',
+        n_bits='int',
+        n_passes='int',
+        order='Py_ssize_t*',
+        order_buffer_mv='Py_ssize_t[::1]',
+        order_mv='Py_ssize_t[::1]',
+        order_sorted='Py_ssize_t*',
+        order_sorted_mv='Py_ssize_t[::1]',
+        pos='double*',
+        shift='int',
+        slot='Py_ssize_t',
+        swap='Py_ssize_t*',
+        returns='void',
+    )
+    def morton_sort(self, gridsize=-1):
+        if gridsize == -1:
+            gridsize = np.max([-1] + [
+                gridsize_potential
+                for dict_method in self.potential_gridsizes.values()
+                for gridsizes in dict_method.values()
+                for gridsize_potential in gridsizes
+            ])
+            if gridsize == -1:
+                return
+        masterprint(
+            f'Reordering {self.name} particles in memory according to '
+            f'the cells of a {gridsize}³ grid ...'
+        )
+        if self.N_local == 0:
+            masterprint('done')
+            return
+        # The Morton keys are stored in the global morton_keys_arr
+        # buffer, which we enlarge if needed. Its second half is used
+        # as scratch space during the sorting below.
+        if morton_keys_arr.shape[0] < 2*self.N_local:
+            morton_keys_arr.resize(2*self.N_local, refcheck=False)
+        keys_mv        = morton_keys_arr[:self.N_local]
+        keys_sorted_mv = morton_keys_arr[self.N_local:2*self.N_local]
+        keys        = cython.address(keys_mv[:])
+        keys_sorted = cython.address(keys_sorted_mv[:])
+        # Compute the Morton index of the grid cell of each particle.
+        # The cell indices are taken relative to the local domain,
+        # with 21 bits available for each dimension.
+        cellsize_inv = gridsize/boxsize
+        pos = self.pos
+        index_max = 0
+        for indexᵖ in range(self.N_local):
+            indexˣ = 3*indexᵖ
+            index_i = cast((pos[indexˣ    ] - domain_bgn_x)*cellsize_inv, 'Py_ssize_t')
+            index_j = cast((pos[indexˣ + 1] - domain_bgn_y)*cellsize_inv, 'Py_ssize_t')
+            index_k = cast((pos[indexˣ + 2] - domain_bgn_z)*cellsize_inv, 'Py_ssize_t')
+            index_i = pairmin(pairmax(index_i, 0), ℤ[2**21 - 1])
+            index_j = pairmin(pairmax(index_j, 0), ℤ[2**21 - 1])
+            index_k = pairmin(pairmax(index_k, 0), ℤ[2**21 - 1])
+            index_max = pairmax(index_max, index_i | index_j | index_k)
+            keys[indexᵖ] = (
+                  morton_spread(index_i) << 2
+                | morton_spread(index_j) << 1
+                | morton_spread(index_k)
+            )
+        # Sort the particle indices according to the keys, using a
+        # least significant digit radix sort over the populated bits of
+        # the keys, 8 bits at a time. Being stable, this keeps the
+        # current order between particles within the same cell. The
+        # order is stored in the first N_local elements of the Δmom
+        # buffer (viewed as integers), as expected by permute(), with
+        # the following N_local elements used as scratch space.
+        order_buffer_mv = asarray(self.Δmom_mv).view(C2np['Py_ssize_t'])
+        order_mv        = order_buffer_mv[:self.N_local]
+        order_sorted_mv = order_buffer_mv[self.N_local:2*self.N_local]
+        order        = cython.address(order_mv[:])
+        order_sorted = cython.address(order_sorted_mv[:])
+        for indexᵖ in range(self.N_local):
+            order[indexᵖ] = indexᵖ
+        n_bits = 0
+        while index_max >> n_bits:
+            n_bits += 1
+        n_bits *= 3
+        counts = cython.address(morton_counts[:])
+        n_passes = 0
+        for shift in range(0, n_bits, 8):
+            for bucket in range(257):
+                counts[bucket] = 0
+            for indexᵖ in range(self.N_local):
+                bucket = (keys[indexᵖ] >> shift) & 255
+                counts[bucket + 1] += 1
+            for bucket in range(256):
+                counts[bucket + 1] += counts[bucket]
+            for indexᵖ in range(self.N_local):
+                key = keys[indexᵖ]
+                bucket = (key >> shift) & 255
+                slot = counts[bucket]
+                counts[bucket] += 1
+                keys_sorted[slot] = key
+                order_sorted[slot] = order[indexᵖ]
+            swap = keys
+            keys = keys_sorted
+            keys_sorted = swap
+            swap = order
+            order = order_sorted
+            order_sorted = swap
+            n_passes += 1
+        # After an odd number of passes, the sorted order resides
+        # in the scratch space. Copy it back.
+        if n_passes%2 == 1:
+            for indexᵖ in range(self.N_local):
+                order_sorted[indexᵖ] = order[indexᵖ]
+            order = order_sorted
+        # Permute the particle data according to the sorted keys
+        self.permute(order)
+        masterprint('done')
+
+    # Method for permuting the particle data in memory, so that the
+    # particle at index order[indexᵖ] is moved to index indexᵖ.
+    # The Δmom buffer beyond the first N_local elements is used as a
+    # temporary buffer, and so this must not store any data at the time
+    # of calling this method. The order array may occupy the first
+    # N_local elements of Δmom. For the rungs, we use the
+    # rung_indices_arr buffer from the communication module, which
+    # we enlarge if needed.
+    @cython.header(
+        # Arguments
+        order='Py_ssize_t*',
+        # Locals
+        data_quantity='double*',
+        dim='int',
+        ids='Py_ssize_t*',
+        indexᵖ='Py_ssize_t',
+        quantity='int',
+        rung_index='signed char',
+        rung_indices='signed char*',
+        rung_indices_jumped='signed char*',
+        tmp_ids='Py_ssize_t*',
+        tmp_ids_mv='Py_ssize_t[::1]',
+        tmp_quantity='double*',
+        tmp_quantity_mv='double[::1]',
+        tmp_rung_indices='signed char*',
+        tmp_rung_indices_mv='signed char[::1]',
+        returns='void',
+    )
+    def permute(self, order):
+        if self.N_local == 0:
+            return
+        tmp_quantity_mv = self.Δmom_mv[self.N_local:]
+        tmp_quantity = cython.address(tmp_quantity_mv[:])
+        # IDs
+        if self.use_ids:
+            ids = self.ids
+            tmp_ids_mv = asarray(tmp_quantity_mv).view(C2np['Py_ssize_t'])
+            tmp_ids = cython.address(tmp_ids_mv[:])
+            for indexᵖ in range(self.N_local):
+                tmp_ids[indexᵖ] = ids[order[indexᵖ]]
+            for indexᵖ in range(self.N_local):
+                ids[indexᵖ] = tmp_ids[indexᵖ]
+        # Momenta and positions,
+        # handled one dimension at a time.
+        for quantity in range(2):
+            if quantity == 0:
+                data_quantity = self.mom
+            else:
+                data_quantity = self.pos
+            for dim in range(3):
+                for indexᵖ in range(self.N_local):
+                    tmp_quantity[indexᵖ] = data_quantity[3*order[indexᵖ] + dim]
+                for indexᵖ in range(self.N_local):
+                    data_quantity[3*indexᵖ + dim] = tmp_quantity[indexᵖ]
+        # Rungs
+        if self.use_rungs:
+            rung_indices        = self.rung_indices
+            rung_indices_jumped = self.rung_indices_jumped
+            if rung_indices_arr.shape[0] < self.N_local:
+                rung_indices_arr.resize(self.N_local, refcheck=False)
+            tmp_rung_indices_mv = rung_indices_arr
+            tmp_rung_indices = cython.address(tmp_rung_indices_mv[:])
+            for indexᵖ in range(self.N_local):
+                tmp_rung_indices[indexᵖ] = rung_indices[order[indexᵖ]]
+            for indexᵖ in range(self.N_local):
+                rung_index = tmp_rung_indices[indexᵖ]
+                rung_indices       [indexᵖ] = rung_index
+                rung_indices_jumped[indexᵖ] = rung_index  # no jump
+
     # Method for integrating fluid values forward in time
     # due to "internal" source terms, meaning source terms that do not
     # result from interacting with other components.
@@ -3785,6 +3921,31 @@ class Component:
 cython.declare(tile_location='double[::1]')
 tile_location = empty(3, dtype=C2np['double'])
 
+# Buffers used by the Component.morton_sort() method
+cython.declare(
+    morton_counts='Py_ssize_t[::1]',
+    morton_keys_arr=object,  # np.ndarray
+)
+morton_counts = empty(257, dtype=C2np['Py_ssize_t'])
+morton_keys_arr = empty(1, dtype=C2np['Py_ssize_t'])
+
+# Function spreading out the lower 21 bits of the given integer,
+# so that bit b ends up as bit 3b. Interleaving three such spread
+# integers results in a Morton (Z-order) index.
+@cython.header(
+    # Arguments
+    x='Py_ssize_t',
+    returns='Py_ssize_t',
+)
+def morton_spread(x):
+    x &= 0x1fffff
+    x = (x | x << 32) & 0x1f00000000ffff
+    x = (x | x << 16) & 0x1f0000ff0000ff
+    x = (x | x <<  8) & 0x100f00f00f00f00f
+    x = (x | x <<  4) & 0x10c30c30c30c30c3
+    x = (x | x <<  2) & 0x1249249249249249
+    return x
+
 # Function for adding species to the universals_dict,
 # recording the presence of any species in use.
 @cython.header(
@@ -42,7 +42,7 @@ cimport(
     '    get_k_magnitudes,                '
     '    transferfunctions_registered,    '
 )
-cimport('from mesh import convert_particles_to_fluid')
+cimport('from mesh import convert_particles_to_fluid, plan_fftw')
 cimport(
     'from snapshot import     '
     '    compare_parameters,  '
@@ -877,6 +877,89 @@ def info():
         # End of information
         masterprint('')
 
+# Function that acquires FFTW wisdom for the grid sizes specified by
+# the special_params['gridsizes'] parameter, storing it in the
+# FFTW wisdom database.
+@cython.pheader(
+    # Locals
+    gridsizes=object,  # list or None
+    gridsizes_planned=list,
+)
+def wisdom():
+    if not fftw_wisdom_reuse:
+        abort('The wisdom utility requires fftw_wisdom_reuse to be True')
+    if not cython.compiled:
+        masterwarn('No FFTW wisdom is acquired in pure Python mode')
+        return
+    # Use the grid sizes implied by the parameters
+    # if none are given explicitly.
+    gridsizes = special_params.get('gridsizes')
+    if not gridsizes:
+        gridsizes = None
+    gridsizes_planned = plan_fftw(gridsizes)
+    if gridsizes_planned:
+        masterprint(
+            'FFTW wisdom acquired for grid size{} {} using {} process{}'.format(
+                's'*(len(gridsizes_planned) > 1),
+                ', '.join(map(str, gridsizes_planned)),
+                nprocs,
+                'es'*(nprocs > 1),
+            )
+        )
+    else:
+        masterprint(f'No new FFTW wisdom needed using {nprocs} process{"es"*(nprocs > 1)}')
+
+# Function that realises the initial conditions given by the
+# initial_conditions parameter and saves them as a snapshot,
+# with particle components realised directly into the snapshot file.
+@cython.pheader(
+    # Locals
+    component='Component',
+    components=list,
+    components_realize=list,
+    filename=str,
+    n_specified='Py_ssize_t',
+    output_base=str,
+    specifications=list,
+)
+def ics():
+    """Particle components are realised one chunk of slab planes at a
+    time, with the displaced positions and boosted momenta written
+    straight to the snapshot file, so that the particle data never has
+    to be held in memory. Components loaded from snapshots and fluid
+    components are handled as usual.
+    """
+    init_time()
+    if isinstance(initial_conditions, (str, dict)):
+        specifications = [initial_conditions]
+    else:
+        specifications = list(initial_conditions)
+    n_specified = len([
+        specification for specification in specifications if isinstance(specification, dict)
+    ])
+    components = get_initial_conditions(do_realization=False)
+    if not components:
+        abort('The ics utility requires the initial_conditions parameter to be set')
+    # The components instantiated from specifications
+    # are placed last.
+    components_realize = []
+    for component in components[len(components) - n_specified:]:
+        if component.representation == 'particles':
+            components_realize.append(component)
+        else:
+            component.realize()
+    # Construct filename of the snapshot
+    filename = special_params.get('filename')
+    if not filename:
+        output_base = output_bases['snapshot']
+        filename = '{}/{}{}{}'.format(
+            output_dirs['snapshot'],
+            output_base,
+            '_'*bool(output_base),
+            f'a={universals.a:.4g}' if enable_Hubble else f't={universals.t:.4g}',
+        )
+    save(components, filename, save_all=True, components_realize=components_realize)
+
 # Function that saves the processed CLASS background
 # and perturbations to an hdf5 file.
 @cython.pheader(
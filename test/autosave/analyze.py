@@ -0,0 +1,57 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from snapshot import load
+import species
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Function returning the particle positions of the snapshot
+# as read in by CO𝘕CEPT, ordered according to the particle IDs.
+def read_pos(filename):
+    component = load(filename, compare_params=False, only_components=True)[0]
+    N = component.N_local
+    ordering = np.argsort(asarray(component.ids_mv)[:N])
+    return asarray(component.pos_mv3)[:N][ordering, :]
+
+# Read in the particle data
+species.allow_similarly_named_components = True
+filename_autosave = glob(f'{this_dir}/autosave_killed/*/snapshot.hdf5')[0]
+pos_autosave = read_pos(filename_autosave)
+with open_hdf5(filename_autosave, mode='r') as hdf5_file:
+    component_h5 = hdf5_file['components/matter']
+    ordering = np.argsort(component_h5['ids'][...])
+    pos_autosave_virtual = component_h5['pos'][...][ordering, :]
+pos_reference = read_pos(glob(f'{this_dir}/output_reference/snapshot*.hdf5')[0])
+pos_resumed = read_pos(glob(f'{this_dir}/output/snapshot*.hdf5')[0])
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data ...')
+
+# The virtual datasets of the autosaved snapshot should refer to the
+# sub-files at their final location, reproducing the particle data
+# as read in by CO𝘕CEPT directly from the sub-files.
+if not np.all(pos_autosave_virtual == pos_autosave):
+    abort(
+        f'The virtual datasets of the autosaved snapshot "{filename_autosave}" '
+        f'do not reproduce the particle data of its sub-files'
+    )
+
+# The simulation resumed from the autosave should reproduce
+# the uninterrupted simulation.
+dist = pos_resumed - pos_reference
+dist -= boxsize*np.round(dist/boxsize)
+dist_mean = np.mean(sqrt(np.sum(dist**2, axis=1)))/boxsize
+tol = 1e-3
+if dist_mean > tol:
+    abort(
+        f'The simulation resumed from the autosave yields results different from '
+        f'the uninterrupted simulation, with a mean particle displacement of '
+        f'{dist_mean:.3e} boxsize'
+    )
+
+# Done analysing
+masterprint('done')
@@ -0,0 +1,42 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in the perturbations of both computations
+masterprint(f'Analysing {this_test} data ...')
+perturbations = {}
+k = {}
+for name in ('pool', 'reuse'):
+    with open_hdf5(glob(f'{this_dir}/output_{name}/*.hdf5')[0], mode='r') as f:
+        k[name] = f['perturbations/k'][:]
+        perturbations[name] = {
+            key: f[f'perturbations/{key}'][...]
+            for key in f['perturbations']
+            if key.startswith('delta_')
+        }
+
+# The k modes of the second computation should be those
+# of the first computation, with the first and last left out.
+if not np.allclose(k['reuse'], k['pool'][1:-1], rtol=1e-12, atol=0):
+    abort(
+        f'Expected the k modes {list(k["pool"][1:-1])} '
+        f'but got {list(k["reuse"])}'
+    )
+
+# The perturbations taken from the pool should match
+# those originally computed.
+for key, perturbation in perturbations['pool'].items():
+    if key not in perturbations['reuse']:
+        abort(f'Perturbation "{key}" missing from the computation using the pool')
+    if not np.allclose(
+        perturbations['reuse'][key], perturbation[:, 1:-1], rtol=1e-9, atol=0,
+    ):
+        abort(f'Perturbation "{key}" taken from the pool differs from the original')
+
+# Done analysing
+masterprint('done')
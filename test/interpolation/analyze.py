@@ -0,0 +1,107 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from species import Component
+from mesh import (
+    domain_bgn_x, domain_bgn_y, domain_bgn_z,
+    get_gridshape_local,
+    interpolate_domaingrid_to_particles,
+    interpolate_domaingrids_to_particles,
+    interpolate_particles,
+    particle_interpolation_loop_NGP,
+    particle_interpolation_loop_CIC,
+    particle_interpolation_loop_TSC,
+    particle_interpolation_loop_PCS,
+)
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Create randomly placed particles
+np.random.seed(42)
+component = Component('test particles', 'matter', N=_N, mass=1)
+for dim in 'xyz':
+    component.populate(boxsize*np.random.random(_N), f'pos{dim}')
+    component.populate(zeros(_N, dtype=C2np['double']), f'mom{dim}')
+component.Δmom_mv3[:component.N_local, :] = 0
+pos = asarray(component.pos_mv3)[:component.N_local]
+Δmom = asarray(component.Δmom_mv3)[:component.N_local]
+
+# Straightforward interpolation using the per-particle iterators,
+# visiting the grid points within the interpolation region of each
+# particle. With deposit True, the contributions of the particles are
+# added to the grid, which must then be given. Otherwise, the grid
+# values are gathered at each particle and returned.
+particle_interpolation_loops = {
+    1: particle_interpolation_loop_NGP,
+    2: particle_interpolation_loop_CIC,
+    3: particle_interpolation_loop_TSC,
+    4: particle_interpolation_loop_PCS,
+}
+def interpolate_iterator(grid, order, contribution=1, deposit=False):
+    gridsize = grid.shape[0] - 2*nghosts
+    cellsize = boxsize/gridsize
+    offset = asarray([domain_bgn_x, domain_bgn_y, domain_bgn_z]) - (
+        (1 + machine_ϵ)*(nghosts - 0.5*cell_centered)*cellsize
+    )
+    grid_flat = grid.reshape(-1)
+    size_j, size_k = grid.shape[1], grid.shape[2]
+    values = zeros(component.N_local, dtype=C2np['double'])
+    for indexᵖ in range(component.N_local):
+        x, y, z = (pos[indexᵖ] - offset)*((1/cellsize)*(1 - machine_ϵ))
+        for index, weight in particle_interpolation_loops[order](
+            x, y, z, size_j, size_k,
+        ):
+            if deposit:
+                grid_flat[index] += contribution*weight
+            else:
+                values[indexᵖ] += grid_flat[index]*weight
+    return values
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data ...')
+
+# Compare the implementations to the iterator implementation
+rtol = 1e-12
+for gridsize in _gridsizes:
+    shape = get_gridshape_local(gridsize)
+    for order in range(1, 5):
+        # Deposit the particles onto a grid
+        grid = zeros(shape, dtype=C2np['double'])
+        interpolate_particles(
+            component, gridsize, grid, 'ϱ', order, do_ghost_communication=False,
+        )
+        grid_iterator = zeros(shape, dtype=C2np['double'])
+        interpolate_iterator(
+            grid_iterator, order, component.mass*(gridsize/boxsize)**3, deposit=True,
+        )
+        if not np.allclose(grid, grid_iterator, rtol=rtol, atol=0):
+            abort(
+                f'Deposit of particles onto a grid of size {gridsize} using '
+                f'order {order} does not agree with the iterator implementation'
+            )
+        # Gather random grid values at the particles,
+        # first for a single grid and then for three grids at once.
+        grids = [np.random.random(shape) for dim in range(3)]
+        values_iterator = [interpolate_iterator(grid, order) for grid in grids]
+        Δmom[...] = 0
+        interpolate_domaingrid_to_particles(grids[0], component, 'Δmom', 0, order)
+        if not np.allclose(Δmom[:, 0], values_iterator[0], rtol=rtol, atol=0):
+            abort(
+                f'Gather of values from a grid of size {gridsize} using '
+                f'order {order} does not agree with the iterator implementation'
+            )
+        Δmom[...] = 0
+        interpolate_domaingrids_to_particles(*grids, component, 'Δmom', order)
+        for dim in range(3):
+            if not np.allclose(Δmom[:, dim], values_iterator[dim], rtol=rtol, atol=0):
+                abort(
+                    f'Gather of values from three grids of size {gridsize} using '
+                    f'order {order} does not agree with the iterator implementation'
+                )
+Δmom[...] = 0
+
+# Done analysing
+masterprint('done')
@@ -0,0 +1,116 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from snapshot import load
+import species
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in the particle positions of the 1LPT, 2LPT and 3LPT
+# realisations, ordered according to the particle IDs, which in turn
+# correspond to the lattice points in C order.
+species.allow_similarly_named_components = True
+pos = {}
+for lpt in (1, 2, 3):
+    filename = glob(f'{this_dir}/output/snapshot_lpt={lpt}*')[0]
+    component = load(filename, compare_params=False, only_components=True)[0]
+    N = component.N_local
+    ordering = np.argsort(asarray(component.ids_mv)[:N])
+    pos[lpt] = asarray(component.pos_mv3)[:N][ordering, :]
+gridsize = icbrt(N)
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data ...')
+
+# Function returning the displacement field between two sets of
+# particle positions, as a (3, gridsize, gridsize, gridsize) array.
+def get_displacement(pos_final, pos_initial):
+    dist = pos_final - pos_initial
+    dist -= boxsize*np.round(dist/boxsize)
+    return dist.T.reshape((3, gridsize, gridsize, gridsize))
+
+# Extract the first-order displacement field ψ
+indices = np.arange(gridsize)
+pos_lattice = np.stack(
+    np.meshgrid(indices, indices, indices, indexing='ij'), axis=-1,
+).reshape((N, 3))
+pos_lattice = (pos_lattice + 0.5*cell_centered)*(boxsize/gridsize)
+ψ = get_displacement(pos[1], pos_lattice)
+
+# Wave vectors of the grid. As in the realisations,
+# the origin and the Nyquist planes are nullified throughout.
+k_fundamental = 2*π/boxsize
+k1D = np.fft.fftfreq(gridsize, 1/gridsize)
+kvec = asarray(np.meshgrid(k1D, k1D, k1D, indexing='ij'))*k_fundamental
+k2 = np.sum(kvec**2, axis=0)
+mask = np.all(np.abs(kvec) < 0.5*gridsize*k_fundamental, axis=0) & (k2 > 0)
+k2[~mask] = 1
+def nullify(field_fourier):
+    field_fourier[~mask] = 0
+    return field_fourier
+
+# Compute ψ_ij = ∂ⱼψᵢ
+ψ_fourier = np.fft.fftn(ψ, axes=(1, 2, 3))
+ψ_ij = {
+    (i, j): np.fft.ifftn(nullify(1j*kvec[j]*ψ_fourier[i])).real
+    for i in range(3)
+    for j in range(3)
+}
+
+# The second-order source and the second-order displacement
+# potential derivatives ψ⁽²⁾_ij = ∂ᵢ∂ⱼ∇⁻²S⁽²⁾.
+S2 = sum(
+    ψ_ij[i, i]*ψ_ij[j, j] - ψ_ij[i, j]*ψ_ij[j, i]
+    for i in range(3)
+    for j in range(i + 1, 3)
+)
+S2_fourier = np.fft.fftn(S2)
+ψ2_ij = {
+    (i, j): np.fft.ifftn(nullify(kvec[i]*kvec[j]/k2*S2_fourier)).real
+    for i in range(3)
+    for j in range(3)
+}
+
+# The third-order source in Einstein-de Sitter, with third-order
+# growth factors D₃ₐ = -D³/3 and D₃ᵦ = 10/21 D³, and the (transverse)
+# third-order displacement field given by ∇∇⁻²S⁽³⁾.
+det = np.linalg.det(
+    np.stack(
+        [np.stack([ψ_ij[i, j] for j in range(3)], axis=-1) for i in range(3)],
+        axis=-2,
+    )
+)
+μ2 = 0.5*sum(
+    ψ_ij[i, i]*ψ2_ij[j, j] - ψ_ij[i, j]*ψ2_ij[i, j]
+    for i in range(3)
+    for j in range(3)
+    if i != j
+)
+S3 = 1/3*det - 10/21*μ2
+S3_fourier = np.fft.fftn(S3)
+ψ3_expected = asarray([
+    np.fft.ifftn(nullify(-1j*kvec[i]/k2*S3_fourier)).real
+    for i in range(3)
+])
+
+# Compare against the realised 3LPT displacement field
+ψ3 = get_displacement(pos[3], pos[2])
+ψ3_rms = sqrt(np.mean(ψ3_expected**2))
+if ψ3_rms < 1e-6*sqrt(np.mean(ψ**2)):
+    abort(
+        f'The expected 3LPT displacement field is vanishingly small. '
+        f'Is the test set up with a sufficiently late a_begin?'
+    )
+error_rel = sqrt(np.mean((ψ3 - ψ3_expected)**2))/ψ3_rms
+tol = 1e-6
+if error_rel > tol:
+    abort(
+        f'The realised 3LPT displacement field differs from the expected one '
+        f'by a relative (RMS) error of {error_rel:.3e}'
+    )
+
+# Done analysing
+masterprint('done')
@@ -0,0 +1,37 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in the power spectra
+powerspecs = {}
+for fname in glob(f'{this_dir}/powerspec_*'):
+    gridsize, interpolation, t = os.path.basename(fname).split('_')[1:]
+    powerspecs[int(gridsize), interpolation, int(t)] = np.loadtxt(fname)
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data ...')
+
+# Compare the power spectra obtained using the threaded interpolation
+# to those obtained using the serial interpolation. The only differences
+# should stem from the order in which the particle contributions are
+# summed up.
+for (gridsize, interpolation, t), powerspec in powerspecs.items():
+    if t == 1:
+        continue
+    powerspec_serial = powerspecs[gridsize, interpolation, 1]
+    if powerspec.shape != powerspec_serial.shape or not np.allclose(
+        powerspec, powerspec_serial, rtol=1e-9, atol=0, equal_nan=True,
+    ):
+        abort(
+            f'The power spectrum obtained using {interpolation} interpolation '
+            f'onto a grid of size {gridsize} with {t} threads differs from '
+            f'that obtained using a single thread'
+        )
+
+# Done analysing
+masterprint('done')
@@ -0,0 +1,58 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from snapshot import load
+import species
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in the particle positions of the CO𝘕CEPT snapshots,
+# ordered according to the particle IDs.
+species.allow_similarly_named_components = True
+labels = sorted(
+    os.path.basename(dname)[len('output_'):]
+    for dname in glob(f'{this_dir}/output_*')
+)
+a = []
+pos = {label: [] for label in labels}
+for label in labels:
+    for fname in sorted(
+        glob(f'{this_dir}/output_{label}/snapshot_a=*'),
+        key=(lambda s: s[(s.index('=') + 1):]),
+    ):
+        snapshot = load(fname, compare_params=False)
+        if label == labels[0]:
+            a.append(snapshot.params['a'])
+        component = snapshot.components[0]
+        N = component.N_local
+        ordering = np.argsort(asarray(component.ids_mv)[:N])
+        pos[label].append(asarray(component.pos_mv3)[:N][ordering, :])
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data ...')
+
+# Compare the particle positions of the runs using several threads
+# to those of the serial run. The only differences should stem from
+# the order in which the momentum updates are summed up.
+label_serial = '1x1'
+for label in labels:
+    if label == label_serial:
+        continue
+    for a_i, pos_serial, pos_threaded in zip(a, pos[label_serial], pos[label]):
+        dist = pos_threaded - pos_serial
+        dist -= boxsize*np.round(dist/boxsize)
+        dist_mean = np.mean(sqrt(np.sum(dist**2, axis=1)))/boxsize
+        tol = 1e-3
+        if dist_mean > tol:
+            n, t = label.split('x')
+            abort(
+                f'Running with {n} process(es) and {t} threads per process yields '
+                f'results different from the serial run at a = {a_i}, with a mean '
+                f'particle displacement of {dist_mean:.3e} boxsize'
+            )
+
+# Done analysing
+masterprint('done')
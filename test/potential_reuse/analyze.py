@@ -0,0 +1,60 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from snapshot import load
+import species
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in data from the CO𝘕CEPT snapshots, with the particles
+# ordered according to their IDs.
+species.allow_similarly_named_components = True
+potential_reuse_steps_list = sorted(
+    int(dname[(dname.index('_') + 1):])
+    for dname in [
+        os.path.basename(dname)
+        for dname in glob(f'{this_dir}/output_*')
+    ]
+)
+a = []
+pos = {potential_reuse_steps: [] for potential_reuse_steps in potential_reuse_steps_list}
+for potential_reuse_steps in potential_reuse_steps_list:
+    for fname in sorted(
+        glob(f'{this_dir}/output_{potential_reuse_steps}/snapshot_a=*'),
+        key=(lambda s: s[(s.index('=') + 1):]),
+    ):
+        snapshot = load(fname, compare_params=False)
+        if potential_reuse_steps == 0:
+            a.append(snapshot.params['a'])
+        component = snapshot.components[0]
+        ordering = np.argsort(component.ids)
+        pos[potential_reuse_steps].append(asarray(component.pos_mv3)[ordering, :])
+N_snapshots = len(a)
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data ...')
+
+# Compare the particle positions of the runs with reuse to those of
+# the run without reuse, in units of the mean inter-particle distance.
+# As the reuse is only allowed when the relative error on the source
+# density is below potential_reuse_tol, the positions should
+# agree closely.
+tol = 0.05
+for potential_reuse_steps in potential_reuse_steps_list[1:]:
+    for i in range(N_snapshots):
+        Δpos = pos[potential_reuse_steps][i] - pos[0][i]
+        Δpos -= boxsize*np.round(Δpos/boxsize)
+        dist = sqrt(np.sum(Δpos**2, axis=1))/(boxsize/_size)
+        if np.mean(dist) > tol:
+            abort(
+                f'The run with potential_reuse_steps = {potential_reuse_steps} '
+                f'deviates from the run without reuse of the potential at a = {a[i]}, '
+                f'with a mean particle displacement of {np.mean(dist)} '
+                f'times the mean inter-particle distance'
+            )
+
+# Done analysing
+masterprint('done')
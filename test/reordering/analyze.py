@@ -0,0 +1,60 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from snapshot import load
+import species
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in data from the CO𝘕CEPT snapshots, with the particles
+# ordered according to their IDs.
+species.allow_similarly_named_components = True
+def read(dirname):
+    data = []
+    for fname in sorted(
+        glob(f'{dirname}/snapshot_a=*'),
+        key=(lambda s: s[(s.index('=') + 1):]),
+    ):
+        component = load(fname, compare_params=False, only_components=True)[0]
+        ids = asarray(component.ids_mv)[:component.N_local]
+        if np.any(np.sort(ids) != arange(_size**3)):
+            abort(f'The particle IDs within "{fname}" are not preserved')
+        ordering = np.argsort(ids)
+        data.append((
+            asarray(component.pos_mv3)[ordering, :],
+            asarray(component.mom_mv3)[ordering, :],
+        ))
+    return data
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data ...')
+
+# Compare the particle data of the runs with and without reordering.
+# Only round-off errors due to the changed order of summation
+# are allowed.
+tol = 1e-6
+for dirname in sorted(glob(f'{this_dir}/output_*_False')):
+    run = os.path.basename(dirname).removeprefix('output_').removesuffix('_False')
+    data = read(dirname)
+    data_reordered = read(f'{this_dir}/output_{run}_deterministic')
+    if len(data) != len(data_reordered):
+        abort(f'Differing numbers of snapshots for run {run} with and without reordering')
+    for (pos, mom), (pos_reordered, mom_reordered) in zip(data, data_reordered):
+        Δpos = pos_reordered - pos
+        Δpos -= boxsize*np.round(Δpos/boxsize)
+        if np.max(np.abs(Δpos)) > tol*boxsize/_size:
+            abort(
+                f'The particle positions of run {run} with '
+                f'and without reordering do not agree'
+            )
+        if not np.allclose(mom_reordered, mom, rtol=0, atol=tol*np.std(mom)):
+            abort(
+                f'The particle momenta of run {run} with '
+                f'and without reordering do not agree'
+            )
+
+# Done analysing
+masterprint('done')
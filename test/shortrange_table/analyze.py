@@ -0,0 +1,117 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from snapshot import load
+import species
+plt = get_matplotlib().pyplot
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in the timings
+timings = {}
+with open_file(f'{this_dir}/timings', mode='r', encoding='utf-8') as f:
+    for line in f:
+        interpolation, size, t_begin, t_end = line.split()
+        timings[interpolation, int(size)] = float(t_end) - float(t_begin)
+table_specs = list(timings.keys())
+table_spec_reference = table_specs[0]
+
+# Read in data from the CO𝘕CEPT snapshots. As all simulations are run
+# using a single process, the particle order is the same
+# in all snapshots.
+species.allow_similarly_named_components = True
+a = []
+components = {table_spec: [] for table_spec in table_specs}
+for interpolation, size in table_specs:
+    for fname in sorted(
+        glob(f'{this_dir}/output_{interpolation}_{size}/snapshot_a=*'),
+        key=(lambda s: s[(s.index('=') + 1):]),
+    ):
+        snapshot = load(fname, compare_params=False)
+        if (interpolation, size) == table_spec_reference:
+            a.append(snapshot.params['a'])
+        components[interpolation, size].append(snapshot.components[0])
+N_snapshots = len(a)
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data ...')
+
+# Compute distance between particles in the reference snapshots
+# and the other snapshots.
+dist = {table_spec: [] for table_spec in table_specs[1:]}
+for i in range(N_snapshots):
+    x = {table_spec: components[table_spec][i].posx for table_spec in table_specs}
+    y = {table_spec: components[table_spec][i].posy for table_spec in table_specs}
+    z = {table_spec: components[table_spec][i].posz for table_spec in table_specs}
+    for table_spec in table_specs[1:]:
+        dx = x[table_spec] - x[table_spec_reference]
+        dy = y[table_spec] - y[table_spec_reference]
+        dz = z[table_spec] - z[table_spec_reference]
+        dx -= boxsize*np.round(dx/boxsize)
+        dy -= boxsize*np.round(dy/boxsize)
+        dz -= boxsize*np.round(dz/boxsize)
+        dist[table_spec].append(np.sqrt(dx**2 + dy**2 + dz**2))
+
+# Plot
+fig_file = f'{this_dir}/result.png'
+fig, axes = plt.subplots(len(dist), sharex=True, sharey=True)
+for (interpolation, size), d, ax in zip(dist.keys(), dist.values(), axes):
+    for i in range(N_snapshots):
+        ax.semilogy(
+            machine_ϵ + asarray(d[i])/boxsize,
+            '.',
+            alpha=0.7,
+            label=f'$a={a[i]}$',
+            zorder=-i,
+        )
+    ax.set_ylabel(
+        rf'$|\Delta\mathbf{{x}}|/\mathrm{{boxsize}}$' + '\n'
+        rf'({interpolation}, {size})'
+    )
+axes[ 0].set_xlim(0, components[table_spec_reference][0].N - 1)
+axes[-1].set_xlabel('Particle number')
+fig.subplots_adjust(hspace=0)
+plt.setp([ax.get_xticklabels() for ax in axes[:-1]], visible=False)
+axes[0].legend()
+fig.tight_layout()
+fig.savefig(fig_file, dpi=150)
+
+# Print out the accuracy and timing of each table specification
+errors = {
+    table_spec: np.mean(asarray(d[-1]))/boxsize
+    for table_spec, d in dist.items()
+}
+for (interpolation, size), t in timings.items():
+    masterprint(
+        f'{interpolation} interpolation, table size {size}: '
+        + (
+            '(reference)'
+            if (interpolation, size) == table_spec_reference
+            else f'mean position error {errors[interpolation, size]:.3e}'
+        )
+        + f', run time {t:.2f} s'
+    )
+
+# Printout error message for unsuccessful test. We require that the
+# errors of the interpolated tables do not exceed the error of the
+# larger NGP table.
+error_ngp = min(
+    error
+    for (interpolation, size), error in errors.items()
+    if interpolation.lower() == 'ngp'
+)
+for (interpolation, size), error in errors.items():
+    if interpolation.lower() == 'ngp':
+        continue
+    if error > error_ngp:
+        abort(
+            f'The {interpolation} interpolated short-range force table of size {size} '
+            f'produces larger errors than the NGP table.\n'
+            f'See "{fig_file}" for a visualization.'
+        )
+
+# Done analysing
+masterprint('done')
@@ -0,0 +1,59 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from snapshot import load
+import species
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in the particle data of the three snapshots,
+# ordered according to the particle IDs.
+species.allow_similarly_named_components = True
+labels = ('plain', 'compressed', 'reloaded')
+pos = {}
+mom = {}
+for label in labels:
+    filename = glob(f'{this_dir}/output_{label}/snapshot*.hdf5')[0]
+    component = load(filename, compare_params=False, only_components=True)[0]
+    N = component.N_local
+    ordering = np.argsort(asarray(component.ids_mv)[:N])
+    pos[label] = asarray(component.pos_mv3)[:N][ordering, :]
+    mom[label] = asarray(component.mom_mv3)[:N][ordering, :]
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data ...')
+
+# The compressed snapshot stores positions as 32-bit fixed-point
+# numbers and momenta in single precision. The positions should then
+# be correct to within half a quantisation cell and the momenta to
+# within single-precision round-off.
+dist = pos['compressed'] - pos['plain']
+dist -= boxsize*np.round(dist/boxsize)
+dist_max = np.max(np.abs(dist))
+dist_tol = 0.5*boxsize/2**32*(1 + 1e-6)
+if dist_max > dist_tol:
+    abort(
+        f'Positions within the compressed snapshot are off by as much as '
+        f'{dist_max/boxsize:.3e} boxsize, exceeding the fixed-point '
+        f'resolution of {dist_tol/boxsize:.3e} boxsize'
+    )
+mom_std = np.std(mom['plain'])
+if not np.all(np.isclose(mom['compressed'], mom['plain'], 1e-6, 1e-6*mom_std)):
+    abort('Momenta within the compressed snapshot exceed single-precision round-off')
+
+# Loading in the sub-files of the compressed snapshot using a different
+# number of processes should reproduce the data exactly.
+if (
+       not np.all(pos['reloaded'] == pos['compressed'])
+    or not np.all(mom['reloaded'] == mom['compressed'])
+):
+    abort(
+        'Loading the compressed snapshot using a different number of processes '
+        'did not reproduce the particle data'
+    )
+
+# Done analysing
+masterprint('done')